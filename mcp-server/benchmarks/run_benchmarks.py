@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+VibeCraft Benchmark Suite
+
+Runs the analysis tools and build paths against the fake RCON server
+(``tests/support/fake_server.py``) on a fixed, seeded scene and records, per
+benchmark:
+
+- RCON commands, packets and bytes in each direction
+- wall time (median over --repeat runs)
+- peak Python heap (tracemalloc, separate run; includes the in-process
+  fake server)
+
+The JSON report carries the git commit so reports from different commits
+can be compared with --compare.
+
+Usage:
+    cd mcp-server
+    python3 benchmarks/run_benchmarks.py
+    python3 benchmarks/run_benchmarks.py --latency 0.002 --repeat 5
+    python3 benchmarks/run_benchmarks.py --only spatial --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add mcp-server/ (for the fake server in tests/support) and src/ to the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer, VoxelWorld, normalize_block
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.spatial_analyzer import SpatialAnalyzerV2
+from vibecraft.terrain import TerrainAnalyzer
+from vibecraft.tools.build_tools import handle_build
+from vibecraft.tools.furniture_tools import handle_place_furniture
+from vibecraft.validation_algorithms import LightingAnalyzer, StructureValidator, SymmetryChecker
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PASSWORD = "benchmark"
+
+# Scene layout: rolling terrain with a small house, a pond and some hazards
+TERRAIN_MIN = -8
+TERRAIN_MAX = 72
+HOUSE_MIN = (20, 64, 20)
+HOUSE_MAX = (28, 69, 28)
+BUILD_ORIGIN = (100, 64, 100)
+
+logger = logging.getLogger("benchmarks")
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[RCONManager, VibeCraftConfig], Any]
+    description: str
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, description: str):
+    """Register a benchmark function (rcon, config) -> Any."""
+
+    def register(func):
+        BENCHMARKS.append(Benchmark(name, func, description))
+        return func
+
+    return register
+
+
+# ----------------------------------------------------------------------
+# Scene
+# ----------------------------------------------------------------------
+
+def build_scene(seed: int = 1234) -> VoxelWorld:
+    """Deterministic test world: terrain, a house, water and lava."""
+    rng = random.Random(seed)
+    world = VoxelWorld()
+
+    def put(x: int, y: int, z: int, block: str) -> None:
+        world.set((x, y, z), *normalize_block(block))
+
+    for x in range(TERRAIN_MIN, TERRAIN_MAX):
+        for z in range(TERRAIN_MIN, TERRAIN_MAX):
+            height = 63 + int(2 * rng.random() + ((x // 16 + z // 16) % 3))
+            if HOUSE_MIN[0] - 2 <= x <= HOUSE_MAX[0] + 2 and HOUSE_MIN[2] - 2 <= z <= HOUSE_MAX[2] + 2:
+                height = HOUSE_MIN[1] - 1
+            for y in range(54, height - 3):
+                put(x, y, z, "stone")
+            for y in range(height - 3, height):
+                put(x, y, z, "dirt")
+            put(x, height, z, "grass_block")
+            if rng.random() < 0.03:
+                put(x, height + 1, z, "short_grass")
+
+    # Pond and hazards
+    for x in range(40, 48):
+        for z in range(8, 14):
+            put(x, 64, z, "water")
+    put(10, 64, 50, "lava")
+    put(11, 64, 50, "lava")
+
+    # House: plank walls with glass windows, stone brick floor, slab roof
+    x1, y1, z1 = HOUSE_MIN
+    x2, y2, z2 = HOUSE_MAX
+    for x in range(x1, x2 + 1):
+        for z in range(z1, z2 + 1):
+            put(x, y1, z, "stone_bricks")
+            put(x, y2, z, "oak_slab[type=bottom]")
+            for y in range(y1 + 1, y2):
+                if x in (x1, x2) or z in (z1, z2):
+                    corner = x in (x1, x2) and z in (z1, z2)
+                    window = y == y1 + 2 and not corner and (x + z) % 3 == 0
+                    put(x, y, z, "glass_pane" if window else ("oak_log" if corner else "oak_planks"))
+    put((x1 + x2) // 2, y1 + 1, z1, "oak_door[facing=south,half=lower]")
+    put((x1 + x2) // 2, y1 + 2, z1, "oak_door[facing=south,half=upper]")
+    put(x1 + 1, y1 + 2, z1 + 1, "wall_torch[facing=south]")
+    put(x1 + 2, y1 + 1, z2 - 1, "chest[facing=north]")
+    # Floating sand for the structure validator
+    put(x2 - 2, y1 + 3, z2 - 2, "sand")
+    return world
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+@benchmark("terrain.analyze_region", "TerrainAnalyzer.analyze_region over 64x64 columns")
+def bench_terrain(rcon, config):
+    return TerrainAnalyzer(rcon).analyze_region(0, 55, 0, 63, 80, 63, resolution=5)
+
+
+def _spatial(detail_level: str):
+    def run(rcon, config):
+        return SpatialAnalyzerV2(rcon).analyze_area(24, 66, 24, radius=5, detail_level=detail_level)
+
+    return run
+
+
+for _level in ("low", "medium", "high"):
+    benchmark(f"spatial.analyze_area.{_level}", f"SpatialAnalyzerV2 detail_level={_level}, radius 5")(
+        _spatial(_level)
+    )
+
+
+@benchmark("validation.check_symmetry", "SymmetryChecker on the house, x axis")
+def bench_symmetry(rcon, config):
+    return SymmetryChecker(rcon).check_symmetry(*HOUSE_MIN, *HOUSE_MAX, axis="x", resolution=1)
+
+
+@benchmark("validation.analyze_lighting", "LightingAnalyzer inside the house, resolution 2")
+def bench_lighting(rcon, config):
+    return LightingAnalyzer(rcon).analyze_lighting(*HOUSE_MIN, *HOUSE_MAX, resolution=2)
+
+
+@benchmark("validation.validate_structure", "StructureValidator on the house")
+def bench_structure(rcon, config):
+    return StructureValidator(rcon).validate_structure(*HOUSE_MIN, *HOUSE_MAX, resolution=1)
+
+
+def _build_commands() -> List[str]:
+    """A 12x6x12 hollow building: fills for walls and setblocks for detail."""
+    x, y, z = BUILD_ORIGIN
+    commands = [
+        f"/fill {x} {y} {z} {x + 11} {y} {z + 11} stone_bricks",
+        f"/fill {x} {y + 1} {z} {x + 11} {y + 5} {z + 11} oak_planks hollow",
+    ]
+    for i in range(12):
+        for j in range(12):
+            commands.append(f"/setblock {x + i} {y + 6} {z + j} spruce_slab[type=bottom]")
+    for i in range(1, 11, 2):
+        commands.append(f"/setblock {x + i} {y + 3} {z} glass_pane")
+        commands.append(f"/setblock {x + i} {y + 3} {z + 11} glass_pane")
+    return commands
+
+
+@benchmark("tools.build", "handle_build with fills and ~150 setblocks over RCON")
+def bench_build(rcon, config):
+    arguments = {"commands": _build_commands(), "description": "benchmark build"}
+    return asyncio.run(handle_build(arguments, rcon, config, logger))
+
+
+@benchmark("tools.place_furniture", "handle_place_furniture, simple_dining_table")
+def bench_furniture(rcon, config):
+    x, y, z = BUILD_ORIGIN
+    arguments = {
+        "furniture_id": "simple_dining_table",
+        "origin_x": x + 40,
+        "origin_y": y,
+        "origin_z": z,
+        "place_on_surface": False,
+    }
+    return asyncio.run(handle_place_furniture(arguments, rcon, config, logger))
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(server: FakeMinecraftServer, config: VibeCraftConfig, bench: Benchmark,
+             scene: Dict, trace_memory: bool = False) -> Dict[str, Any]:
+    """Run a benchmark on a fresh connection pool and a freshly restored scene."""
+    server.world.blocks = dict(scene["blocks"])
+    server.world.block_entities = dict(scene["block_entities"])
+    server.pos1 = server.pos2 = server.worldedit_world = None
+    rcon = RCONManager(config)
+    server.reset_stats()
+    if trace_memory:
+        # tracemalloc slows allocation-heavy code; traced runs are not timed
+        tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        bench.run(rcon, config)
+        elapsed = time.perf_counter() - started
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        rcon.close()
+    return {
+        "wall_time_s": elapsed,
+        "peak_memory_bytes": peak_memory,
+        "stats": dict(server.stats),
+        "command_names": dict(server.command_names.most_common()),
+    }
+
+
+def run_benchmark(server, config, bench, scene, repeat: int, memory: bool) -> Dict[str, Any]:
+    runs = [run_once(server, config, bench, scene) for _ in range(repeat)]
+    wall_times = [run["wall_time_s"] for run in runs]
+    stats = runs[-1]["stats"]
+    result: Dict[str, Any] = {
+        "description": bench.description,
+        "commands": stats.get("commands", 0),
+        "packets_sent": stats.get("packets_in", 0),
+        "packets_received": stats.get("packets_out", 0),
+        "bytes_sent": stats.get("bytes_in", 0),
+        "bytes_received": stats.get("bytes_out", 0),
+        "wall_time_s": round(statistics.median(wall_times), 4),
+        "wall_times_s": [round(t, 4) for t in wall_times],
+        "command_breakdown": runs[-1]["command_names"],
+    }
+
+    if memory:
+        traced = run_once(server, config, bench, scene, trace_memory=True)
+        result["peak_memory_bytes"] = traced["peak_memory_bytes"]
+    return result
+
+
+def compare(report: Dict[str, Any], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nCompared with {baseline.get('commit')} ({baseline_path}):")
+    print(f"{'benchmark':34} {'commands':>18} {'wall time (s)':>22}")
+    for name, result in report["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            print(f"{name:34} {'(new)':>18}")
+            continue
+        commands = f"{before['commands']} -> {result['commands']}"
+        wall = f"{before['wall_time_s']:.3f} -> {result['wall_time_s']:.3f}"
+        print(f"{name:34} {commands:>18} {wall:>22}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark VibeCraft against the fake server")
+    parser.add_argument("--latency", type=float, default=0.0005,
+                        help="Simulated seconds per command (default: 0.0005)")
+    parser.add_argument("--fragment-size", type=int, default=4096,
+                        help="Maximum characters per response packet")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--only", default=None, help="Run benchmarks whose name contains this")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--function-batches", action="store_true",
+                        help="Let batch builds run as datapack functions")
+    parser.add_argument("--schematics", action="store_true",
+                        help="Let large builds be pasted as WorldEdit schematics")
+    parser.add_argument("--pipelining", action="store_true",
+                        help="Keep several batch commands in flight per connection")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Report path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier report to compare with")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+
+    selected = [b for b in BENCHMARKS if not args.only or args.only in b.name]
+    if not selected:
+        print(f"No benchmark matches '{args.only}'")
+        return 1
+
+    world = build_scene()
+    scene = {"blocks": dict(world.blocks), "block_entities": dict(world.block_entities)}
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        world_dir = Path(data_dir) / "world"
+        world_dir.mkdir()
+        schematic_dir = Path(data_dir) / "plugins" / "WorldEdit" / "schematics"
+        schematic_dir.mkdir(parents=True)
+        server = FakeMinecraftServer(
+            password=PASSWORD,
+            world=world,
+            latency=args.latency,
+            fragment_size=args.fragment_size,
+            world_dir=world_dir,
+            schematic_dir=schematic_dir,
+        )
+        with server:
+            config = VibeCraftConfig(
+                rcon_host="127.0.0.1",
+                rcon_port=server.port,
+                rcon_password=PASSWORD,
+                enable_function_batches=args.function_batches,
+                enable_schematic_builds=args.schematics,
+                enable_rcon_pipelining=args.pipelining,
+                minecraft_data_dir=data_dir,
+            )
+
+            results: Dict[str, Any] = {}
+            for bench in selected:
+                print(f"{bench.name:34}", end=" ", flush=True)
+                result = run_benchmark(server, config, bench, scene, args.repeat, not args.no_memory)
+                results[bench.name] = result
+                memory = result.get("peak_memory_bytes")
+                print(
+                    f"{result['commands']:6d} cmds {result['bytes_sent'] + result['bytes_received']:9d} B "
+                    f"{result['wall_time_s']:8.3f} s"
+                    + (f" {memory / 1024:9.0f} KiB" if memory is not None else "")
+                )
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "latency": args.latency,
+            "fragment_size": args.fragment_size,
+            "repeat": args.repeat,
+            "function_batches": args.function_batches,
+            "schematics": args.schematics,
+        },
+        "benchmarks": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{commit or 'report'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
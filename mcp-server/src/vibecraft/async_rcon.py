@@ -0,0 +1,440 @@
+"""
+Asyncio RCON Client
+
+Native asyncio counterpart to RCONManager. Tool handlers are ``async def``;
+awaiting RCON I/O here instead of calling the blocking client lets many tool
+calls (e.g. several SSE clients) make progress concurrently on one event loop.
+"""
+
+import asyncio
+import logging
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Tuple
+
+from .config import VibeCraftConfig
+from .rcon_protocol import (
+    MAX_REQUEST_BODY,
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_SENTINEL,
+    PipelineWindow,
+    RCONAuthenticationError,
+    RCONError,
+    decode_packet,
+    encode_packet,
+)
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving averages
+LATENCY_SMOOTHING = 0.2
+
+# Smallest batch whose duration says something about pipelined throughput
+MIN_TIMED_BATCH = 16
+
+
+class LatencyStats:
+    """Moving averages of how long the server takes to answer commands."""
+
+    def __init__(self):
+        # Seconds for one command sent on its own
+        self.round_trip: Optional[float] = None
+        # Seconds per command in a pipelined batch
+        self.pipelined: Optional[float] = None
+
+    @staticmethod
+    def _average(current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + LATENCY_SMOOTHING * (sample - current)
+
+    def record_round_trip(self, seconds: float) -> None:
+        self.round_trip = self._average(self.round_trip, seconds)
+
+    def record_batch(self, seconds: float, count: int) -> None:
+        if count >= MIN_TIMED_BATCH:
+            self.pipelined = self._average(self.pipelined, seconds / count)
+
+
+class AsyncRCONConnection:
+    """A single authenticated RCON stream. Not safe for concurrent use."""
+
+    def __init__(self, host: str, port: int, password: str):
+        self.host = host
+        self.port = port
+        self.password = password
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._next_id = 0
+        self.commands_sent = 0
+        self.last_used = 0.0
+
+    async def connect(self) -> None:
+        """Open the TCP stream and authenticate."""
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.last_used = time.monotonic()
+
+        try:
+            auth_id = self._allocate_id()
+            self._writer.write(encode_packet(auth_id, SERVERDATA_AUTH, self.password))
+            await self._writer.drain()
+            while True:
+                request_id, packet_type, _ = await self._read_packet()
+                if packet_type != SERVERDATA_AUTH_RESPONSE:
+                    continue
+                if request_id == -1:
+                    raise RCONAuthenticationError("RCON authentication failed: wrong password")
+                if request_id == auth_id:
+                    return
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the stream (safe to call multiple times)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+    def is_alive(self) -> bool:
+        return (
+            self._writer is not None
+            and not self._writer.is_closing()
+            and not self._reader.at_eof()
+        )
+
+    async def command(self, command: str) -> str:
+        """Send a command and wait for its full (possibly multi-packet) response."""
+        parts = []
+        async for fragment in self.stream(command):
+            parts.append(fragment)
+        return "".join(parts)
+
+    async def stream(self, command: str) -> AsyncIterator[str]:
+        """
+        Send a command and yield its response fragments as they arrive.
+
+        The end of the response is detected with a sentinel packet, written
+        once the server has answered the command, as in RCONConnection.stream().
+        """
+        if self._writer is None:
+            raise RCONError("RCON connection is not open")
+        if len(command.encode("utf-8")) > MAX_REQUEST_BODY:
+            raise RCONError(f"Command exceeds RCON limit of {MAX_REQUEST_BODY} bytes")
+
+        request_id = self._allocate_id()
+        sentinel_id: Optional[int] = None
+        self._writer.write(encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+        await self._writer.drain()
+        self.commands_sent += 1
+
+        while True:
+            in_id, _, body = await self._read_packet()
+            if in_id == request_id:
+                if sentinel_id is None:
+                    sentinel_id = self._allocate_id()
+                    self._writer.write(encode_packet(sentinel_id, SERVERDATA_SENTINEL, ""))
+                    await self._writer.drain()
+                yield body
+            elif in_id == sentinel_id:
+                break
+
+        self.last_used = time.monotonic()
+
+    async def pipeline(
+        self, commands: Sequence[str], depth: int, timeout: float
+    ) -> AsyncIterator[str]:
+        """
+        Send commands with up to ``depth`` of them in flight and yield each
+        response in command order.
+
+        Responses (and their sentinels) are matched back to their command by
+        packet ID, so the round-trip latency is paid once per window instead of once per
+        command. ``timeout`` bounds the wait for every individual response.
+
+        Every packet is a write of its own. A ``depth`` of 1 sends each
+        command only after the previous one completed (see stream()), for
+        servers that read one packet per socket read.
+        """
+        if self._writer is None:
+            raise RCONError("RCON connection is not open")
+        if depth <= 1:
+            for command in commands:
+                yield await asyncio.wait_for(self.command(command), timeout)
+            return
+
+        window = PipelineWindow(commands, depth, self._allocate_id)
+        while not window.finished:
+            # Top up the window before waiting on the network
+            sent = window.sent
+            for packet in window.top_up():
+                self._writer.write(packet)
+                await self._writer.drain()
+            self.commands_sent += window.sent - sent
+
+            while not window.has_next():
+                in_id, _, body = await asyncio.wait_for(self._read_packet(), timeout)
+                window.receive(in_id, body)
+
+            self.last_used = time.monotonic()
+            yield window.pop()
+
+    def _allocate_id(self) -> int:
+        self._next_id = (self._next_id % 0x7FFFFFFF) + 1
+        return self._next_id
+
+    async def _read_packet(self) -> Tuple[int, int, str]:
+        try:
+            header = await self._reader.readexactly(4)
+            length = int.from_bytes(header, "little", signed=True)
+            return decode_packet(await self._reader.readexactly(length))
+        except asyncio.IncompleteReadError as e:
+            raise RCONError("RCON connection closed by server") from e
+
+
+class AsyncRCONManager:
+    """
+    Asyncio RCON manager with its own bounded connection pool.
+
+    Usage:
+        response = await rcon.execute("list")
+
+    Every call honours a timeout (``rcon_timeout`` by default). A command that
+    times out or whose task is cancelled discards its connection, since the
+    stream may still carry the late response.
+    """
+
+    def __init__(self, config: VibeCraftConfig):
+        self.config = config
+        self.host = config.rcon_host
+        self.port = config.rcon_port
+        self.password = config.rcon_password
+        self.timeout = config.rcon_timeout
+        self.idle_timeout = config.rcon_pool_idle_timeout
+        self.pipeline_depth = config.rcon_pipeline_depth
+        self._idle: List[AsyncRCONConnection] = []
+        self._slots = asyncio.Semaphore(max(1, config.rcon_pool_size))
+        self.connections_opened = 0
+        # Connections open right now, idle or checked out
+        self._open_count = 0
+        self.latency = LatencyStats()
+
+        # Called when a pooled connection is found dead (e.g. server restart)
+        # or a fresh socket starts a new session with nothing else open
+        # (after idle eviction the server may have restarted unnoticed)
+        self.on_connection_lost: Optional[Callable[[], None]] = None
+
+    async def _open(self) -> AsyncRCONConnection:
+        connection = AsyncRCONConnection(self.host, self.port, self.password)
+        await connection.connect()
+        fresh = self._open_count == 0
+        self._open_count += 1
+        self.connections_opened += 1
+        if fresh:
+            self._connection_lost()
+        return connection
+
+    def _discard(self, connection: AsyncRCONConnection) -> None:
+        connection.close()
+        self._open_count -= 1
+
+    def _take_idle(self) -> Optional[AsyncRCONConnection]:
+        now = time.monotonic()
+        while self._idle:
+            connection = self._idle.pop()
+            if now - connection.last_used > self.idle_timeout:
+                self._discard(connection)
+                continue
+            if not connection.is_alive():
+                self._discard(connection)
+                self._connection_lost()
+                continue
+            return connection
+        return None
+
+    def _connection_lost(self) -> None:
+        if self.on_connection_lost is not None:
+            self.on_connection_lost()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncRCONConnection]:
+        """Check out a pooled connection; discarded if the body raises or is cancelled."""
+        async with self._slots:
+            connection = self._take_idle()
+            if connection is None:
+                connection = await asyncio.wait_for(self._open(), self.timeout)
+            try:
+                yield connection
+            except BaseException:
+                self._discard(connection)
+                raise
+            self._idle.append(connection)
+
+    async def check(self) -> None:
+        """Async counterpart of RCONConnectionPool.check()."""
+        try:
+            async with self.connection():
+                pass
+        except Exception:
+            self._connection_lost()
+
+    async def execute(self, command: str, timeout: Optional[float] = None) -> str:
+        """
+        Execute a command on the Minecraft server.
+
+        Args:
+            command: The command to execute (without leading slash)
+            timeout: Seconds to wait for the response (default: rcon_timeout)
+
+        Returns:
+            The server's response
+
+        Raises:
+            ConnectionError: If RCON connection fails
+            TimeoutError: If command execution times out
+            asyncio.CancelledError: If the calling task is cancelled
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            if self.config.enable_command_logging:
+                logger.info(f"Executing command: {command}")
+
+            started = time.monotonic()
+            response = await asyncio.wait_for(self._run_pooled(command), timeout)
+            self.latency.record_round_trip(time.monotonic() - started)
+
+            if self.config.enable_command_logging:
+                logger.info(f"Response: {response}")
+
+            return response
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            raise self._translate_error(e, command, timeout) from e
+
+    async def execute_batch(
+        self,
+        commands: Sequence[str],
+        window: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Execute many commands pipelined over one connection.
+
+        Args:
+            commands: Commands to execute (without leading slash), in order
+            window: Commands kept in flight (default: rcon_pipeline_depth;
+                always 1 unless enable_rcon_pipelining is set)
+            timeout: Seconds to wait for each response (default: rcon_timeout)
+
+        Returns:
+            The server's responses, in the same order as ``commands``
+
+        Raises:
+            ConnectionError, TimeoutError, RuntimeError: As for execute()
+        """
+        return [response async for response in self.stream_batch(commands, window, timeout)]
+
+    async def stream_batch(
+        self,
+        commands: Sequence[str],
+        window: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Pipelined variant of execute_batch() that yields each response as soon
+        as it (and every response before it) has arrived.
+
+        The server runs the commands of one connection strictly in order, so
+        WorldEdit sequences such as ``/pos1``, ``/pos2``, ``/set`` keep their
+        meaning. On failure, every response yielded so far belongs to a
+        command that completed.
+        """
+        commands = list(commands)
+        window = max(1, window or self.pipeline_depth)
+        if not self.config.enable_rcon_pipelining:
+            window = 1
+        timeout = self.timeout if timeout is None else timeout
+        done = 0
+        retried = False
+        started = time.monotonic()
+
+        try:
+            while True:
+                reused = False
+                try:
+                    async with self.connection() as connection:
+                        reused = connection.commands_sent > 0
+                        async for response in connection.pipeline(commands[done:], window, timeout):
+                            if self.config.enable_command_logging:
+                                logger.info(f"Executed command: {commands[done]} -> {response}")
+                            done += 1
+                            yield response
+                    self.latency.record_batch(time.monotonic() - started, done)
+                    return
+                except (RCONAuthenticationError, ConnectionRefusedError):
+                    raise
+                except (RCONError, OSError) as e:
+                    # Only a connection that broke while idle in the pool is
+                    # retried; nothing may have been executed on it yet.
+                    if not reused or done or retried:
+                        raise
+                    retried = True
+                    logger.info(f"RCON connection lost ({e}); reconnecting")
+                    self._connection_lost()
+
+        except Exception as e:
+            failed = commands[done] if done < len(commands) else "<batch>"
+            raise self._translate_error(e, failed, timeout) from e
+
+    def _translate_error(self, e: Exception, command: str, timeout: float) -> Exception:
+        """Map low-level failures onto the exceptions RCONManager has always raised."""
+        if isinstance(e, ConnectionRefusedError):
+            error_msg = (
+                f"Failed to connect to Minecraft server at {self.host}:{self.port}. "
+                f"Ensure the server is running and RCON is enabled. Error: {str(e)}"
+            )
+            logger.error(error_msg)
+            return ConnectionError(error_msg)
+
+        if isinstance(e, (asyncio.TimeoutError, TimeoutError)):
+            error_msg = (
+                f"Command execution timed out after {timeout} seconds. "
+                f"The server may be overloaded or unresponsive. Command: {command}"
+            )
+            logger.error(error_msg)
+            return TimeoutError(error_msg)
+
+        error_msg = f"Error executing RCON command: {str(e)}"
+        logger.error(error_msg)
+        return RuntimeError(error_msg)
+
+    async def _run_pooled(self, command: str) -> str:
+        reused = False
+        try:
+            async with self.connection() as connection:
+                reused = connection.commands_sent > 0
+                return await connection.command(command)
+        except (RCONAuthenticationError, ConnectionRefusedError):
+            raise
+        except (RCONError, OSError) as e:
+            if not reused:
+                raise
+            logger.info(f"RCON connection lost ({e}); reconnecting")
+            self._connection_lost()
+            async with self.connection() as connection:
+                return await connection.command(command)
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        while self._idle:
+            self._discard(self._idle.pop())
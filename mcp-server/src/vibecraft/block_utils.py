@@ -1,7 +1,10 @@
 """
 Block State Utilities for VibeCraft
 
-Utilities for querying and analyzing block states via RCON.
+Utilities for querying and analyzing block states. Queries are answered
+from the world's region files when they are mounted (see region_files.py)
+and over RCON otherwise; both go through the RCONManager's chunk cache
+(see chunk_cache.py).
 """
 
 import logging
@@ -12,9 +15,52 @@ from .rcon_manager import RCONManager
 
 logger = logging.getLogger(__name__)
 
+AIR_IDS = {"air", "cave_air", "void_air"}
+
+
+def sync_world(rcon: RCONManager) -> bool:
+    """
+    Make region-file reads current before a batch of block queries.
+
+    Returns:
+        Whether queries will be answered from the region files
+    """
+    return rcon.region_files.flush()
+
+
+def block_from_state(state: str) -> Dict[str, Any]:
+    """Block dict (as fetch_block_state returns) for a state like "minecraft:stairs[half=top]"."""
+    name, _, props_str = state.partition("[")
+    if ":" not in name:
+        name = f"minecraft:{name}"
+    block_id = name.split(":", 1)[1]
+    properties: Dict[str, str] = {}
+    for fragment in props_str.rstrip("]").split(","):
+        if "=" in fragment:
+            key, value = fragment.split("=", 1)
+            properties[key.strip()] = value.strip()
+
+    ordered = ','.join(f"{k}={properties[k]}" for k in sorted(properties))
+    return {
+        "namespaced_id": name,
+        "id": block_id,
+        "properties": properties,
+        "state": ordered,
+        "key": f"{block_id}[{ordered}]" if ordered else block_id,
+        "raw": state,
+    }
+
 
 def fetch_block_state(rcon: RCONManager, x: int, y: int, z: int) -> Optional[Dict[str, Any]]:
-    """Fetch block state (id + properties) at coordinates via RCON."""
+    """Fetch block state (id + properties) at coordinates, from region files or via RCON."""
+    state = rcon.region_files.block_state(x, y, z)
+    if state is not None:
+        return block_from_state(state)
+
+    cached = rcon.chunk_cache.block(x, y, z)
+    if cached is not None:
+        return cached
+
     try:
         result = rcon.send_command(f"execute positioned {x} {y} {z} run data get block ~ ~ ~")
     except Exception as exc:
@@ -49,7 +95,7 @@ def fetch_block_state(rcon: RCONManager, x: int, y: int, z: int) -> Optional[Dic
         ordered = ""
         key_repr = block_id
 
-    return {
+    block = {
         "namespaced_id": f"minecraft:{block_id}",
         "id": block_id,
         "properties": properties,
@@ -57,8 +103,10 @@ def fetch_block_state(rcon: RCONManager, x: int, y: int, z: int) -> Optional[Dic
         "key": key_repr,
         "raw": text.strip(),
     }
+    rcon.chunk_cache.put_block(x, y, z, block)
+    return block
 
 
 def block_is_air(block: Optional[Dict[str, Any]]) -> bool:
     """Check if a block is air (or None/missing)."""
-    return block is None or block.get("id") == "air"
+    return block is None or block.get("id") in AIR_IDS
@@ -0,0 +1,287 @@
+"""
+Differential Builds
+
+Re-running a build, furniture placement or pattern over something that is
+already standing resends every block. In diff mode the plan is evaluated
+into the block it leaves at each position, the current blocks there are
+read from the server, and only positions that differ are written:
+
+    1. ``plan_voxels``: setblock, fill (replace/outline/hollow) and WorldEdit
+       ``//set <block>`` over a known selection become position -> block.
+       Anything whose result depends on the world (keep/destroy, filtered
+       fills, patterns, other WorldEdit commands) makes the plan
+       non-diffable and it is sent as is.
+    2. The bounding box is read in bulk from the region files (through the
+       chunk cache) or with ``//copy`` + ``//schem save``
+       (``SchematicBuildExecutor.read_region``); small plans fall back to
+       one pipelined ``execute if block`` probe per position.
+    3. Changed positions are greedy-meshed back into ``fill`` cuboids and
+       emitted bottom-up.
+
+Evaluating, comparing and meshing run on worker threads: a plan may cover up
+to MAX_PLAN_BLOCKS positions.
+
+A position counts as unchanged when it holds the planned block with every
+property the plan names (as ``execute if block`` compares); properties the
+plan leaves to their defaults are not compared. Blocks placed with NBT are
+always written.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from .build_plan import (
+    SELECTION_COMMANDS,
+    BuildPlan,
+    Comment,
+    Fill,
+    SelectionPoint,
+    SetBlock,
+    WorldEditCommand,
+    single_block,
+)
+from .command_compiler import greedy_mesh
+from .worldedit_session import Box, Position, volume
+
+logger = logging.getLogger(__name__)
+
+AIR = "minecraft:air"
+_AIR_BLOCKS = {AIR, "minecraft:cave_air", "minecraft:void_air"}
+
+# Largest plan (in positions) that is evaluated for a diff
+MAX_PLAN_BLOCKS = 1_000_000
+
+# Largest bounding box read back as a schematic
+MAX_READ_VOLUME = 1_000_000
+
+# Most positions checked one by one when the region cannot be read in bulk
+MAX_PROBES = 8192
+
+# Planned block and NBT per position
+Voxels = Dict[Position, Tuple[str, Optional[str]]]
+
+
+def _split_state(state: str) -> Tuple[str, FrozenSet[str]]:
+    state = state.strip().lower()
+    properties: FrozenSet[str] = frozenset()
+    if "[" in state:
+        state, rest = state.split("[", 1)
+        properties = frozenset(part.strip() for part in rest.rstrip("]").split(",") if part.strip())
+    if ":" not in state:
+        state = f"minecraft:{state}"
+    return state, properties
+
+
+@lru_cache(maxsize=4096)
+def same_block(planned: str, actual: str) -> bool:
+    """Whether ``actual`` is ``planned`` with every property ``planned`` names."""
+    planned_type, planned_properties = _split_state(planned)
+    actual_type, actual_properties = _split_state(actual)
+    if planned_type in _AIR_BLOCKS and actual_type in _AIR_BLOCKS:
+        return True
+    return planned_type == actual_type and planned_properties <= actual_properties
+
+
+def _cells(box: Box) -> Iterator[Tuple[Position, bool]]:
+    """Positions in ``box`` and whether each lies on its border."""
+    x1, x2 = sorted((box.x1, box.x2))
+    y1, y2 = sorted((box.y1, box.y2))
+    z1, z2 = sorted((box.z1, box.z2))
+    for x in range(x1, x2 + 1):
+        for y in range(y1, y2 + 1):
+            for z in range(z1, z2 + 1):
+                border = x in (x1, x2) or y in (y1, y2) or z in (z1, z2)
+                yield (x, y, z), border
+
+
+def plan_voxels(commands: Sequence[str]) -> Optional[Voxels]:
+    """
+    The block each position holds after the build, or None if that depends
+    on the world (or the plan writes more than MAX_PLAN_BLOCKS positions).
+    """
+    voxels: Voxels = {}
+    corners: Dict[int, Optional[Position]] = {1: None, 2: None}
+    written = 0
+
+    for operation in BuildPlan.from_commands(commands).operations:
+        if isinstance(operation, Comment):
+            continue
+        if isinstance(operation, SelectionPoint):
+            corners[operation.corner] = operation.position
+            continue
+
+        if isinstance(operation, SetBlock):
+            if operation.mode != "replace":
+                return None
+            voxels[operation.position] = (operation.block, operation.nbt)
+            written += 1
+            continue
+
+        if isinstance(operation, Fill):
+            if operation.filter or operation.mode not in ("replace", "outline", "hollow"):
+                return None
+            written += volume(operation.box)
+            if written > MAX_PLAN_BLOCKS:
+                return None
+            for position, border in _cells(operation.box):
+                if border:
+                    voxels[position] = (operation.block, operation.nbt)
+                elif operation.mode == "hollow":
+                    voxels[position] = (AIR, None)
+                elif operation.mode == "replace":
+                    voxels[position] = (operation.block, operation.nbt)
+            continue
+
+        if isinstance(operation, WorldEditCommand):
+            if operation.name in SELECTION_COMMANDS:
+                corners = {1: None, 2: None}
+                continue
+            block = single_block(operation.args) if operation.name == "set" else None
+            if block is None or corners[1] is None or corners[2] is None:
+                return None
+            box = Box(*corners[1], *corners[2])
+            written += volume(box)
+            if written > MAX_PLAN_BLOCKS:
+                return None
+            for position, _ in _cells(box):
+                voxels[position] = (block, None)
+            continue
+
+        return None
+
+    return voxels if written <= MAX_PLAN_BLOCKS else None
+
+
+@dataclass
+class DiffReport:
+    """What a diff skipped."""
+
+    commands_before: int
+    commands_after: int = 0
+    planned: int = 0
+    changed: int = 0
+    method: Optional[str] = None
+    skipped: Optional[str] = None
+
+    def summary(self) -> str:
+        if self.skipped:
+            return f"Diff skipped ({self.skipped}); sending all {self.commands_before} commands"
+        unchanged = self.planned - self.changed
+        return (
+            f"Diff: {unchanged:,} of {self.planned:,} block writes already in place "
+            f"(read by {self.method}); {self.commands_after} commands instead of {self.commands_before}"
+        )
+
+
+def _bounds(positions) -> Box:
+    xs, ys, zs = zip(*positions)
+    return Box(min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+
+
+async def _read_changed(rcon, voxels: Voxels) -> Tuple[Optional[Dict[Position, bool]], Optional[str]]:
+    """Which planned positions differ from the world (None if it could not be read)."""
+    box = _bounds(voxels)
+
+    if volume(box) <= MAX_READ_VOLUME:
+        if await rcon.run_blocking(rcon.region_files.flush):
+            blocks = await rcon.run_blocking(rcon.region_files.read_box, box)
+            if blocks is not None:
+                return await asyncio.to_thread(_compare_blocks, voxels, blocks), "region files"
+
+        region = await rcon.schematics.read_region(box)
+        if region is not None:
+            return await asyncio.to_thread(_compare_palette, voxels, box, *region), "schematic"
+
+    probed = [(position, block) for position, (block, nbt) in voxels.items() if nbt is None]
+    if len(probed) > MAX_PROBES:
+        return None, None
+    responses = await rcon.execute_batch(
+        [f"execute if block {x} {y} {z} {block}" for (x, y, z), block in probed]
+    )
+    changed = {position: True for position in voxels}
+    for (position, _), response in zip(probed, responses):
+        changed[position] = "passed" not in response.lower()
+    return changed, "probes"
+
+
+def _compare_blocks(voxels: Voxels, blocks) -> Dict[Position, bool]:
+    """Planned positions that differ from region file blocks (a ``read_box`` result)."""
+    return {
+        position: nbt is not None or not same_block(block, blocks.state(*position))
+        for position, (block, nbt) in voxels.items()
+    }
+
+
+def _compare_palette(voxels: Voxels, box: Box, palette: List[str], indices) -> Dict[Position, bool]:
+    """Planned positions that differ from a schematic read of ``box`` (Sponge order)."""
+    width, length = box.x2 - box.x1 + 1, box.z2 - box.z1 + 1
+    changed = {}
+    for (x, y, z), (block, nbt) in voxels.items():
+        index = (x - box.x1) + (z - box.z1) * width + (y - box.y1) * width * length
+        changed[(x, y, z)] = nbt is not None or not same_block(block, palette[indices[index]])
+    return changed
+
+
+def _emit(voxels: Voxels, changed: Dict[Position, bool], slash: str) -> List[str]:
+    """Commands writing the changed positions: fill cuboids for plain blocks, setblock for the rest, bottom-up."""
+    changed = {position: voxels[position] for position, differs in changed.items() if differs}
+    plain = {position: block for position, (block, nbt) in changed.items() if nbt is None}
+    writes = [(box, block, None) for box, block in greedy_mesh(plain)]
+    writes += [
+        (Box(*position, *position), block, nbt)
+        for position, (block, nbt) in changed.items()
+        if nbt is not None
+    ]
+    writes.sort(key=lambda write: (write[0].y1, write[0].x1, write[0].z1))
+
+    commands = []
+    for box, block, nbt in writes:
+        if volume(box) == 1:
+            commands.append(f"{slash}setblock {box.x1} {box.y1} {box.z1} {block}{nbt or ''}")
+        else:
+            commands.append(
+                f"{slash}fill {box.x1} {box.y1} {box.z1} {box.x2} {box.y2} {box.z2} {block}"
+            )
+    return commands
+
+
+async def diff_commands(rcon, commands: Sequence[str]) -> Tuple[List[str], DiffReport]:
+    """
+    Drop writes of blocks that are already in place.
+
+    Args:
+        rcon: RCONManager
+        commands: Build commands (vanilla with or without a leading slash,
+            WorldEdit with two)
+
+    Returns:
+        (commands to send, report). Commands come back unchanged when the
+        plan cannot be diffed.
+    """
+    report = DiffReport(commands_before=len(commands))
+    voxels = await asyncio.to_thread(plan_voxels, commands)
+    if voxels is None:
+        report.skipped = "the build depends on blocks already in the world"
+        return list(commands), report
+    if not voxels:
+        report.skipped = "the build places no blocks"
+        return list(commands), report
+
+    changed, method = await _read_changed(rcon, voxels)
+    if changed is None:
+        report.skipped = "the build is too large to compare block by block"
+        return list(commands), report
+
+    vanilla = [command for command in commands if not command.lstrip().startswith(("#", "//"))]
+    slash = "/" if any(command.lstrip().startswith("/") for command in vanilla) or not vanilla else ""
+    result = await asyncio.to_thread(_emit, voxels, changed, slash)
+
+    report.planned = len(voxels)
+    report.changed = sum(changed.values())
+    report.commands_after = len(result)
+    report.method = method
+    logger.info(report.summary())
+    return result, report
@@ -0,0 +1,180 @@
+"""
+Background Build Jobs
+
+``build(async=True)`` hands its commands to this queue and returns a job id
+right away; ``build_status`` and ``build_cancel`` read and control the job
+while it streams. At most ``build_max_workers`` jobs run at once, later ones
+wait in the queue.
+
+The job table is persisted as ``jobs.json`` next to the build journals, so
+``build_status`` still answers after a restart. Jobs that were queued or
+running when the MCP server stopped are reported as interrupted; their
+journal lets ``resume_build`` continue them.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+CANCELLED = "cancelled"
+
+FINISHED = frozenset({COMPLETED, FAILED, INTERRUPTED, CANCELLED})
+
+# Finished jobs kept in the table
+MAX_FINISHED_JOBS = 100
+
+# Minimum seconds between table writes for progress alone
+_SAVE_INTERVAL = 1.0
+
+
+@dataclass
+class BuildJob:
+    """One background build and its live progress."""
+
+    job_id: str
+    description: str
+    total: int
+    done: int = 0
+    errors: int = 0
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[str] = None
+
+
+JobRunner = Callable[[BuildJob], Awaitable[str]]
+
+
+class BuildJobManager:
+    """
+    Runs builds as asyncio tasks with bounded concurrency.
+
+    Usage:
+        job = manager.submit(job_id, description, total, runner)
+        # runner(job) updates job.done / job.errors and returns the result text
+        manager.get(job_id).status
+        await manager.cancel(job_id)
+    """
+
+    def __init__(self, table_path: Path, max_workers: int = 2):
+        self.table_path = table_path
+        self.max_workers = max(1, max_workers)
+        self.jobs: Dict[str, BuildJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.table_path, "r", encoding="utf-8") as handle:
+                entries = json.load(handle)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            try:
+                job = BuildJob(**entry)
+            except TypeError:
+                continue
+            if job.status not in FINISHED:
+                # The process that ran it is gone
+                job.status = INTERRUPTED
+                job.finished = job.finished or time.time()
+            self.jobs[job.job_id] = job
+
+    def save(self, force: bool = True) -> None:
+        """Write the job table (at most once a second unless ``force``)."""
+        now = time.time()
+        if not force and now - self._last_save < _SAVE_INTERVAL:
+            return
+        self._last_save = now
+
+        finished = sorted(
+            (job for job in self.jobs.values() if job.status in FINISHED),
+            key=lambda job: job.finished or 0,
+            reverse=True,
+        )
+        for job in finished[MAX_FINISHED_JOBS:]:
+            del self.jobs[job.job_id]
+
+        try:
+            self.table_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.table_path.with_suffix(".tmp")
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump([asdict(job) for job in self.jobs.values()], handle, indent=2)
+            temporary.replace(self.table_path)
+        except OSError as e:
+            logger.warning(f"Could not save build job table: {e}")
+
+    def submit(self, job_id: str, description: str, total: int, runner: JobRunner) -> BuildJob:
+        """Queue a build; it starts as soon as a worker slot is free."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        job = BuildJob(job_id=job_id, description=description, total=total)
+        self.jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job, runner))
+        self.save()
+        return job
+
+    async def _run(self, job: BuildJob, runner: JobRunner) -> None:
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.started = time.time()
+                self.save()
+                job.result = await runner(job)
+                if job.status == RUNNING:
+                    job.status = COMPLETED
+                    job.done = job.total
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.error(f"Background build {job.job_id} failed: {e}", exc_info=True)
+            job.status = FAILED
+            job.result = f"❌ Build failed: {e}"
+        finally:
+            job.finished = time.time()
+            self._tasks.pop(job.job_id, None)
+            self.save()
+
+    def progress(self, job: BuildJob, done: int, errors: int = 0) -> None:
+        """Record progress from a running job."""
+        job.done = done
+        job.errors = errors
+        self.save(force=False)
+
+    def get(self, job_id: str) -> Optional[BuildJob]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[BuildJob]:
+        """All known jobs, newest first."""
+        return sorted(self.jobs.values(), key=lambda job: job.submitted, reverse=True)
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if the job was still active and is now cancelled
+        """
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return True
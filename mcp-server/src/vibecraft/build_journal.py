@@ -0,0 +1,236 @@
+"""
+Resumable Build Journal
+
+Every ``build`` that streams its commands over RCON gets a job id and an
+append-only JSON-lines journal (``<journal dir>/<job_id>.jsonl``):
+
+    {"event": "plan", "job_id": "...", "plan_hash": "...", "commands": [...], ...}
+    {"event": "ack", "index": 500}
+    {"event": "ack", "index": 1000}
+    {"event": "interrupted", "index": 1234, "error": "..."}
+    {"event": "resumed", "index": 1234}
+    {"event": "completed", "index": 10000, "errors": 2}
+
+``index`` is the number of commands the server has acknowledged, i.e. the
+next command to send. Acknowledgements are appended every
+``CHECKPOINT_INTERVAL`` commands and exactly when a build is interrupted, so
+``resume_build`` continues where the connection dropped; if the MCP server
+itself dies, at most one interval is sent again. The plan hash guards
+against a journal whose command list was edited.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .paths import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = PROJECT_ROOT / "mcp-server" / "logs" / "builds"
+
+CHECKPOINT_INTERVAL = 50
+
+# Completed journals kept on disk; older ones are removed when new jobs start
+MAX_COMPLETED_JOURNALS = 50
+
+RUNNING = "running"
+INTERRUPTED = "interrupted"
+COMPLETED = "completed"
+
+
+class BuildJournalError(Exception):
+    """A journal is missing, unreadable or does not match its plan."""
+
+
+def plan_hash(commands: Sequence[str]) -> str:
+    """Stable hash of a command list."""
+    digest = hashlib.sha256()
+    for command in commands:
+        digest.update(command.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def journal_dir(config) -> Path:
+    return Path(config.build_journal_dir) if config.build_journal_dir else DEFAULT_JOURNAL_DIR
+
+
+class BuildJournal:
+    """
+    Append-only record of one build job.
+
+    Usage:
+        journal = BuildJournal.create(directory, commands, description)
+        journal.acknowledge(index)          # after each acknowledged command
+        journal.interrupt(index, error)     # or journal.complete(index, errors)
+
+        journal = BuildJournal.load(directory, job_id)
+        commands[journal.acknowledged:]     # what is left to send
+    """
+
+    def __init__(self, path: Path, plan: Dict[str, Any]):
+        self.path = path
+        self.plan = plan
+        self.job_id: str = plan["job_id"]
+        self.description: str = plan.get("description", "")
+        self.commands: List[str] = plan["commands"]
+        self.chunk_group_size: Optional[int] = plan.get("chunk_group_size")
+        self.acknowledged = 0
+        self.status = RUNNING
+        self.error: Optional[str] = None
+        self._recorded = 0
+
+    @classmethod
+    def create(
+        cls,
+        directory: Path,
+        commands: Sequence[str],
+        description: str = "",
+        chunk_group_size: Optional[int] = None,
+    ) -> "BuildJournal":
+        """Start a journal for a new job (``chunk_group_size``: set if the build is chunk-scheduled)."""
+        directory.mkdir(parents=True, exist_ok=True)
+        _prune(directory)
+        job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        plan = {
+            "event": "plan",
+            "job_id": job_id,
+            "description": description,
+            "created": time.time(),
+            "plan_hash": plan_hash(commands),
+            "chunk_group_size": chunk_group_size,
+            "commands": list(commands),
+        }
+        journal = cls(directory / f"{job_id}.jsonl", plan)
+        journal._append(plan)
+        return journal
+
+    @classmethod
+    def load(cls, directory: Path, job_id: str) -> "BuildJournal":
+        """
+        Read a job's journal.
+
+        Raises:
+            BuildJournalError: If the journal does not exist, is corrupt, or
+                its commands no longer match the recorded plan hash
+        """
+        if not job_id or Path(job_id).name != job_id:
+            raise BuildJournalError(f"Invalid job id: {job_id!r}")
+        path = directory / f"{job_id}.jsonl"
+        if not path.exists():
+            raise BuildJournalError(f"No build journal for job {job_id}")
+
+        journal: Optional[BuildJournal] = None
+        with open(path, "r", encoding="utf-8") as handle:
+            for number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partial last line; everything before it counts
+                    logger.warning(f"Ignoring unreadable line {number} of {path.name}")
+                    continue
+                if journal is None:
+                    if entry.get("event") != "plan":
+                        raise BuildJournalError(f"Journal {path.name} does not start with a plan")
+                    journal = cls(path, entry)
+                    continue
+                journal._replay(entry)
+
+        if journal is None:
+            raise BuildJournalError(f"Journal {path.name} is empty")
+        if plan_hash(journal.commands) != journal.plan.get("plan_hash"):
+            raise BuildJournalError(f"Journal {path.name} does not match its plan hash")
+        return journal
+
+    @staticmethod
+    def list_jobs(directory: Path, status: Optional[str] = None) -> List["BuildJournal"]:
+        """Journals in ``directory`` (newest first), optionally only with ``status``."""
+        jobs = []
+        for path in sorted(directory.glob("*.jsonl"), reverse=True):
+            try:
+                journal = BuildJournal.load(directory, path.stem)
+            except BuildJournalError:
+                continue
+            if status is None or journal.status == status:
+                jobs.append(journal)
+        return jobs
+
+    def _replay(self, entry: Dict[str, Any]) -> None:
+        event = entry.get("event")
+        if "index" in entry:
+            self.acknowledged = int(entry["index"])
+        if event == "interrupted":
+            self.status = INTERRUPTED
+            self.error = entry.get("error")
+        elif event == "completed":
+            self.status = COMPLETED
+        elif event == "resumed":
+            self.status = RUNNING
+        self._recorded = self.acknowledged
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def acknowledge(self, index: int) -> None:
+        """Record that commands before ``index`` were acknowledged."""
+        self.acknowledged = index
+        if index - self._recorded >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        if self.acknowledged != self._recorded:
+            self._append({"event": "ack", "index": self.acknowledged})
+            self._recorded = self.acknowledged
+
+    def resume(self) -> None:
+        self.status = RUNNING
+        self._append({"event": "resumed", "index": self.acknowledged})
+
+    def interrupt(self, index: int, error: str) -> None:
+        self.acknowledged = self._recorded = index
+        self.status = INTERRUPTED
+        self.error = error
+        self._append({"event": "interrupted", "index": index, "error": error, "time": time.time()})
+
+    def complete(self, index: int, errors: int = 0) -> None:
+        self.acknowledged = self._recorded = index
+        self.status = COMPLETED
+        self._append({"event": "completed", "index": index, "errors": errors, "time": time.time()})
+
+    @property
+    def remaining(self) -> int:
+        return len(self.commands) - self.acknowledged
+
+
+def _last_event(path: Path) -> Optional[str]:
+    """Event of the last complete line, read from the end of the file."""
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(0, 2)
+            handle.seek(max(0, handle.tell() - 4096))
+            lines = handle.read().decode("utf-8", "replace").strip().splitlines()
+        return json.loads(lines[-1]).get("event") if lines else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _prune(directory: Path) -> None:
+    """Remove the oldest completed journals beyond MAX_COMPLETED_JOURNALS."""
+    completed = [
+        path for path in sorted(directory.glob("*.jsonl"), reverse=True)
+        if _last_event(path) == COMPLETED
+    ]
+    for path in completed[MAX_COMPLETED_JOURNALS:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,748 @@
+"""
+Build Plan Representation and Optimizer
+
+``build``, ``place_furniture`` and ``place_building_pattern`` all end up with
+a flat list of command strings. ``BuildPlan`` parses that list into typed
+operations (setblock, fill, WorldEdit selection corners, other WorldEdit
+commands, comments) and runs optimization passes over it before dispatch:
+
+- duplicates: an idempotent command repeated back to back runs once
+- dead writes: a write whose blocks are all overwritten later is dropped
+- redundant writes: a write of the block the plan already put there
+  (air on air, stone on stone) is dropped
+- selections: ``//pos1``/``//pos2`` that no WorldEdit command reads before
+  the corner is set again, or that re-select the current corner, are dropped
+- reorder: independent vanilla writes are placed bottom-up, so sand, gravel
+  and attached blocks find their support already in place
+- finally, setblock runs are merged into ``/fill`` cuboids
+  (see ``command_compiler``)
+
+Every pass keeps the world the plan produces unchanged. Commands whose effect
+depends on what is already in the world (``keep``/``destroy`` modes, fill
+filters, relative coordinates, WorldEdit commands other than ``//set``,
+anything unrecognised) are barriers: nothing is moved across them and no
+knowledge about blocks survives them.
+
+Commands are taken in the form the tools produce: WorldEdit commands start
+with "//", vanilla commands with at most one slash ("/setblock" or
+"setblock"). Passes only drop or reorder operations, so every command that
+reaches the server is one the caller wrote or a merged ``/fill``.
+"""
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .command_compiler import compile_commands
+from .worldedit_session import SELECTION_COMMANDS, Box, Position, volume
+
+# Largest region whose cells are checked one by one when a single covering
+# box is not enough to decide a pass
+_MAX_CELL_CHECK = 4096
+
+# Plans longer than this skip the passes (they are still merged into /fill)
+MAX_OPTIMIZED_OPERATIONS = 100_000
+
+# The passes look boxes up in 8-block cubes (see _BoxIndex). A box touching
+# more cubes than _MAX_INDEXED_CUBES is kept in a list every lookup scans.
+_CUBE_SHIFT = 3
+_MAX_INDEXED_CUBES = 64
+
+T = TypeVar("T")
+
+_SETBLOCK_RE = re.compile(
+    r"^/?(?:minecraft:)?setblock\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+([^\s{]+)(\{.*\})?"
+    r"(?:\s+(replace|keep|destroy))?\s*$",
+    re.IGNORECASE,
+)
+_FILL_RE = re.compile(
+    r"^/?(?:minecraft:)?fill\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+"
+    r"([^\s{]+)(\{.*\})?(?:\s+(replace|keep|outline|hollow|destroy)(?:\s+(\S+))?)?\s*$",
+    re.IGNORECASE,
+)
+_SELECTION_RE = re.compile(
+    r"^//pos([12])\s+(-?\d+)(?:\s*,\s*|\s+)(-?\d+)(?:\s*,\s*|\s+)(-?\d+)\s*$",
+    re.IGNORECASE,
+)
+_WORLDEDIT_RE = re.compile(r"^//(\S+)\s*(.*)$", re.DOTALL)
+
+# WorldEdit commands that give the same result when run twice in a row
+_IDEMPOTENT_WORLDEDIT = frozenset({"set", "replace", "walls", "faces", "outline"})
+
+
+def normalize_block(block: str) -> str:
+    """Block state with an explicit namespace ("stone" -> "minecraft:stone")."""
+    block = block.strip()
+    if ":" not in block.split("[", 1)[0]:
+        block = f"minecraft:{block}"
+    return block.lower()
+
+
+def _normalize_box(box: Box) -> Box:
+    return Box(
+        min(box.x1, box.x2), min(box.y1, box.y2), min(box.z1, box.z2),
+        max(box.x1, box.x2), max(box.y1, box.y2), max(box.z1, box.z2),
+    )
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return (
+        outer.x1 <= inner.x1 and inner.x2 <= outer.x2
+        and outer.y1 <= inner.y1 and inner.y2 <= outer.y2
+        and outer.z1 <= inner.z1 and inner.z2 <= outer.z2
+    )
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return (
+        a.x1 <= b.x2 and b.x1 <= a.x2
+        and a.y1 <= b.y2 and b.y1 <= a.y2
+        and a.z1 <= b.z2 and b.z1 <= a.z2
+    )
+
+
+def _cells(box: Box) -> Iterator[Position]:
+    for x in range(box.x1, box.x2 + 1):
+        for y in range(box.y1, box.y2 + 1):
+            for z in range(box.z1, box.z2 + 1):
+                yield (x, y, z)
+
+
+def _cubes(box: Box) -> Optional[List[Tuple[int, int, int]]]:
+    """Index cubes a box touches, or None if more than _MAX_INDEXED_CUBES."""
+    x1, y1, z1 = box.x1 >> _CUBE_SHIFT, box.y1 >> _CUBE_SHIFT, box.z1 >> _CUBE_SHIFT
+    x2, y2, z2 = box.x2 >> _CUBE_SHIFT, box.y2 >> _CUBE_SHIFT, box.z2 >> _CUBE_SHIFT
+    if (x2 - x1 + 1) * (y2 - y1 + 1) * (z2 - z1 + 1) > _MAX_INDEXED_CUBES:
+        return None
+    return [
+        (x, y, z)
+        for x in range(x1, x2 + 1)
+        for y in range(y1, y2 + 1)
+        for z in range(z1, z2 + 1)
+    ]
+
+
+class _BoxIndex(Generic[T]):
+    """
+    Boxes with a value each, bucketed by the 8-block cubes they touch, so a
+    pass compares a write only with the writes near it.
+
+    Usage:
+        index.add(box, value)
+        for other, value in index.overlapping(box):
+            ...  # in the order they were added
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[Box, T]] = []
+        self._cubes: Dict[Tuple[int, int, int], List[int]] = {}
+        self._large: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._cubes.clear()
+        self._large.clear()
+
+    def add(self, box: Box, value: T) -> None:
+        number = len(self._entries)
+        self._entries.append((box, value))
+        cubes = _cubes(box)
+        if cubes is None:
+            self._large.append(number)
+            return
+        for cube in cubes:
+            self._cubes.setdefault(cube, []).append(number)
+
+    def overlapping(self, box: Box) -> List[Tuple[Box, T]]:
+        """The entries whose box overlaps ``box``, in the order they were added."""
+        cubes = _cubes(box)
+        if cubes is None:
+            candidates: Sequence[int] = range(len(self._entries))
+        else:
+            found = set(self._large)
+            for cube in cubes:
+                found.update(self._cubes.get(cube, ()))
+            candidates = sorted(found)
+        return [
+            self._entries[number]
+            for number in candidates
+            if _overlaps(self._entries[number][0], box)
+        ]
+
+
+def single_block(pattern: str) -> Optional[str]:
+    """Block state of a WorldEdit pattern that places one block, else None."""
+    pattern = pattern.strip()
+    if not pattern or any(char in pattern for char in ",%#^*") or " " in pattern:
+        return None
+    return normalize_block(pattern)
+
+
+# ---------------------------------------------------------------------------
+# Operations
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Comment:
+    """A "#" line; places nothing."""
+
+    text: str
+
+
+@dataclass(frozen=True)
+class SetBlock:
+    """Vanilla ``setblock`` at absolute coordinates."""
+
+    text: str
+    position: Position
+    block: str
+    nbt: Optional[str] = None
+    mode: str = "replace"
+
+
+@dataclass(frozen=True)
+class Fill:
+    """Vanilla ``fill`` at absolute coordinates (``filter`` is the replace filter)."""
+
+    text: str
+    box: Box
+    block: str
+    nbt: Optional[str] = None
+    mode: str = "replace"
+    filter: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SelectionPoint:
+    """``//pos1`` or ``//pos2`` with explicit coordinates."""
+
+    text: str
+    corner: int
+    position: Position
+
+
+@dataclass(frozen=True)
+class WorldEditCommand:
+    """Any other WorldEdit command ("//set stone" -> name "set", args "stone")."""
+
+    text: str
+    name: str
+    args: str = ""
+
+
+@dataclass(frozen=True)
+class RawCommand:
+    """A command the plan does not understand; always a barrier."""
+
+    text: str
+
+
+Operation = Union[Comment, SetBlock, Fill, SelectionPoint, WorldEditCommand, RawCommand]
+
+
+def strip_command_slash(command: str) -> str:
+    """Strip whitespace and one leading slash ("/setblock" -> "setblock", "//set" -> "/set")."""
+    sanitized = command.strip()
+    if sanitized.startswith("/"):
+        sanitized = sanitized[1:]
+    return sanitized
+
+
+def parse_command(command: str) -> Operation:
+    """Parse one build command into an operation."""
+    stripped = command.strip()
+    if stripped.startswith("#"):
+        return Comment(command)
+
+    if stripped.startswith("//"):
+        match = _SELECTION_RE.match(stripped)
+        if match:
+            corner, x, y, z = match.groups()
+            return SelectionPoint(command, int(corner), (int(x), int(y), int(z)))
+        match = _WORLDEDIT_RE.match(stripped)
+        if match:
+            return WorldEditCommand(command, match.group(1).lower(), match.group(2).strip())
+        return RawCommand(command)
+
+    match = _SETBLOCK_RE.match(stripped)
+    if match:
+        x, y, z, block, nbt, mode = match.groups()
+        return SetBlock(
+            command, (int(x), int(y), int(z)), normalize_block(block), nbt,
+            (mode or "replace").lower(),
+        )
+
+    match = _FILL_RE.match(stripped)
+    if match:
+        coords = [int(value) for value in match.groups()[:6]]
+        block, nbt, mode, filter_block = match.groups()[6:]
+        return Fill(
+            command, _normalize_box(Box(*coords)), normalize_block(block), nbt,
+            (mode or "replace").lower(), filter_block,
+        )
+
+    return RawCommand(command)
+
+
+# ---------------------------------------------------------------------------
+# Effects
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Effect:
+    """
+    What an operation does to the world.
+
+    ``reads``: the result depends on existing blocks (or is unknown) - a barrier.
+    ``full``: every cell of ``box`` ends up as ``state`` (None: mixed or with
+    block entity data). Otherwise only some cells of ``box`` change.
+    """
+
+    box: Optional[Box] = None
+    state: Optional[str] = None
+    full: bool = False
+    reads: bool = False
+
+
+_BARRIER = _Effect(reads=True)
+
+
+def _selections(operations: Sequence[Operation]) -> List[Optional[Box]]:
+    """The known cuboid selection each operation runs with (None if unknown)."""
+    corners: Dict[int, Optional[Position]] = {1: None, 2: None}
+    result: List[Optional[Box]] = []
+    for operation in operations:
+        if corners[1] is not None and corners[2] is not None:
+            result.append(_normalize_box(Box(*corners[1], *corners[2])))
+        else:
+            result.append(None)
+        if isinstance(operation, SelectionPoint):
+            corners[operation.corner] = operation.position
+        elif isinstance(operation, WorldEditCommand) and operation.name in SELECTION_COMMANDS:
+            corners = {1: None, 2: None}
+    return result
+
+
+def _effect(operation: Operation, selection: Optional[Box]) -> Optional[_Effect]:
+    """The operation's effect on blocks, or None if it places nothing."""
+    if isinstance(operation, (Comment, SelectionPoint)):
+        return None
+
+    if isinstance(operation, SetBlock):
+        if operation.mode != "replace":
+            return _BARRIER
+        x, y, z = operation.position
+        state = None if operation.nbt else operation.block
+        return _Effect(Box(x, y, z, x, y, z), state, full=True)
+
+    if isinstance(operation, Fill):
+        if operation.mode in ("keep", "destroy") or operation.filter:
+            return _BARRIER
+        if operation.mode == "outline":
+            return _Effect(operation.box)
+        state = None if operation.nbt or operation.mode == "hollow" else operation.block
+        return _Effect(operation.box, state, full=True)
+
+    if isinstance(operation, WorldEditCommand) and operation.name == "set" and selection is not None:
+        return _Effect(selection, single_block(operation.args), full=True)
+
+    return _BARRIER
+
+
+# ---------------------------------------------------------------------------
+# Passes
+# ---------------------------------------------------------------------------
+
+def _is_idempotent(operation: Operation) -> bool:
+    if isinstance(operation, SelectionPoint):
+        return True
+    if isinstance(operation, (SetBlock, Fill)):
+        return operation.mode != "destroy"
+    if isinstance(operation, WorldEditCommand):
+        args = operation.args.split()
+        return (
+            operation.name in _IDEMPOTENT_WORLDEDIT
+            and bool(args)
+            and all(single_block(arg) is not None for arg in args)
+        )
+    return False
+
+
+def _comparable(operation: Operation) -> str:
+    """Command text with whitespace collapsed and vanilla slashes dropped."""
+    text = " ".join(operation.text.split())
+    if isinstance(operation, (SetBlock, Fill, RawCommand)):
+        text = text.lstrip("/")
+    return text
+
+
+def remove_duplicates(operations: Sequence[Operation]) -> List[Operation]:
+    """Drop an idempotent command that repeats the command right before it."""
+    result: List[Operation] = []
+    previous: Optional[str] = None
+    for operation in operations:
+        if isinstance(operation, Comment):
+            result.append(operation)
+            continue
+        text = _comparable(operation)
+        if text == previous and _is_idempotent(operation):
+            continue
+        previous = text
+        result.append(operation)
+    return result
+
+
+def eliminate_dead_writes(operations: Sequence[Operation]) -> List[Operation]:
+    """Drop writes whose every block is overwritten later, before any barrier."""
+    selections = _selections(operations)
+    keep = [True] * len(operations)
+    points: set = set()
+    boxes: _BoxIndex[None] = _BoxIndex()
+
+    def covered(box: Box) -> bool:
+        nearby = [other for other, _ in boxes.overlapping(box)]
+        if any(_contains(other, box) for other in nearby):
+            return True
+        if volume(box) > _MAX_CELL_CHECK:
+            return False
+        return all(
+            cell in points or any(_contains(other, Box(*cell, *cell)) for other in nearby)
+            for cell in _cells(box)
+        )
+
+    for index in range(len(operations) - 1, -1, -1):
+        effect = _effect(operations[index], selections[index])
+        if effect is None:
+            continue
+        if effect.reads:
+            points.clear()
+            boxes.clear()
+            continue
+        if covered(effect.box):
+            keep[index] = False
+            continue
+        if effect.full:
+            if volume(effect.box) == 1:
+                points.add(effect.box.pos1)
+            else:
+                boxes.add(effect.box, None)
+
+    return [operation for operation, kept in zip(operations, keep) if kept]
+
+
+class _KnownBlocks:
+    """Block states the plan itself has written so far (later entries win)."""
+
+    def __init__(self):
+        self.points: Dict[Position, Tuple[int, Optional[str]]] = {}
+        # Boxes with (sequence, state)
+        self.boxes: _BoxIndex[Tuple[int, Optional[str]]] = _BoxIndex()
+        self.sequence = 0
+
+    def clear(self) -> None:
+        self.points.clear()
+        self.boxes.clear()
+
+    def write(self, box: Box, state: Optional[str]) -> None:
+        self.sequence += 1
+        if volume(box) == 1:
+            self.points[box.pos1] = (self.sequence, state)
+        else:
+            self.boxes.add(box, (self.sequence, state))
+
+    def state_at(self, position: Position, nearby: Sequence[Tuple[Box, Tuple[int, Optional[str]]]]) -> Optional[str]:
+        """State at ``position``, given the boxes that may cover it (oldest first)."""
+        sequence, state = self.points.get(position, (0, None))
+        cell = Box(*position, *position)
+        for box, (box_sequence, box_state) in reversed(nearby):
+            if box_sequence < sequence:
+                break
+            if _contains(box, cell):
+                return box_state
+        return state
+
+    def holds(self, box: Box, state: str) -> bool:
+        """Whether every cell of ``box`` is known to hold ``state``."""
+        nearby = self.boxes.overlapping(box)
+        if volume(box) <= _MAX_CELL_CHECK:
+            return all(self.state_at(cell, nearby) == state for cell in _cells(box))
+
+        # Too large to check cell by cell: the latest box touching it must
+        # cover it and no block may have been set in it since
+        if not nearby:
+            return False
+        other, (sequence, other_state) = nearby[-1]
+        return _contains(other, box) and other_state == state and not any(
+            point_sequence > sequence and _contains(box, Box(*point, *point))
+            for point, (point_sequence, _) in self.points.items()
+        )
+
+
+def remove_redundant_writes(operations: Sequence[Operation]) -> List[Operation]:
+    """Drop writes of the block the plan already placed there (e.g. air on air)."""
+    selections = _selections(operations)
+    known = _KnownBlocks()
+    result: List[Operation] = []
+    for operation, selection in zip(operations, selections):
+        effect = _effect(operation, selection)
+        if effect is None:
+            result.append(operation)
+            continue
+        if effect.reads:
+            known.clear()
+            result.append(operation)
+            continue
+        if effect.full and effect.state is not None and known.holds(effect.box, effect.state):
+            continue
+        known.write(effect.box, effect.state if effect.full else None)
+        result.append(operation)
+    return result
+
+
+def coalesce_selections(operations: Sequence[Operation]) -> List[Operation]:
+    """Drop selection corners nothing reads and corners that are already selected."""
+    keep = [True] * len(operations)
+    current: Dict[int, Optional[Position]] = {1: None, 2: None}
+    # Unread corner per slot: (operation index, corner value before it)
+    pending: Dict[int, Optional[Tuple[int, Optional[Position]]]] = {1: None, 2: None}
+
+    for index, operation in enumerate(operations):
+        if isinstance(operation, SelectionPoint):
+            corner = operation.corner
+            if current[corner] == operation.position:
+                keep[index] = False
+                continue
+            if pending[corner] is not None:
+                unread, before = pending[corner]
+                keep[unread] = False
+                current[corner] = before
+                pending[corner] = None
+                if before == operation.position:
+                    keep[index] = False
+                    continue
+            pending[corner] = (index, current[corner])
+            current[corner] = operation.position
+        elif isinstance(operation, WorldEditCommand):
+            pending = {1: None, 2: None}
+            if operation.name in SELECTION_COMMANDS:
+                current = {1: None, 2: None}
+
+    return [operation for operation, kept in zip(operations, keep) if kept]
+
+
+def is_reorderable(operation: Operation) -> bool:
+    """Whether the operation is a comment or a write whose result does not depend on the world."""
+    if isinstance(operation, Comment):
+        return True
+    if not isinstance(operation, (SetBlock, Fill)):
+        return False
+    effect = _effect(operation, None)
+    return effect is not None and not effect.reads
+
+
+WriteOrder = Callable[[Box], Tuple[int, ...]]
+
+
+def _bottom_up(box: Box) -> Tuple[int, ...]:
+    return (box.y1,)
+
+
+def reorder_writes(operations: Sequence[Operation], order: WriteOrder = _bottom_up) -> List[Operation]:
+    """
+    Place independent vanilla writes bottom-up.
+
+    Within each run of setblock/fill writes between barriers, writes that
+    touch the same blocks with different states keep their relative order;
+    everything else is sorted by ``order`` of the written box (default:
+    lowest y), then original order. Comments move to the start of their run.
+    """
+    result: List[Operation] = []
+    run: List[Operation] = []
+
+    def flush() -> None:
+        result.extend(op for op in run if isinstance(op, Comment))
+        result.extend(_sort_writes([op for op in run if not isinstance(op, Comment)], order))
+        run.clear()
+
+    for operation in operations:
+        if is_reorderable(operation):
+            run.append(operation)
+        else:
+            flush()
+            result.append(operation)
+    flush()
+    return result
+
+
+def _sort_writes(writes: Sequence[Union[SetBlock, Fill]], order: WriteOrder) -> List[Union[SetBlock, Fill]]:
+    if len(writes) < 2:
+        return list(writes)
+
+    effects = [_effect(write, None) for write in writes]
+    successors: List[List[int]] = [[] for _ in writes]
+    indegree = [0] * len(writes)
+
+    def depend(before: int, after: int) -> None:
+        first, second = effects[before], effects[after]
+        if first.full and second.full and first.state is not None and first.state == second.state:
+            return
+        successors[before].append(after)
+        indegree[after] += 1
+
+    # Setblocks conflict only on the same position; fills against anything overlapping
+    last_at: Dict[Position, int] = {}
+    fills: _BoxIndex[int] = _BoxIndex()
+    setblocks: _BoxIndex[int] = _BoxIndex()
+    for index, effect in enumerate(effects):
+        if volume(effect.box) == 1 and isinstance(writes[index], SetBlock):
+            position = effect.box.pos1
+            if position in last_at:
+                depend(last_at[position], index)
+            last_at[position] = index
+            for _, fill_index in fills.overlapping(effect.box):
+                depend(fill_index, index)
+            setblocks.add(effect.box, index)
+        else:
+            earlier = fills.overlapping(effect.box) + setblocks.overlapping(effect.box)
+            for other in sorted(other for _, other in earlier):
+                depend(other, index)
+            fills.add(effect.box, index)
+
+    ready = [(order(effects[i].box), i) for i in range(len(writes)) if indegree[i] == 0]
+    heapq.heapify(ready)
+    ordered: List[Union[SetBlock, Fill]] = []
+    while ready:
+        _, index = heapq.heappop(ready)
+        ordered.append(writes[index])
+        for successor in successors[index]:
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                heapq.heappush(ready, (order(effects[successor].box), successor))
+    return ordered
+
+
+Pass = Callable[[Sequence[Operation]], List[Operation]]
+
+PASSES: Tuple[Tuple[str, Pass], ...] = (
+    ("duplicates", remove_duplicates),
+    ("dead_writes", eliminate_dead_writes),
+    ("redundant_writes", remove_redundant_writes),
+    ("selections", coalesce_selections),
+    ("reorder", reorder_writes),
+)
+
+_PASS_LABELS = {
+    "duplicates": "repeated commands",
+    "dead_writes": "overwritten writes",
+    "redundant_writes": "writes of blocks already placed",
+    "selections": "unused selections",
+}
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+@dataclass
+class OptimizationReport:
+    """What ``BuildPlan.optimize`` changed."""
+
+    submitted: int
+    optimized: int = 0
+    removed: Dict[str, int] = field(default_factory=dict)
+    reordered: int = 0
+    merged: int = 0
+    skipped: bool = False
+
+    def summary(self) -> Optional[str]:
+        """One line for tool output, or None if the plan was left as written."""
+        details = [
+            f"{count} {_PASS_LABELS.get(name, name)} dropped"
+            for name, count in self.removed.items()
+            if count
+        ]
+        if self.merged:
+            details.append("setblock runs merged into /fill")
+        if self.reordered:
+            details.append(f"{self.reordered} writes placed bottom-up")
+        if self.skipped:
+            details.append(f"passes skipped above {MAX_OPTIMIZED_OPERATIONS} commands")
+        if not details:
+            return None
+        return (
+            f"Optimized {self.submitted} commands into {self.optimized} "
+            f"({', '.join(details)})"
+        )
+
+
+class BuildPlan:
+    """
+    A build as a list of typed operations.
+
+    Usage:
+        plan = BuildPlan.from_commands(commands)
+        report = plan.optimize()
+        commands = plan.commands()
+    """
+
+    def __init__(self, operations: Sequence[Operation]):
+        self.operations: List[Operation] = list(operations)
+
+    @classmethod
+    def from_commands(cls, commands: Sequence[str]) -> "BuildPlan":
+        return cls([parse_command(command) for command in commands])
+
+    def commands(self) -> List[str]:
+        return [operation.text for operation in self.operations]
+
+    def optimize(
+        self,
+        passes: Sequence[Tuple[str, Pass]] = PASSES,
+        merge_fills: bool = True,
+    ) -> OptimizationReport:
+        """
+        Run the optimization passes in place.
+
+        Plans longer than MAX_OPTIMIZED_OPERATIONS skip the passes and are
+        only merged into /fill cuboids.
+
+        Args:
+            passes: (name, pass) pairs to run in order
+            merge_fills: Merge the remaining setblock runs into /fill cuboids
+
+        Returns:
+            OptimizationReport describing what changed
+        """
+        report = OptimizationReport(submitted=len(self.operations))
+        if len(self.operations) > MAX_OPTIMIZED_OPERATIONS:
+            report.skipped = True
+            passes = ()
+        for name, optimization in passes:
+            before = self.operations
+            self.operations = optimization(before)
+            if len(self.operations) < len(before):
+                report.removed[name] = len(before) - len(self.operations)
+            elif name == "reorder":
+                report.reordered = sum(
+                    1 for old, new in zip(before, self.operations) if old is not new
+                )
+
+        if merge_fills:
+            merged = compile_commands(self.commands())
+            if len(merged) < len(self.operations):
+                report.merged = len(self.operations) - len(merged)
+                self.operations = [parse_command(command) for command in merged]
+
+        report.optimized = len(self.operations)
+        return report
+
+
+def optimize_commands(commands: Sequence[str]) -> Tuple[List[str], OptimizationReport]:
+    """Optimize a command list with the default passes; see ``BuildPlan``."""
+    plan = BuildPlan.from_commands(commands)
+    report = plan.optimize()
+    return plan.commands(), report
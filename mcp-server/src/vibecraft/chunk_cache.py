@@ -0,0 +1,409 @@
+"""
+Chunk Cache
+
+A session usually reads the same part of the world several times: a
+spatial scan, then ``validate_structure``, then ``check_symmetry``.
+``ChunkCache`` keeps decoded region-file chunks, and block states read over
+RCON, in one LRU cache shared by every read path of an RCONManager:
+
+    - Its size is bounded by ``chunk_cache_mb``; the least recently used
+      chunks are evicted first.
+    - Writes VibeCraft sends itself drop exactly the chunks they touch:
+      ``setblock``/``fill`` by their coordinates, ``//set``, ``//replace``
+      and other selection edits by the tracked WorldEdit selection,
+      ``//paste -o`` by the box the clipboard came from. Commands whose
+      target cannot be worked out (``//undo``, ``clone``, ``execute ... run
+      setblock ~ ~ ~``, unknown commands) clear the whole cache.
+    - Chunks written since the last ``save-all`` are "unsaved": the region
+      files do not hold those blocks yet, so they are read over RCON until
+      the next flush.
+    - Changes made by players are not seen. Chunks read from files saved
+      more than ``chunk_cache_ttl`` seconds ago are read again after the
+      next flush, and block states read over RCON are asked again.
+
+``stats()`` reports hits, misses, evictions and invalidations for tuning
+the budget and the TTL (``get_server_info`` shows them).
+
+Commands are seen in the form sent to the server, where WorldEdit commands
+carry one leading slash ("/set stone") and vanilla commands none.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .build_plan import Fill, SetBlock, parse_command
+from .function_batch import NAMESPACE
+from .worldedit_session import Box, worldedit_command_name
+
+logger = logging.getLogger(__name__)
+
+ChunkKey = Tuple[int, int]
+
+# Rough memory cost of cached data, for the budget
+SECTION_BYTES = 8192 + 256  # unpacked uint16 indices plus bookkeeping
+PALETTE_ENTRY_BYTES = 64
+BLOCK_BYTES = 256  # one block state dict read over RCON
+
+# Boxes spanning more chunks than this mark the whole world unsaved
+MAX_TRACKED_CHUNKS = 4096
+
+# WorldEdit commands that only read the world (or change session state
+# other than the selection, which WorldEditSessionState tracks)
+_WORLDEDIT_READS = frozenset({
+    "pos", "pos1", "pos2", "hpos1", "hpos2", "chunk", "expand", "contract",
+    "shift", "outset", "inset", "sel", "desel", "deselect", ";", "world",
+    "count", "distr", "size", "copy", "schem", "schematic", "clearclipboard",
+    "rotate", "flip", "placement", "gmask", "mask", "help", "version", "ver",
+    "limit", "timeout", "calc", "searchitem", "toggleplace",
+})
+
+# WorldEdit commands that change blocks inside the selection only
+_SELECTION_EDITS = frozenset({
+    "set", "replace", "re", "rep", "walls", "faces", "outline", "overlay",
+    "center", "middle", "naturalize", "smooth", "hollow", "regen", "deform",
+    "forest", "flora", "line", "curve", "cut",
+})
+
+# WorldEdit commands after which the clipboard's source box is unknown
+_CLIPBOARD_CHANGES = frozenset({"schem", "schematic", "clearclipboard", "rotate", "flip"})
+
+# Vanilla commands that do not change blocks
+_VANILLA_READS = frozenset({
+    "list", "time", "tick", "save-all", "save-on", "save-off", "forceload",
+    "reload", "say", "tell", "tellraw", "msg", "w", "me", "help", "seed",
+    "gamerule", "difficulty", "weather", "scoreboard", "bossbar", "title",
+    "locate", "gamemode", "tp", "teleport", "effect", "give", "clear", "xp",
+    "experience", "particle", "playsound", "stopsound", "tag", "team",
+    "trigger", "advancement", "recipe", "attribute", "spawnpoint",
+    "setworldspawn", "worldborder", "whitelist", "op", "deop", "kick", "ban",
+    "pardon", "datapack", "version", "random", "kill", "summon",
+})
+
+_DATA_BLOCK_RE = re.compile(r"^data\s+(?:merge|modify|remove)\s+block\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\b")
+
+
+@dataclass
+class CacheStats:
+    """Counters since the cache was created."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+    budget: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.evictions} evicted, {self.expired} expired, {self.invalidations} invalidated; "
+            f"{self.entries} chunks, {self.bytes / 2**20:.1f}/{self.budget / 2**20:.0f} MB"
+        )
+
+
+class _Entry:
+    """What is cached for one chunk column."""
+
+    __slots__ = ("chunk", "chunk_time", "blocks", "size")
+
+    def __init__(self):
+        self.chunk: Any = None  # region_files.Chunk
+        self.chunk_time = 0.0  # when the files it came from were saved
+        self.blocks: Dict[Tuple[int, int, int], Tuple[float, Dict[str, Any]]] = {}
+        self.size = 0
+
+
+def chunk_size(chunk: Any) -> int:
+    """Estimated memory use of a decoded region_files.Chunk."""
+    size = 0
+    for section in chunk.sections.values():
+        size += SECTION_BYTES + PALETTE_ENTRY_BYTES * len(section.palette)
+        if section.data is not None:
+            size += section.data.nbytes
+    for data in chunk.heightmaps.values():
+        # Packed longs plus the unpacked int32 columns
+        size += data.nbytes + 4 * 256
+    return size
+
+
+def written_box(command: str, selection: Optional[Box], clipboard: Optional[Box] = None) -> Tuple[bool, Optional[Box]]:
+    """
+    Which blocks a command may change.
+
+    Args:
+        command: The command as sent to the server
+        selection: The WorldEdit selection it runs with, if known
+        clipboard: The box the WorldEdit clipboard was copied from, if known
+
+    Returns:
+        ``(False, None)`` if it changes no blocks, ``(True, box)`` if it
+        changes blocks inside ``box`` only, ``(True, None)`` if it may change
+        blocks anywhere
+    """
+    stripped = command.strip()
+    name = worldedit_command_name(stripped)
+    if name is not None:
+        if name in _WORLDEDIT_READS:
+            return False, None
+        if name in _SELECTION_EDITS:
+            return True, selection
+        if name == "paste":
+            flags = "".join(arg[1:] for arg in stripped.split()[1:] if arg.startswith("-"))
+            return True, clipboard if "o" in flags else None
+        return True, None
+
+    operation = parse_command(stripped)
+    if isinstance(operation, SetBlock):
+        return True, Box(*operation.position, *operation.position)
+    if isinstance(operation, Fill):
+        return True, operation.box
+
+    words = stripped.split()
+    if not words:
+        return False, None
+    verb = words[0].lower()
+    if verb.startswith("minecraft:"):
+        verb = verb[len("minecraft:"):]
+    if verb in _VANILLA_READS:
+        return False, None
+    if verb == "data":
+        match = _DATA_BLOCK_RE.match(stripped)
+        if match:
+            position = tuple(int(value) for value in match.groups())
+            return True, Box(*position, *position)
+        return (len(words) > 2 and words[1] != "get" and words[2] == "block"), None
+    if verb == "function":
+        # FunctionBatchExecutor invalidates what its own functions write
+        return not (len(words) > 1 and words[1].startswith(f"{NAMESPACE}:")), None
+    if verb == "execute":
+        head, separator, tail = stripped.rpartition(" run ")
+        if not separator:
+            return False, None
+        if re.search(r"\bstore\s+(?:result|success)\s+block\b", head):
+            return True, None
+        # Relative coordinates do not parse, so any box found is absolute
+        return written_box(tail, None)
+    return True, None
+
+
+class ChunkCache:
+    """
+    LRU cache of chunk data with write invalidation.
+
+    Usage:
+        chunk = cache.chunk(cx, cz)  # None: not cached
+        cache.put_chunk(cx, cz, chunk)
+        cache.observe("fill 0 60 0 20 70 20 stone", selection)
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[ChunkKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats(budget=max_bytes)
+        self._clipboard: Optional[Box] = None
+
+        # Unsaved writes: chunk -> write counter value, plus "everything"
+        self._writes = 0
+        self._unsaved: Dict[ChunkKey, int] = {}
+        self._unsaved_everywhere: Optional[int] = None
+        self._saved_at: Optional[float] = None
+
+    # -- reads ---------------------------------------------------------
+
+    def chunk(self, cx: int, cz: int) -> Any:
+        """Cached decoded chunk, or None."""
+        with self._lock:
+            entry = self._entries.get((cx, cz))
+            if entry is None or entry.chunk is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end((cx, cz))
+            self._stats.hits += 1
+            return entry.chunk
+
+    def put_chunk(self, cx: int, cz: int, chunk: Any) -> None:
+        """Cache a chunk just decoded from the region files."""
+        with self._lock:
+            if self._unsaved_everywhere is not None or (cx, cz) in self._unsaved:
+                # Written while it was being decoded
+                return
+            entry = self._entry((cx, cz))
+            entry.chunk = chunk
+            entry.chunk_time = self._saved_at if self._saved_at is not None else time.monotonic()
+            self._resize((cx, cz), entry)
+
+    def block(self, x: int, y: int, z: int) -> Optional[Dict[str, Any]]:
+        """Cached block dict (as fetch_block_state returns) read over RCON, or None."""
+        key = (x >> 4, z >> 4)
+        with self._lock:
+            entry = self._entries.get(key)
+            cached = entry.blocks.get((x, y, z)) if entry is not None else None
+            if cached is None:
+                self._stats.misses += 1
+                return None
+            read_at, block = cached
+            if time.monotonic() - read_at > self.ttl:
+                del entry.blocks[(x, y, z)]
+                self._stats.expired += 1
+                self._stats.misses += 1
+                self._resize(key, entry)
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return block
+
+    def put_block(self, x: int, y: int, z: int, block: Dict[str, Any]) -> None:
+        """Cache a block state just read over RCON."""
+        key = (x >> 4, z >> 4)
+        with self._lock:
+            entry = self._entry(key)
+            entry.blocks[(x, y, z)] = (time.monotonic(), block)
+            self._resize(key, entry)
+
+    def unsaved(self, cx: int, cz: int) -> bool:
+        """Whether VibeCraft wrote to the chunk since the last save-all."""
+        with self._lock:
+            return self._unsaved_everywhere is not None or (cx, cz) in self._unsaved
+
+    # -- saves -----------------------------------------------------------
+
+    def needs_save(self) -> bool:
+        """Whether a flush must run save-all: unsaved writes, or files older than the TTL."""
+        with self._lock:
+            return (
+                self._saved_at is None
+                or bool(self._unsaved)
+                or self._unsaved_everywhere is not None
+                or time.monotonic() - self._saved_at > self.ttl
+            )
+
+    def begin_save(self) -> int:
+        """Mark taken right before sending save-all (pass it to saved())."""
+        with self._lock:
+            return self._writes
+
+    def saved(self, mark: int) -> None:
+        """
+        save-all finished: writes up to ``mark`` are on disk, and chunks read
+        from files older than the TTL are read again.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._unsaved = {key: write for key, write in self._unsaved.items() if write > mark}
+            if self._unsaved_everywhere is not None and self._unsaved_everywhere <= mark:
+                self._unsaved_everywhere = None
+            self._saved_at = now
+            for key, entry in list(self._entries.items()):
+                if entry.chunk is not None and now - entry.chunk_time > self.ttl:
+                    entry.chunk = None
+                    self._stats.expired += 1
+                    self._resize(key, entry)
+
+    # -- writes ----------------------------------------------------------
+
+    def observe(self, command: str, selection: Optional[Box]) -> None:
+        """Invalidate what a command sent to the server may have changed."""
+        name = worldedit_command_name(command)
+        if name in ("copy", "cut"):
+            self._clipboard = selection
+        elif name in _CLIPBOARD_CHANGES:
+            self._clipboard = None
+
+        writes, box = written_box(command, selection, self._clipboard)
+        if writes:
+            self.invalidate(box)
+
+    def observe_commands(self, commands: Sequence[str]) -> None:
+        """observe() for vanilla commands run some other way (e.g. as a function)."""
+        for command in commands:
+            self.observe(command, None)
+
+    def load_clipboard(self, box: Optional[Box]) -> None:
+        """Record where ``//paste -o`` will put the clipboard just loaded."""
+        self._clipboard = box
+
+    def invalidate(self, box: Optional[Box] = None) -> None:
+        """Drop cached chunks overlapping ``box`` (all of them if None) and mark them unsaved."""
+        with self._lock:
+            self._writes += 1
+            self._stats.invalidations += 1
+            if box is None:
+                keys = None
+            else:
+                cx1, cx2 = sorted((box.x1 >> 4, box.x2 >> 4))
+                cz1, cz2 = sorted((box.z1 >> 4, box.z2 >> 4))
+                count = (cx2 - cx1 + 1) * (cz2 - cz1 + 1)
+                keys = (
+                    [(cx, cz) for cx in range(cx1, cx2 + 1) for cz in range(cz1, cz2 + 1)]
+                    if count <= MAX_TRACKED_CHUNKS else None
+                )
+
+            if keys is None or len(self._unsaved) + len(keys) > MAX_TRACKED_CHUNKS:
+                self._unsaved_everywhere = self._writes
+                self._unsaved.clear()
+            else:
+                for key in keys:
+                    self._unsaved[key] = self._writes
+
+            if keys is None:
+                if box is None:
+                    dropped = list(self._entries)
+                else:
+                    dropped = [
+                        key for key in self._entries
+                        if cx1 <= key[0] <= cx2 and cz1 <= key[1] <= cz2
+                    ]
+            else:
+                dropped = [key for key in keys if key in self._entries]
+            for key in dropped:
+                self._bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            stats = CacheStats(**vars(self._stats))
+            stats.entries = len(self._entries)
+            stats.bytes = self._bytes
+            return stats
+
+    # -- internals -------------------------------------------------------
+
+    def _entry(self, key: ChunkKey) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        self._entries.move_to_end(key)
+        return entry
+
+    def _resize(self, key: ChunkKey, entry: _Entry) -> None:
+        """Recompute an entry's size, then evict down to the budget."""
+        size = BLOCK_BYTES * len(entry.blocks)
+        if entry.chunk is not None:
+            size += SECTION_BYTES + chunk_size(entry.chunk)
+        self._bytes += size - entry.size
+        entry.size = size
+        if not size:
+            del self._entries[key]
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats.evictions += 1
@@ -0,0 +1,301 @@
+"""
+Chunk-Ordered Build Scheduling
+
+Builds generated by code often jump around the map, so the server keeps
+loading and unloading chunks between commands, and vanilla ``setblock``/
+``fill`` fail outright ("That position is not loaded") once they reach a
+chunk nobody is standing in.
+
+For builds that span many chunks the commands are reordered chunk by chunk
+(or by cells of ``group_size`` x ``group_size`` chunks), visiting the cells
+in a serpentine so consecutive cells are neighbours, and split into
+segments of consecutive commands in the same cell. While the build runs, a
+sliding window of force-loaded chunks follows the segments:
+
+    forceload add ...      # chunks of this segment (+ radius) and the next one
+    <segment commands>
+    forceload remove ...   # chunks no longer in the window
+
+Only chunks VibeCraft force-loaded are ever removed; chunks that were
+already force-loaded stay as they were. Reordering only moves independent
+setblock/fill writes (see ``build_plan.reorder_writes``), so the build
+places the same blocks.
+"""
+
+import asyncio
+import logging
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .build_plan import BuildPlan, Fill, SetBlock, reorder_writes
+from .worldedit_session import Box
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16
+
+# forceload add/remove accept at most 256 chunks per area
+MAX_FORCELOAD_AREA = 256
+
+Chunk = Tuple[int, int]
+
+_CHUNK_RE = re.compile(r"\[(-?\d+),\s*(-?\d+)\]")
+
+
+class BuildSegment(NamedTuple):
+    """Commands ``start:end`` of a scheduled build and the chunks they write to."""
+
+    start: int
+    end: int
+    chunks: FrozenSet[Chunk]
+
+
+def chunk_of(x: int, z: int) -> Chunk:
+    return (x // CHUNK_SIZE, z // CHUNK_SIZE)
+
+
+def box_chunks(box: Box) -> Set[Chunk]:
+    """Chunks an inclusive box touches."""
+    cx1, cz1 = chunk_of(min(box.x1, box.x2), min(box.z1, box.z2))
+    cx2, cz2 = chunk_of(max(box.x1, box.x2), max(box.z1, box.z2))
+    return {(cx, cz) for cx in range(cx1, cx2 + 1) for cz in range(cz1, cz2 + 1)}
+
+
+def _write_box(operation) -> Optional[Box]:
+    if isinstance(operation, SetBlock):
+        x, y, z = operation.position
+        return Box(x, y, z, x, y, z)
+    if isinstance(operation, Fill):
+        return operation.box
+    return None
+
+
+def _cell(box: Box, group_size: int) -> Chunk:
+    cx, cz = chunk_of(min(box.x1, box.x2), min(box.z1, box.z2))
+    return (cx // group_size, cz // group_size)
+
+
+def build_chunks(commands: Sequence[str]) -> Set[Chunk]:
+    """Every chunk the vanilla writes of a build touch."""
+    chunks: Set[Chunk] = set()
+    for operation in BuildPlan.from_commands(commands).operations:
+        box = _write_box(operation)
+        if box is not None:
+            chunks |= box_chunks(box)
+    return chunks
+
+
+def order_by_chunk(commands: Sequence[str], group_size: int = 1) -> List[str]:
+    """
+    Reorder independent writes cell by cell, bottom-up within a cell.
+
+    Cells are visited row by row (z), alternating direction (x), so each
+    cell borders the previous one.
+    """
+    plan = BuildPlan.from_commands(commands)
+    cells = {
+        _cell(box, group_size)
+        for box in (_write_box(operation) for operation in plan.operations)
+        if box is not None
+    }
+    rank = {
+        cell: index
+        for index, cell in enumerate(
+            sorted(cells, key=lambda cell: (cell[1], cell[0] if cell[1] % 2 == 0 else -cell[0]))
+        )
+    }
+    operations = reorder_writes(
+        plan.operations, order=lambda box: (rank[_cell(box, group_size)], box.y1)
+    )
+    return [operation.text for operation in operations]
+
+
+def plan_segments(commands: Sequence[str], group_size: int = 1) -> List[BuildSegment]:
+    """
+    Split a build into runs of consecutive commands in the same cell.
+
+    Commands that write nothing (WorldEdit, comments, anything unrecognised)
+    join the segment they follow.
+    """
+    segments: List[BuildSegment] = []
+    start = 0
+    current: Optional[Chunk] = None
+    chunks: Set[Chunk] = set()
+
+    for index, operation in enumerate(BuildPlan.from_commands(commands).operations):
+        box = _write_box(operation)
+        if box is None:
+            continue
+        cell = _cell(box, group_size)
+        if current is not None and cell != current:
+            segments.append(BuildSegment(start, index, frozenset(chunks)))
+            start, chunks = index, set()
+        current = cell
+        chunks |= box_chunks(box)
+
+    if start < len(commands) or not segments:
+        segments.append(BuildSegment(start, len(commands), frozenset(chunks)))
+    return segments
+
+
+def expand_chunks(chunks: Iterable[Chunk], radius: int) -> Set[Chunk]:
+    """Chunks within ``radius`` (Chebyshev distance) of any of ``chunks``."""
+    return {
+        (cx + dx, cz + dz)
+        for cx, cz in chunks
+        for dx in range(-radius, radius + 1)
+        for dz in range(-radius, radius + 1)
+    }
+
+
+def forceload_commands(action: str, chunks: Iterable[Chunk]) -> List[str]:
+    """
+    ``forceload add``/``remove`` commands covering ``chunks``, one per run
+    of adjacent chunks along x.
+    """
+    commands: List[str] = []
+    rows: Dict[int, List[int]] = {}
+    for cx, cz in chunks:
+        rows.setdefault(cz, []).append(cx)
+    for cz in sorted(rows):
+        xs = sorted(rows[cz])
+        run_start = previous = xs[0]
+        for cx in xs[1:] + [None]:
+            if cx is not None and cx == previous + 1 and cx - run_start < MAX_FORCELOAD_AREA:
+                previous = cx
+                continue
+            z = cz * CHUNK_SIZE
+            if run_start == previous:
+                commands.append(f"forceload {action} {run_start * CHUNK_SIZE} {z}")
+            else:
+                commands.append(
+                    f"forceload {action} {run_start * CHUNK_SIZE} {z} {previous * CHUNK_SIZE} {z}"
+                )
+            if cx is not None:
+                run_start = previous = cx
+    return commands
+
+
+class ForceloadTracker:
+    """
+    Chunks VibeCraft holds force-loaded, shared by concurrent builds.
+
+    Each chunk is added when its first holder acquires it and removed when
+    its last holder releases it. Chunks that were force-loaded before
+    VibeCraft first touched them are never added or removed.
+    """
+
+    def __init__(self, rcon):
+        self.rcon = rcon
+        self.holders: Counter = Counter()
+        self.preexisting: Optional[Set[Chunk]] = None
+        self._lock = asyncio.Lock()
+        # execute if loaded needs 1.19.4+; older servers are not probed
+        self._can_probe = True
+
+    async def _load_preexisting(self) -> Set[Chunk]:
+        if self.preexisting is None or not self.holders:
+            response = await self.rcon.execute("forceload query")
+            self.preexisting = {(int(x), int(z)) for x, z in _CHUNK_RE.findall(response)}
+        return self.preexisting
+
+    async def acquire(self, chunks: Iterable[Chunk]) -> None:
+        async with self._lock:
+            preexisting = await self._load_preexisting()
+            new = []
+            for chunk in chunks:
+                if chunk in preexisting:
+                    continue
+                if not self.holders[chunk]:
+                    new.append(chunk)
+                self.holders[chunk] += 1
+            if new:
+                await self.rcon.execute_batch(forceload_commands("add", new))
+
+    async def release(self, chunks: Iterable[Chunk]) -> None:
+        async with self._lock:
+            preexisting = self.preexisting or set()
+            freed = []
+            for chunk in chunks:
+                if chunk in preexisting or not self.holders[chunk]:
+                    continue
+                self.holders[chunk] -= 1
+                if not self.holders[chunk]:
+                    del self.holders[chunk]
+                    freed.append(chunk)
+            if freed:
+                await self.rcon.execute_batch(forceload_commands("remove", freed))
+
+    async def wait_loaded(self, chunks: Iterable[Chunk], timeout: float) -> bool:
+        """
+        Wait until every chunk is loaded (force-loading only queues it).
+
+        Returns:
+            True if all chunks reported loaded before ``timeout``
+        """
+        pending = sorted(set(chunks))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while pending and self._can_probe:
+            probes = [
+                f"execute if loaded {cx * CHUNK_SIZE} 0 {cz * CHUNK_SIZE}" for cx, cz in pending
+            ]
+            responses = await self.rcon.execute_batch(probes)
+            if any("unknown" in response.lower() or "incorrect" in response.lower()
+                   for response in responses):
+                self._can_probe = False
+                break
+            pending = [
+                chunk for chunk, response in zip(pending, responses)
+                if "passed" not in response.lower()
+            ]
+            if not pending:
+                break
+            if loop.time() >= deadline:
+                logger.warning(f"{len(pending)} force-loaded chunks did not load in time")
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+
+class ForceloadWindow:
+    """
+    Sliding window of force-loaded chunks for one scheduled build.
+
+    Usage:
+        window = ForceloadWindow(rcon, segments, radius=1)
+        try:
+            for index, segment in enumerate(segments):
+                await window.enter(index)
+                ...  # run segment.start:segment.end
+        finally:
+            await window.close()
+    """
+
+    def __init__(self, rcon, segments: Sequence[BuildSegment], radius: int = 1):
+        self.tracker: ForceloadTracker = rcon.forceloads
+        self.timeout = rcon.config.rcon_timeout
+        self.segments = segments
+        self.radius = radius
+        self.held: Set[Chunk] = set()
+
+    async def enter(self, index: int) -> None:
+        """Move the window to segment ``index`` and wait for its chunks."""
+        needed = self.segments[index].chunks
+        if not needed:
+            return
+        target = expand_chunks(needed, self.radius)
+        # Start loading the next segment while this one runs
+        if index + 1 < len(self.segments):
+            target |= self.segments[index + 1].chunks
+
+        await self.tracker.acquire(target - self.held)
+        await self.tracker.release(self.held - target)
+        self.held = target
+        await self.tracker.wait_loaded(needed, self.timeout)
+
+    async def close(self) -> None:
+        """Release every chunk this window still holds."""
+        held, self.held = self.held, set()
+        await self.tracker.release(held)
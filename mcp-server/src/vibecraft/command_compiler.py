@@ -0,0 +1,180 @@
+"""
+Setblock-to-Fill Command Compiler
+
+Builds generated by code, furniture and pattern placement are mostly long
+runs of single-block ``setblock`` commands, one RCON round trip each. This
+pass collects consecutive setblocks into a voxel map and re-emits them as the
+fewest axis-aligned ``fill`` cuboids it can find (3D greedy meshing), capped
+at the vanilla fill limit of 32,768 blocks. Walls and floors typically shrink
+by one to two orders of magnitude.
+
+Only plain setblocks take part: absolute coordinates, a block state without
+NBT and the default ``replace`` mode. Any other command (fill, WorldEdit,
+relative coordinates, ``keep``/``destroy``, block entity data) is a barrier:
+it is emitted unchanged and blocks on either side of it are compiled
+separately, so the result is the same world as executing the original list.
+Within a run the last write to a position wins, as it would on the server.
+"""
+
+import itertools
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .worldedit_session import Box, Position
+
+# Vanilla /fill limit (commandModificationBlockLimit gamerule default)
+FILL_LIMIT = 32768
+
+_SETBLOCK_RE = re.compile(
+    r"^(/?)(?:minecraft:)?setblock\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+([^\s{}]+)(?:\s+replace)?\s*$",
+    re.IGNORECASE,
+)
+
+
+def parse_setblock(command: str) -> Optional[Tuple[str, Position, str]]:
+    """
+    Parse a plain setblock command.
+
+    Returns:
+        (leading slash, (x, y, z), block state) or None if the command is not
+        a setblock this compiler can merge
+    """
+    match = _SETBLOCK_RE.match(command.strip())
+    if not match:
+        return None
+    slash, x, y, z, block = match.groups()
+    return slash, (int(x), int(y), int(z)), block
+
+
+def greedy_mesh(voxels: Dict[Position, str], max_volume: int = FILL_LIMIT) -> List[Tuple[Box, str]]:
+    """
+    Cover a voxel map with same-state boxes.
+
+    Every growth order of the three axes is tried and the smallest cover
+    wins; walls favour growing along their plane first, floors another order.
+
+    Returns:
+        (box, block state) pairs, ordered bottom-up so supporting blocks are
+        placed before the blocks resting on them
+    """
+    best: Optional[List[Tuple[Box, str]]] = None
+    for order in itertools.permutations((0, 1, 2)):
+        boxes = _mesh(voxels, order, max_volume)
+        if best is None or len(boxes) < len(best):
+            best = boxes
+            if len(best) == len(set(voxels.values())):
+                break
+    best = best or []
+    best.sort(key=lambda item: (item[0].y1, item[0].z1, item[0].x1))
+    return best
+
+
+def _mesh(voxels: Dict[Position, str], order: Tuple[int, int, int],
+          max_volume: int) -> List[Tuple[Box, str]]:
+    remaining = dict(voxels)
+    first, second, third = order
+    boxes: List[Tuple[Box, str]] = []
+
+    # Start boxes at the lowest corner along the growth order
+    for position in sorted(voxels, key=lambda p: (p[third], p[second], p[first])):
+        state = remaining.get(position)
+        if state is None:
+            continue
+        low = list(position)
+        high = list(position)
+        for axis in order:
+            while _can_grow(remaining, state, low, high, axis, max_volume):
+                high[axis] += 1
+
+        for x in range(low[0], high[0] + 1):
+            for y in range(low[1], high[1] + 1):
+                for z in range(low[2], high[2] + 1):
+                    del remaining[(x, y, z)]
+        boxes.append((Box(low[0], low[1], low[2], high[0], high[1], high[2]), state))
+    return boxes
+
+
+def _can_grow(remaining: Dict[Position, str], state: str, low: List[int], high: List[int],
+              axis: int, max_volume: int) -> bool:
+    """Whether the box can take one more layer on the high side of ``axis``."""
+    sizes = [high[i] - low[i] + 1 for i in range(3)]
+    sizes[axis] += 1
+    if sizes[0] * sizes[1] * sizes[2] > max_volume:
+        return False
+
+    layer_low = list(low)
+    layer_high = list(high)
+    layer_low[axis] = layer_high[axis] = high[axis] + 1
+    for x in range(layer_low[0], layer_high[0] + 1):
+        for y in range(layer_low[1], layer_high[1] + 1):
+            for z in range(layer_low[2], layer_high[2] + 1):
+                if remaining.get((x, y, z)) != state:
+                    return False
+    return True
+
+
+def compile_commands(commands: Sequence[str], max_volume: int = FILL_LIMIT) -> List[str]:
+    """
+    Merge runs of setblock commands into fill commands.
+
+    Commands keep their leading-slash style ("/setblock" -> "/fill"), comment
+    lines ("# ...") are kept and do not interrupt a run, and a run that cannot
+    be shortened is returned as written.
+
+    Args:
+        commands: Build commands in execution order
+        max_volume: Largest fill to emit (the server's fill limit)
+
+    Returns:
+        Equivalent command list, never longer than the input
+    """
+    compiled: List[str] = []
+    run: List[str] = []
+
+    def flush() -> None:
+        compiled.extend(_compile_run(run, max_volume))
+        run.clear()
+
+    for command in commands:
+        stripped = command.strip()
+        if stripped.startswith("#") or parse_setblock(stripped) is not None:
+            run.append(command)
+        else:
+            flush()
+            compiled.append(command)
+    flush()
+    return compiled
+
+
+def _compile_run(run: Sequence[str], max_volume: int) -> List[str]:
+    comments: List[str] = []
+    voxels: Dict[Position, str] = {}
+    slash = ""
+    writes = 0
+    for command in run:
+        parsed = parse_setblock(command)
+        if parsed is None:
+            comments.append(command)
+            continue
+        if not writes:
+            slash = parsed[0]
+        # Later writes replace earlier ones
+        voxels[parsed[1]] = parsed[2]
+        writes += 1
+
+    if writes < 2:
+        return list(run)
+
+    boxes = greedy_mesh(voxels, max_volume)
+    if len(boxes) >= writes:
+        return list(run)
+
+    output = list(comments)
+    for box, state in boxes:
+        if box.pos1 == box.pos2:
+            output.append(f"{slash}setblock {box.x1} {box.y1} {box.z1} {state}")
+        else:
+            output.append(
+                f"{slash}fill {box.x1} {box.y1} {box.z1} {box.x2} {box.y2} {box.z2} {state}"
+            )
+    return output
@@ -14,6 +14,94 @@ class VibeCraftConfig(BaseSettings):
     rcon_port: int = Field(default=25575, description="Minecraft server RCON port")
     rcon_password: str = Field(default="minecraft", description="RCON password")
     rcon_timeout: int = Field(default=10, description="RCON command timeout in seconds")
+    rcon_pool_size: int = Field(
+        default=4, description="Maximum number of persistent RCON connections"
+    )
+    rcon_pool_idle_timeout: float = Field(
+        default=300.0, description="Close pooled RCON connections idle for this many seconds"
+    )
+    enable_rcon_pipelining: bool = Field(
+        default=False,
+        description="Keep several batch commands in flight on one connection. Vanilla and Paper read one packet per socket read and drop the connection when packets arrive together; only enable for servers or proxies that parse the RCON stream",
+    )
+    rcon_pipeline_depth: int = Field(
+        default=32,
+        description="Commands kept in flight on one connection by batch execution when pipelining is enabled",
+    )
+    worldedit_world: str = Field(
+        default="world", description="World WorldEdit console commands operate on"
+    )
+
+    # Build Compilation
+    enable_command_compiler: bool = Field(
+        default=True,
+        description="Optimize build commands (drop overwritten/redundant writes, merge setblock runs into /fill) before executing",
+    )
+
+    # Chunk Scheduling
+    enable_chunk_scheduling: bool = Field(
+        default=True,
+        description="Run large builds chunk by chunk with a sliding window of force-loaded chunks",
+    )
+    chunk_schedule_min_chunks: int = Field(
+        default=16, description="Minimum chunks a build touches for it to be scheduled by chunk"
+    )
+    chunk_group_size: int = Field(
+        default=1, description="Chunks per side of one scheduling cell (1 = chunk by chunk)"
+    )
+    forceload_radius: int = Field(
+        default=1, description="Chunks force-loaded around the cell being built"
+    )
+
+    # Parallel Dispatch
+    build_parallelism: int = Field(
+        default=2,
+        description="RCON connections a vanilla-only build is spread over (1 = one connection)",
+    )
+    parallel_dispatch_min_commands: int = Field(
+        default=256, description="Minimum commands streamed for a build to be split across connections"
+    )
+
+    # Build Journal
+    build_journal_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for resumable build journals (default: mcp-server/logs/builds)",
+    )
+    build_max_workers: int = Field(
+        default=2, description="Background builds (build with async=true) that run at once"
+    )
+
+    # Schematic Builds
+    enable_schematic_builds: bool = Field(
+        default=True,
+        description="Place large vanilla builds as one WorldEdit schematic paste",
+    )
+    schematic_min_blocks: int = Field(
+        default=2048, description="Minimum blocks placed for a build to go through a schematic"
+    )
+
+    # Datapack Function Batches
+    enable_function_batches: bool = Field(
+        default=True,
+        description="Run large vanilla command batches as a datapack function instead of over RCON",
+    )
+    function_batch_min_commands: int = Field(
+        default=64, description="Minimum batch size worth a datapack reload"
+    )
+    enable_region_reads: bool = Field(
+        default=True,
+        description="Answer block queries from the world's region files instead of one RCON command each",
+    )
+    chunk_cache_mb: int = Field(
+        default=256, description="Memory budget of the cache of chunks and block states read from the world"
+    )
+    chunk_cache_ttl: float = Field(
+        default=60.0, description="Seconds before cached world reads are refreshed to pick up changes made by players"
+    )
+    minecraft_data_dir: Optional[str] = Field(
+        default=None,
+        description="Server data directory shared with VibeCraft (default: <project>/minecraft-data)",
+    )
 
     # Safety Settings
     enable_safety_checks: bool = Field(
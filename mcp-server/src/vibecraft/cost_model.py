@@ -0,0 +1,364 @@
+"""
+Build Cost Model
+
+A build reaches the world one of three ways (see ``build_tools._execute_build``):
+commands over RCON (pipelined if enabled, on several connections when the
+writes can be partitioned), one datapack function, or one WorldEdit schematic
+paste. Which is fastest depends on the build and on the server:
+
+    commands   RCON time per command (measured) x commands / connections
+               + blocks written x server time per block
+    function   datapack reload + one call + blocks written
+    paste      schematic encoding and paste over the bounding box
+               + blocks written
+
+Block counts come from the plan (fill volumes, ``//set`` selections); a
+paste visits every position of the bounding box, so sparse builds spread
+over a large box are cheaper as commands. Server-side work is scaled by the
+load the server already carries: commands and reloads run in what is left
+of each 50 ms tick (MSPT from ``tick query``).
+
+After every build the time a strategy actually took is compared with its
+estimate; a per-strategy correction factor moves the estimates towards what
+this server really does.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .build_plan import (
+    BuildPlan,
+    Comment,
+    Fill,
+    Operation,
+    SelectionPoint,
+    SetBlock,
+    WorldEditCommand,
+    is_reorderable,
+    strip_command_slash,
+)
+from .worldedit_session import SELECTION_COMMANDS, Box, volume
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = "commands"
+FUNCTION = "function"
+PASTE = "paste"
+
+LABELS = {
+    COMMANDS: "RCON commands",
+    FUNCTION: "datapack function",
+    PASTE: "schematic paste",
+}
+
+# Used until the connection has been timed
+DEFAULT_ROUND_TRIP = 0.005
+DEFAULT_PIPELINED = 0.001  # per command, with enable_rcon_pipelining
+
+# Server time per block written (block updates, lighting)
+BLOCK_SECONDS = 1e-6
+
+# Encoding the schematic and WorldEdit visiting each position of the
+# bounding box during the paste (air included, -a only skips placing it)
+PASTE_POSITION_SECONDS = 0.8e-6
+
+# //schem load finishing asynchronously (the clipboard is polled every 0.1 s)
+PASTE_OVERHEAD = 0.15
+
+# Datapack reload: every datapack, recipe and loot table is read again
+RELOAD_SECONDS = 1.0
+
+# Parsing one function line
+FUNCTION_LINE_SECONDS = 5e-6
+
+TICK_SECONDS = 0.05
+
+# How long a measured MSPT is reused, and how long to wait for it
+MSPT_TTL = 30.0
+MSPT_TIMEOUT = 2.0
+
+# Weight of the newest run in the correction factors, and their bounds
+CORRECTION_SMOOTHING = 0.3
+CORRECTION_RANGE = (0.2, 5.0)
+
+_MSPT_RE = re.compile(r"average time per tick:\s*([\d.]+)\s*ms", re.IGNORECASE)
+
+_AIR_BLOCKS = {"minecraft:air", "minecraft:cave_air", "minecraft:void_air"}
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 10:
+        return f"{seconds:.1f} s"
+    if seconds < 120:
+        return f"{seconds:.0f} s"
+    return f"{seconds / 60:.0f} min"
+
+
+@dataclass
+class StrategyEstimate:
+    """Predicted duration of one way of placing a build."""
+
+    strategy: str
+    base_seconds: float  # Model estimate before correction
+    seconds: float
+    detail: str
+
+    @property
+    def label(self) -> str:
+        return LABELS[self.strategy]
+
+
+@dataclass
+class BuildEstimate:
+    """Estimates of every strategy that can place a build, cheapest first."""
+
+    estimates: List[StrategyEstimate]
+    blocks: int
+    bounding_volume: int
+    mspt: Optional[float] = None
+
+    @property
+    def best(self) -> StrategyEstimate:
+        return self.estimates[0]
+
+    def get(self, strategy: str) -> Optional[StrategyEstimate]:
+        return next((item for item in self.estimates if item.strategy == strategy), None)
+
+    def summary(self) -> str:
+        """E.g. "≈ 0.4 s via schematic paste vs 3.1 s via RCON commands"."""
+        parts = [f"{format_seconds(item.seconds)} via {item.label}" for item in self.estimates]
+        return "≈ " + " vs ".join(parts)
+
+    def lines(self) -> List[str]:
+        """One line per strategy, for previews."""
+        density = self.blocks / self.bounding_volume if self.bounding_volume else 0.0
+        load = f"{self.mspt:.1f} ms/tick" if self.mspt is not None else "unknown"
+        lines = [
+            f"**Estimated time** ({self.blocks:,} blocks, {density:.0%} of the bounding box, "
+            f"server load {load}):"
+        ]
+        for index, item in enumerate(self.estimates):
+            marker = " ← will be used" if index == 0 else ""
+            lines.append(f"  - {item.label}: ≈ {format_seconds(item.seconds)} ({item.detail}){marker}")
+        return lines
+
+
+@dataclass
+class _PlanShape:
+    commands: int = 0
+    blocks: int = 0
+    bounds: Optional[Box] = None
+    vanilla: bool = True
+    pasteable: bool = True
+    reorderable: bool = True
+    corners: Dict[int, Optional[Tuple[int, int, int]]] = field(default_factory=lambda: {1: None, 2: None})
+
+
+def _extend(bounds: Optional[Box], box: Box) -> Box:
+    x1, x2 = sorted((box.x1, box.x2))
+    y1, y2 = sorted((box.y1, box.y2))
+    z1, z2 = sorted((box.z1, box.z2))
+    if bounds is None:
+        return Box(x1, y1, z1, x2, y2, z2)
+    return Box(
+        min(bounds.x1, x1), min(bounds.y1, y1), min(bounds.z1, z1),
+        max(bounds.x2, x2), max(bounds.y2, y2), max(bounds.z2, z2),
+    )
+
+
+def _shape(operations: Sequence[Operation]) -> _PlanShape:
+    """Commands, blocks written and bounding box of a plan, and what it is eligible for."""
+    shape = _PlanShape()
+    for operation in operations:
+        if isinstance(operation, Comment):
+            continue
+        shape.commands += 1
+        shape.reorderable = shape.reorderable and is_reorderable(operation)
+
+        if isinstance(operation, SetBlock):
+            box = Box(*operation.position, *operation.position)
+            shape.pasteable = shape.pasteable and operation.mode == "replace" and operation.block not in _AIR_BLOCKS
+        elif isinstance(operation, Fill):
+            box = operation.box
+            shape.pasteable = (
+                shape.pasteable
+                and operation.mode in ("replace", "outline")
+                and not operation.filter
+                and operation.block not in _AIR_BLOCKS
+            )
+        elif isinstance(operation, SelectionPoint):
+            shape.vanilla = shape.pasteable = False
+            shape.corners[operation.corner] = operation.position
+            continue
+        elif isinstance(operation, WorldEditCommand):
+            shape.vanilla = shape.pasteable = False
+            if operation.name in SELECTION_COMMANDS:
+                shape.corners = {1: None, 2: None}
+                continue
+            if shape.corners[1] is None or shape.corners[2] is None:
+                continue
+            box = Box(*shape.corners[1], *shape.corners[2])
+        else:
+            if operation.text.strip().startswith("//"):
+                shape.vanilla = False
+            shape.pasteable = False
+            continue
+
+        shape.blocks += volume(box)
+        shape.bounds = _extend(shape.bounds, box)
+    return shape
+
+
+class BuildCostModel:
+    """
+    Estimates how long each strategy would take to place a build.
+
+    Usage:
+        estimate = await rcon.cost_model.estimate(commands)
+        estimate.best.strategy      # "commands", "function" or "paste"
+        ...
+        rcon.cost_model.observe(estimate.best, seconds_it_took)
+    """
+
+    def __init__(self, rcon, config):
+        self.rcon = rcon
+        self.config = config
+        self.corrections: Dict[str, float] = {}
+        self._mspt: Optional[float] = None
+        self._mspt_checked = float("-inf")
+
+    async def server_mspt(self) -> Optional[float]:
+        """Average milliseconds per tick (``tick query``, 1.20.3+), or None if unknown."""
+        now = time.monotonic()
+        if now - self._mspt_checked < MSPT_TTL:
+            return self._mspt
+        self._mspt_checked = now
+        try:
+            response = await self.rcon.execute("tick query", timeout=MSPT_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Could not query server tick time: {e}")
+            self._mspt = None
+            return None
+        match = _MSPT_RE.search(response or "")
+        self._mspt = float(match.group(1)) if match else None
+        return self._mspt
+
+    def _connections(self, shape: _PlanShape) -> int:
+        parallelism = min(self.config.build_parallelism, self.config.rcon_pool_size)
+        if (
+            parallelism > 1
+            and shape.reorderable
+            and shape.commands >= self.config.parallel_dispatch_min_commands
+        ):
+            return parallelism
+        return 1
+
+    def _estimate(self, strategy: str, seconds: float, detail: str) -> StrategyEstimate:
+        correction = self.corrections.get(strategy, 1.0)
+        return StrategyEstimate(strategy, seconds, seconds * correction, detail)
+
+    async def estimate(self, commands: Sequence[str]) -> BuildEstimate:
+        """
+        Estimate every strategy that can place ``commands`` (as the tools
+        produce them: "//" for WorldEdit, "/" or nothing for vanilla).
+        """
+        shape = _shape(BuildPlan.from_commands(commands).operations)
+        mspt = await self.server_mspt()
+
+        # Share of each tick the server has left for commands and reloads
+        spare = max(TICK_SECONDS - (mspt or 0.0) / 1000, 0.1 * TICK_SECONDS)
+        load = TICK_SECONDS / spare
+        latency = self.rcon.aio.latency
+        round_trip = latency.round_trip or DEFAULT_ROUND_TRIP
+        # Without pipelining each command waits for its response, then for
+        # its sentinel's
+        per_command = latency.pipelined or (
+            DEFAULT_PIPELINED if self.rcon.config.enable_rcon_pipelining else 2 * round_trip
+        )
+        block_seconds = shape.blocks * BLOCK_SECONDS * load
+        bounding_volume = volume(shape.bounds) if shape.bounds is not None else 0
+
+        connections = self._connections(shape)
+        detail = f"{shape.commands:,} commands"
+        if connections > 1:
+            detail += f" on {connections} connections"
+        estimates = [
+            self._estimate(
+                COMMANDS,
+                shape.commands * per_command * load / connections + block_seconds,
+                detail,
+            )
+        ]
+
+        if shape.vanilla:
+            stripped = [strip_command_slash(command) for command in commands]
+            if self.rcon.functions.accepts(stripped):
+                estimates.append(self._estimate(
+                    FUNCTION,
+                    RELOAD_SECONDS * load + 2 * round_trip
+                    + shape.commands * FUNCTION_LINE_SECONDS + block_seconds,
+                    "reload, then one tick",
+                ))
+            if (
+                shape.pasteable
+                and shape.blocks >= self.config.schematic_min_blocks
+                and self.rcon.schematics.enabled()
+            ):
+                estimates.append(self._estimate(
+                    PASTE,
+                    bounding_volume * PASTE_POSITION_SECONDS * load + block_seconds
+                    + 4 * round_trip + PASTE_OVERHEAD,
+                    f"{bounding_volume:,}-block bounding box",
+                ))
+
+        estimates.sort(key=lambda item: item.seconds)
+        return BuildEstimate(estimates, shape.blocks, bounding_volume, mspt)
+
+    def observe(self, estimate: StrategyEstimate, seconds: float) -> None:
+        """Move the strategy's correction towards what a build actually took."""
+        if estimate.base_seconds <= 0 or seconds <= 0:
+            return
+        low, high = CORRECTION_RANGE
+        ratio = min(max(seconds / estimate.base_seconds, low), high)
+        current = self.corrections.get(estimate.strategy, 1.0)
+        self.corrections[estimate.strategy] = current + CORRECTION_SMOOTHING * (ratio - current)
+        logger.debug(
+            f"{estimate.label}: estimated {estimate.seconds:.2f}s, took {seconds:.2f}s; "
+            f"correction now {self.corrections[estimate.strategy]:.2f}"
+        )
+
+
+async def place_by_cheapest(
+    rcon, commands: Sequence[str], estimate: BuildEstimate
+) -> Optional[Tuple[StrategyEstimate, str]]:
+    """
+    Try the strategies estimated to beat plain commands, cheapest first.
+
+    Args:
+        rcon: RCONManager
+        commands: Commands with the leading slash stripped (as sent)
+        estimate: From BuildCostModel.estimate() for the same build
+
+    Returns:
+        (strategy that placed the build, its response), or None if the
+        commands should be sent over RCON
+    """
+    for choice in estimate.estimates:
+        if choice.strategy == COMMANDS:
+            return None
+        started = time.monotonic()
+        try:
+            if choice.strategy == PASTE:
+                response = await rcon.schematics.run(commands)
+            else:
+                response = await rcon.functions.run(commands)
+        except Exception as e:
+            logger.warning(f"Build by {choice.label} failed, trying the next strategy: {e}")
+            continue
+        if response is not None:
+            rcon.cost_model.observe(choice, time.monotonic() - started)
+            return choice, response
+    return None
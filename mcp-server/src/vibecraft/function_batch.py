@@ -0,0 +1,265 @@
+"""
+Datapack Function Batch Executor
+
+Runs large batches of vanilla commands as a single datapack function instead
+of one RCON round trip per command.
+
+The Minecraft server's data directory is mounted locally (``./minecraft-data``
+in docker-compose.yml), so VibeCraft can write a function into a datapack it
+owns, make the server pick it up with ``reload`` and execute it with one
+``function vibecraft:<batch>`` call - every command then runs in the same
+server tick. The function file is removed again afterwards.
+
+Only vanilla commands can run inside a function; batches containing WorldEdit
+commands, small batches, and setups where the data directory is missing or not
+writable fall back to RCON (``run()`` returns None).
+
+One command the server cannot parse keeps its whole function from loading. An
+empty check function is written next to every batch: once the reload has made
+it known, a batch function that is still unknown failed to parse, and its
+commands are sent over RCON, where each one reports its own error. Only when
+the check function never appears is the directory taken to be one the server
+does not read, and batches are disabled.
+
+A function reports nothing about the commands it ran, so every command is
+wrapped to count the ones that fail (a position that is not loaded, a block
+that already was what it was set to) in a scoreboard, which is read after
+the call and reported in the response.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .config import VibeCraftConfig
+from .paths import MINECRAFT_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "vibecraft"
+DATAPACK_NAME = "vibecraft"
+
+# Commands beyond the maxCommandChainLength gamerule (default 65536) are
+# silently dropped, so larger batches are split over several functions. Each
+# batch command is two lines that each run a nested command, after two lines
+# of setup.
+MAX_FUNCTION_COMMANDS = 16383
+
+# Scoreboard objective counting the failed commands of a batch function
+SCORE_OBJECTIVE = "vibecraft_batch"
+
+_SCORE = re.compile(r"has (-?\d+) \[")
+
+PACK_MCMETA = {
+    "pack": {
+        "description": "VibeCraft batch builds (managed automatically)",
+        # Pre-1.21.9 servers read pack_format/supported_formats, newer ones
+        # min_format/max_format.
+        "pack_format": 48,
+        "supported_formats": {"min_inclusive": 48, "max_inclusive": 1000},
+        "min_format": 48,
+        "max_format": 1000,
+    }
+}
+
+
+class FunctionBatchExecutor:
+    """
+    Executes vanilla command batches through a VibeCraft-owned datapack.
+
+    Usage:
+        response = await executor.run(["setblock 0 64 0 stone", ...])
+        if response is None:
+            ...  # not applicable - send the commands over RCON instead
+    """
+
+    def __init__(self, rcon, config: VibeCraftConfig):
+        self.rcon = rcon
+        self.config = config
+        self.data_dir = (
+            Path(config.minecraft_data_dir) if config.minecraft_data_dir else MINECRAFT_DATA_DIR
+        )
+        # Set after a batch the server never picked up (e.g. the directory is
+        # not the one the server reads); later batches go straight to RCON.
+        self._disabled = False
+
+    def accepts(self, commands: Sequence[str]) -> bool:
+        """
+        Whether a batch (of slash-stripped commands) should run as a function.
+
+        Commands still starting with "/" are WorldEdit commands, which the
+        function parser does not know. Nothing is written to disk here.
+        """
+        return (
+            self.config.enable_function_batches
+            and not self._disabled
+            and len(commands) >= self.config.function_batch_min_commands
+            and all(command and not command.startswith("/") for command in commands)
+            and self.function_dir() is not None
+        )
+
+    def world_dir(self) -> Path:
+        """World folder, honouring ``level-name`` from server.properties."""
+        level_name = "world"
+        properties = self.data_dir / "server.properties"
+        try:
+            for line in properties.read_text(encoding="utf-8").splitlines():
+                if line.startswith("level-name="):
+                    level_name = line.split("=", 1)[1].strip() or level_name
+                    break
+        except OSError:
+            pass
+        return self.data_dir / level_name
+
+    def function_dir(self) -> Optional[Path]:
+        """The datapack function folder, or None if the world folder is not writable."""
+        world_dir = self.world_dir()
+        if not world_dir.is_dir() or not os.access(world_dir, os.W_OK):
+            return None
+        # 1.21 renamed the "functions" folder to "function"
+        return world_dir / "datapacks" / DATAPACK_NAME / "data" / NAMESPACE / "function"
+
+    async def run(self, commands: Sequence[str]) -> Optional[str]:
+        """
+        Run commands as datapack function(s).
+
+        The file writes and the wait for the reload happen on a worker
+        thread (see run_sync()).
+
+        Args:
+            commands: Vanilla commands without leading slash
+
+        Returns:
+            The server's response to the function call(s), or None when the
+            batch was not run (not eligible, not loaded, or not parseable) and
+            must be sent over RCON instead. Parts after one that did not parse
+            are sent over RCON here.
+        """
+        return await asyncio.to_thread(self.run_sync, commands)
+
+    def run_sync(self, commands: Sequence[str]) -> Optional[str]:
+        """Blocking form of run(), for routines already on a worker thread."""
+        if not self.accepts(commands):
+            return None
+
+        function_dir = self.function_dir()
+        try:
+            names = self._write(function_dir, commands)
+        except OSError as e:
+            logger.info(f"Could not write batch function ({e}); using RCON")
+            return None
+
+        try:
+            # "minecraft:" - on Paper/Bukkit a bare "reload" reloads plugins
+            self.rcon.execute_command("minecraft:reload")
+            if not self._wait_for_reload(f"{NAMESPACE}:{names[0]}"):
+                logger.warning(
+                    f"Server did not load datapack functions from {function_dir}; "
+                    f"falling back to RCON for batch builds"
+                )
+                self._disabled = True
+                return None
+
+            responses = []
+            for index, name in enumerate(names[1:]):
+                response = self.rcon.execute_command(f"function {NAMESPACE}:{name}")
+                if "unknown function" in response.lower():
+                    # The reload is done, so this function failed to parse
+                    logger.info(f"Server could not load batch function {NAMESPACE}:{name}; using RCON")
+                    if not index:
+                        return None
+                    responses.extend(self.rcon.execute_batch_sync(commands[index * MAX_FUNCTION_COMMANDS:]))
+                    break
+                part = commands[index * MAX_FUNCTION_COMMANDS:(index + 1) * MAX_FUNCTION_COMMANDS]
+                responses.append(self._summary(name, part))
+            return "\n".join(responses)
+        finally:
+            # The server sees only "function ...", so the cache is told here
+            self.rcon.chunk_cache.observe_commands(commands)
+            self._remove(function_dir, names)
+
+    def _write(self, function_dir: Path, commands: Sequence[str]) -> List[str]:
+        """
+        Write the (empty) check function and the batch as function files of
+        at most MAX_FUNCTION_COMMANDS; their names, the check function first.
+        """
+        mcmeta = function_dir.parents[2] / "pack.mcmeta"
+        function_dir.mkdir(parents=True, exist_ok=True)
+        if not mcmeta.exists():
+            mcmeta.write_text(json.dumps(PACK_MCMETA, indent=2), encoding="utf-8")
+
+        batch = f"batch_{uuid.uuid4().hex[:12]}"
+        names: List[str] = []
+        try:
+            (function_dir / f"{batch}_check.mcfunction").write_text("# Loaded marker\n", encoding="utf-8")
+            names.append(f"{batch}_check")
+            for part, start in enumerate(range(0, len(commands), MAX_FUNCTION_COMMANDS)):
+                name = f"{batch}_{part}"
+                lines = function_lines(commands[start:start + MAX_FUNCTION_COMMANDS])
+                (function_dir / f"{name}.mcfunction").write_text("\n".join(lines) + "\n", encoding="utf-8")
+                names.append(name)
+        except OSError:
+            self._remove(function_dir, names)
+            raise
+        return names
+
+    def _summary(self, name: str, commands: Sequence[str]) -> str:
+        """What a batch function did, read back from its failure count."""
+        count = sum(1 for command in commands if not command.startswith("#"))
+        summary = f"Ran {count} command(s) as function {NAMESPACE}:{name}"
+        response = self.rcon.execute_command(f"scoreboard players get #failed {SCORE_OBJECTIVE}")
+        match = _SCORE.search(response)
+        if match is None:
+            logger.warning(f"Could not read the failure count of {NAMESPACE}:{name}: {response}")
+        elif int(match.group(1)):
+            summary += f"; {match.group(1)} failed or changed nothing"
+        return summary
+
+    def _wait_for_reload(self, function_id: str) -> bool:
+        """
+        Call a function until the (asynchronous) reload has made it known.
+        Returns False if it does not become known within rcon_timeout.
+        """
+        deadline = time.monotonic() + self.config.rcon_timeout
+        while True:
+            response = self.rcon.execute_command(f"function {function_id}")
+            if "unknown function" not in response.lower():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+
+    @staticmethod
+    def _remove(function_dir: Path, names: Sequence[str]) -> None:
+        for name in names:
+            try:
+                (function_dir / f"{name}.mcfunction").unlink()
+            except OSError:
+                pass
+
+
+def function_lines(commands: Sequence[str]) -> List[str]:
+    """
+    Function lines running ``commands``, each counted in the ``#failed``
+    score of SCORE_OBJECTIVE when it fails. Comments are kept as they are.
+    """
+    lines = [
+        f"scoreboard objectives add {SCORE_OBJECTIVE} dummy",
+        f"scoreboard players set #failed {SCORE_OBJECTIVE} 0",
+    ]
+    for command in commands:
+        if command.startswith("#"):
+            lines.append(command)
+            continue
+        lines.append(f"execute store success score #line {SCORE_OBJECTIVE} run {command}")
+        lines.append(
+            f"execute if score #line {SCORE_OBJECTIVE} matches 0 "
+            f"run scoreboard players add #failed {SCORE_OBJECTIVE} 1"
+        )
+    return lines
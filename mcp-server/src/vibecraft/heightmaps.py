@@ -0,0 +1,229 @@
+"""
+Heightmap Service
+
+Every saved chunk stores the server's heightmaps: for each column, the
+highest block of a kind.
+
+    - ``WORLD_SURFACE``: any block but air
+    - ``MOTION_BLOCKING``: blocks that stop movement, or hold a fluid
+    - ``MOTION_BLOCKING_NO_LEAVES``: the same, ignoring leaves
+    - ``OCEAN_FLOOR``: blocks that stop movement (no fluids)
+
+``HeightmapService.surface()`` returns the surface Y of every column of an
+X/Z rectangle as one NumPy array, read from those heightmaps through the
+region files and the chunk cache. Columns in chunks the files do not hold
+(or every column, when the world is not mounted) are asked from the server
+with ``execute positioned over <heightmap>`` (``probe()``, 1.19.4+): a whole
+batch of columns costs one datapack function call, or one command per
+column without the datapack, plus one read of the results.
+"""
+
+import logging
+import math
+import re
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORLD_SURFACE = "WORLD_SURFACE"
+MOTION_BLOCKING = "MOTION_BLOCKING"
+MOTION_BLOCKING_NO_LEAVES = "MOTION_BLOCKING_NO_LEAVES"
+OCEAN_FLOOR = "OCEAN_FLOOR"
+
+# Overworld build limits (1.18+)
+WORLD_MIN_Y = -64
+WORLD_MAX_Y = 319
+
+# Columns whose surface could not be read
+UNKNOWN = np.iinfo(np.int32).min
+
+# Server-side probes: markers tagged PROBE_TAG report their positions into
+# PROBE_STORAGE, at most PROBE_BATCH columns per read. Each probe appends its
+# own id to the tag and the storage key, so concurrent probes stay apart.
+PROBE_TAG = "vibecraft_probe"
+PROBE_STORAGE = "vibecraft:surface_probe"
+PROBE_BATCH = 1024
+
+# One "[x, y, z]" entry of the collected positions ("[3.5d, 68.0d, 1.5d]")
+_POS_RE = re.compile(r"\[(-?[\d.]+)d,\s*(-?[\d.]+)d,\s*(-?[\d.]+)d\]")
+
+
+class Heightmap:
+    """
+    Surface Y of the sampled columns of an X/Z rectangle.
+
+    ``heights[i, k]`` belongs to column ``(x + i * step, z + k * step)`` for
+    ``origin = (x, z)``. A column without any counted block holds a Y below
+    the world; one that could not be read holds ``UNKNOWN``.
+    """
+
+    def __init__(self, origin: Tuple[int, int], step: int, heights: np.ndarray, source: str):
+        self.origin = origin
+        self.step = step
+        self.heights = heights
+        self.source = source
+
+    def at(self, x: int, z: int) -> Optional[int]:
+        """Surface Y of a sampled column, or None if it could not be read."""
+        ox, oz = self.origin
+        height = int(self.heights[(x - ox) // self.step, (z - oz) // self.step])
+        return None if height == UNKNOWN else height
+
+    def columns(self, min_y: int = WORLD_MIN_Y) -> Iterator[Tuple[int, int, int]]:
+        """(x, surface y, z) of every sampled column with a surface at or above ``min_y``, x-major."""
+        ox, oz = self.origin
+        for i, k in zip(*np.nonzero(self.heights >= min_y)):
+            yield ox + int(i) * self.step, int(self.heights[i, k]), oz + int(k) * self.step
+
+    def stats(self) -> Optional[dict]:
+        """Lowest, highest and mean surface Y over the columns that have one."""
+        known = self.heights[self.heights >= WORLD_MIN_Y]
+        if not known.size:
+            return None
+        return {
+            "min_y": int(known.min()),
+            "max_y": int(known.max()),
+            "avg_y": round(float(known.mean()), 2),
+            "columns": int(known.size),
+        }
+
+
+class HeightmapService:
+    """
+    Surface heights from chunk heightmaps, with a server-side fallback.
+
+    Usage:
+        heightmap = rcon.heightmaps.surface(0, 0, 255, 255)
+        heightmap.heights  # (256, 256) int32 array
+    """
+
+    def __init__(self, rcon):
+        self.rcon = rcon
+
+    def surface(
+        self,
+        x1: int, z1: int, x2: int, z2: int,
+        kind: str = WORLD_SURFACE,
+        step: int = 1,
+        fallback: bool = True,
+        max_probes: Optional[int] = None,
+    ) -> Optional[Heightmap]:
+        """
+        Surface Y of every ``step``-th column of a rectangle.
+
+        Args:
+            kind: Heightmap type (see module docstring)
+            fallback: Ask the server for columns the region files do not
+                hold (``probe()``); if False, or if their chunks are not
+                loaded, they are left ``UNKNOWN``
+            max_probes: Most columns to probe that way
+
+        Returns:
+            The heightmap, or None if no column could be read
+        """
+        min_x, max_x = sorted((x1, x2))
+        min_z, max_z = sorted((z1, z2))
+        step = max(1, step)
+        xs = np.arange(min_x, max_x + 1, step)
+        zs = np.arange(min_z, max_z + 1, step)
+        heights = np.full((len(xs), len(zs)), UNKNOWN, dtype=np.int32)
+
+        sources = []
+        if self.rcon.region_files.flush():
+            if self._read_heightmaps(xs, zs, kind, heights):
+                sources.append("chunk heightmaps")
+
+        missing = list(zip(*np.nonzero(heights == UNKNOWN)))
+        if missing and fallback:
+            if max_probes is not None and len(missing) > max_probes:
+                logger.warning(f"Probing {max_probes} of {len(missing)} columns without heightmaps")
+                missing = missing[:max_probes]
+            probed = self.probe([(int(xs[i]), int(zs[k])) for i, k in missing], kind)
+            for i, k in missing:
+                heights[i, k] = probed.get((int(xs[i]), int(zs[k])), UNKNOWN)
+            if probed:
+                sources.append("server probe")
+
+        if not sources:
+            return None
+        return Heightmap((min_x, min_z), step, heights, " + ".join(sources))
+
+    def _read_heightmaps(self, xs: np.ndarray, zs: np.ndarray, kind: str, heights: np.ndarray) -> bool:
+        """Fill ``heights`` from the chunks' heightmaps; whether any chunk had one."""
+        found = False
+        for cx in np.unique(xs >> 4).tolist():
+            in_x = np.nonzero((xs >> 4) == cx)[0]
+            for cz in np.unique(zs >> 4).tolist():
+                chunk = self.rcon.region_files.chunk(cx, cz)
+                columns = chunk.heightmap(kind) if chunk is not None else None
+                if columns is None:
+                    continue
+                in_z = np.nonzero((zs >> 4) == cz)[0]
+                heights[np.ix_(in_x, in_z)] = columns[np.ix_(xs[in_x] & 15, zs[in_z] & 15)]
+                found = True
+        return found
+
+    def probe(self, columns: Sequence[Tuple[int, int]], kind: str = WORLD_SURFACE) -> Dict[Tuple[int, int], int]:
+        """
+        Surface Y of columns, asked from the server.
+
+        A marker is summoned ``positioned over`` each column's heightmap;
+        the markers' positions are collected into command storage and read
+        back with one ``data get storage``. Batches large enough for a
+        datapack function run in one call, others are pipelined over one
+        pooled connection.
+
+        Returns:
+            ``{(x, z): surface y}`` for the columns in loaded chunks (a Y below
+            the world for empty ones); others, and every column on servers
+            before 1.19.4, are left out
+        """
+        heights: Dict[Tuple[int, int], int] = {}
+        probe_id = uuid.uuid4().hex[:12]
+        key = f"columns_{probe_id}"
+        read = f"data get storage {PROBE_STORAGE} {key}"
+        remove = f"data remove storage {PROBE_STORAGE} {key}"
+        for start in range(0, len(columns), PROBE_BATCH):
+            batch = columns[start:start + PROBE_BATCH]
+            commands = probe_commands(batch, kind, probe_id)
+            try:
+                if self.rcon.functions.run_sync(commands) is None:
+                    # Pipelined over one connection, the read included
+                    response = self.rcon.execute_batch_sync(commands + [read, remove])[-2]
+                else:
+                    response = self.rcon.execute_command(read)
+                    self.rcon.execute_command(remove)
+            except Exception as e:
+                logger.debug(f"Surface probe failed: {e}")
+                break
+            for x, y, z in _POS_RE.findall(response):
+                # Markers stand on the first free block above the surface
+                heights[(math.floor(float(x)), math.floor(float(z)))] = math.floor(float(y)) - 1
+        return heights
+
+
+def probe_commands(
+    columns: Sequence[Tuple[int, int]], kind: str = WORLD_SURFACE, probe_id: str = ""
+) -> List[str]:
+    """
+    Commands that leave ``[x, y, z]`` of a marker on top of each column's
+    ``kind`` heightmap in ``PROBE_STORAGE``'s ``columns_<probe_id>`` list.
+    """
+    heightmap = kind.lower()
+    key = f"columns_{probe_id}"
+    tag = f"{PROBE_TAG}_{probe_id}"
+    selector = f"@e[type=minecraft:marker,tag={tag}]"
+    commands = [f"data modify storage {PROBE_STORAGE} {key} set value []"]
+    commands += [
+        f"execute if loaded {x} 0 {z} positioned {x} 0 {z} positioned over {heightmap} "
+        f"run summon minecraft:marker ~ ~ ~ {{Tags:[\"{tag}\"]}}"
+        for x, z in columns
+    ]
+    commands += [
+        f"execute as {selector} run data modify storage {PROBE_STORAGE} {key} append from entity @s Pos",
+        f"kill {selector}",
+    ]
+    return commands
@@ -0,0 +1,151 @@
+"""
+Spatially Partitioned Parallel Dispatch
+
+The server answers the commands of one RCON connection strictly in order,
+so a pipelined build still waits on one socket. Vanilla ``setblock``/``fill``
+writes do not depend on WorldEdit's console selection, so writes to
+disjoint blocks can go over several pooled connections at once:
+
+    1. Every write is hashed into 3-D cells of ``CELL_SIZE`` blocks; writes
+       sharing a cell are joined (union-find), so each group is a set of
+       writes that may overlap, and different groups never touch the same
+       block.
+    2. Groups are packed into at most ``parallelism`` partitions, largest
+       first onto the least loaded one.
+    3. Each partition streams on its own connection in original command
+       order, so overlapping writes keep their order.
+
+Only plans made entirely of replace-mode writes (``build_plan.is_reorderable``)
+are partitioned; anything that reads the world or uses WorldEdit runs on
+one connection as before.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from .build_plan import BuildPlan, Fill, SetBlock, is_reorderable
+from .worldedit_session import Box
+
+logger = logging.getLogger(__name__)
+
+# Edge length of the cells writes are hashed into
+CELL_SIZE = 4
+
+Cell = Tuple[int, int, int]
+
+
+def _cells(box: Box) -> List[Cell]:
+    x1, x2 = sorted((box.x1, box.x2))
+    y1, y2 = sorted((box.y1, box.y2))
+    z1, z2 = sorted((box.z1, box.z2))
+    return [
+        (cx, cy, cz)
+        for cx in range(x1 // CELL_SIZE, x2 // CELL_SIZE + 1)
+        for cy in range(y1 // CELL_SIZE, y2 // CELL_SIZE + 1)
+        for cz in range(z1 // CELL_SIZE, z2 // CELL_SIZE + 1)
+    ]
+
+
+def partition_commands(commands: Sequence[str], parallelism: int) -> Optional[List[List[int]]]:
+    """
+    Split a build into spatially disjoint partitions of command indices.
+
+    Returns:
+        Up to ``parallelism`` lists of indices (each in ascending order), or
+        None if the build cannot be split: it contains anything other than
+        replace-mode setblock/fill writes, or all writes touch one group.
+    """
+    if parallelism < 2:
+        return None
+    operations = BuildPlan.from_commands(commands).operations
+    if len(operations) != len(commands):
+        return None
+
+    parent = list(range(len(operations)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    # Comments touch nothing and stay groups of their own
+    owner: Dict[Cell, int] = {}
+    for index, operation in enumerate(operations):
+        if not is_reorderable(operation):
+            return None
+        if isinstance(operation, SetBlock):
+            x, y, z = operation.position
+            cells = _cells(Box(x, y, z, x, y, z))
+        elif isinstance(operation, Fill):
+            cells = _cells(operation.box)
+        else:
+            cells = []
+        for cell in cells:
+            other = owner.setdefault(cell, index)
+            if other != index:
+                parent[find(index)] = find(other)
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(operations)):
+        groups.setdefault(find(index), []).append(index)
+    if len(groups) < 2:
+        return None
+
+    partitions: List[List[int]] = [[] for _ in range(min(parallelism, len(groups)))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(partitions, key=len).extend(group)
+    for partition in partitions:
+        partition.sort()
+    return partitions
+
+
+async def dispatch_partitions(
+    rcon, commands: Sequence[str], partitions: Sequence[Sequence[int]]
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Run each partition on its own pooled connection, concurrently.
+
+    Yields ``(index, response)`` as responses arrive (in order within a
+    partition, interleaved across them). If any partition fails, the others
+    are cancelled and the error is raised; every pair yielded so far belongs
+    to a command that completed.
+
+    Args:
+        rcon: RCONManager
+        commands: Commands as sent (without leading slash)
+        partitions: Command indices per partition, from partition_commands()
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def worker(indices: Sequence[int]) -> None:
+        position = 0
+        async for response in rcon.stream_batch([commands[i] for i in indices], trusted=False):
+            await queue.put((indices[position], response))
+            position += 1
+
+    async def run(indices: Sequence[int]) -> None:
+        try:
+            await worker(indices)
+        except BaseException as e:
+            await queue.put(e)
+            raise
+        await queue.put(finished)
+
+    tasks = [asyncio.create_task(run(indices)) for indices in partitions if indices]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -17,6 +17,9 @@ CONTEXT_DIR = PROJECT_ROOT / "context"
 # Schemas directory containing .schem files
 SCHEMAS_DIR = PROJECT_ROOT / "schemas"
 
+# Minecraft server data directory (docker-compose volume mounted at /data)
+MINECRAFT_DATA_DIR = PROJECT_ROOT / "minecraft-data"
+
 # MCP server source directory
 SRC_DIR = PROJECT_ROOT / "mcp-server" / "src"
 
@@ -0,0 +1,143 @@
+"""
+MCP Progress Notifications
+
+When a client sends a ``progressToken`` with a tool call, ``server.call_tool``
+binds it to the call's context; long-running code then reports through a
+``ProgressReporter`` without the token being threaded through every handler:
+
+    reporter = ProgressReporter(total=len(commands))
+    for done, ... in enumerate(..., 1):
+        reporter.update(done)       # "1200/5000 commands, 850 commands/s, ETA 4s"
+
+    stages = ProgressReporter(total=4, unit="steps")
+    stages.stage(1, "Getting overall block composition")
+
+Reporters are no-ops when the call has no progress token. ``update`` may be
+called from worker threads (``rcon.run_blocking`` copies the context), and is
+throttled so a tight loop sends at most a few notifications per second.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between count updates (the last one is always sent)
+UPDATE_INTERVAL = 0.5
+
+
+class ProgressSink:
+    """Where one tool call's progress notifications go."""
+
+    def __init__(self, session: Any, token: Any, request_id: Any = None):
+        self.session = session
+        self.token = token
+        self.request_id = request_id
+        self.loop = asyncio.get_running_loop()
+        self._pending: Set[asyncio.Future] = set()
+
+    def send(self, progress: float, total: Optional[float], message: Optional[str]) -> None:
+        coroutine = self._send(progress, total, message)
+        try:
+            in_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            future = self.loop.create_task(coroutine)
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def _send(self, progress: float, total: Optional[float], message: Optional[str]) -> None:
+        try:
+            await self.session.send_progress_notification(
+                self.token,
+                progress,
+                total=total,
+                message=message,
+                related_request_id=self.request_id,
+            )
+        except Exception as e:
+            # The client may have gone away; the tool call itself carries on
+            logger.debug(f"Could not send progress notification: {e}")
+
+
+_sink: ContextVar[Optional[ProgressSink]] = ContextVar("vibecraft_progress_sink", default=None)
+
+
+def bind(session: Any, token: Any, request_id: Any = None):
+    """Send this context's progress to ``session`` under ``token`` (returns a reset token)."""
+    return _sink.set(ProgressSink(session, token, request_id))
+
+
+def unbind(reset_token) -> None:
+    _sink.reset(reset_token)
+
+
+def detach() -> None:
+    """Stop reporting in this context (e.g. a background job outliving its tool call)."""
+    _sink.set(None)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class ProgressReporter:
+    """
+    Throttled progress of one operation, with throughput and ETA.
+
+    Args:
+        total: Units of work (commands, blocks, steps)
+        unit: Name of one unit, used in messages
+        start: Units already done (e.g. a resumed build); excluded from throughput
+    """
+
+    def __init__(self, total: int, unit: str = "commands", start: int = 0):
+        self.sink = _sink.get()
+        self.total = total
+        self.unit = unit
+        self.start = start
+        self._started = time.monotonic()
+        self._last_sent = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.sink is not None
+
+    def update(self, done: int, message: Optional[str] = None) -> None:
+        """Report ``done`` of ``total`` units (sent at most every UPDATE_INTERVAL)."""
+        if self.sink is None:
+            return
+        now = time.monotonic()
+        if done < self.total and now - self._last_sent < UPDATE_INTERVAL:
+            return
+        self._last_sent = now
+
+        text = f"{done}/{self.total} {self.unit}"
+        elapsed = now - self._started
+        rate = (done - self.start) / elapsed if elapsed > 0 else 0.0
+        if rate > 0:
+            text += f", {rate:.0f} {self.unit}/s"
+            if done < self.total:
+                text += f", ETA {_format_duration((self.total - done) / rate)}"
+        if message:
+            text = f"{message} ({text})"
+        self.sink.send(done, self.total, text)
+
+    def stage(self, index: int, name: str) -> None:
+        """Report that stage ``index`` (1-based) of ``total`` is starting."""
+        if self.sink is None:
+            return
+        self._last_sent = time.monotonic()
+        self.sink.send(index - 1, self.total, f"Step {index}/{self.total}: {name}")
@@ -1,13 +1,176 @@
 """RCON Connection Manager for Minecraft server communication"""
 
+import asyncio
 import logging
-from typing import Optional
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Iterator, List, Optional, Sequence, TypeVar
 import warnings
-from mcrcon import MCRcon
+from .async_rcon import AsyncRCONManager
+from .build_jobs import BuildJobManager
+from .build_plan import strip_command_slash
+from .build_journal import journal_dir
+from .chunk_cache import ChunkCache
+from .chunk_scheduler import ForceloadTracker
 from .config import VibeCraftConfig
+from .cost_model import BuildCostModel
+from .function_batch import FunctionBatchExecutor
+from .heightmaps import HeightmapService
+from .rcon_protocol import RCONConnection, RCONAuthenticationError, RCONError
+from .region_files import RegionFileReader
+from .schematic import SchematicBuildExecutor
+from .worldedit_session import Box, WorldEditSessionState
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def _session_caller() -> object:
+    """The running asyncio task, or the current thread outside an event loop."""
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return threading.get_ident()
+
+
+class RCONConnectionPool:
+    """
+    Bounded pool of persistent, authenticated RCON connections.
+
+    - At most ``max_size`` connections exist at once; callers block (up to
+      ``acquire_timeout`` seconds) when all of them are checked out.
+    - Connections idle for longer than ``idle_timeout`` seconds are closed.
+    - Every checkout runs a cheap liveness probe so sockets closed by the
+      server (restart, network drop) are replaced transparently.
+    - ``on_connection_lost`` runs when a connection is found dead and when a
+      socket is opened while no other one is open (after idle eviction the
+      server may have restarted unnoticed).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        timeout: float,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+
+        self._idle: Deque[RCONConnection] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self.connections_opened = 0
+        # Connections open right now, idle or checked out
+        self._open_count = 0
+
+        # Called when a pooled connection is found dead (e.g. server restart)
+        # or a fresh socket starts a new session with nothing else open
+        self.on_connection_lost: Optional[Callable[[], None]] = None
+
+    def _open(self) -> RCONConnection:
+        connection = RCONConnection(self.host, self.port, self.password, self.timeout)
+        connection.connect()
+        with self._lock:
+            fresh = self._open_count == 0
+            self._open_count += 1
+            self.connections_opened += 1
+        logger.debug(f"Opened RCON connection #{self.connections_opened} to {self.host}:{self.port}")
+        if fresh:
+            self.connection_lost()
+        return connection
+
+    def _discard(self, connection: RCONConnection) -> None:
+        """Close a connection that was open; the caller holds ``_lock`` or owns it."""
+        connection.close()
+        self._open_count -= 1
+
+    def _take_idle(self) -> Optional[RCONConnection]:
+        """Pop a healthy idle connection, closing stale or broken ones."""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                # Most recently used connections sit at the right end
+                connection = self._idle.pop()
+                if now - connection.last_used > self.idle_timeout:
+                    self._discard(connection)
+                    continue
+                if not connection.is_alive():
+                    self._discard(connection)
+                    self.connection_lost()
+                    continue
+                return connection
+        return None
+
+    def connection_lost(self) -> None:
+        if self.on_connection_lost is not None:
+            self.on_connection_lost()
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle and now - self._idle[0].last_used > self.idle_timeout:
+                self._discard(self._idle.popleft())
+
+    @contextmanager
+    def connection(self) -> Iterator[RCONConnection]:
+        """
+        Check out a connection for exclusive use.
+
+        If the body raises, the connection is discarded rather than returned,
+        since its stream position is unknown.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(
+                f"Timed out after {self.timeout} seconds waiting for a free RCON connection"
+            )
+        connection: Optional[RCONConnection] = None
+        try:
+            connection = self._take_idle() or self._open()
+            yield connection
+        except BaseException:
+            if connection is not None:
+                with self._lock:
+                    self._discard(connection)
+            raise
+        else:
+            with self._lock:
+                self._idle.append(connection)
+        finally:
+            self._slots.release()
+            self._evict_idle()
+
+    def check(self) -> None:
+        """
+        Check a connection out and back in, so a dropped, expired or first
+        connection runs ``on_connection_lost`` now. Failing to connect counts
+        as a lost connection too.
+        """
+        try:
+            with self.connection():
+                pass
+        except Exception:
+            self.connection_lost()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
 
 class RCONManager:
     """Manages RCON connections to Minecraft server"""
@@ -18,13 +181,214 @@ class RCONManager:
         self.port = config.rcon_port
         self.password = config.rcon_password
         self.timeout = config.rcon_timeout
-        self._connection: Optional[MCRcon] = None
+        self.pool = RCONConnectionPool(
+            self.host,
+            self.port,
+            self.password,
+            self.timeout,
+            max_size=config.rcon_pool_size,
+            idle_timeout=config.rcon_pool_idle_timeout,
+        )
         self._warned_send_command = False
 
+        # Asyncio client for tool handlers (await rcon.execute(...))
+        self.aio = AsyncRCONManager(config)
+
+        # Large vanilla batches run as one datapack function when possible
+        self.functions = FunctionBatchExecutor(self, config)
+
+        # Large vanilla builds are pasted as one WorldEdit schematic when possible
+        self.schematics = SchematicBuildExecutor(self, config)
+
+        # Picks the cheapest of those strategies (or plain commands) per build
+        self.cost_model = BuildCostModel(self, config)
+
+        # Chunks and block states read from the world, shared by every read
+        # path and invalidated by the writes sent through this manager
+        self.chunk_cache = ChunkCache(config.chunk_cache_mb * 2**20, config.chunk_cache_ttl)
+
+        # Block queries answered from the mounted world's region files
+        self.region_files = RegionFileReader(self, config)
+
+        # Surface heights from the chunks' heightmaps (WorldEdit fallback)
+        self.heightmaps = HeightmapService(self)
+
+        # Chunks force-loaded for chunk-scheduled builds, shared between them
+        self.forceloads = ForceloadTracker(self)
+
+        # Builds started with build(async=True)
+        self.jobs = BuildJobManager(journal_dir(config) / "jobs.json", config.build_max_workers)
+
+        # WorldEdit's console actor has ONE session (selection, world, gmask)
+        # shared by every RCON connection. Hold this lock around any command
+        # sequence that depends on it, so concurrent tool calls cannot clobber
+        # each other's //pos1 / //pos2. Not reentrant: take it once, at the
+        # tool-handler level.
+        self.worldedit_lock = threading.Lock()
+        # Task (or thread, for blocking code) holding the session
+        self._session_owner: Optional[object] = None
+
+        # Mirror of that session, used to skip //pos1 / //pos2 and /world
+        # commands that would not change it. A lost connection may mean the
+        # server restarted with a fresh session, so it is forgotten then.
+        self.worldedit_state = WorldEditSessionState()
+        self.pool.on_connection_lost = self.worldedit_state.invalidate
+        self.aio.on_connection_lost = self.worldedit_state.invalidate
+
+    async def execute(self, command: str, timeout: Optional[float] = None) -> str:
+        """Execute a command without blocking the event loop (see AsyncRCONManager)."""
+        if self.worldedit_state.cached_response(command) is not None:
+            await self.aio.check()
+        cached = self.worldedit_state.cached_response(command)
+        if cached is not None:
+            return cached
+        try:
+            response = await self.aio.execute(command, timeout=timeout)
+        except BaseException:
+            self._observe_failed(command)
+            raise
+        self._observe(command, response)
+        return response
+
+    async def ensure_worldedit_world(self, world: Optional[str] = None) -> Optional[str]:
+        """
+        Point the console WorldEdit session at ``world`` (default:
+        ``worldedit_world``) unless it already is.
+
+        The override survives between commands and connections, so it is sent
+        once and then only again after a reconnect (which may mean a server
+        restart) or a switch to another world.
+
+        Returns:
+            The server's response, or None if nothing had to be sent
+        """
+        world = world or self.config.worldedit_world
+        if self.worldedit_state.world == world:
+            await self.aio.check()
+        if self.worldedit_state.world == world:
+            return None
+        return await self.execute(f"/world {world}")
+
+    async def execute_batch(
+        self, commands: Sequence[str], window: Optional[int] = None, trusted: bool = True
+    ) -> List[str]:
+        """Pipeline many commands over one connection; responses in command order."""
+        return [response async for response in self.stream_batch(commands, window, trusted)]
+
+    async def stream_batch(
+        self, commands: Sequence[str], window: Optional[int] = None, trusted: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Streaming form of execute_batch() (``async for response in ...``).
+
+        Pass ``trusted=False`` for user-authored commands, so that any
+        unfamiliar WorldEdit command clears the tracked selection.
+        """
+        index = 0
+        try:
+            async for response in self.aio.stream_batch(commands, window=window):
+                self._observe(commands[index], response, trusted=trusted)
+                index += 1
+                yield response
+        except BaseException:
+            for command in commands[index:]:
+                self._observe_failed(command)
+            raise
+
+    @contextmanager
+    def worldedit_session(self) -> Iterator[None]:
+        """
+        Hold the console WorldEdit session for a sequence of blocking commands.
+
+        Not reentrant, and neither is worldedit_session_async(): code that
+        holds the session must not take it again (for instance through
+        run_blocking(..., worldedit=True)); doing so raises RuntimeError.
+        """
+        self._check_session_not_held()
+        with self.worldedit_lock:
+            with self._hold_session():
+                yield
+
+    @asynccontextmanager
+    async def worldedit_session_async(self) -> AsyncIterator[None]:
+        """Async variant of worldedit_session(); waits for the lock on a worker thread."""
+        self._check_session_not_held()
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.worldedit_lock.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # The worker still takes the lock; hand it back once it has
+            acquire.add_done_callback(lambda _: self.worldedit_lock.release())
+            raise
+        try:
+            with self._hold_session():
+                yield
+        finally:
+            self.worldedit_lock.release()
+
+    @contextmanager
+    def _hold_session(self) -> Iterator[None]:
+        """Record the caller as the owner of the (already locked) session."""
+        self._session_owner = _session_caller()
+        try:
+            yield
+        finally:
+            self._session_owner = None
+
+    def _check_session_not_held(self) -> None:
+        if self._session_owner is not None and self._session_owner == _session_caller():
+            raise RuntimeError("The WorldEdit session is already held by this caller (it is not reentrant)")
+
+    async def run_blocking(self, func: Callable[..., T], *args: Any, worldedit: bool = False, **kwargs: Any) -> T:
+        """
+        Run a blocking RCON routine (e.g. an analyzer) on a worker thread.
+
+        Args:
+            func: Synchronous callable that talks to the server via this manager
+            worldedit: Hold the WorldEdit console session for the whole call
+                (required when ``func`` sets a selection and then acts on it)
+        """
+        if not worldedit:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        self._check_session_not_held()
+
+        # The lock is taken inside the worker thread so it stays held until
+        # func actually finishes, even if the awaiting task is cancelled.
+        def locked() -> T:
+            with self.worldedit_session():
+                world = self.config.worldedit_world
+                if self.worldedit_state.world != world:
+                    self.execute_command(f"/world {world}")
+                return func(*args, **kwargs)
+
+        return await asyncio.to_thread(locked)
+
+    @contextmanager
+    def selection(self, box: Box) -> Iterator[Box]:
+        """
+        Make ``box`` the console WorldEdit selection for the enclosed commands.
+
+        Only corners that differ from the tracked selection are sent, so
+        repeated queries over the same region cost no extra round trips. The
+        caller must hold the WorldEdit session (worldedit_session() or
+        run_blocking(..., worldedit=True)).
+
+        Usage:
+            with rcon.selection(Box(0, 60, 0, 15, 70, 15)):
+                rcon.execute_command("/count stone")
+        """
+        self.execute_command(f"/pos1 {box.x1},{box.y1},{box.z1}")
+        self.execute_command(f"/pos2 {box.x2},{box.y2},{box.z2}")
+        yield box
+
     def execute_command(self, command: str) -> str:
         """
         Execute a command on the Minecraft server via RCON.
 
+        Commands run over a pooled persistent connection. If a reused
+        connection turns out to be broken, the command is retried once on a
+        freshly opened connection.
+
         Args:
             command: The command to execute (without leading slash)
 
@@ -35,40 +399,176 @@ class RCONManager:
             ConnectionError: If RCON connection fails
             TimeoutError: If command execution times out
         """
+        # The mirrored session only holds while the server keeps it; checking
+        # a connection first notices a restart (which forgets the mirror)
+        if self.worldedit_state.cached_response(command) is not None:
+            self.pool.check()
+        cached = self.worldedit_state.cached_response(command)
+        if cached is not None:
+            return cached
+
+        try:
+            if self.config.enable_command_logging:
+                logger.info(f"Executing command: {command}")
+
+            response = self._run_pooled(command)
+
+            if self.config.enable_command_logging:
+                logger.info(f"Response: {response}")
+
+            self._observe(command, response)
+            return response
+
+        except Exception as e:
+            self._observe_failed(command)
+            raise self._translate_error(e, command) from e
+
+    def _observe(self, command: str, response: Optional[str], trusted: bool = True) -> None:
+        """Update the WorldEdit session mirror and the chunk cache after a command ran."""
+        # Selection edits act on the selection from before the command
+        self.chunk_cache.observe(command, self.worldedit_state.selection())
+        self.worldedit_state.observe(command, response, trusted=trusted)
+
+    def _observe_failed(self, command: str) -> None:
+        """A command failed part way: it may or may not have run."""
+        self.chunk_cache.observe(command, self.worldedit_state.selection())
+        self.worldedit_state.invalidate()
+
+    def _run_pooled(self, command: str) -> str:
+        reused = False
         try:
-            # Create a new connection for each command
-            # This is more reliable than maintaining a persistent connection
-            with MCRcon(self.host, self.password, port=self.port, timeout=self.timeout) as mcr:
-                if self.config.enable_command_logging:
-                    logger.info(f"Executing command: {command}")
+            with self.pool.connection() as connection:
+                reused = connection.commands_sent > 0
+                return connection.command(command)
+        except (RCONAuthenticationError, TimeoutError, ConnectionRefusedError):
+            raise
+        except (RCONError, OSError) as e:
+            if not reused:
+                raise
+            # Stale socket (server restart, NAT timeout): reconnect transparently
+            logger.info(f"RCON connection lost ({e}); reconnecting")
+            self.pool.connection_lost()
+            with self.pool.connection() as connection:
+                return connection.command(command)
+
+    def stream_command(self, command: str) -> Iterator[str]:
+        """
+        Execute a command and yield its response line by line.
 
-                response = mcr.command(command)
+        Lines are produced as the response packets arrive, so large outputs
+        (``//distr`` over a big region) can be parsed without waiting for, or
+        holding, the whole payload.
 
-                if self.config.enable_command_logging:
-                    logger.info(f"Response: {response}")
+        Args:
+            command: The command to execute (without leading slash)
+
+        Raises:
+            ConnectionError, TimeoutError, RuntimeError: As for execute_command()
+        """
+        if self.config.enable_command_logging:
+            logger.info(f"Streaming command: {command}")
 
-                return response
+        # The response is not kept, so its outcome is unknown to the tracker
+        self._observe(command, None)
 
-        except ConnectionRefusedError as e:
+        yielded = False
+        try:
+            for attempt in range(2):
+                reused = False
+                try:
+                    with self.pool.connection() as connection:
+                        reused = connection.commands_sent > 0
+                        pending = ""
+                        for fragment in connection.stream(command):
+                            *lines, pending = (pending + fragment).split("\n")
+                            for line in lines:
+                                yielded = True
+                                yield line
+                        if pending:
+                            yielded = True
+                            yield pending
+                    return
+                except (RCONAuthenticationError, TimeoutError, ConnectionRefusedError):
+                    raise
+                except (RCONError, OSError) as e:
+                    if not reused or yielded or attempt:
+                        raise
+                    logger.info(f"RCON connection lost ({e}); reconnecting")
+                    self.pool.connection_lost()
+        except Exception as e:
+            self.worldedit_state.invalidate()
+            raise self._translate_error(e, command) from e
+
+    def execute_batch_sync(
+        self, commands: Sequence[str], window: Optional[int] = None, trusted: bool = True
+    ) -> List[str]:
+        """
+        Blocking counterpart of execute_batch(), for code running on a worker
+        thread: the commands are pipelined over one pooled connection.
+
+        Raises:
+            ConnectionError, TimeoutError, RuntimeError: As for execute_command()
+        """
+        commands = list(commands)
+        window = max(1, window or self.config.rcon_pipeline_depth)
+        if not self.config.enable_rcon_pipelining:
+            window = 1
+        responses: List[str] = []
+        try:
+            for attempt in range(2):
+                reused = False
+                try:
+                    with self.pool.connection() as connection:
+                        reused = connection.commands_sent > 0
+                        for response in connection.pipeline(commands[len(responses):], window):
+                            command = commands[len(responses)]
+                            if self.config.enable_command_logging:
+                                logger.info(f"Executed command: {command} -> {response}")
+                            self._observe(command, response, trusted=trusted)
+                            responses.append(response)
+                    return responses
+                except (RCONAuthenticationError, TimeoutError, ConnectionRefusedError):
+                    raise
+                except (RCONError, OSError) as e:
+                    # Only a connection that broke while idle in the pool is
+                    # retried; nothing may have been executed on it yet.
+                    if not reused or responses or attempt:
+                        raise
+                    logger.info(f"RCON connection lost ({e}); reconnecting")
+                    self.pool.connection_lost()
+        except Exception as e:
+            for command in commands[len(responses):]:
+                self._observe_failed(command)
+            failed = commands[len(responses)] if len(responses) < len(commands) else "<batch>"
+            raise self._translate_error(e, failed) from e
+        return responses
+
+    def _translate_error(self, e: Exception, command: str) -> Exception:
+        """Map low-level failures onto ConnectionError / TimeoutError / RuntimeError."""
+        if isinstance(e, ConnectionRefusedError):
             error_msg = (
                 f"Failed to connect to Minecraft server at {self.host}:{self.port}. "
                 f"Ensure the server is running and RCON is enabled. Error: {str(e)}"
             )
             logger.error(error_msg)
-            raise ConnectionError(error_msg) from e
+            return ConnectionError(error_msg)
 
-        except TimeoutError as e:
+        if isinstance(e, TimeoutError):
             error_msg = (
                 f"Command execution timed out after {self.timeout} seconds. "
                 f"The server may be overloaded or unresponsive. Command: {command}"
             )
             logger.error(error_msg)
-            raise TimeoutError(error_msg) from e
+            return TimeoutError(error_msg)
 
-        except Exception as e:
-            error_msg = f"Error executing RCON command: {str(e)}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg) from e
+        error_msg = f"Error executing RCON command: {str(e)}"
+        logger.error(error_msg)
+        return RuntimeError(error_msg)
+
+    def close(self) -> None:
+        """Close all pooled (blocking) RCON connections."""
+        self.pool.close()
+        self.region_files.close()
 
     def test_connection(self) -> bool:
         """
@@ -160,7 +660,4 @@ class RCONManager:
             )
             self._warned_send_command = True
 
-        sanitized = command.strip()
-        if sanitized.startswith("/"):
-            sanitized = sanitized[1:]
-        return self.execute_command(sanitized)
+        return self.execute_command(strip_command_slash(command))
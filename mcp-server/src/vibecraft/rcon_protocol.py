@@ -0,0 +1,290 @@
+"""
+RCON Protocol Implementation
+
+Minimal, signal-free implementation of the Source RCON protocol as spoken by
+Minecraft servers. Replaces the ``mcrcon`` client, whose SIGALRM-based timeout
+only works on the main thread and cannot back a shared connection pool.
+
+Packet layout (little endian):
+    int32 length | int32 request_id | int32 type | body (ASCII) | 0x00 0x00
+"""
+
+import select
+import socket
+import struct
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Packet types
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+# Any type the server does not handle; it answers with "Unknown request",
+# echoing the request id, which marks the end of the preceding response.
+SERVERDATA_SENTINEL = SERVERDATA_RESPONSE_VALUE
+
+# Minecraft rejects request bodies longer than this (in bytes)
+MAX_REQUEST_BODY = 1446
+
+_HEADER = struct.Struct("<ii")
+_LENGTH = struct.Struct("<i")
+
+
+class RCONError(Exception):
+    """Raised when the RCON protocol is violated or the link is unusable."""
+
+
+class RCONAuthenticationError(RCONError):
+    """Raised when the server rejects the RCON password."""
+
+
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    """Encode a single RCON packet including its length prefix."""
+    payload = _HEADER.pack(request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_packet(payload: bytes) -> Tuple[int, int, str]:
+    """
+    Decode an RCON packet payload (without the length prefix).
+
+    Returns:
+        (request_id, packet_type, body)
+    """
+    if len(payload) < 10:
+        raise RCONError(f"RCON packet too short ({len(payload)} bytes)")
+    if payload[-2:] != b"\x00\x00":
+        raise RCONError("Incorrect RCON packet padding")
+    request_id, packet_type = _HEADER.unpack(payload[:8])
+    return request_id, packet_type, payload[8:-2].decode("utf-8", errors="replace")
+
+
+class PipelineWindow:
+    """
+    Bookkeeping of a pipelined batch, shared by the blocking and the asyncio
+    connection: which packets to send next, and which response (ended by
+    its sentinel) belongs to which command.
+
+    Usage:
+        window = PipelineWindow(commands, depth, connection._allocate_id)
+        while not window.finished:
+            for packet in window.top_up():
+                send(packet)
+            while not window.has_next():
+                request_id, _, body = read_packet()
+                window.receive(request_id, body)
+            yield window.pop()
+    """
+
+    def __init__(self, commands: Sequence[str], depth: int, allocate_id: Callable[[], int]):
+        self.commands = commands
+        self.depth = max(1, depth)
+        self._allocate_id = allocate_id
+        self._fragments: Dict[int, List[str]] = {}  # request id -> response so far
+        self._sentinels: Dict[int, int] = {}  # sentinel id -> request id
+        self._index_of: Dict[int, int] = {}  # request id -> command index
+        self._ready: Dict[int, str] = {}  # command index -> complete response
+        self.sent = 0
+        self.yielded = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.yielded >= len(self.commands)
+
+    def top_up(self) -> List[bytes]:
+        """
+        Packets that fill the window up to ``depth`` commands in flight, to
+        be written one at a time.
+
+        An oversized command is only rejected once everything before it has
+        completed.
+        """
+        packets: List[bytes] = []
+        while self.sent < len(self.commands) and len(self._sentinels) < self.depth:
+            command = self.commands[self.sent]
+            if len(command.encode("utf-8")) > MAX_REQUEST_BODY:
+                break
+            request_id = self._allocate_id()
+            sentinel_id = self._allocate_id()
+            self._fragments[request_id] = []
+            self._sentinels[sentinel_id] = request_id
+            self._index_of[request_id] = self.sent
+            packets.append(encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+            packets.append(encode_packet(sentinel_id, SERVERDATA_SENTINEL, ""))
+            self.sent += 1
+        if self.yielded == self.sent:
+            raise RCONError(f"Command exceeds RCON limit of {MAX_REQUEST_BODY} bytes")
+        return packets
+
+    def receive(self, request_id: int, body: str) -> None:
+        """Take one packet read from the connection."""
+        if request_id in self._fragments:
+            self._fragments[request_id].append(body)
+        elif request_id in self._sentinels:
+            command_id = self._sentinels.pop(request_id)
+            self._ready[self._index_of.pop(command_id)] = "".join(self._fragments.pop(command_id))
+
+    def has_next(self) -> bool:
+        """Whether the response to the next command in order is complete."""
+        return self.yielded in self._ready
+
+    def pop(self) -> str:
+        """The response to the next command in order (check has_next() first)."""
+        response = self._ready.pop(self.yielded)
+        self.yielded += 1
+        return response
+
+
+class RCONConnection:
+    """
+    A single authenticated RCON socket.
+
+    Not safe for concurrent use - callers (the connection pool) must ensure
+    only one thread talks over a connection at a time.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._next_id = 0
+        self.commands_sent = 0
+        self.created_at = 0.0
+        self.last_used = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    def connect(self) -> None:
+        """Open the TCP connection and authenticate."""
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.created_at = self.last_used = time.monotonic()
+
+        try:
+            auth_id = self._allocate_id()
+            self._socket.sendall(encode_packet(auth_id, SERVERDATA_AUTH, self.password))
+            while True:
+                request_id, packet_type, _ = self._read_packet()
+                if packet_type != SERVERDATA_AUTH_RESPONSE:
+                    continue
+                if request_id == -1:
+                    raise RCONAuthenticationError("RCON authentication failed: wrong password")
+                if request_id == auth_id:
+                    return
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the socket (safe to call multiple times)."""
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def command(self, command: str) -> str:
+        """Send a command and return the server's full response text."""
+        return "".join(self.stream(command))
+
+    def stream(self, command: str) -> Iterator[str]:
+        """
+        Send a command and yield its response fragments as they arrive.
+
+        Minecraft splits responses longer than 4096 characters over several
+        packets and marks none of them as the last. An empty packet of an
+        unknown type follows the command; the server answers it only after
+        the command's response, so its reply ends the stream.
+
+        Vanilla and Paper decode one packet per socket read and drop the
+        connection when a read holds more. The sentinel is therefore written
+        once the first response packet shows the command has been read.
+        """
+        if self._socket is None:
+            raise RCONError("RCON connection is not open")
+        if len(command.encode("utf-8")) > MAX_REQUEST_BODY:
+            raise RCONError(f"Command exceeds RCON limit of {MAX_REQUEST_BODY} bytes")
+
+        request_id = self._allocate_id()
+        sentinel_id: Optional[int] = None
+        self._socket.sendall(encode_packet(request_id, SERVERDATA_EXECCOMMAND, command))
+        self.commands_sent += 1
+
+        while True:
+            in_id, _, body = self._read_packet()
+            if in_id == request_id:
+                if sentinel_id is None:
+                    sentinel_id = self._allocate_id()
+                    self._socket.sendall(encode_packet(sentinel_id, SERVERDATA_SENTINEL, ""))
+                yield body
+            elif in_id == sentinel_id:
+                break
+
+        self.last_used = time.monotonic()
+
+    def pipeline(self, commands: Sequence[str], depth: int) -> Iterator[str]:
+        """
+        Send commands with up to ``depth`` of them in flight and yield each
+        response in command order (see AsyncRCONConnection.pipeline()).
+        """
+        if self._socket is None:
+            raise RCONError("RCON connection is not open")
+        if depth <= 1:
+            for command in commands:
+                yield self.command(command)
+            return
+
+        window = PipelineWindow(commands, depth, self._allocate_id)
+        while not window.finished:
+            sent = window.sent
+            for packet in window.top_up():
+                self._socket.sendall(packet)
+            self.commands_sent += window.sent - sent
+            while not window.has_next():
+                in_id, _, body = self._read_packet()
+                window.receive(in_id, body)
+            self.last_used = time.monotonic()
+            yield window.pop()
+
+    def is_alive(self) -> bool:
+        """
+        Cheap liveness probe that does not send anything to the server.
+
+        A healthy idle RCON socket has nothing to read; a readable socket whose
+        peek returns no bytes was closed by the server.
+        """
+        if self._socket is None:
+            return False
+        try:
+            readable, _, errored = select.select([self._socket], [], [self._socket], 0)
+            if errored:
+                return False
+            if readable:
+                return self._socket.recv(1, socket.MSG_PEEK) != b""
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _allocate_id(self) -> int:
+        self._next_id = (self._next_id % 0x7FFFFFFF) + 1
+        return self._next_id
+
+    def _read_exact(self, length: int) -> bytes:
+        data = bytearray()
+        while len(data) < length:
+            chunk = self._socket.recv(length - len(data))
+            if not chunk:
+                raise RCONError("RCON connection closed by server")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_packet(self) -> Tuple[int, int, str]:
+        (length,) = _LENGTH.unpack(self._read_exact(4))
+        return decode_packet(self._read_exact(length))
@@ -0,0 +1,415 @@
+"""
+Anvil Region File Reader
+
+Block queries over RCON cost one ``execute ... data get block`` round trip
+per block, and the validation analyzers make thousands of them. The world's
+region files (``<world>/region/r.<x>.<z>.mca``) sit in the mounted server
+data directory, so block states can be read from disk instead:
+
+    - Region files are memory-mapped; only the 8 KiB header is read up
+      front, and a chunk is decompressed the first time a block in it is
+      asked for.
+    - Chunk sections keep their palette and packed ``data`` long array,
+      unpacked with NumPy bit operations into 4096 ``uint16`` palette
+      indices the first time the section is used.
+    - ``read_box()`` assembles the sections of every chunk a box touches
+      into one ``(x, y, z)`` index array over a shared palette, which the
+      analyzers scan with array operations.
+    - Chunks also carry the server's heightmaps (``WORLD_SURFACE``,
+      ``MOTION_BLOCKING``, ...), which HeightmapService reads (see
+      heightmaps.py).
+    - Decoded chunks are kept in the RCONManager's ChunkCache (see
+      chunk_cache.py), which drops the chunks VibeCraft writes to.
+    - ``flush()`` runs ``save-all flush`` so the files hold every block
+      placed so far, when anything was written since the last one or it is
+      older than ``chunk_cache_ttl``. Call it once before a batch of
+      queries whose answers must be current. Until then, chunks written
+      since the last save give None.
+
+Only the 1.18+ chunk format is read (the server is 1.21). Chunks that are
+missing, not fully generated, in an older format or LZ4-compressed give
+None, and callers fall back to RCON.
+"""
+
+import gzip
+import logging
+import mmap
+import struct
+import threading
+import zlib
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import nbtlib
+import numpy as np
+
+from .config import VibeCraftConfig
+from .worldedit_session import Box, Position
+
+logger = logging.getLogger(__name__)
+
+AIR = "minecraft:air"
+
+SECTOR_SIZE = 4096
+REGION_CHUNKS = 32
+
+# Compression type byte in front of each chunk
+GZIP, ZLIB, UNCOMPRESSED, LZ4 = 1, 2, 3, 4
+# Flag on the compression type: the chunk lives in a separate c.<x>.<z>.mcc file
+EXTERNAL = 128
+
+_FULL_STATUS = {"full", "minecraft:full"}
+
+SECTION_BLOCKS = 4096
+CHUNK_COLUMNS = 256
+
+# Largest box read_box() assembles (2 bytes per block)
+MAX_READ_VOLUME = 32 * 1024 * 1024
+
+
+def palette_state(entry: nbtlib.Compound) -> str:
+    """Block state string of a palette entry, properties sorted."""
+    name = str(entry["Name"])
+    properties = entry.get("Properties")
+    if properties:
+        pairs = ",".join(f"{key}={properties[key]}" for key in sorted(properties))
+        return f"{name}[{pairs}]"
+    return name
+
+
+def unpack_indices(data: np.ndarray, bits: int, count: int = SECTION_BLOCKS) -> np.ndarray:
+    """
+    Unpack packed longs (a section's ``data``, a heightmap) into ``count`` values.
+
+    Since 1.16 entries never straddle two longs: each long holds
+    ``64 // bits`` entries from its low bits up, and the rest is padding.
+    """
+    per_long = 64 // bits
+    shifts = np.arange(per_long, dtype=np.uint64) * np.uint64(bits)
+    values = (data.astype(np.uint64)[:, None] >> shifts) & np.uint64((1 << bits) - 1)
+    indices = values.reshape(-1)[:count].astype(np.uint16)
+    if len(indices) < count:
+        indices = np.pad(indices, (0, count - len(indices)))
+    return indices
+
+
+class ChunkSection:
+    """One 16x16x16 section: palette plus packed palette indices."""
+
+    def __init__(self, palette: List[str], data: Optional[np.ndarray]):
+        self.palette = palette
+        self.data = data  # None when the palette has a single entry
+        self.bits = max(4, (len(palette) - 1).bit_length())
+        self._indices: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_nbt(cls, block_states: nbtlib.Compound) -> "ChunkSection":
+        palette = [palette_state(entry) for entry in block_states.get("palette", [])] or [AIR]
+        data = block_states.get("data")
+        # LongArray is big-endian int64; reinterpret as native unsigned
+        return cls(palette, np.asarray(data, dtype=np.int64).view(np.uint64) if data is not None else None)
+
+    def indices(self) -> np.ndarray:
+        """Palette index of every block, in (y, z, x) order."""
+        if self._indices is None:
+            if self.data is None:
+                self._indices = np.zeros(SECTION_BLOCKS, dtype=np.uint16)
+            else:
+                self._indices = np.minimum(unpack_indices(self.data, self.bits), len(self.palette) - 1)
+        return self._indices
+
+    def state(self, index: int) -> str:
+        """State at ``index`` = (y << 8) | (z << 4) | x within the section."""
+        if self.data is None:
+            return self.palette[0]
+        return self.palette[self.indices()[index]]
+
+
+class BlockRegion:
+    """
+    Block states of a box as palette indices.
+
+    ``indices[x - origin.x, y - origin.y, z - origin.z]`` is the position's
+    entry in ``palette``.
+    """
+
+    def __init__(self, origin: Position, palette: List[str], indices: np.ndarray):
+        self.origin = origin
+        self.palette = palette
+        self.indices = indices
+
+    @property
+    def box(self) -> Box:
+        x, y, z = self.origin
+        width, height, length = self.indices.shape
+        return Box(x, y, z, x + width - 1, y + height - 1, z + length - 1)
+
+    def contains(self, x: int, y: int, z: int) -> bool:
+        box = self.box
+        return box.x1 <= x <= box.x2 and box.y1 <= y <= box.y2 and box.z1 <= z <= box.z2
+
+    def state(self, x: int, y: int, z: int) -> str:
+        ox, oy, oz = self.origin
+        return self.palette[self.indices[x - ox, y - oy, z - oz]]
+
+    def lookup(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Boolean table over the palette, for ``table[region.indices]`` masks."""
+        return np.array([bool(predicate(state)) for state in self.palette], dtype=bool)
+
+
+class Chunk:
+    """Block sections of one decoded chunk, keyed by section Y, and its heightmaps."""
+
+    def __init__(
+        self,
+        sections: Dict[int, ChunkSection],
+        heightmaps: Optional[Dict[str, np.ndarray]] = None,
+        min_y: int = -64,
+    ):
+        self.sections = sections
+        self.heightmaps = heightmaps or {}  # packed longs, by type
+        self.min_y = min_y
+        self._heights: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_nbt(cls, root: nbtlib.Compound) -> Optional["Chunk"]:
+        """Decode a chunk, or None if it is not a fully generated 1.18+ chunk."""
+        if "sections" not in root or str(root.get("Status", "")) not in _FULL_STATUS:
+            return None
+        sections = {}
+        for section in root["sections"]:
+            block_states = section.get("block_states")
+            if block_states is not None:
+                sections[int(section["Y"])] = ChunkSection.from_nbt(block_states)
+        heightmaps = {
+            str(name): np.asarray(data, dtype=np.int64).view(np.uint64)
+            for name, data in root.get("Heightmaps", {}).items()
+            if len(data)
+        }
+        return cls(sections, heightmaps, int(root.get("yPos", -4)) * 16)
+
+    def heightmap(self, kind: str) -> Optional[np.ndarray]:
+        """
+        Y of the highest block of each column counted by heightmap ``kind``,
+        indexed ``[x & 15, z & 15]`` (``min_y - 1`` for an empty column), or
+        None if the chunk does not store that heightmap.
+        """
+        if kind not in self._heights:
+            data = self.heightmaps.get(kind)
+            if data is None:
+                return None
+            # Stored as "first free Y above the block" - min_y, z-major; the
+            # entry width follows from the world height, i.e. the array length
+            bits = 64 // -(-CHUNK_COLUMNS // len(data))
+            values = unpack_indices(data, bits, CHUNK_COLUMNS).astype(np.int32)
+            self._heights[kind] = values.reshape(16, 16).T + (self.min_y - 1)
+        return self._heights[kind]
+
+    def block_state(self, x: int, y: int, z: int) -> str:
+        section = self.sections.get(y >> 4)
+        if section is None:
+            return AIR
+        return section.state(((y & 15) << 8) | ((z & 15) << 4) | (x & 15))
+
+
+class RegionFile:
+    """A memory-mapped ``.mca`` file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file: no chunks
+            self._map = None
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def chunk_bytes(self, cx: int, cz: int) -> Optional[bytes]:
+        """Uncompressed NBT of a chunk (chunk coordinates), or None if absent or unreadable."""
+        if self._map is None or len(self._map) < 2 * SECTOR_SIZE:
+            return None
+        entry = 4 * ((cx % REGION_CHUNKS) + (cz % REGION_CHUNKS) * REGION_CHUNKS)
+        location = int.from_bytes(self._map[entry:entry + 3], "big")
+        if location == 0:
+            return None
+
+        start = location * SECTOR_SIZE
+        if start + 5 > len(self._map):
+            return None
+        length, compression = struct.unpack(">IB", self._map[start:start + 5])
+        if compression & EXTERNAL:
+            external = self.path.parent / f"c.{cx}.{cz}.mcc"
+            try:
+                payload = external.read_bytes()
+            except OSError:
+                return None
+            compression &= ~EXTERNAL
+        else:
+            payload = self._map[start + 5:start + 4 + length]
+
+        try:
+            if compression == ZLIB:
+                return zlib.decompress(payload)
+            if compression == GZIP:
+                return gzip.decompress(payload)
+            if compression == UNCOMPRESSED:
+                return bytes(payload)
+        except (zlib.error, OSError, EOFError) as e:
+            logger.debug(f"Unreadable chunk {cx},{cz} in {self.path.name}: {e}")
+            return None
+        # LZ4 (region-file-compression=lz4) needs a library we do not ship
+        return None
+
+
+class RegionFileReader:
+    """
+    Answers block-state queries from the world's region files.
+
+    Usage:
+        reader.flush()  # once, before queries that must see recent builds
+        state = reader.block_state(x, y, z)  # None -> ask over RCON instead
+    """
+
+    def __init__(self, rcon, config: VibeCraftConfig):
+        self.rcon = rcon
+        self.config = config
+        self._lock = threading.Lock()
+        self._regions: Dict[Tuple[int, int], Optional[RegionFile]] = {}
+        # Chunks the files did not hold at the last flush
+        self._missing: Set[Tuple[int, int]] = set()
+
+    def region_dir(self) -> Optional[Path]:
+        """Overworld region folder, or None if reads are disabled or it is not mounted."""
+        if not self.config.enable_region_reads:
+            return None
+        region_dir = self.rcon.functions.world_dir() / "region"
+        return region_dir if region_dir.is_dir() else None
+
+    def available(self) -> bool:
+        return self.region_dir() is not None
+
+    def flush(self) -> bool:
+        """
+        Have the server write every loaded chunk to disk (``save-all flush``)
+        if VibeCraft wrote blocks since the last save or it is older than
+        ``chunk_cache_ttl``.
+
+        Returns:
+            Whether region reads are available
+        """
+        # Nothing to read unless the world folder is mounted here
+        if not self.config.enable_region_reads or not self.rcon.functions.world_dir().is_dir():
+            return False
+        cache = self.rcon.chunk_cache
+        if cache.needs_save():
+            mark = cache.begin_save()
+            try:
+                self.rcon.execute_command("save-all flush")
+            except Exception as e:
+                logger.warning(f"save-all flush failed ({e}); region files may be stale")
+            else:
+                cache.saved(mark)
+            self.close()
+        return self.available()
+
+    def block_state(self, x: int, y: int, z: int) -> Optional[str]:
+        """Block state at a position, or None if the region files cannot tell."""
+        chunk = self._chunk(x >> 4, z >> 4)
+        return chunk.block_state(x, y, z) if chunk is not None else None
+
+    def chunk(self, cx: int, cz: int) -> Optional[Chunk]:
+        """Decoded chunk (chunk coordinates), or None if the region files cannot tell."""
+        if self.region_dir() is None:
+            return None
+        return self._chunk(cx, cz)
+
+    def read_box(self, box: Box) -> Optional[BlockRegion]:
+        """
+        Block states of a whole box, or None if any chunk it touches cannot
+        be read from the files (or it is larger than MAX_READ_VOLUME).
+        """
+        x1, x2 = sorted((box.x1, box.x2))
+        y1, y2 = sorted((box.y1, box.y2))
+        z1, z2 = sorted((box.z1, box.z2))
+        shape = (x2 - x1 + 1, y2 - y1 + 1, z2 - z1 + 1)
+        if shape[0] * shape[1] * shape[2] > MAX_READ_VOLUME or self.region_dir() is None:
+            return None
+
+        palette: Dict[str, int] = {AIR: 0}
+        indices = np.zeros(shape, dtype=np.uint16)
+        for cx in range(x1 >> 4, (x2 >> 4) + 1):
+            for cz in range(z1 >> 4, (z2 >> 4) + 1):
+                chunk = self._chunk(cx, cz)
+                if chunk is None:
+                    logger.debug(f"Chunk {cx},{cz} is not in the region files; reading {box} block by block")
+                    return None
+                # Part of the box inside this chunk, in chunk-local coordinates
+                lx1, lx2 = max(x1, cx * 16) - cx * 16, min(x2, cx * 16 + 15) - cx * 16
+                lz1, lz2 = max(z1, cz * 16) - cz * 16, min(z2, cz * 16 + 15) - cz * 16
+                for sy in range(y1 >> 4, (y2 >> 4) + 1):
+                    section = chunk.sections.get(sy)
+                    if section is None:
+                        continue
+                    remap = np.array(
+                        [palette.setdefault(state, len(palette)) for state in section.palette],
+                        dtype=np.uint16,
+                    )
+                    ly1, ly2 = max(y1, sy * 16) - sy * 16, min(y2, sy * 16 + 15) - sy * 16
+                    # (y, z, x) -> (x, y, z)
+                    cells = section.indices().reshape(16, 16, 16).transpose(2, 0, 1)
+                    indices[
+                        cx * 16 + lx1 - x1:cx * 16 + lx2 - x1 + 1,
+                        sy * 16 + ly1 - y1:sy * 16 + ly2 - y1 + 1,
+                        cz * 16 + lz1 - z1:cz * 16 + lz2 - z1 + 1,
+                    ] = remap[cells[lx1:lx2 + 1, ly1:ly2 + 1, lz1:lz2 + 1]]
+        return BlockRegion((x1, y1, z1), list(palette), indices)
+
+    def close(self) -> None:
+        with self._lock:
+            for region in self._regions.values():
+                if region is not None:
+                    region.close()
+            self._regions.clear()
+            self._missing.clear()
+
+    def _chunk(self, cx: int, cz: int) -> Optional[Chunk]:
+        cache = self.rcon.chunk_cache
+        if cache.unsaved(cx, cz):
+            return None
+        chunk = cache.chunk(cx, cz)
+        if chunk is not None:
+            return chunk
+        with self._lock:
+            if (cx, cz) in self._missing:
+                return None
+            region = self._region(cx >> 5, cz >> 5)
+            data = region.chunk_bytes(cx, cz) if region is not None else None
+            if data is not None:
+                try:
+                    chunk = Chunk.from_nbt(nbtlib.File.parse(BytesIO(data)))
+                except Exception as e:
+                    logger.debug(f"Could not decode chunk {cx},{cz}: {e}")
+            if chunk is None:
+                self._missing.add((cx, cz))
+                return None
+        cache.put_chunk(cx, cz, chunk)
+        return chunk
+
+    def _region(self, rx: int, rz: int) -> Optional[RegionFile]:
+        if (rx, rz) not in self._regions:
+            region = None
+            region_dir = self.region_dir()
+            if region_dir is not None:
+                path = region_dir / f"r.{rx}.{rz}.mca"
+                try:
+                    region = RegionFile(path)
+                except OSError:
+                    region = None
+            self._regions[(rx, rz)] = region
+        return self._regions[(rx, rz)]
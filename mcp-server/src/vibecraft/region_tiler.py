@@ -0,0 +1,245 @@
+"""
+Region Tiling
+
+Vanilla ``fill`` refuses more than 32,768 blocks, and VibeCraft keeps a
+single WorldEdit operation under ``WORLDEDIT_TILE_VOLUME`` blocks. Larger
+regions are cut into chunk-aligned tiles that each fit, and the operation
+runs once per tile, in order:
+
+    - Block-by-block operations (``fill``, ``//set``, ``//replace``) get
+      disjoint tiles, cut into horizontal layers as well when a single chunk
+      column is over the limit.
+    - Column operations (``//overlay``, ``//smooth``, ``//deform``) keep the
+      region's full height in every tile. ``//smooth`` tiles overlap their
+      neighbours so each tile is smoothed with the terrain around it.
+
+``tile_commands`` applies this to a build's command list; the terrain
+generator tiles its selections with ``tile_region``.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from .build_plan import Fill, SelectionPoint, WorldEditCommand, parse_command
+from .command_compiler import FILL_LIMIT
+from .worldedit_session import SELECTION_COMMANDS, Box, Position, volume
+
+CHUNK_SIZE = 16
+
+# Largest selection one WorldEdit operation is run on
+WORLDEDIT_TILE_VOLUME = 100_000
+
+# Columns one //smooth iteration reads on either side of a block
+SMOOTH_MARGIN = 2
+
+# WorldEdit operations tiled in builds, and whether they work on whole columns
+_TILED_WORLDEDIT = {"set": False, "replace": False, "overlay": True, "smooth": True}
+
+_CHANGED_RE = re.compile(
+    r"([\d,]+) blocks? (?:have been |has been |were )?(?:changed|affected)", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class Tile:
+    """One piece of a tiled region."""
+
+    box: Box  # Selection the operation runs on (core plus overlap)
+    core: Box  # Part of the region this tile is responsible for
+
+
+def tile_region(box: Box, max_volume: int, columns: bool = False, overlap: int = 0) -> List[Tile]:
+    """
+    Cut ``box`` into chunk-aligned tiles of at most ``max_volume`` blocks.
+
+    Args:
+        box: Region (corners in any order)
+        max_volume: Largest tile selection, overlap included
+        columns: Keep the region's full height in every tile
+        overlap: Blocks each selection reaches into its neighbours
+            (horizontally, never past the region); reduced if it would not
+            leave room for a whole chunk
+
+    Returns:
+        Tiles bottom layer first, then by x and z. A region that fits is one tile.
+
+    Raises:
+        ValueError: ``columns`` is set and a single column is over ``max_volume``
+    """
+    x1, x2 = sorted((box.x1, box.x2))
+    y1, y2 = sorted((box.y1, box.y2))
+    z1, z2 = sorted((box.z1, box.z2))
+    region = Box(x1, y1, z1, x2, y2, z2)
+    if volume(region) <= max_volume:
+        return [Tile(region, region)]
+
+    height = y2 - y1 + 1
+    layer = height
+    if not columns and height * CHUNK_SIZE ** 2 > max_volume:
+        layer = max(1, max_volume // CHUNK_SIZE ** 2)
+    area = max_volume // layer
+    if area < 1:
+        raise ValueError(
+            f"Region is {height} blocks tall; a single column does not fit in {max_volume:,} blocks"
+        )
+
+    # Whole chunks on each side, as many as fit together with the overlap:
+    # first along x (no wider than the region), then along z
+    overlap = min(overlap, max(0, (math.isqrt(area) - CHUNK_SIZE) // 2))
+    aligned = (CHUNK_SIZE + 2 * overlap) ** 2 <= area
+    if aligned:
+        span = (x2 // CHUNK_SIZE - x1 // CHUNK_SIZE + 1) * CHUNK_SIZE
+        side_x = CHUNK_SIZE
+        while side_x < span and (side_x + CHUNK_SIZE + 2 * overlap) ** 2 <= area:
+            side_x += CHUNK_SIZE
+        side_z = CHUNK_SIZE
+        while (side_x + 2 * overlap) * (side_z + CHUNK_SIZE + 2 * overlap) <= area:
+            side_z += CHUNK_SIZE
+    else:
+        # Not even one chunk column fits: smaller, unaligned squares
+        side_x = side_z = math.isqrt(area)
+
+    def starts(low: int, high: int, side: int) -> range:
+        first = low - low % CHUNK_SIZE if aligned else low
+        return range(first, high + 1, side)
+
+    tiles = []
+    for ty in range(y1, y2 + 1, layer):
+        for tx in starts(x1, x2, side_x):
+            for tz in starts(z1, z2, side_z):
+                core = Box(
+                    max(tx, x1), ty, max(tz, z1),
+                    min(tx + side_x - 1, x2), min(ty + layer - 1, y2), min(tz + side_z - 1, z2),
+                )
+                selection = Box(
+                    max(core.x1 - overlap, x1), core.y1, max(core.z1 - overlap, z1),
+                    min(core.x2 + overlap, x2), core.y2, min(core.z2 + overlap, z2),
+                )
+                tiles.append(Tile(selection, core))
+    return tiles
+
+
+def summarize_responses(responses: Sequence[str]) -> str:
+    """One result line for an operation run over several tiles."""
+    counts = [_CHANGED_RE.search(response or "") for response in responses]
+    if responses and all(counts):
+        total = sum(int(match.group(1).replace(",", "")) for match in counts)
+        return f"{total:,} blocks changed across {len(responses)} tiles"
+    last = (responses[-1] or "").strip() if responses else ""
+    return f"Ran in {len(responses)} tiles; last response: {last}"
+
+
+def _shell(box: Box) -> List[Box]:
+    """Disjoint boxes covering the faces of ``box``."""
+    x1, y1, z1, x2, y2, z2 = box
+    if x2 - x1 < 2 or y2 - y1 < 2 or z2 - z1 < 2:
+        return [box]
+    return [
+        Box(x1, y1, z1, x2, y1, z2),
+        Box(x1, y2, z1, x2, y2, z2),
+        Box(x1, y1 + 1, z1, x1, y2 - 1, z2),
+        Box(x2, y1 + 1, z1, x2, y2 - 1, z2),
+        Box(x1 + 1, y1 + 1, z1, x2 - 1, y2 - 1, z1),
+        Box(x1 + 1, y1 + 1, z2, x2 - 1, y2 - 1, z2),
+    ]
+
+
+def _tile_fill(fill: Fill, limit: int) -> List[str]:
+    """Fills of at most ``limit`` blocks that together do what ``fill`` does."""
+    slash = "/" if fill.text.strip().startswith("/") else ""
+    block = f"{fill.block}{fill.nbt or ''}"
+
+    # outline/hollow only write the faces (and hollow clears the inside), so
+    # tiles must not each get faces of their own
+    if fill.mode in ("outline", "hollow"):
+        parts = [(part, block, "") for part in _shell(fill.box)]
+        x1, y1, z1, x2, y2, z2 = fill.box
+        if fill.mode == "hollow" and x2 - x1 >= 2 and y2 - y1 >= 2 and z2 - z1 >= 2:
+            parts.append((Box(x1 + 1, y1 + 1, z1 + 1, x2 - 1, y2 - 1, z2 - 1), "minecraft:air", ""))
+    elif fill.mode == "replace":
+        parts = [(fill.box, block, f" replace {fill.filter}" if fill.filter else "")]
+    else:
+        parts = [(fill.box, block, f" {fill.mode}")]
+
+    commands = []
+    for part, state, suffix in parts:
+        for tile in tile_region(part, limit):
+            x1, y1, z1, x2, y2, z2 = tile.box
+            commands.append(f"{slash}fill {x1} {y1} {z1} {x2} {y2} {z2} {state}{suffix}")
+    return commands
+
+
+def _smooth_iterations(args: str) -> int:
+    for token in args.split():
+        if token.isdigit():
+            return int(token)
+    return 1
+
+
+def _tile_worldedit(
+    operation: WorldEditCommand, corners: Tuple[Position, Position], limit: int
+) -> Optional[List[str]]:
+    """Per-tile ``//pos1``/``//pos2``/operation, then the original selection again."""
+    columns = _TILED_WORLDEDIT[operation.name]
+    overlap = SMOOTH_MARGIN * _smooth_iterations(operation.args) if operation.name == "smooth" else 0
+    try:
+        tiles = tile_region(Box(*corners[0], *corners[1]), limit, columns=columns, overlap=overlap)
+    except ValueError:
+        return None
+
+    commands = []
+    for tile in tiles:
+        commands.append(f"//pos1 {tile.box.x1},{tile.box.y1},{tile.box.z1}")
+        commands.append(f"//pos2 {tile.box.x2},{tile.box.y2},{tile.box.z2}")
+        commands.append(operation.text.strip())
+    commands.append("//pos1 {},{},{}".format(*corners[0]))
+    commands.append("//pos2 {},{},{}".format(*corners[1]))
+    return commands
+
+
+def tile_commands(
+    commands: Sequence[str],
+    fill_limit: int = FILL_LIMIT,
+    worldedit_limit: int = WORLDEDIT_TILE_VOLUME,
+) -> Tuple[List[str], int]:
+    """
+    Replace oversized fills and WorldEdit region operations with tiles.
+
+    WorldEdit operations are tiled only when the plan itself set the
+    selection with ``//pos1``/``//pos2``; the selection is restored after
+    the tiles, so later commands see it unchanged.
+
+    Returns:
+        (commands, number of commands that were tiled)
+    """
+    result: List[str] = []
+    tiled = 0
+    corners: List[Optional[Position]] = [None, None]
+
+    for command in commands:
+        operation = parse_command(command)
+        replacement = None
+
+        if isinstance(operation, SelectionPoint):
+            corners[operation.corner - 1] = operation.position
+        elif isinstance(operation, Fill) and volume(operation.box) > fill_limit:
+            replacement = _tile_fill(operation, fill_limit)
+        elif isinstance(operation, WorldEditCommand):
+            if operation.name in SELECTION_COMMANDS:
+                corners = [None, None]
+            elif (
+                operation.name in _TILED_WORLDEDIT
+                and None not in corners
+                and volume(Box(*corners[0], *corners[1])) > worldedit_limit
+            ):
+                replacement = _tile_worldedit(operation, (corners[0], corners[1]), worldedit_limit)
+
+        if replacement is None:
+            result.append(command)
+        else:
+            result.extend(replacement)
+            tiled += 1
+
+    return result, tiled
@@ -0,0 +1,423 @@
+"""
+Sponge Schematic Build Executor
+
+Compiles a build into a Sponge v3 ``.schem`` file, drops it into WorldEdit's
+schematics folder in the mounted server data directory and places it with
+
+    //clearclipboard
+    //schem load <name>
+    //paste -a -o
+
+so a build of any size costs a handful of RCON commands instead of one per
+block or fill. ``-a`` skips air (cells the build does not touch stay as
+they are) and ``-o`` pastes at the schematic's own origin, which is stored
+as the build's minimum corner. The file is removed after pasting.
+
+Builds qualify when they consist only of absolute-coordinate ``setblock``
+and ``fill`` commands (replace or outline mode) that place no air; anything
+else (WorldEdit commands, relative coordinates, keep/hollow/destroy modes,
+clearing blocks) falls back to the other execution paths (``run()`` returns
+None).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import nbtlib
+import numpy as np
+
+from .config import VibeCraftConfig
+from .paths import MINECRAFT_DATA_DIR
+from .worldedit_session import Box, Position
+
+logger = logging.getLogger(__name__)
+
+SCHEMATIC_VERSION = 3
+
+# Minecraft 1.21. WorldEdit runs older block data through the server's data
+# fixers, so one version works on every newer server.
+DATA_VERSION = 3953
+
+AIR = "minecraft:air"
+_AIR_BLOCKS = {AIR, "minecraft:cave_air", "minecraft:void_air"}
+
+_SETBLOCK_RE = re.compile(
+    r"^(?:minecraft:)?setblock\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+([^\s{]+)(\{.*\})?(?:\s+replace)?\s*$",
+    re.IGNORECASE,
+)
+_FILL_RE = re.compile(
+    r"^(?:minecraft:)?fill\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)\s+"
+    r"([^\s{]+)(\{.*\})?(?:\s+(replace|outline))?\s*$",
+    re.IGNORECASE,
+)
+
+Voxels = Dict[Position, str]
+BlockEntities = Dict[Position, str]
+
+
+def _namespaced(block: str) -> str:
+    block = block.strip()
+    if ":" not in block.split("[", 1)[0]:
+        block = f"minecraft:{block}"
+    return block
+
+
+def commands_to_voxels(commands: Sequence[str]) -> Optional[Tuple[Voxels, BlockEntities]]:
+    """
+    Evaluate setblock/fill commands into a voxel map.
+
+    Args:
+        commands: Vanilla commands without leading slash; "#" comments are ignored
+
+    Returns:
+        (block state per position, SNBT per block entity position), or None if
+        a command cannot be represented in a schematic pasted with -a
+    """
+    voxels: Voxels = {}
+    entities: BlockEntities = {}
+
+    def place(position: Position, block: str, nbt: Optional[str]) -> bool:
+        if block.split("[", 1)[0] in _AIR_BLOCKS:
+            return False
+        voxels[position] = block
+        if nbt:
+            entities[position] = nbt
+        else:
+            entities.pop(position, None)
+        return True
+
+    for command in commands:
+        command = command.strip()
+        if not command or command.startswith("#"):
+            continue
+
+        match = _SETBLOCK_RE.match(command)
+        if match:
+            x, y, z, block, nbt = match.groups()
+            if not place((int(x), int(y), int(z)), _namespaced(block), nbt):
+                return None
+            continue
+
+        match = _FILL_RE.match(command)
+        if not match:
+            return None
+        coords = [int(value) for value in match.groups()[:6]]
+        block, nbt, mode = _namespaced(match.group(7)), match.group(8), (match.group(9) or "").lower()
+        x1, x2 = sorted((coords[0], coords[3]))
+        y1, y2 = sorted((coords[1], coords[4]))
+        z1, z2 = sorted((coords[2], coords[5]))
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                for z in range(z1, z2 + 1):
+                    if mode == "outline" and x not in (x1, x2) and y not in (y1, y2) and z not in (z1, z2):
+                        continue
+                    if not place((x, y, z), block, nbt):
+                        return None
+
+    return voxels, entities
+
+
+def _varints(values: np.ndarray) -> bytes:
+    """Encode palette indices as the unsigned LEB128 varints Sponge uses."""
+    if values.size == 0 or int(values.max()) < 0x80:
+        return values.astype(np.uint8).tobytes()
+    out = bytearray()
+    for value in values.tolist():
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: bytes, count: int) -> np.ndarray:
+    """Decode ``count`` Sponge varints (the common one-byte case without a Python loop)."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == count and not (raw & 0x80).any():
+        return raw.astype(np.int64)
+    values = np.empty(count, dtype=np.int64)
+    index = value = shift = 0
+    for byte in raw.tolist():
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values[index] = value
+        index += 1
+        value = shift = 0
+    if index != count:
+        raise ValueError(f"Schematic block data holds {index} blocks, expected {count}")
+    return values
+
+
+def read_schematic(path: Path) -> Tuple[Tuple[int, int, int], List[str], np.ndarray]:
+    """
+    Read the blocks of a Sponge v3 schematic.
+
+    Returns:
+        ((width, height, length), palette states by index, palette index per
+        block in Sponge order: x fastest, then z, then y)
+
+    Raises:
+        ValueError: If the file is not a Sponge v3 schematic
+    """
+    root = nbtlib.load(path)
+    schematic = root.get("Schematic", root)
+    try:
+        size = (int(schematic["Width"]), int(schematic["Height"]), int(schematic["Length"]))
+        blocks = schematic["Blocks"]
+        palette_tag = blocks["Palette"]
+        data = blocks["Data"]
+    except KeyError as e:
+        raise ValueError(f"Not a Sponge v3 schematic (missing {e})")
+    palette = [AIR] * (max((int(index) for index in palette_tag.values()), default=-1) + 1)
+    for state, index in palette_tag.items():
+        palette[int(index)] = state
+    return size, palette, _decode_varints(np.asarray(data, dtype=np.int8).tobytes(), size[0] * size[1] * size[2])
+
+
+def build_schematic(voxels: Voxels, block_entities: Optional[BlockEntities] = None) -> nbtlib.File:
+    """
+    Build a Sponge v3 schematic from a non-empty voxel map.
+
+    The WorldEdit origin is the build's minimum corner and the offset is zero,
+    so ``//paste -o`` puts every block back at its absolute position.
+
+    Raises:
+        ValueError: If the map is empty, too large, or block entity data is not valid SNBT
+    """
+    if not voxels:
+        raise ValueError("Cannot build a schematic without blocks")
+    block_entities = block_entities or {}
+
+    xs, ys, zs = zip(*voxels)
+    min_x, min_y, min_z = min(xs), min(ys), min(zs)
+    width = max(xs) - min_x + 1
+    height = max(ys) - min_y + 1
+    length = max(zs) - min_z + 1
+    if max(width, height, length) > 0xFFFF:
+        raise ValueError(f"Build too large for a schematic ({width}x{height}x{length})")
+
+    palette: Dict[str, int] = {AIR: 0}
+    indices = np.zeros(width * height * length, dtype=np.int64)
+    for (x, y, z), state in voxels.items():
+        index = palette.setdefault(state, len(palette))
+        indices[(x - min_x) + (z - min_z) * width + (y - min_y) * width * length] = index
+
+    entities = nbtlib.List[nbtlib.Compound]()
+    for (x, y, z), snbt in block_entities.items():
+        try:
+            data = nbtlib.parse_nbt(snbt)
+        except Exception as e:
+            raise ValueError(f"Invalid block entity data at {x} {y} {z}: {e}")
+        entities.append(nbtlib.Compound({
+            "Pos": nbtlib.IntArray([x - min_x, y - min_y, z - min_z]),
+            "Id": nbtlib.String(voxels[(x, y, z)].split("[", 1)[0]),
+            "Data": data,
+        }))
+
+    data = np.frombuffer(_varints(indices), dtype=np.int8)
+    schematic = nbtlib.Compound({
+        "Version": nbtlib.Int(SCHEMATIC_VERSION),
+        "DataVersion": nbtlib.Int(DATA_VERSION),
+        "Width": nbtlib.Short(width),
+        "Height": nbtlib.Short(height),
+        "Length": nbtlib.Short(length),
+        "Offset": nbtlib.IntArray([0, 0, 0]),
+        "Metadata": nbtlib.Compound({
+            "WorldEdit": nbtlib.Compound({
+                "Origin": nbtlib.IntArray([min_x, min_y, min_z]),
+            }),
+        }),
+        "Blocks": nbtlib.Compound({
+            "Palette": nbtlib.Compound({state: nbtlib.Int(i) for state, i in palette.items()}),
+            "Data": nbtlib.ByteArray(data),
+            "BlockEntities": entities,
+        }),
+    })
+    return nbtlib.File({"Schematic": schematic}, gzipped=True)
+
+
+class SchematicBuildExecutor:
+    """
+    Places vanilla command builds as one WorldEdit schematic paste.
+
+    Usage:
+        response = await executor.run(["fill 0 64 0 10 64 10 stone", ...])
+        if response is None:
+            ...  # not applicable - use datapack functions or RCON instead
+    """
+
+    def __init__(self, rcon, config: VibeCraftConfig):
+        self.rcon = rcon
+        self.config = config
+        self.data_dir = (
+            Path(config.minecraft_data_dir) if config.minecraft_data_dir else MINECRAFT_DATA_DIR
+        )
+        # Set once WorldEdit could not load a schematic we wrote (e.g. the
+        # folder is not the one the server reads); later builds skip this path.
+        self._disabled = False
+        # Same for reading regions back (//copy or //schem save failed)
+        self._read_disabled = False
+
+    def schematic_dir(self) -> Optional[Path]:
+        """WorldEdit's schematics folder, or None if it is missing or not writable."""
+        folder = self.data_dir / "plugins" / "WorldEdit" / "schematics"
+        if not folder.is_dir() or not os.access(folder, os.W_OK):
+            return None
+        return folder
+
+    def enabled(self) -> bool:
+        return (
+            self.config.enable_schematic_builds
+            and not self._disabled
+            and self.schematic_dir() is not None
+        )
+
+    async def run(self, commands: Sequence[str]) -> Optional[str]:
+        """
+        Place a build given as vanilla commands (without leading slash).
+
+        Returns:
+            The paste response, or None if the build was not placed and must
+            be executed another way
+        """
+        if not self.enabled() or any(command.strip().startswith("/") for command in commands):
+            return None
+        parsed = commands_to_voxels(commands)
+        if parsed is None:
+            return None
+        voxels, block_entities = parsed
+        if len(voxels) < self.config.schematic_min_blocks:
+            return None
+        return await self.run_voxels(voxels, block_entities)
+
+    async def run_voxels(
+        self, voxels: Voxels, block_entities: Optional[BlockEntities] = None
+    ) -> Optional[str]:
+        """Place a voxel map (absolute positions -> namespaced block states)."""
+        if not self.enabled() or not voxels:
+            return None
+
+        folder = self.schematic_dir()
+        name = f"vibecraft_{uuid.uuid4().hex[:12]}"
+        path = folder / f"{name}.schem"
+        try:
+            schematic = build_schematic(voxels, block_entities)
+            await asyncio.to_thread(schematic.save, path)
+        except (OSError, ValueError) as e:
+            logger.info(f"Could not write schematic ({e}); using commands")
+            return None
+
+        try:
+            async with self.rcon.worldedit_session_async():
+                await self.rcon.ensure_worldedit_world()
+                # The load finishes asynchronously; an empty clipboard until
+                # then keeps an earlier one (e.g. a read_region() //copy)
+                # from being pasted in its place.
+                await self.rcon.execute("/clearclipboard")
+                response = await self.rcon.execute(f"/schem load {name}")
+                if _load_failed(response):
+                    logger.warning(
+                        f"WorldEdit could not load schematics from {folder} ({response.strip()}); "
+                        f"falling back to commands for builds"
+                    )
+                    self._disabled = True
+                    return None
+                # The schematic is pasted at its original position (-o)
+                xs, ys, zs = zip(*voxels)
+                self.rcon.chunk_cache.load_clipboard(Box(min(xs), min(ys), min(zs), max(xs), max(ys), max(zs)))
+                return await self._paste_when_loaded()
+        finally:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    async def read_region(self, box: Box) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Read the blocks in ``box`` by copying it into a schematic file
+        (``//copy``, ``//schem save``) and decoding that.
+
+        Returns:
+            (palette states, palette index per block in Sponge order - x
+            fastest, then z, then y - from the box's minimum corner), or None
+            if the region could not be read this way
+        """
+        folder = self.schematic_dir()
+        if folder is None or self._read_disabled:
+            return None
+        x1, x2 = sorted((box.x1, box.x2))
+        y1, y2 = sorted((box.y1, box.y2))
+        z1, z2 = sorted((box.z1, box.z2))
+        name = f"vibecraft_{uuid.uuid4().hex[:12]}"
+        path = folder / f"{name}.schem"
+
+        try:
+            async with self.rcon.worldedit_session_async():
+                await self.rcon.ensure_worldedit_world()
+                await self.rcon.execute(f"/pos1 {x1},{y1},{z1}")
+                await self.rcon.execute(f"/pos2 {x2},{y2},{z2}")
+                response = await self.rcon.execute("/copy")
+                if "copied" not in response.lower():
+                    # The console has no position of its own to copy relative to
+                    await self.rcon.execute("/placement pos1")
+                    response = await self.rcon.execute("/copy")
+                if "copied" in response.lower():
+                    response = await self.rcon.execute(f"/schem save {name}")
+                if "saved" not in response.lower():
+                    logger.warning(f"WorldEdit could not save a region ({response.strip()}); reading blocks with probes")
+                    self._read_disabled = True
+                    return None
+
+            # //schem save writes the file asynchronously
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.config.rcon_timeout
+            expected = (x2 - x1 + 1, y2 - y1 + 1, z2 - z1 + 1)
+            while True:
+                try:
+                    size, palette, indices = await asyncio.to_thread(read_schematic, path)
+                    break
+                except (OSError, ValueError, EOFError) as e:
+                    if loop.time() >= deadline:
+                        logger.warning(f"Could not read saved region {path.name}: {e}")
+                        return None
+                    await asyncio.sleep(0.1)
+            if size != expected:
+                logger.warning(f"Saved region is {size}, expected {expected}")
+                return None
+            return palette, indices
+        finally:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    async def _paste_when_loaded(self) -> Optional[str]:
+        """
+        Paste the clipboard, retrying while ``//schem load`` (which runs
+        asynchronously in WorldEdit) has not filled it yet.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.rcon_timeout
+        while True:
+            response = await self.rcon.execute("/paste -a -o")
+            if "clipboard is empty" not in response.lower():
+                return response
+            if loop.time() >= deadline:
+                logger.warning("WorldEdit did not finish loading the build schematic; using commands")
+                return None
+            await asyncio.sleep(0.1)
+
+
+def _load_failed(response: str) -> bool:
+    lowered = response.lower()
+    return any(
+        phrase in lowered
+        for phrase in ("does not exist", "doesn't exist", "unknown", "error", "not found")
+    )
@@ -29,6 +29,7 @@ from .resources import (
 )
 from .paths import CONTEXT_DIR
 from .tools import TOOL_REGISTRY
+from . import progress
 
 # Logger will be initialized in setup_logging()
 logger = logging.getLogger("vibecraft")
@@ -296,8 +297,17 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
         if handler is None:
             return [TextContent(type="text", text=f"❌ Unknown tool: {name}")]
         
-        # Call handler with standard parameters
-        return await handler(arguments, rcon, config, logger)
+        # Long-running tools report progress when the client asked for it
+        context = app.request_context
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return await handler(arguments, rcon, config, logger)
+
+        reset = progress.bind(context.session, token, context.request_id)
+        try:
+            return await handler(arguments, rcon, config, logger)
+        finally:
+            progress.unbind(reset)
 
 
     except Exception as e:
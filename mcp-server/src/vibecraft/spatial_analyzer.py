@@ -15,11 +15,21 @@ Strategies:
 
 import logging
 import re
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from collections import Counter
 
+from .progress import ProgressReporter
+from .worldedit_session import Box
+
 logger = logging.getLogger(__name__)
 
+# Blocks of the ##stone_bricks and ##glass masks the pattern detection used
+# to //count; the other families are exactly the blocks with their suffix
+STONE_BRICK_BLOCKS = frozenset({
+    'stone_bricks', 'mossy_stone_bricks', 'cracked_stone_bricks', 'chiseled_stone_bricks',
+})
+GLASS_BLOCKS = frozenset({'glass', 'glass_pane'})
+
 
 class SpatialAnalyzerV2:
     """
@@ -70,10 +80,13 @@ class SpatialAnalyzerV2:
             'version': 2
         }
 
+        stages = ProgressReporter(6, unit="steps")
+
         # ALWAYS do these (fast and essential):
 
         # 1. Horizontal slice scanning (floor/ceiling detection)
         logger.info("Step 1/6: Scanning horizontal slices...")
+        stages.stage(1, "Scanning horizontal slices")
         floor_y, ceiling_y, slices = self._scan_horizontal_slices(
             center_x, center_y, center_z, radius
         )
@@ -83,6 +96,7 @@ class SpatialAnalyzerV2:
 
         # 2. Volumetric voxel grid (3D density map)
         logger.info("Step 2/6: Building voxel grid...")
+        stages.stage(2, "Building voxel grid")
         voxels = self._scan_volumetric_grid(center_x, center_y, center_z, radius)
         # Convert tuple keys to strings for JSON serialization
         voxels_serializable = {f"{k[0]},{k[1]},{k[2]}": v for k, v in voxels.items()}
@@ -92,6 +106,7 @@ class SpatialAnalyzerV2:
         if detail_level in ["medium", "high"]:
             # 3. Cardinal ray-casting (clearance detection)
             logger.info("Step 3/6: Ray-casting clearance...")
+            stages.stage(3, "Ray-casting clearance")
             rays = self._raycast_clearance(center_x, center_y, center_z, max_distance=radius)
             result['clearance'] = rays
             result['blocked_directions'] = [d for d, r in rays.items() if r.get('blocked_at')]
@@ -99,11 +114,13 @@ class SpatialAnalyzerV2:
         if detail_level == "high":
             # 4. Material palette detection (style matching)
             logger.info("Step 4/6: Detecting material palette...")
+            stages.stage(4, "Detecting material palette")
             palette = self._detect_material_palette(center_x, center_y, center_z, radius=10)
             result['material_palette'] = palette
 
             # 5. Structure pattern detection (shape recognition)
             logger.info("Step 5/6: Analyzing structure patterns...")
+            stages.stage(5, "Analyzing structure patterns")
             patterns = self._detect_structure_patterns(
                 center_x - radius, center_y - radius, center_z - radius,
                 center_x + radius, center_y + radius, center_z + radius
@@ -112,6 +129,7 @@ class SpatialAnalyzerV2:
 
         # 6. Generate recommendations
         logger.info("Step 6/6: Generating recommendations...")
+        stages.stage(6, "Generating recommendations")
         result['recommendations'] = self._generate_recommendations(result)
 
         # Add human-readable summary
@@ -155,12 +173,9 @@ class SpatialAnalyzerV2:
 
                     # Get composition for this voxel (3 commands)
                     try:
-                        self.rcon.send_command(f"//pos1 {x1},{y1},{z1}")
-                        self.rcon.send_command(f"//pos2 {x2},{y2},{z2}")
-                        result = self.rcon.send_command("//distr")
-
                         # Parse top blocks in this voxel
-                        voxel_data = self._parse_distr(result)
+                        with self.rcon.selection(Box(x1, y1, z1, x2, y2, z2)):
+                            voxel_data = self._parse_distr(self.rcon.stream_command("/distr"))
                         voxels[(vx, vy, vz)] = voxel_data
                     except Exception as e:
                         logger.debug(f"Failed to scan voxel ({vx},{vy},{vz}): {e}")
@@ -168,12 +183,15 @@ class SpatialAnalyzerV2:
 
         return voxels
 
-    def _parse_distr(self, result: str) -> Dict[str, Any]:
+    def _parse_distr(self, result: Union[str, Iterable[str]]) -> Dict[str, Any]:
         """
         Parse WorldEdit //distr output.
 
         Format: "X.X% blockname (count blocks)"
 
+        Accepts the whole response text or its lines as streamed by
+        ``RCONManager.stream_command``.
+
         Returns:
             {
                 'blocks': {'stone': 50, 'dirt': 30, 'air': 20},
@@ -187,7 +205,8 @@ class SpatialAnalyzerV2:
         if not result:
             return {'blocks': {}, 'total': 0, 'top_block': 'air'}
 
-        for line in str(result).split('\n'):
+        lines = result.split('\n') if isinstance(result, str) else result
+        for line in lines:
             match = re.search(r'([\d.]+)%\s+([a-z_:]+)\s+\((\d+)', line, re.IGNORECASE)
             if match:
                 percentage = float(match.group(1))
@@ -476,18 +495,14 @@ class SpatialAnalyzerV2:
         """
         try:
             # Scan larger area around center
-            self.rcon.send_command(
-                f"//pos1 {center_x-radius},{center_y-radius},{center_z-radius}"
-            )
-            self.rcon.send_command(
-                f"//pos2 {center_x+radius},{center_y+radius},{center_z+radius}"
+            area = Box(
+                center_x - radius, center_y - radius, center_z - radius,
+                center_x + radius, center_y + radius, center_z + radius,
             )
 
-            # Get full distribution
-            result = self.rcon.send_command("//distr")
-
-            # Parse and extract building materials
-            parsed = self._parse_distr(result)
+            # Get full distribution (streamed: large areas span many packets)
+            with self.rcon.selection(area):
+                parsed = self._parse_distr(self.rcon.stream_command("/distr"))
             blocks = parsed.get('blocks', {})
 
             # Extract building materials (exclude terrain blocks)
@@ -598,51 +613,41 @@ class SpatialAnalyzerV2:
             }
         """
         try:
-            # Set selection once
-            self.rcon.send_command(f"//pos1 {min_x},{min_y},{min_z}")
-            self.rcon.send_command(f"//pos2 {max_x},{max_y},{max_z}")
+            # ONE //distr for the whole region; every feature count below is
+            # derived from it instead of issuing a //count per block family.
+            # The response is streamed, so large regions lose no rows.
+            with self.rcon.selection(Box(min_x, min_y, min_z, max_x, max_y, max_z)):
+                blocks = self._parse_distr(self.rcon.stream_command("/distr")).get('blocks', {})
 
             patterns = {}
 
-            # Check for various structure types with ONE //count each
             checks = {
-                'stairs': '##stairs',
-                'slabs': '##slabs',
-                'glass': '##glass',
-                'doors': '##doors',
-                'wool': '##wool',
-                'planks': '##planks',
-                'stone': '##stone_bricks',
-                'fences': '##fences'
+                'stairs': lambda b: b.endswith('_stairs'),
+                'slabs': lambda b: b.endswith('_slab'),
+                'glass': lambda b: b in GLASS_BLOCKS,
+                'doors': lambda b: b.endswith('_door') and not b.endswith('trapdoor'),
+                'wool': lambda b: b.endswith('_wool'),
+                'planks': lambda b: b.endswith('_planks'),
+                'stone': lambda b: b in STONE_BRICK_BLOCKS,
+                'fences': lambda b: b.endswith('_fence'),
             }
 
-            for name, mask in checks.items():
-                try:
-                    result = self.rcon.send_command(f"//count {mask}")
-                    count = self._parse_count(result)
-                    patterns[f'has_{name}'] = count > 0
-                    patterns[f'{name}_count'] = count
-                except:
-                    patterns[f'has_{name}'] = False
-                    patterns[f'{name}_count'] = 0
+            for name, matches in checks.items():
+                count = sum(n for block, n in blocks.items() if matches(block))
+                patterns[f'has_{name}'] = count > 0
+                patterns[f'{name}_count'] = count
 
             # Classify structure type
             structure_type = self._classify_structure(patterns)
             patterns['structure_type'] = structure_type
 
             # Detect if hollow (building) vs solid (wall/foundation)
-            try:
-                air_result = self.rcon.send_command("//count air")
-                air_count = self._parse_count(air_result)
-
-                volume = (max_x - min_x + 1) * (max_y - min_y + 1) * (max_z - min_z + 1)
-                air_ratio = air_count / volume if volume > 0 else 0
+            air_count = blocks.get('air', 0)
+            volume = (max_x - min_x + 1) * (max_y - min_y + 1) * (max_z - min_z + 1)
+            air_ratio = air_count / volume if volume > 0 else 0
 
-                patterns['is_hollow'] = air_ratio > 0.3  # >30% air = hollow
-                patterns['air_ratio'] = round(air_ratio, 2)
-            except:
-                patterns['is_hollow'] = False
-                patterns['air_ratio'] = 0.0
+            patterns['is_hollow'] = air_ratio > 0.3  # >30% air = hollow
+            patterns['air_ratio'] = round(air_ratio, 2)
 
             # Calculate complexity based on block variety
             complexity = self._calculate_complexity(patterns)
@@ -3,17 +3,29 @@ Terrain Analyzer Module - OPTIMIZED for speed
 
 Analyzes Minecraft terrain regions using efficient WorldEdit bulk commands:
 - ONE //distr call for entire region (not per-block!)
-- Vertical slice sampling for elevation
+- Server-side heightmap probes for elevation (execute positioned over)
 - //count commands for hazard detection
 - Runs in seconds, not minutes
+
+When the world's region files are mounted, the region is read from them in
+one go instead (see region_files.py) and all three steps are array scans;
+elevation comes straight from the chunks' heightmaps (see heightmaps.py).
 """
 
 import re
 import math
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Tuple, Optional, Any
 from collections import Counter, defaultdict
 
+import numpy as np
+
+from .block_utils import block_from_state, block_is_air, sync_world
+from .heightmaps import UNKNOWN, WORLD_SURFACE
+from .progress import ProgressReporter
+from .region_files import BlockRegion
+from .worldedit_session import Box
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,15 +106,40 @@ class TerrainAnalyzer:
         logger.info(f"Fast analyzing region: ({min_x},{min_y},{min_z}) to ({max_x},{max_y},{max_z})")
         logger.info(f"Dimensions: {width}×{height}×{depth} = {total_blocks:,} blocks")
 
+        stages = ProgressReporter(4, unit="steps")
+
+        # Read the whole region from the world's region files when they are
+        # mounted; otherwise each step below asks WorldEdit
+        sync_world(self.rcon)
+        region = self.rcon.region_files.read_box(Box(min_x, min_y, min_z, max_x, max_y, max_z))
+        block_counts = self._count_blocks(region) if region is not None else None
+
         # STEP 1: Get overall block composition with ONE //distr command
         logger.info("Step 1/4: Getting overall block composition...")
-        composition = self._get_bulk_composition(min_x, min_y, min_z, max_x, max_y, max_z)
+        stages.stage(1, "Getting overall block composition")
+        if block_counts is not None:
+            composition = self._summarize_composition(
+                {
+                    block: {'count': count, 'percentage': count / total_blocks * 100}
+                    for block, count in block_counts.items()
+                },
+                total_blocks,
+            )
+        else:
+            composition = self._get_bulk_composition(min_x, min_y, min_z, max_x, max_y, max_z)
 
         # STEP 2: Sample elevation efficiently
         logger.info("Step 2/4: Sampling elevation...")
-        elevation_samples = self._sample_elevation_fast(
-            min_x, min_z, max_x, max_z, min_y, max_y, resolution, max_samples
+        stages.stage(2, "Sampling elevation")
+        elevation_samples = self._sample_elevation_heightmap(
+            min_x, min_z, max_x, max_z, min_y, max_y, resolution, max_samples, region
         )
+        if elevation_samples is None and region is not None:
+            elevation_samples = self._sample_elevation_local(region, resolution, max_samples)
+        elif elevation_samples is None:
+            elevation_samples = self._sample_elevation_heightmap(
+                min_x, min_z, max_x, max_z, min_y, max_y, resolution, max_samples, probe=True
+            )
 
         if not elevation_samples:
             return {
@@ -116,11 +153,15 @@ class TerrainAnalyzer:
 
         # STEP 3: Analyze elevation statistics
         logger.info("Step 3/4: Analyzing elevation...")
+        stages.stage(3, "Analyzing elevation")
         elevation_stats = self._analyze_elevation(elevation_samples, min_x, max_x, min_z, max_z)
 
         # STEP 4: Detect hazards and opportunities
         logger.info("Step 4/4: Detecting hazards and opportunities...")
-        hazards = self._detect_hazards_fast(min_x, min_y, min_z, max_x, max_y, max_z, composition, elevation_stats)
+        stages.stage(4, "Detecting hazards and opportunities")
+        hazards = self._detect_hazards_fast(
+            min_x, min_y, min_z, max_x, max_y, max_z, composition, elevation_stats, block_counts
+        )
         opportunities = self._detect_opportunities(composition, elevation_stats, width, depth)
 
         # Generate summary
@@ -158,84 +199,90 @@ class TerrainAnalyzer:
         This is the key optimization - one command instead of hundreds.
         """
         try:
-            # Set selection
-            self.rcon.send_command(f"//pos1 {min_x},{min_y},{min_z}")
-            self.rcon.send_command(f"//pos2 {max_x},{max_y},{max_z}")
-
-            # Get distribution (ONE command for entire region!)
-            result = self.rcon.send_command("//distr")
-
-            if not result:
-                return self._empty_composition()
-
             # Parse WorldEdit distribution output
             # Format: "X.X% blockname (count blocks)"
             block_data = {}
             total_blocks = 0
 
-            for line in str(result).split('\n'):
-                match = re.search(r'([\d.]+)%\s+([a-z_:]+)\s+\((\d+)', line, re.IGNORECASE)
-                if match:
-                    percentage = float(match.group(1))
-                    block_name = match.group(2)
-                    count = int(match.group(3))
-
-                    # Remove minecraft: prefix
-                    if ':' in block_name:
-                        block_name = block_name.split(':', 1)[1]
-
-                    block_data[block_name] = {
-                        'count': count,
-                        'percentage': percentage
-                    }
-                    total_blocks += count
-
-            if not block_data:
-                return self._empty_composition()
-
-            # Categorize blocks
-            liquids = sum(data['count'] for block, data in block_data.items() if block in self.LIQUID_BLOCKS)
-            vegetation = sum(data['count'] for block, data in block_data.items() if block in self.VEGETATION_BLOCKS)
-            natural_surface = sum(data['count'] for block, data in block_data.items() if block in self.NATURAL_SURFACE_BLOCKS)
-            air_count = block_data.get('air', {}).get('count', 0)
-
-            # Top 10 blocks
-            sorted_blocks = sorted(block_data.items(), key=lambda x: x[1]['count'], reverse=True)
-            top_blocks = [
-                {
-                    'block': block,
-                    'count': data['count'],
-                    'percentage': round(data['percentage'], 2)
-                }
-                for block, data in sorted_blocks[:10]
-            ]
+            with self.rcon.selection(Box(min_x, min_y, min_z, max_x, max_y, max_z)):
+                # Get distribution (ONE command for entire region!). Streamed line
+                # by line: big regions span several 4096-char RCON packets.
+                for line in self.rcon.stream_command("/distr"):
+                    match = re.search(r'([\d.]+)%\s+([a-z_:]+)\s+\((\d+)', line, re.IGNORECASE)
+                    if match:
+                        percentage = float(match.group(1))
+                        block_name = match.group(2)
+                        count = int(match.group(3))
 
-            return {
-                'total_blocks': total_blocks,
-                'unique_blocks': len(block_data),
-                'top_blocks': top_blocks,
-                'liquids': {
-                    'count': liquids,
-                    'percentage': round(liquids / total_blocks * 100, 2) if total_blocks > 0 else 0
-                },
-                'vegetation': {
-                    'count': vegetation,
-                    'percentage': round(vegetation / total_blocks * 100, 2) if total_blocks > 0 else 0
-                },
-                'natural_surface': {
-                    'count': natural_surface,
-                    'percentage': round(natural_surface / total_blocks * 100, 2) if total_blocks > 0 else 0
-                },
-                'air_cavities': {
-                    'count': air_count,
-                    'percentage': round(air_count / total_blocks * 100, 2) if total_blocks > 0 else 0
-                }
-            }
+                        # Remove minecraft: prefix
+                        if ':' in block_name:
+                            block_name = block_name.split(':', 1)[1]
+
+                        block_data[block_name] = {
+                            'count': count,
+                            'percentage': percentage
+                        }
+                        total_blocks += count
+
+            return self._summarize_composition(block_data, total_blocks)
 
         except Exception as e:
             logger.error(f"Failed to get bulk composition: {e}")
             return self._empty_composition()
 
+    def _summarize_composition(self, block_data: Dict[str, Dict[str, Any]], total_blocks: int) -> Dict[str, Any]:
+        """Categorize a block distribution ({block: {'count', 'percentage'}})."""
+        if not block_data:
+            return self._empty_composition()
+
+        # Categorize blocks
+        liquids = sum(data['count'] for block, data in block_data.items() if block in self.LIQUID_BLOCKS)
+        vegetation = sum(data['count'] for block, data in block_data.items() if block in self.VEGETATION_BLOCKS)
+        natural_surface = sum(data['count'] for block, data in block_data.items() if block in self.NATURAL_SURFACE_BLOCKS)
+        air_count = block_data.get('air', {}).get('count', 0)
+
+        # Top 10 blocks
+        sorted_blocks = sorted(block_data.items(), key=lambda x: x[1]['count'], reverse=True)
+        top_blocks = [
+            {
+                'block': block,
+                'count': data['count'],
+                'percentage': round(data['percentage'], 2)
+            }
+            for block, data in sorted_blocks[:10]
+        ]
+
+        return {
+            'total_blocks': total_blocks,
+            'unique_blocks': len(block_data),
+            'top_blocks': top_blocks,
+            'liquids': {
+                'count': liquids,
+                'percentage': round(liquids / total_blocks * 100, 2) if total_blocks > 0 else 0
+            },
+            'vegetation': {
+                'count': vegetation,
+                'percentage': round(vegetation / total_blocks * 100, 2) if total_blocks > 0 else 0
+            },
+            'natural_surface': {
+                'count': natural_surface,
+                'percentage': round(natural_surface / total_blocks * 100, 2) if total_blocks > 0 else 0
+            },
+            'air_cavities': {
+                'count': air_count,
+                'percentage': round(air_count / total_blocks * 100, 2) if total_blocks > 0 else 0
+            }
+        }
+
+    def _count_blocks(self, region: BlockRegion) -> Dict[str, int]:
+        """Blocks of each type in a region read from the region files."""
+        counts = np.bincount(region.indices.ravel(), minlength=len(region.palette))
+        block_counts: Counter = Counter()
+        for state, count in zip(region.palette, counts.tolist()):
+            if count:
+                block_counts[block_from_state(state)['id']] += count
+        return dict(block_counts)
+
     def _empty_composition(self) -> Dict[str, Any]:
         """Return empty composition structure."""
         return {
@@ -248,160 +295,84 @@ class TerrainAnalyzer:
             'air_cavities': {'count': 0, 'percentage': 0}
         }
 
-    def _sample_elevation_fast(
+    def _sample_elevation_heightmap(
         self,
         min_x: int, min_z: int,
         max_x: int, max_z: int,
         min_y: int, max_y: int,
         resolution: int,
-        max_samples: int
-    ) -> List[Tuple[int, int, int]]:
+        max_samples: int,
+        region: Optional[BlockRegion] = None,
+        probe: bool = False
+    ) -> Optional[List[Tuple[int, int, int]]]:
         """
-        Sample elevation using vertical slices (MUCH faster than per-block queries).
+        Sample elevation from the chunks' WORLD_SURFACE heightmaps.
 
-        Strategy:
-        - Sample at grid points (every Nth X,Z position)
-        - Use vertical slices to find surface quickly
-        - Returns list of (x, y, z) tuples
+        With ``probe``, columns the region files do not hold are asked from
+        the server (see HeightmapService.probe()); otherwise None is returned
+        when the heightmaps do not cover the whole area. Columns whose
+        surface lies above the region are searched below its top in
+        ``region`` when it was read, and skipped otherwise.
         """
-        samples = []
-        samples_taken = 0
-
-        # Calculate step size
         step = max(1, resolution)
-
-        for x in range(min_x, max_x + 1, step):
-            for z in range(min_z, max_z + 1, step):
-                if samples_taken >= max_samples:
-                    logger.warning(f"Hit max samples limit ({max_samples})")
-                    return samples
-
-                # Find surface Y at this X,Z using vertical slice
-                surface_y = self._find_surface_slice(x, z, min_y, max_y)
-
-                if surface_y is not None:
-                    samples.append((x, surface_y, z))
-                    samples_taken += 1
-
-        logger.info(f"Sampled {len(samples)} elevation points")
-        return samples
-
-    def _find_surface_slice(self, x: int, z: int, min_y: int, max_y: int) -> Optional[int]:
-        """
-        Find surface Y at X,Z using vertical slice (faster than individual block queries).
-
-        Uses WorldEdit to scan a 1-block wide vertical slice.
-        """
-        try:
-            # Define vertical slice (1 block wide, full height)
-            self.rcon.send_command(f"//pos1 {x},{min_y},{z}")
-            self.rcon.send_command(f"//pos2 {x},{max_y},{z}")
-
-            # Get distribution of this vertical slice
-            result = self.rcon.send_command("//distr")
-
-            if not result:
-                return None
-
-            # Parse to find highest non-air block
-            block_heights = {}
-            for line in str(result).split('\n'):
-                match = re.search(r'([\d.]+)%\s+([a-z_:]+)', line, re.IGNORECASE)
-                if match:
-                    block_name = match.group(2)
-                    if ':' in block_name:
-                        block_name = block_name.split(':', 1)[1]
-
-                    # Skip air blocks
-                    if block_name != 'air':
-                        # This tells us the block exists, but not exact Y
-                        # We'll estimate based on distribution
-                        block_heights[block_name] = True
-
-            # If we found any non-air blocks, estimate surface
-            # Since we can't get exact Y from //distr, use a binary search approach
-            if block_heights:
-                return self._binary_search_surface(x, z, min_y, max_y)
-
-            return None
-
-        except Exception as e:
-            logger.debug(f"Failed to find surface at {x},{z}: {e}")
+        heightmap = self.rcon.heightmaps.surface(
+            min_x, min_z, max_x, max_z, kind=WORLD_SURFACE, step=step,
+            fallback=probe, max_probes=max_samples
+        )
+        if heightmap is None or (not probe and (heightmap.heights == UNKNOWN).any()):
             return None
 
-    def _binary_search_surface(self, x: int, z: int, min_y: int, max_y: int) -> Optional[int]:
-        """
-        Use binary search to find surface Y efficiently.
-
-        Much faster than checking every Y level.
-        Uses WorldEdit //count instead of execute commands (works from RCON console).
-        """
-        # Start from top, work down with binary search
-        low = min_y
-        high = max_y
-        surface_y = None
-
-        # Binary search for approximate surface
-        while high - low > 5:
-            mid = (low + high) // 2
-
-            # Check if this Y level has a solid block using WorldEdit
-            try:
-                # Set selection to single block at this Y level
-                self.rcon.send_command(f"//pos1 {x},{mid},{z}")
-                self.rcon.send_command(f"//pos2 {x},{mid},{z}")
-
-                # Count non-air blocks (will be 0 if air, 1 if solid)
-                result = self.rcon.send_command("//count !air")
-
-                # Parse count
-                count = 0
-                if result:
-                    match = re.search(r'(\d+)\s+block', str(result), re.IGNORECASE)
-                    if match:
-                        count = int(match.group(1))
-
-                if count == 0:
-                    # Air found, surface is below
-                    high = mid
-                else:
-                    # Solid block found, surface is at or above
-                    low = mid
-                    surface_y = mid
-
-            except Exception as e:
-                logger.debug(f"Binary search failed at Y={mid}: {e}")
+        covered = region.lookup(lambda state: not block_is_air(block_from_state(state))) if region is not None else None
+        samples = []
+        for x, y, z in heightmap.columns(min_y):
+            if len(samples) >= max_samples:
+                logger.warning(f"Hit max samples limit ({max_samples})")
                 break
-
-        # Refine with linear search in final range (only ~5 blocks)
-        if surface_y is not None:
-            for y in range(min(high, surface_y + 5), max(low, surface_y - 5) - 1, -1):
-                try:
-                    # Check single block
-                    self.rcon.send_command(f"//pos1 {x},{y},{z}")
-                    self.rcon.send_command(f"//pos2 {x},{y},{z}")
-                    result = self.rcon.send_command("//count !air")
-
-                    count = 0
-                    if result:
-                        match = re.search(r'(\d+)\s+block', str(result), re.IGNORECASE)
-                        if match:
-                            count = int(match.group(1))
-
-                    if count > 0:
-                        return y
-                except Exception as e:
-                    logger.debug(f"Linear search failed at Y={y}: {e}")
+            if y > max_y:
+                if covered is not None:
+                    ox, oy, oz = region.origin
+                    solid = np.nonzero(covered[region.indices[x - ox, :, z - oz]])[0]
+                    y = oy + int(solid[-1]) if len(solid) else None
+                else:
+                    # A heightmap cannot tell the highest block below a Y
+                    y = None
+                if y is None:
                     continue
+            samples.append((x, y, z))
 
-        return surface_y if surface_y else None
+        logger.info(f"Sampled {len(samples)} elevation points from {heightmap.source}")
+        return samples
+
+    def _sample_elevation_local(
+        self, region: BlockRegion, resolution: int, max_samples: int
+    ) -> List[Tuple[int, int, int]]:
+        """Highest non-air block of every sampled column in a region read from the region files."""
+        step = max(1, resolution)
+        air = region.lookup(lambda state: block_is_air(block_from_state(state)))
+        solid = ~air[region.indices[::step, :, ::step]]
+        height = solid.shape[1]
+        # First solid block from the top of each column
+        surface = height - 1 - np.argmax(solid[:, ::-1, :], axis=1)
+
+        ox, oy, oz = region.origin
+        columns = list(zip(*np.nonzero(solid.any(axis=1))))
+        if len(columns) > max_samples:
+            logger.warning(f"Hit max samples limit ({max_samples})")
+            columns = columns[:max_samples]
+        samples = [
+            (ox + int(i) * step, oy + int(surface[i, k]), oz + int(k) * step)
+            for i, k in columns
+        ]
+        logger.info(f"Sampled {len(samples)} elevation points from region files")
+        return samples
 
     def _detect_hazards_fast(
         self,
         min_x: int, min_y: int, min_z: int,
         max_x: int, max_y: int, max_z: int,
         composition: Dict[str, Any],
-        elevation_stats: Dict[str, Any]
+        elevation_stats: Dict[str, Any],
+        block_counts: Optional[Dict[str, int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Detect hazards using WorldEdit //count commands (FAST!).
@@ -410,33 +381,26 @@ class TerrainAnalyzer:
         """
         hazards = []
 
-        # Set selection once
-        self.rcon.send_command(f"//pos1 {min_x},{min_y},{min_z}")
-        self.rcon.send_command(f"//pos2 {max_x},{max_y},{max_z}")
-
         total_blocks = composition.get('total_blocks', 1)
 
-        # Check for each hazard type using //count (very fast!)
-        for block, description in self.HAZARD_BLOCKS.items():
-            try:
-                result = self.rcon.send_command(f"//count {block}")
+        # Check for each hazard type using //count (very fast!), unless the
+        # region's blocks were already counted
+        if block_counts is None:
+            block_counts = self._count_with_worldedit(
+                min_x, min_y, min_z, max_x, max_y, max_z, self.HAZARD_BLOCKS
+            )
 
-                if result:
-                    # Parse count from result (format: "X blocks counted")
-                    match = re.search(r'(\d+)\s+block', str(result), re.IGNORECASE)
-                    if match:
-                        count = int(match.group(1))
-                        if count > 0:
-                            percentage = round(count / total_blocks * 100, 2)
-                            hazards.append({
-                                'type': description,
-                                'severity': 'high' if percentage > 5 else 'medium' if percentage > 1 else 'low',
-                                'count': count,
-                                'percentage': percentage,
-                                'recommendation': f'Exercise caution - {description} present'
-                            })
-            except Exception as e:
-                logger.debug(f"Failed to count {block}: {e}")
+        for block, description in self.HAZARD_BLOCKS.items():
+            count = block_counts.get(block, 0)
+            if count > 0:
+                percentage = round(count / total_blocks * 100, 2)
+                hazards.append({
+                    'type': description,
+                    'severity': 'high' if percentage > 5 else 'medium' if percentage > 1 else 'low',
+                    'count': count,
+                    'percentage': percentage,
+                    'recommendation': f'Exercise caution - {description} present'
+                })
 
         # Check for water bodies from composition
         water_pct = composition.get('liquids', {}).get('percentage', 0)
@@ -469,6 +433,29 @@ class TerrainAnalyzer:
 
         return hazards
 
+    def _count_with_worldedit(
+        self,
+        min_x: int, min_y: int, min_z: int,
+        max_x: int, max_y: int, max_z: int,
+        blocks: Iterable[str]
+    ) -> Dict[str, int]:
+        """One //count per block type over the region."""
+        counts = {}
+        # The selection is only re-sent if elevation sampling moved it.
+        with self.rcon.selection(Box(min_x, min_y, min_z, max_x, max_y, max_z)):
+            for block in blocks:
+                try:
+                    result = self.rcon.send_command(f"//count {block}")
+
+                    if result:
+                        # Parse count from result (format: "X blocks counted")
+                        match = re.search(r'(\d+)\s+block', str(result), re.IGNORECASE)
+                        if match:
+                            counts[block] = int(match.group(1))
+                except Exception as e:
+                    logger.debug(f"Failed to count {block}: {e}")
+        return counts
+
     def _analyze_elevation(
         self,
         samples: List[Tuple[int, int, int]],
@@ -15,7 +15,11 @@ Key capabilities:
 import logging
 import math
 from typing import Dict, Any, Optional, List, Tuple
+from .heightmaps import MOTION_BLOCKING_NO_LEAVES
+from .progress import ProgressReporter
 from .rcon_manager import RCONManager
+from .region_tiler import SMOOTH_MARGIN, WORLDEDIT_TILE_VOLUME, summarize_responses, tile_region
+from .worldedit_session import Box, volume
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +35,12 @@ class TerrainGenerator:
 
         # Safety limits
         self.MAX_AMPLITUDE = 50  # Max vertical displacement
-        self.MAX_REGION_SIZE = 100000  # Max blocks in selection
+        self.MAX_REGION_SIZE = WORLDEDIT_TILE_VOLUME  # Max blocks per selection; larger regions are tiled
         self.DEFAULT_SMOOTH_ITERATIONS = 2
 
+        # Region of the last set_selection(), when it had to be tiled
+        self.region: Optional[Box] = None
+
     # =========================================================================
     # LOW-LEVEL PRIMITIVES (Direct WorldEdit Command Wrappers)
     # =========================================================================
@@ -46,41 +53,89 @@ class TerrainGenerator:
             min_y, max_y = min(y1, y2), max(y1, y2)
             min_z, max_z = min(z1, z2), max(z1, z2)
 
-            # Validate region size
-            volume = (max_x - min_x + 1) * (max_y - min_y + 1) * (max_z - min_z + 1)
-            if volume > self.MAX_REGION_SIZE:
-                return {
-                    "success": False,
-                    "error": f"Region too large ({volume:,} blocks). Max: {self.MAX_REGION_SIZE:,}"
-                }
-
-            # Set positions
-            result1 = self.rcon.send_command(f"//pos1 {min_x},{min_y},{min_z}")
-            result2 = self.rcon.send_command(f"//pos2 {max_x},{max_y},{max_z}")
-
-            return {
+            region = Box(min_x, min_y, min_z, max_x, max_y, max_z)
+            region_volume = volume(region)
+
+            # Oversized regions are selected tile by tile by each operation
+            if region_volume > self.MAX_REGION_SIZE:
+                try:
+                    tiles = tile_region(region, self.MAX_REGION_SIZE, columns=True)
+                except ValueError as e:
+                    return {"success": False, "error": str(e)}
+                self.region = region
+                tile_count = len(tiles)
+                output = f"Region of {region_volume:,} blocks will be processed in {tile_count} tiles"
+            else:
+                self.region = None
+                result1 = self.rcon.send_command(f"//pos1 {min_x},{min_y},{min_z}")
+                result2 = self.rcon.send_command(f"//pos2 {max_x},{max_y},{max_z}")
+                output = f"{result1}\n{result2}"
+                tile_count = 1
+
+            result = {
                 "success": True,
                 "region": {
                     "min": [min_x, min_y, min_z],
                     "max": [max_x, max_y, max_z],
-                    "volume": volume
+                    "volume": region_volume,
+                    "tiles": tile_count
                 },
-                "output": f"{result1}\n{result2}"
+                "output": output
             }
 
+            # Deformations only show where the selection holds the ground
+            surface = self.surface_profile(min_x, min_z, max_x, max_z)
+            if surface is not None:
+                result["surface"] = surface
+                if surface["max_y"] < min_y or surface["min_y"] > max_y:
+                    result["warning"] = (
+                        f"The ground here is at Y {surface['min_y']}..{surface['max_y']}, outside the "
+                        f"selection's Y {min_y}..{max_y}; the operation may change nothing visible"
+                    )
+            return result
+
         except Exception as e:
             logger.error(f"Error setting selection: {e}")
             return {"success": False, "error": str(e)}
 
+    def surface_profile(self, x1: int, z1: int, x2: int, z2: int) -> Optional[Dict[str, Any]]:
+        """
+        Lowest, highest and mean ground Y of a rectangle from the chunks'
+        heightmaps (leaves ignored), or None if the region files are not
+        available. Costs no WorldEdit commands.
+        """
+        heightmap = self.rcon.heightmaps.surface(x1, z1, x2, z2, kind=MOTION_BLOCKING_NO_LEAVES, fallback=False)
+        return heightmap.stats() if heightmap is not None else None
+
+    def _run(self, command: str, columns: bool = True, overlap: int = 0) -> str:
+        """
+        Run a WorldEdit operation on the selection; over a tiled region, once
+        per tile (see region_tiler) with the results added up.
+        """
+        if self.region is None:
+            return self.rcon.send_command(command)
+
+        tiles = tile_region(self.region, self.MAX_REGION_SIZE, columns=columns, overlap=overlap)
+        reporter = ProgressReporter(len(tiles), unit="tiles")
+        responses = []
+        for done, tile in enumerate(tiles, 1):
+            self.rcon.send_command(f"//pos1 {tile.box.x1},{tile.box.y1},{tile.box.z1}")
+            self.rcon.send_command(f"//pos2 {tile.box.x2},{tile.box.y2},{tile.box.z2}")
+            responses.append(self.rcon.send_command(command))
+            reporter.update(done, command.split()[0])
+        return summarize_responses(responses)
+
     def deform(self, expression: str, timeout: int = 120) -> Dict[str, Any]:
         """
         Apply a deformation expression to the selected region.
 
-        Expression modifies x, y, z coordinates using math and noise functions.
+        Expression modifies x, y, z coordinates using math and noise functions,
+        in raw world coordinates (-r) whether or not the region is tiled, so
+        scales are in blocks and the result does not depend on the selection.
         Example: "y = y + perlin(42, x/18, 0, z/18, 1.2, 4, 0.55) * 6"
         """
         try:
-            result = self.rcon.send_command(f"//deform {expression}")
+            result = self._run(f"//deform -r {expression}")
 
             return {
                 "success": True,
@@ -98,14 +153,15 @@ class TerrainGenerator:
         Generate blocks using an expression.
 
         Pattern: Block type(s) to place (e.g., "stone", "70%stone,30%andesite")
-        Expression: Math expression defining shape (e.g., "y < 64 + perlin(...) * 10")
+        Expression: Math expression defining shape, in raw world coordinates
+            like deform() (e.g., "y < 64 + perlin(1, x/20, 0, z/20, 1, 3, 0.5) * 10")
         """
         try:
-            cmd = f"//generate {pattern} {expression}"
-            if hollow:
-                cmd += " -h"
+            # Flags go first: the expression takes the rest of the line
+            flags = "-h -r" if hollow else "-r"
+            cmd = f"//generate {flags} {pattern} {expression}"
 
-            result = self.rcon.send_command(cmd)
+            result = self._run(cmd, columns=False)
 
             return {
                 "success": True,
@@ -132,7 +188,8 @@ class TerrainGenerator:
             if mask:
                 self.rcon.send_command(f"//gmask {mask}")
 
-            result = self.rcon.send_command(f"//smooth {iterations}")
+            # Overlapping tiles give every tile's edge the terrain next to it
+            result = self._run(f"//smooth {iterations}", overlap=SMOOTH_MARGIN * iterations)
 
             if mask:
                 self.rcon.send_command("//gmask")  # Clear mask
@@ -148,6 +205,25 @@ class TerrainGenerator:
             logger.error(f"Error smoothing terrain: {e}")
             return {"success": False, "error": str(e)}
 
+    def smooth_region(
+        self,
+        x1: int, y1: int, z1: int,
+        x2: int, y2: int, z2: int,
+        iterations: int = 2,
+        mask: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Select a region and smooth it (see smooth()). Run it holding the
+        WorldEdit session, so no other selection lands in between.
+        """
+        select_result = self.set_selection(x1, y1, z1, x2, y2, z2)
+        if not select_result["success"]:
+            return select_result
+        result = self.smooth(iterations, mask)
+        if result["success"]:
+            result["region"] = select_result["region"]
+        return result
+
     def overlay(self, pattern: str) -> Dict[str, Any]:
         """
         Overlay a pattern on top of the surface in the selected region.
@@ -155,7 +231,7 @@ class TerrainGenerator:
         Pattern: Block type(s) to place on top (e.g., "grass_block", "85%grass_block,10%moss_block,5%coarse_dirt")
         """
         try:
-            result = self.rcon.send_command(f"//overlay {pattern}")
+            result = self._run(f"//overlay {pattern}")
 
             return {
                 "success": True,
@@ -180,7 +256,7 @@ class TerrainGenerator:
             if mask:
                 self.rcon.send_command(f"//gmask {mask}")
 
-            result = self.rcon.send_command(f"//replace {from_pattern} {to_pattern}")
+            result = self._run(f"//replace {from_pattern} {to_pattern}", columns=False)
 
             if mask:
                 self.rcon.send_command("//gmask")  # Clear mask
@@ -568,7 +644,7 @@ class TerrainGenerator:
 
         # Step 2: Replace base material (below surface)
         # Use mask to only affect blocks below Y threshold
-        base_result = self.rcon.send_command(f"//replace stone,dirt,grass_block {recipe['base']}")
+        base_result = self._run(f"//replace stone,dirt,grass_block {recipe['base']}", columns=False)
         steps.append(("Base Material", {"output": base_result}))
 
         # Step 3: Overlay surface pattern
@@ -758,6 +758,7 @@ Returns:
 - Current time
 - Server difficulty
 - WorldEdit version (if detected)
+- Chunk cache hit/miss statistics
 
 Useful for checking server status before executing commands.
 """,
@@ -865,7 +866,8 @@ Useful for:
 - Calculating structure height above terrain
 - Smart building placement on uneven terrain
 
-Uses raycast from Y=320 (build limit) down to bedrock to find first solid block.
+Reads the chunk's heightmap from the world's region files (leaves and plants are ignored,
+water counts); columns that were never saved are asked from the server's own heightmap.
 
 Returns: Surface Y-coordinate and block type at that location.
 """,
@@ -995,6 +997,11 @@ The tool reports a placement summary and highlights any command failures so you
                         "type": "boolean",
                         "description": "Return commands without executing",
                         "default": False
+                    },
+                    "diff": {
+                        "type": "boolean",
+                        "description": "Read the target area first and only place blocks that differ",
+                        "default": False
                     }
                 },
                 "required": ["furniture_id", "origin_x", "origin_y", "origin_z"]
@@ -1461,7 +1468,8 @@ Creates natural-looking landscapes with pre-tested recipes for hills, mountains,
 
 **Process**:
 1. Sets WorldEdit selection
-2. Applies noise-based deformation
+2. Applies noise-based deformation in world coordinates (`//deform -r`), so `scale` is in blocks
+   and a region gets the same terrain whether or not it is processed in tiles
 3. Smooths terrain for natural appearance
 4. Returns summary with parameters used
 
@@ -1744,6 +1752,11 @@ to inspect the generated commands before modifying the world.
                         "type": "boolean",
                         "description": "Return commands instead of executing",
                         "default": False
+                    },
+                    "diff": {
+                        "type": "boolean",
+                        "description": "Read the target area first and only place blocks that differ",
+                        "default": False
                     }
                 },
                 "required": ["pattern_id", "origin_x", "origin_y", "origin_z"]
@@ -2515,10 +2528,75 @@ WHEN TO USE BUILD VS SPECIALIZED TOOLS
                         "description": "If True, return commands without executing",
                         "default": False,
                     },
+                    "async": {
+                        "type": "boolean",
+                        "description": "If True, run in the background and return a job id at once (see build_status/build_cancel)",
+                        "default": False,
+                    },
+                    "diff": {
+                        "type": "boolean",
+                        "description": "If True, read the target region first and only send blocks that differ (for re-running or touching up a build)",
+                        "default": False,
+                    },
                 },
                 "required": [],  # Either commands OR code required
             },
         ),
+        Tool(
+            name="resume_build",
+            description="""Continue a build that was interrupted (e.g. the RCON connection dropped).
+
+Every build sent over RCON is journaled with a job id (shown as "Job: ..." in the build output).
+If a build stops early, call resume_build with that job id: it sends only the commands the server
+has not acknowledged yet, in the same order. Call without job_id to list interrupted builds.
+""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job id from the interrupted build's output (omit to list interrupted builds)",
+                    },
+                },
+                "required": [],
+            },
+        ),
+        Tool(
+            name="build_status",
+            description="""Show the progress of a background build started with build(async=true).
+
+Reports status (queued, running, completed, interrupted, cancelled, failed), commands done out of
+the total, and the full build result once it has finished. Call without job_id to list recent jobs.
+""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job id returned by build(async=true) (omit to list recent jobs)",
+                    },
+                },
+                "required": [],
+            },
+        ),
+        Tool(
+            name="build_cancel",
+            description="""Stop a queued or running background build.
+
+Blocks already placed stay in the world. The build's journal keeps the remaining commands, so
+resume_build can continue it later.
+""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job id returned by build(async=true)",
+                    },
+                },
+                "required": ["job_id"],
+            },
+        ),
     ]
     
     return schemas
@@ -104,6 +104,9 @@ TOOL_REGISTRY["building_template"] = core_tools.handle_building_template
 
 # Register build tool
 TOOL_REGISTRY["build"] = build_tools.handle_build
+TOOL_REGISTRY["resume_build"] = build_tools.handle_resume_build
+TOOL_REGISTRY["build_status"] = build_tools.handle_build_status
+TOOL_REGISTRY["build_cancel"] = build_tools.handle_build_cancel
 
 # Register generic WorldEdit tools (20 tools via wrapper)
 # Each WorldEdit tool uses the generic handler with its tool_name
@@ -5,13 +5,32 @@ Handles direct Minecraft command execution for building structures.
 Supports both direct command lists and code-generated commands.
 """
 
-from typing import Dict, Any, List
+import asyncio
+import time
+import uuid
+from contextlib import aclosing, nullcontext
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 from mcp.types import TextContent
 import logging
 from ..code_sandbox import execute_command_generator, CodeSandboxError
+from ..build_diff import diff_commands
+from ..build_plan import optimize_commands, strip_command_slash
+from ..build_journal import COMPLETED, BuildJournal, BuildJournalError, journal_dir
+from ..build_jobs import FINISHED, INTERRUPTED, BuildJob
+from ..chunk_scheduler import BuildSegment, ForceloadWindow, build_chunks, order_by_chunk, plan_segments
+from ..cost_model import COMMANDS, PASTE, place_by_cheapest
+from ..parallel_dispatch import dispatch_partitions, partition_commands
+from ..progress import ProgressReporter, detach
+from ..region_tiler import tile_commands
 
 logger = logging.getLogger(__name__)
 
+# Job ids with a build streaming in this process
+_active_jobs: Set[str] = set()
+
+# Called with (commands done, command errors) as a build streams
+ProgressCallback = Callable[[int, int], None]
+
 
 async def handle_build(
     arguments: Dict[str, Any],
@@ -110,7 +129,49 @@ async def handle_build(
                 text=f"❌ Error: command at index {i} must start with '/' or '//'\n\nGot: {cmd}\nExpected: /{cmd} or //{cmd}"
             )]
 
+    # Fills over the vanilla limit and oversized WorldEdit operations run as
+    # chunk-aligned tiles
+    notes: List[str] = []
+    commands, tiled = tile_commands(commands)
+    if tiled:
+        notes.append(f"Split {tiled} oversized region command(s) into tiles ({len(commands)} commands)")
+        logger_instance.info(notes[-1])
+
+    # Drop overwritten and redundant writes, merge setblock runs into /fill
+    # cuboids; the world ends up the same. Large plans take a while, so this
+    # runs on a worker thread.
+    if config.enable_command_compiler:
+        commands, report = await asyncio.to_thread(optimize_commands, commands)
+        if report.summary():
+            notes.append(report.summary())
+            logger_instance.info(report.summary())
+
+    # Diff mode: only send blocks that differ from what is already there
+    if arguments.get("diff"):
+        commands, diff_report = await diff_commands(rcon, commands)
+        notes.append(diff_report.summary())
+        if not commands:
+            return [TextContent(
+                type="text",
+                text=f"✅ {description}: every block is already in place, nothing to send.\n\n"
+                     f"⚡ {diff_report.summary()}",
+            )]
     command_count = len(commands)
+
+    # Builds spanning many chunks run chunk by chunk, with the chunks around
+    # the one being built force-loaded
+    segments = None
+    if config.enable_chunk_scheduling:
+        chunk_count = len(build_chunks(commands))
+        if chunk_count >= config.chunk_schedule_min_chunks:
+            commands = order_by_chunk(commands, config.chunk_group_size)
+            segments = plan_segments(commands, config.chunk_group_size)
+            schedule_note = (
+                f"Scheduled by chunk: {chunk_count} chunks in {len(segments)} segments"
+            )
+            notes.append(schedule_note)
+            logger_instance.info(schedule_note)
+
     logger_instance.info(f"Processing build: {description} ({command_count} commands)")
 
     # Preview mode - return commands without executing
@@ -121,6 +182,9 @@ async def handle_build(
             f"**Commands:** {command_count}",
             "",
         ]
+        result_lines[-1:-1] = [f"⚡ {note}" for note in notes]
+        estimate = await rcon.cost_model.estimate(commands)
+        result_lines.extend(estimate.lines() + [""])
 
         # Show all commands if 20 or less
         if command_count <= 20:
@@ -139,8 +203,75 @@ async def handle_build(
 
         return [TextContent(type="text", text="\n".join(result_lines))]
 
-    # Execute commands
+    # Background mode: journal up front (its id is the job id) and return
+    if arguments.get("async"):
+        journal = None
+        try:
+            journal = BuildJournal.create(
+                journal_dir(config), commands, description,
+                config.chunk_group_size if segments is not None else None,
+            )
+            job_id = journal.job_id
+        except OSError as e:
+            logger_instance.warning(f"Could not create build journal: {e}")
+            job_id = uuid.uuid4().hex[:12]
+
+        async def run(job: BuildJob) -> str:
+            # Progress goes to build_status, not the tool call that queued it
+            detach()
+
+            def on_progress(done: int, errors: int) -> None:
+                rcon.jobs.progress(job, done, errors)
+
+            result = await _execute_build(
+                commands, segments, notes, description, rcon, config, logger_instance,
+                journal=journal, on_progress=on_progress,
+            )
+            if journal is not None and journal.status != COMPLETED:
+                job.status = INTERRUPTED
+            return result[0].text
+
+        job = rcon.jobs.submit(job_id, description, command_count, run)
+        lines = [
+            f"🏗️ Build queued: {description}",
+            f"Job: {job.job_id}",
+            "",
+            f"Commands: {command_count}",
+        ]
+        lines.extend(f"⚡ {note}" for note in notes)
+        lines.extend([
+            "",
+            f"💡 Check progress with build_status(job_id=\"{job.job_id}\"), "
+            f"stop it with build_cancel(job_id=\"{job.job_id}\").",
+        ])
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    return await _execute_build(
+        commands, segments, notes, description, rcon, config, logger_instance
+    )
+
+
+async def _execute_build(
+    commands: List[str],
+    segments: Optional[List[BuildSegment]],
+    notes: List[str],
+    description: str,
+    rcon,
+    config,
+    logger_instance,
+    journal: Optional[BuildJournal] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[TextContent]:
+    """
+    Run an optimized (and possibly chunk-scheduled) build.
+
+    ``journal`` is created here when the build is streamed over RCON, unless
+    the caller already made one (background jobs need the id up front).
+    """
+    command_count = len(commands)
     logger_instance.info(f"Executing {command_count} commands...")
+    if on_progress is None:
+        on_progress = _report_progress(command_count)
 
     result_lines = [
         f"🏗️ Building: {description}",
@@ -149,36 +280,457 @@ async def handle_build(
         "",
         "Progress:",
     ]
+    result_lines[3:3] = [f"⚡ {note}" for note in notes]
 
-    errors = []
-    commands_executed = 0
+    stripped_commands = [strip_command_slash(cmd) for cmd in commands]
 
-    for i, cmd in enumerate(commands):
+    # Large vanilla-only builds can be pasted as one WorldEdit schematic or
+    # run as one datapack function (a single server tick). The cost model
+    # ranks those against plain commands; run() returns None when a strategy
+    # turns out not to apply and the next one is tried.
+    estimate = await rcon.cost_model.estimate(commands)
+    if len(estimate.estimates) > 1:
+        result_lines.insert(3, f"⚡ Strategy: {estimate.summary()}")
+    placed = await _place_by_cheapest(rcon, stripped_commands, estimate, segments, logger_instance)
+    if placed is not None:
+        choice, response = placed
+        logger_instance.info(f"Build placed by {choice.label}: {response}")
+        how = "schematic paste" if choice.strategy == PASTE else "datapack function, one server tick"
+        result_lines.append(f"  [{command_count}/{command_count}] 100.0% ({how})")
+        # A function reports how many of its commands failed
+        errors = [line for line in response.splitlines() if line.endswith("failed or changed nothing")]
+        _complete_journal(journal, command_count, logger_instance)
+        if on_progress is not None:
+            on_progress(command_count, len(errors))
+        return _build_result(
+            result_lines, description, command_count, errors, None, command_count, logger_instance
+        )
+
+    # Everything else is streamed over RCON and journaled, so an interrupted
+    # build can be continued with resume_build
+    if journal is None:
         try:
-            # Execute command via RCON
-            result = rcon.send_command(cmd)
+            journal = BuildJournal.create(
+                journal_dir(config), commands, description,
+                config.chunk_group_size if segments is not None else None,
+            )
+        except OSError as e:
+            logger_instance.warning(f"Could not create build journal: {e}")
+    if journal is not None:
+        result_lines.insert(1, f"Job: {journal.job_id}")
 
-            # Check for errors in result
-            if result and any(err_word in result.lower() for err_word in ["error", "unknown", "incorrect", "invalid", "cannot"]):
-                errors.append(f"Command {i+1} failed: {cmd}\nResult: {result}")
-                logger_instance.warning(f"Command error: {cmd} -> {result}")
+    started = time.monotonic()
+    errors, interrupted, done = await _stream_build(
+        commands, segments, 0, rcon, config, logger_instance, journal, result_lines, on_progress
+    )
+    if not errors and interrupted is None:
+        rcon.cost_model.observe(estimate.get(COMMANDS), time.monotonic() - started)
+    return _build_result(
+        result_lines, description, command_count, errors, interrupted, done, logger_instance, journal
+    )
 
-            commands_executed += 1
 
-            # Update progress every 50 commands or on last command
-            if (i + 1) % 50 == 0 or (i + 1) == command_count:
-                progress_pct = (commands_executed / command_count) * 100
-                result_lines.append(
-                    f"  [{commands_executed}/{command_count}] {progress_pct:.1f}%"
-                )
+async def _place_by_cheapest(
+    rcon,
+    stripped_commands: List[str],
+    estimate,
+    segments: Optional[List[BuildSegment]],
+    logger_instance,
+):
+    """
+    place_by_cheapest(), with every chunk of a chunk-scheduled build
+    force-loaded while a function or schematic writes them all at once.
+    """
+    if segments is None or estimate.estimates[0].strategy == COMMANDS:
+        return await place_by_cheapest(rcon, stripped_commands, estimate)
 
+    chunks = frozenset().union(*(segment.chunks for segment in segments))
+    window = ForceloadWindow(rcon, [BuildSegment(0, len(stripped_commands), chunks)], radius=0)
+    try:
+        try:
+            await window.enter(0)
         except Exception as e:
-            logger_instance.error(f"Error executing command {i+1}: {e}", exc_info=True)
-            errors.append(f"Command {i+1}: {cmd}\nError: {str(e)}")
+            logger_instance.warning(f"Could not force-load chunks for the build: {e}")
+        return await place_by_cheapest(rcon, stripped_commands, estimate)
+    finally:
+        try:
+            await window.close()
+        except Exception as e:
+            logger_instance.warning(f"Could not release force-loaded chunks: {e}")
+
+
+def _complete_journal(journal: Optional[BuildJournal], command_count: int, logger_instance) -> None:
+    if journal is None:
+        return
+    try:
+        journal.complete(command_count)
+    except OSError as e:
+        logger_instance.warning(f"Could not update build journal: {e}")
 
-    # Final result
+
+async def handle_resume_build(
+    arguments: Dict[str, Any],
+    rcon,
+    config,
+    logger_instance
+) -> List[TextContent]:
+    """
+    Handle resume_build tool.
+
+    Continues an interrupted build from its journal checkpoint.
+
+    Args:
+        arguments: Tool arguments containing job_id
+        rcon: RCON manager instance
+        config: Server configuration
+        logger_instance: Logger instance
+
+    Returns:
+        List of TextContent with execution results
+    """
+    directory = journal_dir(config)
+    job_id = str(arguments.get("job_id") or "").strip()
+
+    if not job_id:
+        resumable = [
+            journal for journal in BuildJournal.list_jobs(directory)
+            if journal.status != COMPLETED and not _is_active(journal.job_id, rcon)
+        ]
+        if not resumable:
+            return [TextContent(type="text", text="No interrupted builds to resume.")]
+        lines = ["Interrupted builds (pass job_id to resume one):", ""]
+        for journal in resumable[:10]:
+            lines.append(
+                f"- `{journal.job_id}` {journal.description}: "
+                f"{journal.acknowledged}/{len(journal.commands)} commands done"
+            )
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    try:
+        journal = BuildJournal.load(directory, job_id)
+    except BuildJournalError as e:
+        return [TextContent(type="text", text=f"❌ Cannot resume build: {e}")]
+
+    if _is_active(job_id, rcon):
+        return [TextContent(type="text", text=f"❌ Build {job_id} is still running.")]
+    if journal.status == COMPLETED:
+        return [TextContent(type="text", text=f"✅ Build {job_id} already completed; nothing to resume.")]
+
+    commands = journal.commands
+    command_count = len(commands)
+    start = journal.acknowledged
+    segments = (
+        plan_segments(commands, journal.chunk_group_size)
+        if journal.chunk_group_size else None
+    )
+    journal.resume()
+    logger_instance.info(f"Resuming build {job_id} at command {start + 1}/{command_count}")
+
+    result_lines = [
+        f"🏗️ Resuming: {journal.description}",
+        f"Job: {job_id}",
+        "",
+        f"Commands: {command_count} ({start} already done)",
+        "",
+        "Progress:",
+    ]
+    errors, interrupted, done = await _stream_build(
+        commands, segments, start, rcon, config, logger_instance, journal, result_lines,
+        _report_progress(command_count, start),
+    )
+    return _build_result(
+        result_lines, journal.description, command_count, errors, interrupted, done,
+        logger_instance, journal,
+    )
+
+
+async def handle_build_status(
+    arguments: Dict[str, Any],
+    rcon,
+    config,
+    logger_instance
+) -> List[TextContent]:
+    """
+    Handle build_status tool.
+
+    Reports the progress of a background build, or lists recent ones.
+
+    Args:
+        arguments: Tool arguments containing optional job_id
+        rcon: RCON manager instance
+        config: Server configuration
+        logger_instance: Logger instance
+
+    Returns:
+        List of TextContent with job status
+    """
+    job_id = str(arguments.get("job_id") or "").strip()
+
+    if not job_id:
+        jobs = rcon.jobs.list()
+        if not jobs:
+            return [TextContent(type="text", text="No background builds.")]
+        lines = ["Background builds (newest first):", ""]
+        for job in jobs[:10]:
+            lines.append(f"- `{job.job_id}` {job.description}: {_job_progress(job)}")
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    job = rcon.jobs.get(job_id)
+    if job is None:
+        return [TextContent(type="text", text=f"❌ No background build with job id {job_id}")]
+
+    lines = [
+        f"🏗️ {job.description}",
+        f"Job: {job.job_id}",
+        "",
+        f"Status: {_job_progress(job)}",
+    ]
+    if job.errors:
+        lines.append(f"Command errors so far: {job.errors}")
+    if job.started is not None:
+        elapsed = (job.finished or time.time()) - job.started
+        lines.append(f"Elapsed: {elapsed:.1f}s")
+    if job.result:
+        lines.extend(["", job.result])
+    elif job.status == INTERRUPTED:
+        lines.extend([
+            "",
+            f"💡 Run resume_build(job_id=\"{job.job_id}\") to send the remaining commands.",
+        ])
+    return [TextContent(type="text", text="\n".join(lines))]
+
+
+async def handle_build_cancel(
+    arguments: Dict[str, Any],
+    rcon,
+    config,
+    logger_instance
+) -> List[TextContent]:
+    """
+    Handle build_cancel tool.
+
+    Stops a queued or running background build. Commands already sent stay
+    in the world; the journal keeps the rest for resume_build.
+
+    Args:
+        arguments: Tool arguments containing job_id
+        rcon: RCON manager instance
+        config: Server configuration
+        logger_instance: Logger instance
+
+    Returns:
+        List of TextContent with the cancelled job's progress
+    """
+    job_id = str(arguments.get("job_id") or "").strip()
+    if not job_id:
+        return [TextContent(type="text", text="❌ Error: job_id is required")]
+
+    job = rcon.jobs.get(job_id)
+    if job is None:
+        return [TextContent(type="text", text=f"❌ No background build with job id {job_id}")]
+    if not await rcon.jobs.cancel(job_id):
+        return [TextContent(type="text", text=f"Build {job_id} is not running ({job.status}).")]
+
+    logger_instance.info(f"Cancelled background build {job_id} at {job.done}/{job.total}")
+    return [TextContent(
+        type="text",
+        text=f"⛔ Cancelled build {job_id} after {job.done}/{job.total} commands.\n\n"
+             f"💡 Run resume_build(job_id=\"{job_id}\") to send the remaining commands.",
+    )]
+
+
+def _report_progress(total: int, start: int = 0) -> Optional[ProgressCallback]:
+    """Progress callback for the current tool call (None if the client sent no progress token)."""
+    reporter = ProgressReporter(total, start=start)
+    if not reporter.active:
+        return None
+
+    def on_progress(done: int, errors: int) -> None:
+        reporter.update(done, f"{errors} command errors" if errors else None)
+
+    return on_progress
+
+
+def _is_active(job_id: str, rcon) -> bool:
+    """Whether a build with ``job_id`` is streaming or queued in this process."""
+    job = rcon.jobs.get(job_id)
+    return job_id in _active_jobs or (job is not None and job.status not in FINISHED)
+
+
+def _job_progress(job: BuildJob) -> str:
+    percent = (job.done / job.total * 100) if job.total else 100.0
+    return f"{job.status}, {job.done}/{job.total} commands ({percent:.1f}%)"
+
+
+async def _stream_build(
+    commands: List[str],
+    segments: Optional[List[BuildSegment]],
+    start: int,
+    rcon,
+    config,
+    logger_instance,
+    journal: Optional[BuildJournal],
+    result_lines: List[str],
+    on_progress: Optional[ProgressCallback] = None,
+) -> Tuple[List[str], Optional[str], int]:
+    """
+    Stream ``commands[start:]`` over RCON, appending progress to ``result_lines``.
+
+    Commands are pipelined over one connection. A transport failure is
+    retried once from the command in flight; if that fails too the build
+    stops there (the journal records where) instead of failing every
+    remaining command. Cancelling the task interrupts the build the same
+    way, so it can be resumed.
+
+    With ``build_parallelism`` > 1, vanilla-only stretches are split into
+    spatially disjoint partitions sent over separate connections; the
+    journal then acknowledges the longest prefix of completed commands.
+    If a partition fails, the rest of the stretch goes over one connection
+    from that prefix (replace writes can safely be sent again).
+
+    Returns:
+        (command errors, interruption error or None, commands done)
+    """
+    command_count = len(commands)
+    stripped_commands = [strip_command_slash(cmd) for cmd in commands]
+    uses_worldedit = any(cmd.startswith("//") for cmd in commands)
+    session = rcon.worldedit_session_async() if uses_worldedit else nullcontext()
+
+    errors: List[str] = []
+    interrupted: Optional[str] = None
+    i = start
+    retried_at = None
+    # Each partition holds a pooled connection for its whole run
+    parallelism = min(config.build_parallelism, config.rcon_pool_size)
+
+    window = None
+    if segments is not None:
+        window = ForceloadWindow(rcon, segments, config.forceload_radius)
+    else:
+        segments = [BuildSegment(0, command_count, frozenset())]
+
+    def acknowledge(result: str) -> None:
+        """Record the response to command ``i`` and move past it."""
+        nonlocal i
+        cmd = commands[i]
+
+        # Check for errors in result
+        if result and any(err_word in result.lower() for err_word in ["error", "unknown", "incorrect", "invalid", "cannot"]):
+            errors.append(f"Command {i+1} failed: {cmd}\nResult: {result}")
+            logger_instance.warning(f"Command error: {cmd} -> {result}")
+
+        i += 1
+        if journal is not None:
+            journal.acknowledge(i)
+        if on_progress is not None:
+            on_progress(i, len(errors))
+
+        # Update progress every 50 commands or on last command
+        if i % 50 == 0 or i == command_count:
+            progress_pct = (i / command_count) * 100
+            result_lines.append(
+                f"  [{i}/{command_count}] {progress_pct:.1f}%"
+            )
+
+    if journal is not None:
+        _active_jobs.add(journal.job_id)
+    try:
+        async with session:
+            for segment_index, (_, segment_end, _) in enumerate(segments):
+                if i >= segment_end:
+                    continue
+                if window is not None:
+                    try:
+                        await window.enter(segment_index)
+                    except Exception as e:
+                        logger_instance.warning(f"Could not force-load chunks for segment {segment_index}: {e}")
+
+                # Disjoint vanilla writes go over several connections at once
+                if (
+                    parallelism > 1
+                    and segment_end - i >= config.parallel_dispatch_min_commands
+                ):
+                    partitions = partition_commands(commands[i:segment_end], parallelism)
+                    if partitions is not None:
+                        offset = i
+                        arrived: Dict[int, str] = {}
+                        responses = dispatch_partitions(
+                            rcon, stripped_commands[offset:segment_end], partitions
+                        )
+                        try:
+                            async with aclosing(responses):
+                                async for index, result in responses:
+                                    arrived[offset + index] = result
+                                    # Acknowledge the longest prefix that has completed
+                                    while i in arrived:
+                                        acknowledge(arrived.pop(i))
+                        except Exception as e:
+                            logger_instance.warning(
+                                f"Parallel dispatch failed at command {i+1}, continuing on one connection: {e}"
+                            )
+
+                while i < segment_end:
+                    try:
+                        async for result in rcon.stream_batch(stripped_commands[i:segment_end], trusted=False):
+                            acknowledge(result)
+
+                    except Exception as e:
+                        logger_instance.error(f"Error executing command {i+1}: {e}", exc_info=True)
+                        if retried_at != i:
+                            retried_at = i
+                            continue
+                        interrupted = f"Command {i+1}: {commands[i]}\nError: {str(e)}"
+                        break
+                if interrupted:
+                    break
+    except asyncio.CancelledError:
+        interrupted = f"Cancelled after command {i}"
+        raise
+    finally:
+        if journal is not None:
+            _active_jobs.discard(journal.job_id)
+            try:
+                if interrupted:
+                    journal.interrupt(i, interrupted)
+                elif i >= command_count:
+                    journal.complete(i, len(errors))
+                else:
+                    journal.checkpoint()
+            except OSError as e:
+                logger_instance.warning(f"Could not update build journal: {e}")
+        if window is not None:
+            try:
+                await window.close()
+            except Exception as e:
+                logger_instance.warning(f"Could not release force-loaded chunks: {e}")
+
+    return errors, interrupted, i
+
+
+def _build_result(
+    result_lines: List[str],
+    description: str,
+    command_count: int,
+    errors: List[str],
+    interrupted: Optional[str],
+    done: int,
+    logger_instance,
+    journal: Optional[BuildJournal] = None,
+) -> List[TextContent]:
     result_lines.append("")
 
+    if interrupted:
+        result_lines.append(f"⛔ Build interrupted after {done}/{command_count} commands:")
+        result_lines.append(f"  - {interrupted}")
+        result_lines.append("")
+        if journal is not None:
+            result_lines.append(
+                f"💡 Run resume_build(job_id=\"{journal.job_id}\") to send the remaining "
+                f"{journal.remaining} commands."
+            )
+        logger_instance.warning(f"Build interrupted: {description}")
+        return [TextContent(type="text", text="\n".join(result_lines))]
+
     if errors:
         result_lines.append("⚠️ Build completed with errors:")
         result_lines.extend([f"  - {err}" for err in errors[:5]])
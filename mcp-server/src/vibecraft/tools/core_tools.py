@@ -5,6 +5,7 @@ This module contains handlers for core operations including RCON commands,
 server info, schematics, templates, and generic WorldEdit commands.
 """
 
+import asyncio
 from typing import Dict, Any, List
 from mcp.types import TextContent
 from pathlib import Path
@@ -109,7 +110,10 @@ async def handle_rcon_command(
 
     # Execute command
     try:
-        response = rcon.execute_command(command)
+        response = await rcon.execute(command)
+        # Arbitrary WorldEdit commands (aliases, //expand, ...) may have moved
+        # the console selection; don't let later tools trust the tracked one
+        rcon.worldedit_state.observe(command, response, trusted=False)
         result = f"✅ Command executed: {command}\n\nResponse: {response}"
 
         if warning:
@@ -136,24 +140,26 @@ async def handle_worldedit_generic(
     if not command:
         return [TextContent(type="text", text="❌ Command cannot be empty")]
 
-    # CRITICAL: Set world context before any WorldEdit command
-    # WorldEdit from RCON requires world context to be set first
-    try:
-        # Use execute_command (not send_command which strips leading slash)
-        result = rcon.execute_command("/world world")
-        logger_instance.debug(f"WorldEdit world context set: {result}")
-    except Exception as e:
-        logger_instance.warning(f"Failed to set world context (may already be set): {e}")
-
-    command = prepare_worldedit_command(tool_name, command)
-
-    # Execute via rcon_command handler
-    return await handle_rcon_command(
-        {"command": command},
-        rcon,
-        config,
-        logger_instance
-    )
+    async with rcon.worldedit_session_async():
+        # CRITICAL: Set world context before any WorldEdit command
+        # WorldEdit from RCON requires world context to be set first
+        try:
+            # Sent once, then again only after a reconnect or a world change
+            result = await rcon.ensure_worldedit_world()
+            if result is not None:
+                logger_instance.debug(f"WorldEdit world context set: {result}")
+        except Exception as e:
+            logger_instance.warning(f"Failed to set world context (may already be set): {e}")
+
+        command = prepare_worldedit_command(tool_name, command)
+
+        # Execute via rcon_command handler
+        return await handle_rcon_command(
+            {"command": command},
+            rcon,
+            config,
+            logger_instance
+        )
 
 
 async def handle_get_server_info(
@@ -163,12 +169,12 @@ async def handle_get_server_info(
     logger_instance
 ) -> List[TextContent]:
     """Handle get_server_info tool."""
-    info = rcon.get_server_info()
+    info = await asyncio.to_thread(rcon.get_server_info)
 
     # Try to detect WorldEdit version if enabled
     worldedit_version = "Unknown"
     if config.enable_version_detection:
-        detected = rcon.detect_worldedit_version()
+        detected = await asyncio.to_thread(rcon.detect_worldedit_version)
         if detected:
             worldedit_version = detected
 
@@ -182,6 +188,7 @@ async def handle_get_server_info(
         "",
         f"RCON Host: {config.rcon_host}:{config.rcon_port}",
         f"Safety Checks: {'Enabled' if config.enable_safety_checks else 'Disabled'}",
+        f"Chunk Cache: {rcon.chunk_cache.stats().summary()}",
     ]
 
     logger_instance.info("Server info retrieved")
@@ -4,11 +4,17 @@ Furniture Tool Handlers
 Search and place furniture from the furniture catalog and layout library.
 """
 
+import asyncio
 import json
 import logging
 from typing import Dict, Any, List
 from mcp.types import TextContent
 
+from ..build_diff import diff_commands
+from ..build_plan import optimize_commands, strip_command_slash
+from ..cost_model import place_by_cheapest
+from ..progress import ProgressReporter
+
 logger = logging.getLogger(__name__)
 
 
@@ -363,6 +369,7 @@ async def handle_place_furniture(
     facing = arguments.get("facing")
     place_on_surface = arguments.get("place_on_surface", True)
     preview_only = arguments.get("preview_only", False)
+    diff = arguments.get("diff", False)
 
     missing = [field for field in ("furniture_id", "origin_x", "origin_y", "origin_z") if arguments.get(field) is None]
     if missing:
@@ -391,6 +398,21 @@ async def handle_place_furniture(
         logger_instance.error(f"Error generating placement commands: {exc}")
         return [TextContent(type="text", text=f"❌ Failed to generate commands: {exc}")]
 
+    # Normalized like build commands: "//" for WorldEdit, the leading slash
+    # stripped only when sending
+    commands = [command.strip() for command in commands]
+    if config.enable_command_compiler:
+        commands, report = await asyncio.to_thread(optimize_commands, commands)
+        if report.summary():
+            logger_instance.info(report.summary())
+
+    diff_summary = None
+    if diff:
+        commands, diff_report = await diff_commands(rcon, commands)
+        diff_summary = diff_report.summary()
+        if not commands:
+            return [TextContent(type="text", text=f"✅ Furniture already in place, nothing to send.\n{diff_summary}")]
+
     summary = FurniturePlacer.get_command_summary(commands)
     final_facing = facing or layout.get('origin', {}).get('facing', 'north')
 
@@ -403,6 +425,7 @@ async def handle_place_furniture(
             f"Facing: {final_facing}",
             "",
             summary,
+            *([diff_summary] if diff_summary else []),
             "Commands:",
             "```plain",
             command_listing,
@@ -413,12 +436,17 @@ async def handle_place_furniture(
 
     executed_commands: List[str] = []
     try:
-        for command in commands:
-            stripped = command.strip()
-            if not stripped or stripped.startswith('#'):
-                continue
-            executed_commands.append(stripped)
-            rcon.execute_command(stripped)
+        pending = [strip_command_slash(command) for command in commands]
+        pending = [command for command in pending if command and not command.startswith('#')]
+        estimate = await rcon.cost_model.estimate(pending)
+        if await place_by_cheapest(rcon, pending, estimate) is not None:
+            executed_commands = pending
+        else:
+            reporter = ProgressReporter(len(pending))
+            async with rcon.worldedit_session_async():
+                async for _ in rcon.stream_batch(pending):
+                    executed_commands.append(pending[len(executed_commands)])
+                    reporter.update(len(executed_commands))
     except Exception as exc:
         logger_instance.error(f"Furniture placement failed: {exc}", exc_info=True)
         failure_output = [
@@ -460,6 +488,7 @@ async def handle_place_furniture(
         f"Facing: {final_facing}",
         "",
         summary,
+        *([diff_summary] if diff_summary else []),
     ]
 
     if material_lines:
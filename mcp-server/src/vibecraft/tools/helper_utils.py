@@ -5,11 +5,15 @@ This module contains handlers for utility operations including
 item search, player positioning, surface detection, and region calculations.
 """
 
+import asyncio
 from typing import Dict, Any, List
 from mcp.types import TextContent
 import re
 import math
 
+from ..block_utils import fetch_block_state
+from ..heightmaps import MOTION_BLOCKING_NO_LEAVES, WORLD_MIN_Y
+
 
 async def handle_calculate_region_size(
     arguments: Dict[str, Any],
@@ -147,7 +151,7 @@ async def handle_get_player_position(
 
     # If no player specified, get first online player
     if not player_name:
-        info = rcon.get_server_info()
+        info = await asyncio.to_thread(rcon.get_server_info)
         players = info.get('players', '')
         if not players or players == "0":
             return [TextContent(type="text", text="❌ No players online. Please specify a player name or have someone join the server.")]
@@ -156,7 +160,7 @@ async def handle_get_player_position(
         if ":" in players:
             player_name = players.split(":", 1)[1].strip().split(",")[0].strip()
         else:
-            list_result = rcon.send_command("list")
+            list_result = await rcon.execute("list")
             if ":" in list_result:
                 player_list = list_result.split(":", 1)[1].strip()
                 if player_list:
@@ -167,7 +171,7 @@ async def handle_get_player_position(
 
     try:
         # Get player position
-        pos_result = rcon.send_command(f"data get entity {player_name} Pos")
+        pos_result = await rcon.execute(f"data get entity {player_name} Pos")
         coord_match = re.search(r'\[([-\d.]+)d?,\s*([-\d.]+)d?,\s*([-\d.]+)d?\]', pos_result)
 
         if not coord_match:
@@ -178,7 +182,7 @@ async def handle_get_player_position(
         z = float(coord_match.group(3))
 
         # Get player rotation (yaw, pitch)
-        rot_result = rcon.send_command(f"data get entity {player_name} Rotation")
+        rot_result = await rcon.execute(f"data get entity {player_name} Rotation")
         rot_match = re.search(r'\[([-\d.]+)f?,\s*([-\d.]+)f?\]', rot_result)
 
         yaw = 0.0
@@ -222,7 +226,7 @@ async def handle_get_player_position(
             target_z = int(z + dz)
 
             # Check if there's a non-air block at this position
-            block_check = rcon.send_command(f"execute positioned {target_x} {target_y} {target_z} run data get block ~ ~ ~ id")
+            block_check = await rcon.execute(f"execute positioned {target_x} {target_y} {target_z} run data get block ~ ~ ~ id")
 
             if "air" not in block_check.lower() and "has the following" in block_check:
                 # Found a non-air block
@@ -238,7 +242,7 @@ async def handle_get_player_position(
 
         # Check block directly below player's feet to identify surface type
         surface_block = "unknown"
-        block_check = rcon.send_command(f"execute positioned {int(x)} {player_y - 1} {int(z)} run data get block ~ ~ ~ id")
+        block_check = await rcon.execute(f"execute positioned {int(x)} {player_y - 1} {int(z)} run data get block ~ ~ ~ id")
         if "has the following" in block_check:
             block_match = re.search(r'"minecraft:([^"]+)"', block_check)
             if block_match:
@@ -297,44 +301,29 @@ async def handle_get_surface_level(
     z = arguments["z"]
 
     try:
-        # SIMPLIFIED SURFACE DETECTION
-        # Uses player Y position as baseline reference for ground level
-        # This avoids complex raycasting that often fails
-
         logger_instance.info(f"Detecting surface level at X={x}, Z={z}")
 
-        # Get player position as baseline reference
-        player_y_baseline = 64  # Default fallback (typical overworld surface)
-
-        try:
-            info = rcon.get_server_info()
-            players_str = info.get('players', '')
-
-            if players_str and ":" in players_str:
-                player_list = players_str.split(":")[1].strip().split(",")
-                if player_list:
-                    player_name = player_list[0].strip()
-                    player_data = rcon.send_command(f"data get entity {player_name} Pos")
-
-                    if "has the following entity data" in player_data:
-                        pos_match = re.search(r'\[([+-]?\d+\.?\d*)d,\s*([+-]?\d+\.?\d*)d,\s*([+-]?\d+\.?\d*)d\]', player_data)
-                        if pos_match:
-                            player_y_baseline = int(float(pos_match.group(2)))
-                            logger_instance.info(f"Using player Y position {player_y_baseline} as baseline reference")
-        except Exception as e:
-            logger_instance.warning(f"Could not get player position, using default Y=64: {e}")
-
-        # Use player Y as the ground level for the target coordinates
-        # This assumes terrain doesn't vary drastically across the world
-        surface_y = player_y_baseline - 1  # Ground is typically 1 block below player feet
+        # Ground from the chunk's heightmap, ignoring leaves so tree canopies
+        # do not count; the server is asked if the chunk was never saved
+        heightmap = await rcon.run_blocking(
+            rcon.heightmaps.surface, x, z, x, z, kind=MOTION_BLOCKING_NO_LEAVES
+        )
+        surface_y = heightmap.at(x, z) if heightmap is not None else None
+        if surface_y is not None and surface_y >= WORLD_MIN_Y:
+            method = heightmap.source
+            note = "Exact ground level of this column (leaves and plants are ignored, water counts)."
+        else:
+            player_y_baseline = await _player_y_baseline(rcon, logger_instance)
+            surface_y = player_y_baseline - 1  # Ground is typically 1 block below player feet
+            method = f"Player Y baseline ({player_y_baseline})"
+            note = (
+                "The column could not be read, so the player's current Y position is used as the ground level.\n"
+                "If terrain varies significantly, use `get_player_position` while standing at the exact build site."
+            )
 
         # Check what block is at that level
-        surface_block = "unknown"
-        block_check = rcon.send_command(f"execute positioned {x} {surface_y} {z} run data get block ~ ~ ~ id")
-        if "has the following" in block_check:
-            block_match = re.search(r'"minecraft:([^"]+)"', block_check)
-            if block_match:
-                surface_block = block_match.group(1)
+        block = await rcon.run_blocking(fetch_block_state, rcon, x, surface_y, z)
+        surface_block = block["id"] if block is not None else "unknown"
 
         logger_instance.info(f"Surface at ({x}, {z}): Y={surface_y}, block={surface_block}")
 
@@ -342,18 +331,41 @@ async def handle_get_surface_level(
 
 **Surface Level:** Y={surface_y}
 **Block Type:** {surface_block}
-**Detection Method:** Player Y baseline ({player_y_baseline})
+**Detection Method:** {method}
 
 **Building Coordinates:**
 - On surface (RECOMMENDED): {x},{surface_y + 1},{z} - builds on top of ground
 - Foundation level: {x},{surface_y},{z} - replaces surface block
 - Elevated: {x},{surface_y + 2},{z} - builds 1 block above surface
 
-**Note:** This uses player's current Y position as reference for ground level.
-For best results, be near your build location before checking surface.
-If terrain varies significantly, use `get_player_position` while standing at the exact build site.
+**Note:** {note}
 """)]
 
     except Exception as e:
         logger_instance.error(f"Error in get_surface_level: {str(e)}", exc_info=True)
         return [TextContent(type="text", text=f"❌ Error finding surface level: {str(e)}")]
+
+
+async def _player_y_baseline(rcon, logger_instance) -> int:
+    """Y of the first online player's feet, or 64 (typical overworld surface)."""
+    player_y_baseline = 64
+
+    try:
+        info = await asyncio.to_thread(rcon.get_server_info)
+        players_str = info.get('players', '')
+
+        if players_str and ":" in players_str:
+            player_list = players_str.split(":")[1].strip().split(",")
+            if player_list:
+                player_name = player_list[0].strip()
+                player_data = await rcon.execute(f"data get entity {player_name} Pos")
+
+                if "has the following entity data" in player_data:
+                    pos_match = re.search(r'\[([+-]?\d+\.?\d*)d,\s*([+-]?\d+\.?\d*)d,\s*([+-]?\d+\.?\d*)d\]', player_data)
+                    if pos_match:
+                        player_y_baseline = int(float(pos_match.group(2)))
+                        logger_instance.info(f"Using player Y position {player_y_baseline} as baseline reference")
+    except Exception as e:
+        logger_instance.warning(f"Could not get player position, using default Y=64: {e}")
+
+    return player_y_baseline
@@ -4,6 +4,7 @@ Pattern Tool Handlers
 Building and terrain pattern lookup and placement.
 """
 
+import asyncio
 import json
 import logging
 from pathlib import Path
@@ -11,6 +12,10 @@ from typing import Dict, Any, List
 from mcp.types import TextContent
 
 from .pattern_lookup_base import PatternLookupHandler
+from ..build_diff import diff_commands
+from ..build_plan import optimize_commands, strip_command_slash
+from ..cost_model import place_by_cheapest
+from ..progress import ProgressReporter
 from ..paths import CONTEXT_DIR
 
 logger = logging.getLogger(__name__)
@@ -69,6 +74,7 @@ async def handle_place_building_pattern(
     origin_z = arguments.get("origin_z")
     facing = arguments.get("facing")
     preview_only = arguments.get("preview_only", False)
+    diff = arguments.get("diff", False)
 
     missing = [field for field in ("pattern_id", "origin_x", "origin_y", "origin_z") if arguments.get(field) is None]
     if missing:
@@ -99,6 +105,21 @@ async def handle_place_building_pattern(
         logger_instance.error(f"Error generating pattern placement commands: {exc}")
         return [TextContent(type="text", text=f"❌ Failed to generate commands: {exc}")]
 
+    # Normalized like build commands: "//" for WorldEdit, the leading slash
+    # stripped only when sending
+    commands = [command.strip() for command in commands]
+    if config.enable_command_compiler:
+        commands, report = await asyncio.to_thread(optimize_commands, commands)
+        if report.summary():
+            logger_instance.info(report.summary())
+
+    diff_summary = None
+    if diff:
+        commands, diff_report = await diff_commands(rcon, commands)
+        diff_summary = diff_report.summary()
+        if not commands:
+            return [TextContent(type="text", text=f"✅ Pattern already in place, nothing to send.\n{diff_summary}")]
+
     summary = PatternPlacer.get_command_summary(commands)
     final_facing = facing or structured.get('origin', {}).get('facing', 'north')
 
@@ -111,6 +132,7 @@ async def handle_place_building_pattern(
             f"Facing: {final_facing}",
             "",
             summary,
+            *([diff_summary] if diff_summary else []),
             "Commands:",
             "```plain",
             command_block,
@@ -121,12 +143,17 @@ async def handle_place_building_pattern(
 
     executed_commands: List[str] = []
     try:
-        for command in commands:
-            stripped = command.strip()
-            if not stripped or stripped.startswith('#'):
-                continue
-            executed_commands.append(stripped)
-            rcon.execute_command(stripped)
+        pending = [strip_command_slash(command) for command in commands]
+        pending = [command for command in pending if command and not command.startswith('#')]
+        estimate = await rcon.cost_model.estimate(pending)
+        if await place_by_cheapest(rcon, pending, estimate) is not None:
+            executed_commands = pending
+        else:
+            reporter = ProgressReporter(len(pending))
+            async with rcon.worldedit_session_async():
+                async for _ in rcon.stream_batch(pending):
+                    executed_commands.append(pending[len(executed_commands)])
+                    reporter.update(len(executed_commands))
     except Exception as exc:
         logger_instance.error(f"Pattern placement failed: {exc}", exc_info=True)
         failure_output = [
@@ -171,6 +198,7 @@ async def handle_place_building_pattern(
         f"Facing: {final_facing}",
         "",
         summary,
+        *([diff_summary] if diff_summary else []),
     ]
 
     if palette_lines:
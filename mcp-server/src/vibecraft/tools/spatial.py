@@ -53,12 +53,14 @@ async def handle_spatial_awareness_scan(
         )
 
         # Perform analysis
-        result = analyzer.analyze_area(
+        result = await rcon.run_blocking(
+            analyzer.analyze_area,
             center_x=center_x,
             center_y=center_y,
             center_z=center_z,
             radius=radius,
-            detail_level=detail_level
+            detail_level=detail_level,
+            worldedit=True,
         )
 
         # Use the built-in summary from the analyzer
@@ -43,7 +43,7 @@ async def handle_generate_terrain(
             if octaves: kwargs["octaves"] = octaves
             if smooth_iterations: kwargs["smooth_iterations"] = smooth_iterations
             if seed: kwargs["seed"] = seed
-            result = generator.generate_hills(**kwargs)
+            result = await rcon.run_blocking(generator.generate_hills, worldedit=True, **kwargs)
 
         elif terrain_type == "rugged_mountains":
             kwargs = {"x1": x1, "y1": y1, "z1": z1, "x2": x2, "y2": y2, "z2": z2}
@@ -52,7 +52,7 @@ async def handle_generate_terrain(
             if octaves: kwargs["octaves"] = octaves
             if smooth_iterations: kwargs["smooth_iterations"] = smooth_iterations
             if seed: kwargs["seed"] = seed
-            result = generator.generate_mountains(**kwargs)
+            result = await rcon.run_blocking(generator.generate_mountains, worldedit=True, **kwargs)
 
         elif terrain_type == "valley_network":
             kwargs = {"x1": x1, "y1": y1, "z1": z1, "x2": x2, "y2": y2, "z2": z2}
@@ -61,7 +61,7 @@ async def handle_generate_terrain(
             if octaves: kwargs["octaves"] = octaves
             if smooth_iterations: kwargs["smooth_iterations"] = smooth_iterations
             if seed: kwargs["seed"] = seed
-            result = generator.generate_valleys(**kwargs)
+            result = await rcon.run_blocking(generator.generate_valleys, worldedit=True, **kwargs)
 
         elif terrain_type == "mountain_range":
             kwargs = {"x1": x1, "y1": y1, "z1": z1, "x2": x2, "y2": y2, "z2": z2}
@@ -71,14 +71,14 @@ async def handle_generate_terrain(
             if octaves: kwargs["octaves"] = octaves
             if smooth_iterations: kwargs["smooth_iterations"] = smooth_iterations
             if seed: kwargs["seed"] = seed
-            result = generator.generate_mountain_range(**kwargs)
+            result = await rcon.run_blocking(generator.generate_mountain_range, worldedit=True, **kwargs)
 
         elif terrain_type == "plateau":
             kwargs = {"x1": x1, "y1": y1, "z1": z1, "x2": x2, "y2": y2, "z2": z2}
             if height: kwargs["height"] = height
             if smooth_iterations: kwargs["smooth_iterations"] = smooth_iterations
             if seed: kwargs["seed"] = seed
-            result = generator.generate_plateau(**kwargs)
+            result = await rcon.run_blocking(generator.generate_plateau, worldedit=True, **kwargs)
 
         else:
             return [TextContent(type="text", text=f"❌ Unknown terrain type: {terrain_type}")]
@@ -102,8 +102,22 @@ async def handle_generate_terrain(
             if operation == "Selection" and step_result.get("success"):
                 region = step_result.get("region", {})
                 output += f"     Region: {region.get('volume', 0):,} blocks\n"
+                if region.get('tiles', 1) > 1:
+                    output += f"     Tiles: {region['tiles']} (chunk-aligned, run one after another)\n"
+                if step_result.get("warning"):
+                    output += f"     ⚠️ {step_result['warning']}\n"
         output += "\n"
 
+        before = next(
+            (step.get("surface") for operation, step in result.get('steps', []) if operation == "Selection"),
+            None,
+        )
+        after = await rcon.run_blocking(generator.surface_profile, x1, z1, x2, z2) if before else None
+        if before and after:
+            output += "**Ground Level (from chunk heightmaps):**\n"
+            output += f"  - Before: Y {before['min_y']}..{before['max_y']} (avg {before['avg_y']})\n"
+            output += f"  - After: Y {after['min_y']}..{after['max_y']} (avg {after['avg_y']})\n\n"
+
         output += "**Next Steps:**\n"
         output += "  • Apply texturing with texture_terrain() for natural appearance\n"
         output += "  • Add additional smoothing if needed with smooth_terrain()\n"
@@ -133,7 +147,7 @@ async def handle_texture_terrain(
 
     try:
         generator = TerrainGenerator(rcon)
-        result = generator.texture_natural_slopes(x1, y1, z1, x2, y2, z2, style)
+        result = await rcon.run_blocking(generator.texture_natural_slopes, x1, y1, z1, x2, y2, z2, style, worldedit=True)
 
         if not result.get("success"):
             return [TextContent(type="text", text=f"❌ Error: {result.get('error', 'Unknown error')}")]
@@ -181,13 +195,10 @@ async def handle_smooth_terrain(
     try:
         generator = TerrainGenerator(rcon)
 
-        # Set selection first
-        select_result = generator.set_selection(x1, y1, z1, x2, y2, z2)
-        if not select_result.get("success"):
-            return [TextContent(type="text", text=f"❌ Error: {select_result.get('error', 'Selection failed')}")]
-
-        # Apply smoothing
-        result = generator.smooth(iterations, mask)
+        # Selection and smoothing hold the WorldEdit session together
+        result = await rcon.run_blocking(
+            generator.smooth_region, x1, y1, z1, x2, y2, z2, iterations, mask, worldedit=True
+        )
 
         if not result.get("success"):
             return [TextContent(type="text", text=f"❌ Error: {result.get('error', 'Unknown error')}")]
@@ -195,7 +206,9 @@ async def handle_smooth_terrain(
         # Format output
         output = f"✨ Terrain Smoothing Complete\n\n"
         output += f"**Iterations:** {result['iterations']}\n"
-        output += f"**Region:** {select_result['region']['volume']:,} blocks\n"
+        output += f"**Region:** {result['region']['volume']:,} blocks\n"
+        if result['region']['tiles'] > 1:
+            output += f"**Tiles:** {result['region']['tiles']}\n"
         if mask:
             output += f"**Mask:** {mask}\n"
         output += "\n"
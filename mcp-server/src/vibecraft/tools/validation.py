@@ -162,7 +162,7 @@ async def handle_check_symmetry(
 
     try:
         checker = SymmetryChecker(rcon)
-        result = checker.check_symmetry(x1, y1, z1, x2, y2, z2, axis, tolerance, resolution)
+        result = await rcon.run_blocking(checker.check_symmetry, x1, y1, z1, x2, y2, z2, axis, tolerance, resolution)
 
         if 'error' in result:
             return [TextContent(type="text", text=f"❌ Error: {result['error']}")]
@@ -241,7 +241,7 @@ async def handle_analyze_lighting(
 
     try:
         analyzer = LightingAnalyzer(rcon)
-        result = analyzer.analyze_lighting(x1, y1, z1, x2, y2, z2, resolution)
+        result = await rcon.run_blocking(analyzer.analyze_lighting, x1, y1, z1, x2, y2, z2, resolution)
 
         if 'error' in result:
             return [TextContent(type="text", text=f"❌ Error: {result['error']}")]
@@ -322,7 +322,7 @@ async def handle_validate_structure(
 
     try:
         validator = StructureValidator(rcon)
-        result = validator.validate_structure(x1, y1, z1, x2, y2, z2, resolution)
+        result = await rcon.run_blocking(validator.validate_structure, x1, y1, z1, x2, y2, z2, resolution)
 
         if 'error' in result:
             return [TextContent(type="text", text=f"❌ Error: {result['error']}")]
@@ -8,6 +8,8 @@ deformations, vegetation, terrain generation, and analysis.
 from typing import Dict, Any, List
 from mcp.types import TextContent
 
+from ..build_plan import strip_command_slash
+
 
 async def handle_worldedit_deform(
     arguments: Dict[str, Any],
@@ -28,7 +30,7 @@ async def handle_worldedit_deform(
 
     try:
         # Execute RCON command
-        result = rcon.send_command(command)
+        result = await rcon.execute(strip_command_slash(command))
         output = warning + f"**Command:** `{command}`\n\n**Result:**\n{result}"
 
         logger_instance.info(f"Deform command executed: {command}")
@@ -99,7 +101,7 @@ async def handle_worldedit_vegetation(
 
     try:
         # Execute RCON command
-        result = rcon.send_command(command)
+        result = await rcon.execute(strip_command_slash(command))
         output = f"**Command:** `{command}`\n\n**Result:**\n{result}"
 
         logger_instance.info(f"Vegetation command executed: {command}")
@@ -167,7 +169,7 @@ async def handle_worldedit_terrain_advanced(
 
     try:
         # Execute RCON command
-        result = rcon.send_command(command)
+        result = await rcon.execute(strip_command_slash(command))
         output = warning + f"**Command:** `{command}`\n\n**Result:**\n{result}"
 
         logger_instance.info(f"Terrain advanced command executed: {command}")
@@ -205,7 +207,7 @@ async def handle_worldedit_analysis(
 
     try:
         # Execute RCON command
-        result = rcon.send_command(command)
+        result = await rcon.execute(strip_command_slash(command))
         output = f"**Command:** `{command}`\n\n**Result:**\n{result}"
 
         logger_instance.info(f"Analysis command executed: {command}")
@@ -10,8 +10,12 @@ import logging
 from typing import List, Tuple, Dict, Any, Optional, Set
 from collections import Counter
 
+import numpy as np
+
 from .rcon_manager import RCONManager
-from .block_utils import fetch_block_state, block_is_air
+from .block_utils import block_from_state, fetch_block_state, block_is_air, sync_world
+from .region_files import BlockRegion
+from .worldedit_session import Box
 
 logger = logging.getLogger(__name__)
 class SymmetryChecker:
@@ -67,8 +71,51 @@ class SymmetryChecker:
         else:
             return {"error": f"Invalid axis '{axis}'. Must be 'x', 'y', or 'z'."}
 
+        sync_world(self.rcon)
+
+        bounds = (min_x, min_y, min_z, max_x, max_y, max_z)
+        region = self.rcon.region_files.read_box(Box(*bounds))
+        if region is not None:
+            total_checked, differences = self._compare_mirrored(region, axis, center, resolution)
+        else:
+            total_checked, differences = self._compare_queried(bounds, axis, center, resolution)
+
+        # Calculate symmetry score
+        symmetric_count = total_checked - len(differences)
+        symmetry_score = (symmetric_count / total_checked * 100) if total_checked > 0 else 0
+
+        # Determine verdict
+        if len(differences) <= tolerance:
+            verdict = "SYMMETRIC"
+        elif symmetry_score >= 90:
+            verdict = "MOSTLY_SYMMETRIC"
+        elif symmetry_score >= 70:
+            verdict = "PARTIALLY_SYMMETRIC"
+        else:
+            verdict = "ASYMMETRIC"
+
+        logger.info(f"Symmetry check complete: {symmetry_score:.1f}% symmetric ({len(differences)} differences)")
+
+        return {
+            "symmetry_score": round(symmetry_score, 2),
+            "axis": axis,
+            "center_plane": center,
+            "total_blocks_checked": total_checked,
+            "symmetric_blocks": symmetric_count,
+            "asymmetric_blocks": len(differences),
+            "tolerance": tolerance,
+            "verdict": verdict,
+            "differences": differences[:50],  # Limit to first 50 differences
+            "total_differences": len(differences),
+            "summary": self._generate_symmetry_summary(symmetry_score, verdict, len(differences), axis)
+        }
+
+    def _compare_queried(
+        self, bounds: Tuple[int, ...], axis: str, center: int, resolution: int
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Compare mirrored blocks one query at a time."""
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
         # Sample blocks in region
-        samples = []
         differences = []
         total_checked = 0
 
@@ -117,35 +164,47 @@ class SymmetryChecker:
                             "recommendation": f"Replace {display_block2} at ({mirror_x},{mirror_y},{mirror_z}) with {display_block1} for symmetry"
                         })
 
-        # Calculate symmetry score
-        symmetric_count = total_checked - len(differences)
-        symmetry_score = (symmetric_count / total_checked * 100) if total_checked > 0 else 0
-
-        # Determine verdict
-        if len(differences) <= tolerance:
-            verdict = "SYMMETRIC"
-        elif symmetry_score >= 90:
-            verdict = "MOSTLY_SYMMETRIC"
-        elif symmetry_score >= 70:
-            verdict = "PARTIALLY_SYMMETRIC"
-        else:
-            verdict = "ASYMMETRIC"
-
-        logger.info(f"Symmetry check complete: {symmetry_score:.1f}% symmetric ({len(differences)} differences)")
-
-        return {
-            "symmetry_score": round(symmetry_score, 2),
-            "axis": axis,
-            "center_plane": center,
-            "total_blocks_checked": total_checked,
-            "symmetric_blocks": symmetric_count,
-            "asymmetric_blocks": len(differences),
-            "tolerance": tolerance,
-            "verdict": verdict,
-            "differences": differences[:50],  # Limit to first 50 differences
-            "total_differences": len(differences),
-            "summary": self._generate_symmetry_summary(symmetry_score, verdict, len(differences), axis)
-        }
+        return total_checked, differences
+
+    def _compare_mirrored(
+        self, region: BlockRegion, axis: str, center: int, resolution: int
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Compare mirrored blocks of a region read in bulk, as arrays."""
+        dimension = "xyz".index(axis)
+        low = region.origin[dimension]
+        high = low + region.indices.shape[dimension] - 1
+        sampled = np.arange(low, high + 1, resolution)
+        mirror = 2 * center - sampled
+        keep = np.nonzero((mirror >= low) & (mirror <= high) & (mirror != sampled))[0]
+
+        step = [slice(None, None, resolution)] * 3
+        grid = region.indices[tuple(step)]
+        step[dimension] = slice(None)
+        blocks = np.take(grid, keep, axis=dimension)
+        mirrored = np.take(region.indices[tuple(step)], mirror[keep] - low, axis=dimension)
+
+        air = region.lookup(lambda state: block_is_air(block_from_state(state)))
+        differs = ~(air[blocks] & air[mirrored]) & (blocks != mirrored)
+        total_checked = int(np.count_nonzero(~(air[blocks] & air[mirrored])))
+
+        keys = [block_from_state(state)["key"] for state in region.palette]
+        differences = []
+        for index in zip(*np.nonzero(differs)):
+            position = [
+                int(sampled[keep[index[d]]]) if d == dimension else region.origin[d] + int(index[d]) * resolution
+                for d in range(3)
+            ]
+            mirror_position = list(position)
+            mirror_position[dimension] = 2 * center - position[dimension]
+            key1, key2 = keys[blocks[index]], keys[mirrored[index]]
+            differences.append({
+                "position1": position,
+                "block1": key1,
+                "position2": mirror_position,
+                "block2": key2,
+                "recommendation": f"Replace {key2} at ({mirror_position[0]},{mirror_position[1]},{mirror_position[2]}) with {key1} for symmetry"
+            })
+        return total_checked, differences
 
     def _generate_symmetry_summary(self, score: float, verdict: str, diff_count: int, axis: str) -> str:
         """Generate natural language summary of symmetry check."""
@@ -234,40 +293,29 @@ class LightingAnalyzer:
         min_z, max_z = min(z1, z2), max(z1, z2)
 
         logger.info(f"Analyzing lighting for region ({min_x},{min_y},{min_z}) to ({max_x},{max_y},{max_z})")
+        sync_world(self.rcon)
 
-        # Sample light levels
-        light_samples = []
-        dark_spots = []
+        bounds = (min_x, min_y, min_z, max_x, max_y, max_z)
         block_cache = {}  # Cache for block queries to improve performance
 
-        for x in range(min_x, max_x + 1, resolution):
-            for y in range(min_y, max_y + 1, resolution):
-                for z in range(min_z, max_z + 1, resolution):
-                    light_level = self._get_light_level(x, y, z, block_cache)
-
-                    if light_level is not None:
-                        light_samples.append({
-                            "position": [x, y, z],
-                            "light_level": light_level
-                        })
-
-                        # Dark spot detection (< 8 allows mob spawning)
-                        if light_level < 8:
-                            dark_spots.append({
-                                "position": [x, y, z],
-                                "light_level": light_level
-                            })
+        # Light sources count up to 4 blocks away (2 vertically); sky checks
+        # look SKY_CHECK_MAX blocks up
+        top = max(max_y + 2, min(max_y + self.SKY_CHECK_MAX, self.MAX_WORLD_HEIGHT))
+        region = self.rcon.region_files.read_box(Box(min_x - 4, min_y - 2, min_z - 4, max_x + 4, top, max_z + 4))
+        if region is not None:
+            light_levels, dark_spots = self._light_levels_local(region, bounds, resolution)
+        else:
+            light_levels, dark_spots = self._light_levels_queried(bounds, resolution, block_cache)
 
-        if not light_samples:
+        if len(light_levels) == 0:
             return {"error": "No light data collected from region"}
 
         # Calculate statistics
-        light_levels = [s["light_level"] for s in light_samples]
-        avg_light = sum(light_levels) / len(light_levels)
+        avg_light = float(light_levels.mean())
 
-        well_lit = sum(1 for l in light_levels if l >= 12)
-        dim = sum(1 for l in light_levels if 8 <= l < 12)
-        dark = sum(1 for l in light_levels if l < 8)
+        well_lit = int(np.count_nonzero(light_levels >= 12))
+        dim = int(np.count_nonzero((light_levels >= 8) & (light_levels < 12)))
+        dark = int(np.count_nonzero(light_levels < 8))
 
         # Determine mob spawn risk
         dark_percentage = (dark / len(light_levels)) * 100
@@ -281,7 +329,7 @@ class LightingAnalyzer:
         # Calculate optimal light placements
         optimal_placements = self._calculate_light_placements(dark_spots, resolution, block_cache)
 
-        logger.info(f"Lighting analysis complete: {len(light_samples)} samples, {len(dark_spots)} dark spots")
+        logger.info(f"Lighting analysis complete: {len(light_levels)} samples, {len(dark_spots)} dark spots")
 
         return {
             "region": {
@@ -289,7 +337,7 @@ class LightingAnalyzer:
                 "max": [max_x, max_y, max_z]
             },
             "average_light_level": round(avg_light, 2),
-            "total_samples": len(light_samples),
+            "total_samples": len(light_levels),
             "dark_spots_count": len(dark_spots),
             "mob_spawn_risk": mob_risk,
             "light_distribution": {
@@ -305,6 +353,89 @@ class LightingAnalyzer:
             "summary": self._generate_lighting_summary(avg_light, mob_risk, len(dark_spots))
         }
 
+    def _light_levels_queried(
+        self,
+        bounds: Tuple[int, ...],
+        resolution: int,
+        cache: Dict[Tuple[int, int, int], Optional[Dict[str, Any]]]
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """Light level of every sample, querying blocks one at a time."""
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
+        light_levels = []
+        dark_spots = []
+
+        for x in range(min_x, max_x + 1, resolution):
+            for y in range(min_y, max_y + 1, resolution):
+                for z in range(min_z, max_z + 1, resolution):
+                    light_level = self._get_light_level(x, y, z, cache)
+
+                    if light_level is not None:
+                        light_levels.append(light_level)
+
+                        # Dark spot detection (< 8 allows mob spawning)
+                        if light_level < 8:
+                            dark_spots.append({
+                                "position": [x, y, z],
+                                "light_level": light_level
+                            })
+
+        return np.array(light_levels, dtype=np.int16), dark_spots
+
+    def _light_levels_local(
+        self, region: BlockRegion, bounds: Tuple[int, ...], resolution: int
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Light level of every sample in a region read in bulk, as arrays.
+
+        Same rules as _get_light_level, applied to all samples at once.
+        """
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
+        ox, oy, oz = region.origin
+        blocks = [block_from_state(state) for state in region.palette]
+        light = np.array([self._is_light_source(block) for block in blocks])[region.indices]
+        opaque = np.array([block["id"] not in self.TRANSPARENT_BLOCKS for block in blocks])[region.indices]
+        plain_air = np.array([block["id"] == "air" for block in blocks])[region.indices]
+
+        def sampled(array: np.ndarray, dx: int = 0, dy: int = 0, dz: int = 0) -> np.ndarray:
+            return array[
+                min_x - ox + dx:max_x - ox + dx + 1:resolution,
+                min_y - oy + dy:max_y - oy + dy + 1:resolution,
+                min_z - oz + dz:max_z - oz + dz + 1:resolution,
+            ]
+
+        # Open to sky: no opaque block in the SKY_CHECK_MAX blocks above
+        # (up to the build limit). opaque_below[i] counts opaque blocks under
+        # index i of each column.
+        columns = opaque[min_x - ox:max_x - ox + 1:resolution, :, min_z - oz:max_z - oz + 1:resolution]
+        opaque_below = np.concatenate(
+            [np.zeros_like(columns[:, :1], dtype=np.int32), np.cumsum(columns, axis=1, dtype=np.int32)],
+            axis=1,
+        )
+        ys = np.arange(min_y, max_y + 1, resolution)
+        first = np.minimum(ys + 1 - oy, opaque_below.shape[1] - 1)
+        last = np.clip(np.minimum(ys + self.SKY_CHECK_MAX, self.MAX_WORLD_HEIGHT) + 1 - oy, first, opaque_below.shape[1] - 1)
+        open_sky = opaque_below[:, last, :] == opaque_below[:, first, :]
+
+        # Nearest light source: farthest offsets first, so nearer ones overwrite
+        nearest = np.full(open_sky.shape, -1, dtype=np.int16)
+        for dx, dy, dz in sorted(self.LIGHT_OFFSETS, key=lambda offset: -sum(map(abs, offset))):
+            nearest[sampled(light, dx, dy, dz)] = abs(dx) + abs(dy) + abs(dz)
+
+        light_levels = np.where(
+            sampled(light) | open_sky,
+            15,
+            np.where(nearest >= 0, np.maximum(1, 15 - nearest), np.where(sampled(plain_air), 8, 5)),
+        ).astype(np.int16)
+
+        dark_spots = [
+            {
+                "position": [min_x + int(i) * resolution, min_y + int(j) * resolution, min_z + int(k) * resolution],
+                "light_level": int(light_levels[i, j, k])
+            }
+            for i, j, k in zip(*np.nonzero(light_levels < 8))
+        ]
+        return light_levels.ravel(), dark_spots
+
     def _get_light_level(
         self,
         x: int,
@@ -515,7 +646,37 @@ class StructureValidator:
         min_z, max_z = min(z1, z2), max(z1, z2)
 
         logger.info(f"Validating structure integrity for ({min_x},{min_y},{min_z}) to ({max_x},{max_y},{max_z})")
+        sync_world(self.rcon)
 
+        bounds = (min_x, min_y, min_z, max_x, max_y, max_z)
+        # One block of margin for the neighbours (none needed above)
+        region = self.rcon.region_files.read_box(Box(min_x - 1, min_y - 1, min_z - 1, max_x + 1, max_y, max_z + 1))
+        if region is not None:
+            total_blocks, gravity_violations, floating_blocks = self._find_issues_local(region, bounds, resolution)
+        else:
+            total_blocks, gravity_violations, floating_blocks = self._find_issues_queried(bounds, resolution)
+
+        # Combine all issues
+        all_issues = gravity_violations + floating_blocks
+        structure_valid = len(all_issues) == 0
+
+        logger.info(f"Validation complete: {total_blocks} blocks checked, {len(all_issues)} issues found")
+
+        return {
+            "structure_valid": structure_valid,
+            "total_blocks_checked": total_blocks,
+            "issues_found": len(all_issues),
+            "gravity_violations": gravity_violations,
+            "floating_blocks": floating_blocks[:20],  # First 20
+            "total_floating": len(floating_blocks),
+            "summary": self._generate_validation_summary(structure_valid, len(all_issues))
+        }
+
+    def _find_issues_queried(
+        self, bounds: Tuple[int, ...], resolution: int
+    ) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Gravity and floating-block checks, querying blocks one at a time."""
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
         floating_blocks = []
         gravity_violations = []
         total_blocks = 0
@@ -567,21 +728,63 @@ class StructureValidator:
                                 "recommendation": "Connect to main structure or add supports"
                             })
 
-        # Combine all issues
-        all_issues = gravity_violations + floating_blocks
-        structure_valid = len(all_issues) == 0
-
-        logger.info(f"Validation complete: {total_blocks} blocks checked, {len(all_issues)} issues found")
-
-        return {
-            "structure_valid": structure_valid,
-            "total_blocks_checked": total_blocks,
-            "issues_found": len(all_issues),
-            "gravity_violations": gravity_violations,
-            "floating_blocks": floating_blocks[:20],  # First 20
-            "total_floating": len(floating_blocks),
-            "summary": self._generate_validation_summary(structure_valid, len(all_issues))
-        }
+        return total_blocks, gravity_violations, floating_blocks
+
+    def _find_issues_local(
+        self, region: BlockRegion, bounds: Tuple[int, ...], resolution: int
+    ) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Gravity and floating-block checks over a region read in bulk, as arrays."""
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
+        blocks = [block_from_state(state) for state in region.palette]
+        air = np.array([block_is_air(block) for block in blocks])[region.indices]
+        falls = np.array([block["id"] in self.GRAVITY_BLOCKS for block in blocks])[region.indices]
+
+        # The region starts one block below and beside the bounds
+        def sampled(array: np.ndarray, dx: int = 0, dy: int = 0, dz: int = 0) -> np.ndarray:
+            return array[
+                1 + dx:max_x - min_x + 2 + dx:resolution,
+                1 + dy:max_y - min_y + 2 + dy:resolution,
+                1 + dz:max_z - min_z + 2 + dz:resolution,
+            ]
+
+        solid = ~sampled(air)
+        unsupported = solid & sampled(falls) & sampled(air, dy=-1)
+        isolated = (
+            solid & sampled(air, dy=-1)
+            & sampled(air, dx=1) & sampled(air, dx=-1) & sampled(air, dz=1) & sampled(air, dz=-1)
+        )
+        isolated[:, 0, :] = False  # Skip bottom layer
+
+        def issues(mask: np.ndarray) -> List[Tuple[List[int], str]]:
+            return [
+                (
+                    [min_x + int(i) * resolution, min_y + int(j) * resolution, min_z + int(k) * resolution],
+                    blocks[region.indices[1 + i * resolution, 1 + j * resolution, 1 + k * resolution]]["key"],
+                )
+                for i, j, k in zip(*np.nonzero(mask))
+            ]
+
+        gravity_violations = [
+            {
+                "position": position,
+                "block": key,
+                "issue": f"No support below (air at Y={position[1] - 1})",
+                "severity": "HIGH",
+                "recommendation": "Add support column or replace with non-gravity block"
+            }
+            for position, key in issues(unsupported)
+        ]
+        floating_blocks = [
+            {
+                "position": position,
+                "block": key,
+                "issue": "No adjacent solid blocks detected",
+                "severity": "MEDIUM",
+                "recommendation": "Connect to main structure or add supports"
+            }
+            for position, key in issues(isolated)
+        ]
+        return int(np.count_nonzero(solid)), gravity_violations, floating_blocks
 
     def _generate_validation_summary(self, valid: bool, issue_count: int) -> str:
         """Generate natural language summary of validation."""
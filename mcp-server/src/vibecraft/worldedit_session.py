@@ -0,0 +1,169 @@
+"""
+WorldEdit Console Session Tracking
+
+WorldEdit keeps ONE session for the RCON console actor: its selection and
+world override persist between commands and across RCON connections.
+VibeCraft's analyzers and generators re-send ``//pos1``/``//pos2`` before
+almost every ``//count``/``//distr``, usually with the coordinates that are
+already selected. Mirroring the session here lets RCONManager skip those
+no-op commands.
+
+Commands are seen in the form sent to the server, where WorldEdit commands
+carry one leading slash ("/pos1 1,2,3", "/set stone") and vanilla commands
+none ("setblock ...").
+"""
+
+import re
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+Position = Tuple[int, int, int]
+
+_POS_RE = re.compile(r"^pos([12])\s+(-?\d+)\s*,\s*(-?\d+)\s*,\s*(-?\d+)$", re.IGNORECASE)
+
+# WorldEdit commands that can move or replace the console selection.
+# move/stack/paste only do so with -s; treating them as changing it anyway
+# costs at most one extra //pos1 / //pos2 later.
+SELECTION_COMMANDS = frozenset({
+    "pos", "pos1", "pos2", "hpos1", "hpos2", "chunk", "expand", "contract",
+    "shift", "outset", "inset", "sel", "desel", "deselect", ";", "world",
+    "move", "stack", "paste",
+})
+
+
+class Box(NamedTuple):
+    """Inclusive cuboid given by two corners (any order)."""
+
+    x1: int
+    y1: int
+    z1: int
+    x2: int
+    y2: int
+    z2: int
+
+    @property
+    def pos1(self) -> Position:
+        return (self.x1, self.y1, self.z1)
+
+    @property
+    def pos2(self) -> Position:
+        return (self.x2, self.y2, self.z2)
+
+
+def volume(box: Box) -> int:
+    """Number of blocks in a box."""
+    return (abs(box.x2 - box.x1) + 1) * (abs(box.y2 - box.y1) + 1) * (abs(box.z2 - box.z1) + 1)
+
+
+def worldedit_command_name(command: str) -> Optional[str]:
+    """Name of a WorldEdit command as sent to the server ("/pos1 ..." -> "pos1"), else None."""
+    command = command.strip()
+    if not command.startswith("/"):
+        return None
+    parts = command.lstrip("/").split(None, 1)
+    return parts[0].lower() if parts else None
+
+
+class WorldEditSessionState:
+    """
+    Last known selection corners and world of the console WorldEdit session.
+
+    ``None`` means unknown. Anything that might have changed the session
+    without VibeCraft seeing the outcome (a failed command, a reconnect, an
+    arbitrary raw command) resets the affected fields.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pos1: Optional[Position] = None
+        self.pos2: Optional[Position] = None
+        self.world: Optional[str] = None
+
+    def invalidate(self) -> None:
+        """Forget everything (e.g. after a connection error)."""
+        with self._lock:
+            self.pos1 = self.pos2 = None
+            self.world = None
+
+    def invalidate_selection(self) -> None:
+        with self._lock:
+            self.pos1 = self.pos2 = None
+
+    def selection(self) -> Optional[Box]:
+        """The tracked cuboid selection, or None if a corner is unknown."""
+        with self._lock:
+            if self.pos1 is None or self.pos2 is None:
+                return None
+            return Box(*self.pos1, *self.pos2)
+
+    def cached_response(self, command: str) -> Optional[str]:
+        """
+        Response to return instead of sending ``command``, if it is a no-op
+        against the tracked state; otherwise None.
+        """
+        position = self._parse_position(command)
+        if position is None:
+            return None
+        index, point = position
+        with self._lock:
+            current = self.pos1 if index == 1 else self.pos2
+        if current != point:
+            return None
+        label = "First" if index == 1 else "Second"
+        return f"{label} position already set to ({point[0]}, {point[1]}, {point[2]})."
+
+    def observe(self, command: str, response: Optional[str], trusted: bool = True) -> None:
+        """
+        Update the state after ``command`` ran and returned ``response``.
+
+        Args:
+            trusted: False for arbitrary user commands (the raw rcon_command
+                tool): any WorldEdit command other than a plain //pos1,
+                //pos2 or //world then clears the selection, since aliases or
+                unfamiliar commands may have moved it.
+        """
+        name = worldedit_command_name(command)
+        if name is None:
+            return
+
+        succeeded = bool(response) and _looks_successful(response)
+
+        position = self._parse_position(command)
+        if position is not None:
+            index, point = position
+            with self._lock:
+                value = point if succeeded else None
+                if index == 1:
+                    self.pos1 = value
+                else:
+                    self.pos2 = value
+            return
+
+        if name == "world":
+            args = command.strip().lstrip("/").split(None, 1)
+            world = args[1].strip() if len(args) > 1 else None
+            with self._lock:
+                new_world = world if succeeded else None
+                if new_world != self.world:
+                    # The selection belongs to the previous world
+                    self.pos1 = self.pos2 = None
+                self.world = new_world
+            return
+
+        if name in SELECTION_COMMANDS or not trusted:
+            self.invalidate_selection()
+
+    @staticmethod
+    def _parse_position(command: str) -> Optional[Tuple[int, Position]]:
+        if worldedit_command_name(command) not in ("pos1", "pos2"):
+            return None
+        match = _POS_RE.match(command.strip().lstrip("/"))
+        if not match:
+            return None
+        point = (int(match.group(2)), int(match.group(3)), int(match.group(4)))
+        return int(match.group(1)), point
+
+
+def _looks_successful(response: str) -> bool:
+    lowered = response.lower()
+    return not any(word in lowered for word in ("error", "unknown", "invalid", "usage", "denied"))
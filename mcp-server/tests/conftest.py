@@ -1,13 +1,53 @@
 """
 Pytest configuration file.
 
-Adds the src/ directory to sys.path so tests can import vibecraft modules.
+Adds the src/ directory to sys.path so tests can import vibecraft modules,
+and provides the ``make_rcon`` fixture shared by the fake-server tests.
 """
 
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add src/ directory to Python path for imports
 src_dir = Path(__file__).resolve().parents[1] / "src"
 if str(src_dir) not in sys.path:
     sys.path.insert(0, str(src_dir))
+
+
+@pytest.fixture
+def make_rcon(tmp_path):
+    """
+    Factory for RCONManagers connected to a FakeMinecraftServer.
+
+    The data directory (with an empty ``world`` folder) and the build
+    journals live under ``tmp_path``; keyword arguments override config
+    fields. Managers are closed after the test.
+
+    Usage:
+        rcon = make_rcon(server, enable_function_batches=False)
+    """
+    from vibecraft.config import VibeCraftConfig
+    from vibecraft.rcon_manager import RCONManager
+
+    managers = []
+
+    def make(server, **overrides) -> RCONManager:
+        (tmp_path / "world").mkdir(exist_ok=True)
+        settings = {
+            "rcon_host": "127.0.0.1",
+            "rcon_port": server.port,
+            "rcon_password": server.password,
+            "rcon_timeout": 2,
+            "minecraft_data_dir": str(tmp_path),
+            "build_journal_dir": str(tmp_path / "journal"),
+        }
+        settings.update(overrides)
+        rcon = RCONManager(VibeCraftConfig(**settings))
+        managers.append(rcon)
+        return rcon
+
+    yield make
+    for rcon in managers:
+        rcon.close()
@@ -0,0 +1,1351 @@
+"""
+Fake Minecraft RCON Server
+
+A small stand-in for a Paper server with WorldEdit, holding a sparse voxel
+world in memory. It speaks the real RCON protocol (including multi-packet
+responses and the "Unknown request" reply VibeCraft uses as an end marker),
+so RCONManager, the analyzers and the build tools can be exercised and
+benchmarked without a live server.
+
+Supported commands (as sent over RCON - WorldEdit commands with one leading
+slash, vanilla commands without):
+
+    setblock, fill, data get block, data get/modify storage,
+    execute positioned [over]/as/if loaded/if block ... run, summon, kill,
+    list, time query, tick query, version WorldEdit, reload, function, forceload,
+    save-all
+    /pos1, /pos2, /world, /sel, /set, /count, /distr, /copy, /schem load,
+    /schem save, /paste
+
+Responses follow the wording of the real server closely enough for the
+parsers in VibeCraft; anything else gets an "Unknown or incomplete command"
+reply.
+
+Usage:
+    with FakeMinecraftServer(password="test", latency=0.002) as server:
+        config = VibeCraftConfig(rcon_host="127.0.0.1", rcon_port=server.port,
+                                 rcon_password="test")
+        ...
+
+    # Or as a separate process (from mcp-server/):
+    uv run python -m tests.support.fake_server --port 25575 --password test
+"""
+
+import argparse
+import io
+import logging
+import os
+import random
+import re
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import nbtlib
+
+from vibecraft.command_compiler import FILL_LIMIT
+from vibecraft.rcon_protocol import (
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_RESPONSE_VALUE,
+    RCONError,
+    decode_packet,
+    encode_packet,
+)
+from vibecraft.worldedit_session import Box, Position, volume
+
+logger = logging.getLogger(__name__)
+
+AIR = "minecraft:air"
+
+# The server reads requests into a fixed buffer; larger packets are dropped
+MAX_PACKET_SIZE = 1460
+
+# Minecraft splits responses into packets of at most this many characters
+DEFAULT_FRAGMENT_SIZE = 4096
+
+_BLOCK_ID_RE = re.compile(r"^[a-z0-9_.-]+:[a-z0-9_./-]+$")
+
+_BLOCK_ENTITY_IDS = frozenset({
+    "chest", "trapped_chest", "barrel", "furnace", "blast_furnace", "smoker", "hopper",
+    "dispenser", "dropper", "lectern", "brewing_stand", "beacon", "spawner", "jukebox",
+    "campfire", "soul_campfire", "chiseled_bookshelf", "decorated_pot", "ender_chest",
+    "enchanting_table", "bell", "conduit", "crafter", "vault", "trial_spawner",
+})
+_BLOCK_ENTITY_SUFFIXES = ("_sign", "shulker_box", "_bed", "_banner", "_head", "_skull")
+
+
+class CommandError(Exception):
+    """A command failed; the message is sent back as the response."""
+
+
+def normalize_block(text: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a block argument into a canonical state and optional NBT.
+
+    "oak_stairs[half=top,facing=north]{...}" ->
+        ("minecraft:oak_stairs[facing=north,half=top]", "{...}")
+    """
+    nbt = None
+    brace = text.find("{")
+    if brace != -1:
+        text, nbt = text[:brace], text[brace:]
+
+    properties = ""
+    bracket = text.find("[")
+    if bracket != -1:
+        if not text.endswith("]"):
+            raise CommandError(f"Unclosed block state properties: {text}")
+        text, properties = text[:bracket], text[bracket + 1:-1]
+
+    name = text.strip().lower()
+    if ":" not in name:
+        name = f"minecraft:{name}"
+    if not _BLOCK_ID_RE.match(name):
+        raise CommandError(f"Unknown block type '{name}'")
+
+    if properties.strip():
+        pairs = sorted(part.strip() for part in properties.split(",") if part.strip())
+        return f"{name}[{','.join(pairs)}]", nbt
+    return name, nbt
+
+
+def block_type(state: str) -> str:
+    """Block id of a state string ("minecraft:oak_stairs[...]" -> "minecraft:oak_stairs")."""
+    return state.split("[", 1)[0]
+
+
+def is_block_entity(state: str) -> bool:
+    name = block_type(state).split(":", 1)[1]
+    return name in _BLOCK_ENTITY_IDS or name.endswith(_BLOCK_ENTITY_SUFFIXES)
+
+
+def split_arguments(text: str) -> List[str]:
+    """Split on whitespace, keeping [...] / {...} / quoted parts together."""
+    args: List[str] = []
+    current: List[str] = []
+    depth = 0
+    quote: Optional[str] = None
+    for char in text:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+            current.append(char)
+        elif char in "[{":
+            depth += 1
+            current.append(char)
+        elif char in "]}":
+            depth -= 1
+            current.append(char)
+        elif char.isspace() and depth == 0:
+            if current:
+                args.append("".join(current))
+                current = []
+        else:
+            current.append(char)
+    if current:
+        args.append("".join(current))
+    return args
+
+
+def _box_bounds(box: Box) -> Tuple[int, int, int, int, int, int]:
+    return (
+        min(box.x1, box.x2), min(box.y1, box.y2), min(box.z1, box.z2),
+        max(box.x1, box.x2), max(box.y1, box.y2), max(box.z1, box.z2),
+    )
+
+
+class VoxelWorld:
+    """
+    Sparse block storage: only non-air blocks are kept.
+
+    Not thread-safe on its own; FakeMinecraftServer serialises access the
+    way the real server runs every command on its main thread.
+    """
+
+    def __init__(self, min_y: int = -64, max_y: int = 319):
+        self.min_y = min_y
+        self.max_y = max_y
+        self.blocks: Dict[Position, str] = {}
+        self.block_entities: Dict[Position, str] = {}
+
+    def get(self, position: Position) -> str:
+        return self.blocks.get(position, AIR)
+
+    def set(self, position: Position, state: str, nbt: Optional[str] = None) -> bool:
+        """Place a block; returns False if nothing changed."""
+        if not self.min_y <= position[1] <= self.max_y:
+            raise CommandError("Cannot place block outside of the world")
+        previous = self.blocks.get(position, AIR)
+        if state == AIR:
+            self.blocks.pop(position, None)
+        else:
+            self.blocks[position] = state
+        if state != AIR and is_block_entity(state):
+            entity = nbt or "{}"
+            changed_entity = self.block_entities.get(position) != entity
+            self.block_entities[position] = entity
+            return previous != state or changed_entity
+        self.block_entities.pop(position, None)
+        return previous != state
+
+    def surface(self, x: int, z: int, kind: str) -> int:
+        """First Y above the highest block of a column that heightmap ``kind`` counts."""
+        counted = HEIGHTMAP_COUNTS[kind]
+        for y in range(self.max_y, self.min_y - 1, -1):
+            state = self.blocks.get((x, y, z))
+            if state is not None and counted(state):
+                return y + 1
+        return self.min_y
+
+    def positions(self, box: Box) -> Iterator[Position]:
+        x1, y1, z1, x2, y2, z2 = _box_bounds(box)
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                for z in range(z1, z2 + 1):
+                    yield (x, y, z)
+
+    def counts(self, box: Box) -> Counter:
+        """Block state histogram of a region, air included."""
+        x1, y1, z1, x2, y2, z2 = _box_bounds(box)
+        size = volume(box)
+        counts: Counter = Counter()
+        if len(self.blocks) < size:
+            for (x, y, z), state in self.blocks.items():
+                if x1 <= x <= x2 and y1 <= y <= y2 and z1 <= z <= z2:
+                    counts[state] += 1
+        else:
+            for position in self.positions(box):
+                state = self.blocks.get(position)
+                if state is not None:
+                    counts[state] += 1
+        air = size - sum(counts.values())
+        if air:
+            counts[AIR] = air
+        return counts
+
+
+class FakeMinecraftServer:
+    """
+    Threaded RCON server backed by a VoxelWorld.
+
+    Args:
+        host / port: Listen address (port 0 picks a free port)
+        password: RCON password
+        world: Voxel world to serve (a new empty one by default)
+        latency: Seconds each command is delayed before it runs, simulating
+            network round trip and tick scheduling. Applied per connection,
+            so commands on different connections overlap.
+        fragment_size: Maximum characters per response packet
+        one_packet_per_read: Read the socket like vanilla and Paper do: one
+            read per packet, dropping the connection when a read does not
+            hold exactly one packet (e.g. two packets sent back to back)
+        world_name: Name accepted by WorldEdit's //world
+        worldedit_version: Version reported by "version WorldEdit"
+        world_dir: Folder whose datapacks/ are loaded by "reload", making
+            "function <namespace>:<name>" work; "save-all" writes the world
+            to region/ in it as Anvil region files
+        schematic_dir: Folder "//schem load" reads Sponge schematics from
+        seed: Seed for random WorldEdit patterns ("50%stone,50%dirt")
+        mspt: Milliseconds per tick reported by "tick query"
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: str = "vibecraft",
+        world: Optional[VoxelWorld] = None,
+        latency: float = 0.0,
+        fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+        one_packet_per_read: bool = False,
+        world_name: str = "world",
+        worldedit_version: str = "7.3.10",
+        world_dir: Optional[Path] = None,
+        schematic_dir: Optional[Path] = None,
+        seed: int = 0,
+        mspt: float = 2.0,
+    ):
+        self.host = host
+        self.requested_port = port
+        self.password = password
+        self.world = world if world is not None else VoxelWorld()
+        self.latency = latency
+        self.fragment_size = fragment_size
+        self.one_packet_per_read = one_packet_per_read
+        self.world_name = world_name
+        self.worldedit_version = worldedit_version
+        self.world_dir = Path(world_dir) if world_dir else None
+        self.schematic_dir = Path(schematic_dir) if schematic_dir else None
+        self.random = random.Random(seed)
+        self.mspt = mspt
+
+        # The console's WorldEdit session, shared by every connection
+        self.pos1: Optional[Position] = None
+        self.pos2: Optional[Position] = None
+        self.worldedit_world: Optional[str] = None
+        self.clipboard: Optional[Tuple[Position, List[Tuple[Position, str, Optional[str]]]]] = None
+
+        self.functions: Dict[str, List[str]] = {}
+        self.forced_chunks: Set[Tuple[int, int]] = set()
+        # Summoned entities ({"type", "pos", "tags"}) and command storage
+        self.entities: List[dict] = []
+        self.storage: Dict[str, Dict[str, list]] = {}
+        # Scoreboard objective -> score holder -> score
+        self.scores: Dict[str, Dict[str, int]] = {}
+        self._executor: Optional[dict] = None
+        self.stats: Counter = Counter()
+        self.command_names: Counter = Counter()
+
+        self._lock = threading.Lock()
+        self._clients: Set[socket.socket] = set()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._vanilla: Dict[str, Callable[[List[str], Position], str]] = {
+            "setblock": self._setblock,
+            "fill": self._fill,
+            "data": self._data,
+            "execute": self._execute,
+            "summon": self._summon,
+            "kill": self._kill,
+            "list": lambda args, origin: "There are 0 of a max of 20 players online: ",
+            "time": self._time,
+            "tick": self._tick,
+            "version": self._version,
+            "reload": self._reload,
+            "function": self._function,
+            "forceload": self._forceload,
+            "save-all": self._save_all,
+            "scoreboard": self._scoreboard,
+        }
+        self._worldedit: Dict[str, Callable[[List[str]], str]] = {
+            "pos1": lambda args: self._position(1, args),
+            "pos2": lambda args: self._position(2, args),
+            "world": self._world,
+            "sel": self._sel,
+            "set": self._set,
+            "count": self._count,
+            "distr": self._distr,
+            "schem": self._schem,
+            "schematic": self._schem,
+            "paste": self._paste,
+            "copy": self._copy,
+            "clearclipboard": self._clear_clipboard,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            raise RuntimeError("Fake server is not running")
+        return self._server.server_address[1]
+
+    def start(self) -> "FakeMinecraftServer":
+        fake = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                fake.serve_client(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((self.host, self.requested_port), Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-rcon",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Fake RCON server listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.drop_connections()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def drop_connections(self) -> None:
+        """Close every open client connection (simulates a dropped link or a restart)."""
+        with self._lock:
+            clients = list(self._clients)
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "FakeMinecraftServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+            self.command_names.clear()
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+
+    def serve_client(self, sock: socket.socket) -> None:
+        """Serve one RCON connection until the client disconnects."""
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._lock:
+            self._clients.add(sock)
+        authenticated = False
+        try:
+            while True:
+                payload = self._read_request(sock)
+                if payload is None:
+                    return
+                request_id, packet_type, body = decode_packet(payload)
+                self._record(packets_in=1, bytes_in=4 + len(payload))
+
+                if packet_type == SERVERDATA_AUTH:
+                    authenticated = body == self.password
+                    reply_id = request_id if authenticated else -1
+                    self._send(sock, reply_id, SERVERDATA_AUTH_RESPONSE, "")
+                elif not authenticated:
+                    return
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    if self.latency:
+                        time.sleep(self.latency)
+                    response = self.execute(body)
+                    size = max(1, self.fragment_size)
+                    for start in range(0, max(len(response), 1), size):
+                        self._send(
+                            sock, request_id, SERVERDATA_RESPONSE_VALUE,
+                            response[start:start + size],
+                        )
+                else:
+                    self._send(
+                        sock, request_id, SERVERDATA_RESPONSE_VALUE,
+                        f"Unknown request {packet_type:x}",
+                    )
+        except (OSError, RCONError):
+            return
+        finally:
+            with self._lock:
+                self._clients.discard(sock)
+            sock.close()
+
+    def _read_request(self, sock: socket.socket) -> Optional[bytes]:
+        """Payload of the next packet, or None when the connection should close."""
+        if self.one_packet_per_read:
+            data = sock.recv(4 + MAX_PACKET_SIZE)
+            if len(data) < 4:
+                return None
+            (length,) = struct.unpack("<i", data[:4])
+            if length != len(data) - 4:
+                self._record(dropped_reads=1)
+                return None
+            return data[4:]
+
+        header = _recv_exact(sock, 4)
+        if header is None:
+            return None
+        (length,) = struct.unpack("<i", header)
+        if length > MAX_PACKET_SIZE:
+            return None
+        return _recv_exact(sock, length)
+
+    def _send(self, sock: socket.socket, request_id: int, packet_type: int, body: str) -> None:
+        packet = encode_packet(request_id, packet_type, body)
+        sock.sendall(packet)
+        self._record(packets_out=1, bytes_out=len(packet))
+
+    def _record(self, **amounts: int) -> None:
+        with self._lock:
+            self.stats.update(amounts)
+
+    # ------------------------------------------------------------------
+    # Command dispatch
+    # ------------------------------------------------------------------
+
+    def execute(self, command: str) -> str:
+        """Run one command (as received over RCON) and return its response."""
+        with self._lock:
+            self.stats["commands"] += 1
+            try:
+                return self._dispatch(command.strip(), (0, 0, 0), count=True)
+            except CommandError as e:
+                return str(e)
+
+    def _dispatch(self, command: str, origin: Position, count: bool = False) -> str:
+        if command.startswith("/"):
+            args = split_arguments(command[1:])
+            name = args[0].lower() if args else ""
+            if count:
+                self.command_names[f"/{name}"] += 1
+            handler = self._worldedit.get(name)
+            if handler is None:
+                raise CommandError(f"Unknown command. Type \"/help\" for help. (/{name})")
+            return handler(args[1:])
+
+        args = split_arguments(command)
+        name = args[0].lower() if args else ""
+        if name.startswith("minecraft:"):
+            name = name[len("minecraft:"):]
+        if count:
+            self.command_names[name] += 1
+        handler = self._vanilla.get(name)
+        if handler is None:
+            raise CommandError(
+                f"Unknown or incomplete command, see below for error\n{command}<--[HERE]"
+            )
+        return handler(args[1:], origin)
+
+    # ------------------------------------------------------------------
+    # Vanilla commands
+    # ------------------------------------------------------------------
+
+    def _setblock(self, args: List[str], origin: Position) -> str:
+        if len(args) < 4:
+            raise CommandError("Incorrect argument for command")
+        position = _parse_position(args[:3], origin)
+        state, nbt = normalize_block(args[3])
+        mode = args[4].lower() if len(args) > 4 else "replace"
+        if mode == "keep" and self.world.get(position) != AIR:
+            raise CommandError("Could not set the block")
+        if not self.world.set(position, state, nbt):
+            raise CommandError("Could not set the block")
+        return f"Changed the block at {position[0]}, {position[1]}, {position[2]}"
+
+    def _fill(self, args: List[str], origin: Position) -> str:
+        if len(args) < 7:
+            raise CommandError("Incorrect argument for command")
+        corner1 = _parse_position(args[0:3], origin)
+        corner2 = _parse_position(args[3:6], origin)
+        box = Box(*corner1, *corner2)
+        size = volume(box)
+        if size > FILL_LIMIT:
+            raise CommandError(
+                f"Too many blocks in the specified area (maximum {FILL_LIMIT}, specified {size})"
+            )
+
+        state, nbt = normalize_block(args[6])
+        mode = args[7].lower() if len(args) > 7 else "replace"
+        replace_filter = None
+        if mode == "replace" and len(args) > 8:
+            replace_filter = _Mask(args[8])
+
+        x1, y1, z1, x2, y2, z2 = _box_bounds(box)
+        changed = 0
+        for position in self.world.positions(box):
+            target = state
+            current = self.world.get(position)
+            edge = (
+                position[0] in (x1, x2) or position[1] in (y1, y2) or position[2] in (z1, z2)
+            )
+            if mode == "keep" and current != AIR:
+                continue
+            if mode == "outline" and not edge:
+                continue
+            if mode == "hollow" and not edge:
+                target = AIR
+            if replace_filter is not None and not replace_filter.matches(current):
+                continue
+            if self.world.set(position, target, nbt):
+                changed += 1
+
+        if not changed:
+            raise CommandError("No blocks were filled")
+        return f"Successfully filled {changed} block(s)"
+
+    def _data(self, args: List[str], origin: Position) -> str:
+        if len(args) > 2 and args[1].lower() == "storage":
+            return self._data_storage(args)
+        if len(args) < 5 or args[0].lower() != "get" or args[1].lower() != "block":
+            raise CommandError("Incorrect argument for command")
+        position = _parse_position(args[2:5], origin)
+        state = self.world.get(position)
+        if position not in self.world.block_entities:
+            raise CommandError("The target block is not a block entity")
+
+        x, y, z = position
+        block_id = block_type(state)
+        path = args[5] if len(args) > 5 else None
+        if path is None:
+            extra = self.world.block_entities[position].strip()[1:-1].strip()
+            fields = f"x: {x}, y: {y}, z: {z}, id: \"{block_id}\""
+            if extra:
+                fields += f", {extra}"
+            value = "{" + fields + "}"
+        elif path in ("x", "y", "z"):
+            value = str(dict(zip("xyz", position))[path])
+        elif path == "id":
+            value = f"\"{block_id}\""
+        else:
+            raise CommandError(f"Found no elements matching {path}")
+        return f"{x}, {y}, {z} has the following block data: {value}"
+
+    def _data_storage(self, args: List[str]) -> str:
+        action, storage_id = args[0].lower(), args[2]
+        storage = self.storage.setdefault(storage_id, {})
+        path = args[3] if len(args) > 3 else None
+        if action == "get" and path is not None:
+            if path not in storage:
+                raise CommandError(f"Found no elements matching {path}")
+            return f"Storage {storage_id} has the following contents: {_snbt(storage[path])}"
+        if action == "remove" and path is not None:
+            if storage.pop(path, None) is None:
+                raise CommandError(f"Found no elements matching {path}")
+            return f"Modified storage {storage_id}"
+        if action == "modify" and args[4:7] == ["set", "value", "[]"]:
+            storage[path] = []
+            return f"Modified storage {storage_id}"
+        if action == "modify" and args[4:7] == ["append", "from", "entity"] and len(args) == 9:
+            entity = self._executor if args[7] == "@s" else next(iter(self._select(args[7])), None)
+            if entity is None or args[8] != "Pos":
+                raise CommandError("No entity was found")
+            storage.setdefault(path, []).append(list(entity["pos"]))
+            return f"Modified storage {storage_id}"
+        raise CommandError("Incorrect argument for command")
+
+    def _summon(self, args: List[str], origin: Position) -> str:
+        if not args:
+            raise CommandError("Incorrect argument for command")
+        x, y, z = _parse_position(args[1:4], origin) if len(args) > 3 else origin
+        tags = re.search(r"Tags:\[([^\]]*)\]", args[4]) if len(args) > 4 else None
+        self.entities.append({
+            "type": args[0] if ":" in args[0] else f"minecraft:{args[0]}",
+            # Block positions stand for the block's centre, as in execute positioned
+            "pos": (x + 0.5, float(y), z + 0.5),
+            "tags": set(re.findall(r"\"([^\"]*)\"", tags.group(1))) if tags else set(),
+        })
+        return f"Summoned new {args[0].split(':')[-1].title()}"
+
+    def _kill(self, args: List[str], origin: Position) -> str:
+        targets = self._select(args[0]) if args else []
+        if not targets:
+            raise CommandError("No entity was found")
+        self.entities = [entity for entity in self.entities if entity not in targets]
+        return f"Killed {len(targets)} entities"
+
+    def _select(self, selector: str) -> List[dict]:
+        """Entities matched by "@e[type=...,tag=...]" (or "@s")."""
+        if selector == "@s":
+            return [self._executor] if self._executor is not None else []
+        match = re.fullmatch(r"@e(?:\[(.*)\])?", selector)
+        if not match:
+            raise CommandError(f"Invalid entity selector: {selector}")
+        targets = self.entities
+        for option in filter(None, (match.group(1) or "").split(",")):
+            key, _, value = option.partition("=")
+            if key == "type":
+                kind = value if ":" in value else f"minecraft:{value}"
+                targets = [entity for entity in targets if entity["type"] == kind]
+            elif key == "tag":
+                targets = [entity for entity in targets if value in entity["tags"]]
+        return list(targets)
+
+    def _execute(self, args: List[str], origin: Position) -> str:
+        position = origin
+        # "store success score <holder> <objective>" targets
+        stores: List[Tuple[str, str]] = []
+        index = 0
+        while index < len(args):
+            keyword = args[index].lower()
+            if keyword == "store" and args[index + 1:index + 3] == ["success", "score"] \
+                    and index + 4 < len(args):
+                self._objective(args[index + 4])
+                stores.append((args[index + 3], args[index + 4]))
+                index += 5
+            elif keyword in ("if", "unless") and args[index + 1:index + 2] == ["score"] \
+                    and args[index + 4:index + 5] == ["matches"] and index + 5 < len(args):
+                score = self._objective(args[index + 3]).get(args[index + 2])
+                passed = (score is not None and score == int(args[index + 5])) == (keyword == "if")
+                index += 6
+                if index == len(args):
+                    return "Test passed" if passed else "Test failed"
+                if not passed:
+                    raise CommandError("Test failed")
+            elif keyword == "positioned" and args[index + 1:index + 2] == ["over"] and index + 2 < len(args):
+                kind = args[index + 2].upper()
+                if kind not in HEIGHTMAP_COUNTS:
+                    raise CommandError(f"Invalid heightmap type: {args[index + 2]}")
+                position = (position[0], self.world.surface(position[0], position[2], kind), position[2])
+                index += 3
+            elif keyword == "as" and index + 1 < len(args):
+                targets = self._select(args[index + 1])
+                if not targets:
+                    raise CommandError("No entity was found")
+                previous = self._executor
+                try:
+                    for entity in targets:
+                        self._executor = entity
+                        response = self._execute(args[index + 2:], position)
+                finally:
+                    self._executor = previous
+                return response
+            elif keyword == "positioned" and index + 3 < len(args):
+                position = _parse_position(args[index + 1:index + 4], position)
+                index += 4
+            elif keyword in ("if", "unless") and args[index + 1:index + 2] == ["loaded"] \
+                    and index + 4 < len(args):
+                # Every position in the voxel world counts as loaded
+                _parse_position(args[index + 2:index + 5], position)
+                passed = keyword == "if"
+                index += 5
+                if index == len(args):
+                    return "Test passed" if passed else "Test failed"
+                if not passed:
+                    raise CommandError("Test failed")
+            elif keyword in ("if", "unless") and args[index + 1:index + 2] == ["block"] \
+                    and index + 5 < len(args):
+                target = _parse_position(args[index + 2:index + 5], position)
+                block, _ = normalize_block(args[index + 5])
+                passed = _block_matches(block, self.world.get(target)) == (keyword == "if")
+                index += 6
+                if index == len(args):
+                    return "Test passed" if passed else "Test failed"
+                if not passed:
+                    raise CommandError("Test failed")
+            elif keyword == "run" and index + 1 < len(args):
+                try:
+                    response = self._dispatch(" ".join(args[index + 1:]), position)
+                except CommandError:
+                    for holder, objective in stores:
+                        self.scores[objective][holder] = 0
+                    raise
+                for holder, objective in stores:
+                    self.scores[objective][holder] = 1
+                return response
+            else:
+                raise CommandError(
+                    f"Unknown or incomplete command, see below for error\n"
+                    f"execute {' '.join(args[index:])}<--[HERE]"
+                )
+        raise CommandError("Unknown or incomplete command, see below for error")
+
+    def _objective(self, name: str) -> Dict[str, int]:
+        if name not in self.scores:
+            raise CommandError(f"Unknown scoreboard objective '{name}'")
+        return self.scores[name]
+
+    def _scoreboard(self, args: List[str], origin: Position) -> str:
+        if args[:2] == ["objectives", "add"] and len(args) >= 4:
+            if args[2] in self.scores:
+                raise CommandError("An objective already exists by that name")
+            self.scores[args[2]] = {}
+            return f"Created new objective [{args[2]}]"
+        if args[:1] != ["players"] or len(args) < 4:
+            raise CommandError("Incorrect argument for command")
+        action, holder = args[1], args[2]
+        scores = self._objective(args[3])
+        if action == "get":
+            if holder not in scores:
+                raise CommandError(f"Can't get value of {args[3]} for {holder}; none is set")
+            return f"{holder} has {scores[holder]} [{args[3]}]"
+        if action in ("set", "add") and len(args) == 5:
+            base = scores.get(holder, 0) if action == "add" else 0
+            scores[holder] = base + int(args[4])
+            return f"Set [{args[3]}] for {holder} to {scores[holder]}"
+        raise CommandError("Incorrect argument for command")
+
+    def _time(self, args: List[str], origin: Position) -> str:
+        if args[:1] != ["query"]:
+            raise CommandError("Incorrect argument for command")
+        return "The time is 1000"
+
+    def _tick(self, args: List[str], origin: Position) -> str:
+        if args[:1] != ["query"]:
+            raise CommandError("Incorrect argument for command")
+        return (
+            "The game is running normally\n"
+            "Target tick rate: 20.0 per second.\n"
+            f"Average time per tick: {self.mspt:.1f}ms (Target: 50.0ms)"
+        )
+
+    def _version(self, args: List[str], origin: Position) -> str:
+        if args and args[0].lower() == "worldedit":
+            return f"WorldEdit version {self.worldedit_version}"
+        return "This server is running Paper version 1.21.4 (Implementing API version 1.21.4)"
+
+    def _reload(self, args: List[str], origin: Position) -> str:
+        self.functions = {}
+        if self.world_dir is not None:
+            for path in sorted(self.world_dir.glob("datapacks/*/data/*/function*/**/*.mcfunction")):
+                # <pack>/data/<namespace>/function(s)/<name>.mcfunction
+                parts = path.relative_to(self.world_dir / "datapacks").parts
+                namespace = parts[2]
+                name = "/".join(parts[4:])[:-len(".mcfunction")]
+                lines = path.read_text(encoding="utf-8").splitlines()
+                lines = [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+                # A line the parser rejects keeps the whole function from loading
+                if all(self._parses(line) for line in lines):
+                    self.functions[f"{namespace}:{name}"] = lines
+        return "Reloading!"
+
+    def _parses(self, command: str) -> bool:
+        name = command.split(" ", 1)[0].lower()
+        if name.startswith("minecraft:"):
+            name = name[len("minecraft:"):]
+        if name == "execute" and " run " in command:
+            return self._parses(command.split(" run ", 1)[1])
+        return name in self._vanilla
+
+    def _function(self, args: List[str], origin: Position) -> str:
+        if not args:
+            raise CommandError("Incorrect argument for command")
+        function_id = args[0] if ":" in args[0] else f"minecraft:{args[0]}"
+        lines = self.functions.get(function_id)
+        if lines is None:
+            raise CommandError(f"Unknown function {function_id}")
+        for line in lines:
+            try:
+                self._dispatch(line, origin)
+            except CommandError:
+                pass
+        return f"Executed {len(lines)} command(s) from function '{function_id}'"
+
+    def _save_all(self, args: List[str], origin: Position) -> str:
+        if self.world_dir is not None:
+            _write_region_files(self.world_dir / "region", self.world)
+        return "Saving the game (this may take a moment!)\nSaved the game"
+
+    def _forceload(self, args: List[str], origin: Position) -> str:
+        action = args[0].lower() if args else ""
+        dimension = "minecraft:overworld"
+        if action == "query" and len(args) == 1:
+            if not self.forced_chunks:
+                return f"No force loaded chunks were found in {dimension}"
+            listed = ", ".join(f"[{x}, {z}]" for x, z in sorted(self.forced_chunks))
+            return f"{len(self.forced_chunks)} force loaded chunks were found in {dimension} at: {listed}"
+        if action == "remove" and args[1:2] == ["all"]:
+            self.forced_chunks.clear()
+            return f"Unmarked all force loaded chunks in {dimension}"
+        if action not in ("add", "remove") or len(args) not in (3, 5):
+            raise CommandError("Incorrect argument for command")
+
+        corners = [int(float(value)) // 16 for value in args[1:]]
+        x1, z1 = corners[0], corners[1]
+        x2, z2 = (corners[2], corners[3]) if len(corners) == 4 else (x1, z1)
+        chunks = {
+            (x, z)
+            for x in range(min(x1, x2), max(x1, x2) + 1)
+            for z in range(min(z1, z2), max(z1, z2) + 1)
+        }
+        if len(chunks) > 256:
+            raise CommandError(
+                f"Too many chunks in the specified area (maximum 256, specified {len(chunks)})"
+            )
+        if action == "add":
+            changed = chunks - self.forced_chunks
+            self.forced_chunks |= changed
+            verb, suffix = "Marked", "to be force loaded"
+        else:
+            changed = chunks & self.forced_chunks
+            self.forced_chunks -= changed
+            verb, suffix = "Unmarked", "for force loading"
+        if not changed:
+            raise CommandError(
+                "No chunks were marked for force loading" if action == "add"
+                else "No chunks were removed from force loading"
+            )
+        if len(chunks) == 1:
+            return f"{verb} chunk [{x1}, {z1}] in {dimension} {suffix}"
+        return f"{verb} {len(chunks)} chunks in {dimension} from [{x1}, {z1}] to [{x2}, {z2}] {suffix}"
+
+    # ------------------------------------------------------------------
+    # WorldEdit commands
+    # ------------------------------------------------------------------
+
+    def _position(self, index: int, args: List[str]) -> str:
+        if not args:
+            raise CommandError("You must provide coordinates as the console.")
+        parts = [part for part in re.split(r"[\s,]+", " ".join(args)) if part]
+        try:
+            point = tuple(int(part) for part in parts)
+        except ValueError:
+            raise CommandError(f"Invalid coordinates: {' '.join(args)}")
+        if len(point) != 3:
+            raise CommandError(f"Invalid coordinates: {' '.join(args)}")
+
+        if index == 1:
+            self.pos1 = point
+        else:
+            self.pos2 = point
+        label = "First" if index == 1 else "Second"
+        text = f"{label} position set to ({point[0]}, {point[1]}, {point[2]})"
+        if self.pos1 is not None and self.pos2 is not None:
+            text += f" ({volume(Box(*self.pos1, *self.pos2))})"
+        return text + "."
+
+    def _world(self, args: List[str]) -> str:
+        if not args:
+            self.worldedit_world = None
+            return "Removed the world override."
+        if args[0] != self.world_name:
+            raise CommandError(f"Unknown world: {args[0]}")
+        self.worldedit_world = args[0]
+        return f"Set the world override to {args[0]}. (Use //world to go back to default)"
+
+    def _sel(self, args: List[str]) -> str:
+        self.pos1 = self.pos2 = None
+        if not args:
+            return "Selection cleared."
+        if args[0].lower() != "cuboid":
+            raise CommandError(f"Unknown selection type: {args[0]}")
+        return "Cuboid: left click for point 1, right click for point 2"
+
+    def _selection(self) -> Box:
+        if self.pos1 is None or self.pos2 is None:
+            raise CommandError("Make a region selection first.")
+        return Box(*self.pos1, *self.pos2)
+
+    def _set(self, args: List[str]) -> str:
+        if not args:
+            raise CommandError("Usage: //set <pattern>")
+        box = self._selection()
+        choose = self._pattern(args[0])
+        affected = 0
+        for position in self.world.positions(box):
+            state, nbt = choose()
+            self.world.set(position, state, nbt)
+            affected += 1
+        return f"Operation completed ({affected} blocks affected)."
+
+    def _count(self, args: List[str]) -> str:
+        if not args:
+            raise CommandError("Usage: //count <mask>")
+        box = self._selection()
+        mask = _Mask(" ".join(args))
+        total = sum(n for state, n in self.world.counts(box).items() if mask.matches(state))
+        return f"Counted: {total} blocks"
+
+    def _distr(self, args: List[str]) -> str:
+        box = self._selection()
+        separate_states = "-d" in args
+        counts: Counter = Counter()
+        for state, n in self.world.counts(box).items():
+            counts[state if separate_states else block_type(state)] += n
+        total = sum(counts.values())
+        lines = [f"# total blocks: {total}"]
+        for name, n in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+            lines.append(f"{n / total * 100:.3f}% {name} ({n})")
+        return "\n".join(lines)
+
+    def _copy(self, args: List[str]) -> str:
+        box = self._selection()
+        x1, y1, z1, x2, y2, z2 = _box_bounds(box)
+        blocks = [
+            ((x - x1, y - y1, z - z1), self.world.get((x, y, z)), self.world.block_entities.get((x, y, z)))
+            for x, y, z in self.world.positions(box)
+        ]
+        self.clipboard = ((x1, y1, z1), blocks)
+        return f"{len(blocks)} block(s) were copied."
+
+    def _clear_clipboard(self, args: List[str]) -> str:
+        self.clipboard = None
+        return "Clipboard cleared."
+
+    def _schem(self, args: List[str]) -> str:
+        action = args[0].lower() if args else ""
+        names = [arg for arg in args[1:] if not arg.startswith("-")]
+        if action not in ("load", "save") or not names:
+            raise CommandError("Usage: //schem <load|save> <filename> [format]")
+        name = names[0]
+        path = self.schematic_dir / name if self.schematic_dir else None
+        if path is not None and not path.suffix:
+            path = path.with_suffix(".schem")
+
+        if action == "save":
+            if self.clipboard is None:
+                raise CommandError("Your clipboard is empty. Use //copy first.")
+            if path is None:
+                raise CommandError("Schematic folder is not available")
+            if path.exists() and "-f" not in args:
+                raise CommandError("That schematic already exists. Use the -f flag to overwrite it.")
+            _write_sponge_schematic(path, *self.clipboard)
+            return f"{name} saved."
+
+        if path is None or not path.is_file():
+            raise CommandError(f"Schematic {name} does not exist!")
+        self.clipboard = _read_sponge_schematic(path)
+        return f"{name} loaded. Paste it with //paste"
+
+    def _paste(self, args: List[str]) -> str:
+        if self.clipboard is None:
+            raise CommandError("Your clipboard is empty. Use //copy first.")
+        flags = {flag for arg in args if arg.startswith("-") for flag in arg[1:]}
+        if "o" not in flags:
+            raise CommandError("The console has no position; paste with -o.")
+        (ox, oy, oz), blocks = self.clipboard
+        for (dx, dy, dz), state, nbt in blocks:
+            if "a" in flags and state == AIR:
+                continue
+            self.world.set((ox + dx, oy + dy, oz + dz), state, nbt)
+        self.pos1 = self.pos2 = None
+        return f"The clipboard has been pasted at ({ox}, {oy}, {oz})"
+
+    def _pattern(self, text: str) -> Callable[[], Tuple[str, Optional[str]]]:
+        """Parse a (possibly weighted random) WorldEdit pattern."""
+        choices: List[Tuple[str, Optional[str]]] = []
+        weights: List[float] = []
+        for part in split_arguments(text.replace(",", " ")):
+            weight = 1.0
+            match = re.match(r"^([\d.]+)%(.+)$", part)
+            if match:
+                weight, part = float(match.group(1)), match.group(2)
+            choices.append(normalize_block(part))
+            weights.append(weight)
+        if not choices:
+            raise CommandError(f"Invalid pattern: {text}")
+        if len(choices) == 1:
+            return lambda: choices[0]
+        return lambda: self.random.choices(choices, weights)[0]
+
+
+class _Mask:
+    """
+    WorldEdit-style block mask: space-separated terms are ANDed, comma-separated
+    blocks ORed, "!" negates, "#existing" matches anything but air. Blocks
+    without properties match every state of that block.
+    """
+
+    def __init__(self, text: str):
+        self.terms: List[Tuple[bool, List[str]]] = []
+        for term in split_arguments(text):
+            negate = term.startswith("!")
+            if negate:
+                term = term[1:]
+            blocks = []
+            for block in _split_top_level(term):
+                blocks.append("#existing" if block == "#existing" else normalize_block(block)[0])
+            self.terms.append((negate, blocks))
+
+    def matches(self, state: str) -> bool:
+        for negate, blocks in self.terms:
+            hit = any(_block_matches(block, state) for block in blocks)
+            if hit == negate:
+                return False
+        return True
+
+
+def _block_matches(block: str, state: str) -> bool:
+    if block == "#existing":
+        return state != AIR
+    if "[" in block:
+        wanted = set(block[block.index("[") + 1:-1].split(","))
+        have = set(state[state.index("[") + 1:-1].split(",")) if "[" in state else set()
+        return block_type(block) == block_type(state) and wanted <= have
+    return block == block_type(state)
+
+
+def _split_top_level(text: str) -> Iterable[str]:
+    """Split on commas outside [...]."""
+    parts, current, depth = [], [], 0
+    for char in text:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part]
+
+
+def _parse_position(tokens: List[str], origin: Position) -> Position:
+    if len(tokens) != 3:
+        raise CommandError("Incomplete (expected 3 coordinates)")
+    position = []
+    for token, base in zip(tokens, origin):
+        try:
+            if token.startswith("~"):
+                offset = token[1:]
+                position.append(base + (int(float(offset) // 1) if offset else 0))
+            elif token.startswith("^"):
+                raise CommandError("Local coordinates are not supported by the fake server")
+            else:
+                position.append(int(float(token) // 1))
+        except ValueError:
+            raise CommandError(f"Invalid position: {' '.join(tokens)}")
+    return (position[0], position[1], position[2])
+
+
+def _snbt(value) -> str:
+    """SNBT as printed by "data get" (numbers as doubles, lists in brackets)."""
+    if isinstance(value, list):
+        return "[" + ", ".join(_snbt(item) for item in value) + "]"
+    return f"{float(value)}d"
+
+
+def _read_sponge_schematic(path: Path) -> Tuple[Position, List[Tuple[Position, str, Optional[str]]]]:
+    """Read a Sponge v3 schematic into (minimum corner, [(offset, state, snbt)])."""
+    schematic = nbtlib.load(path)["Schematic"]
+    width, length = int(schematic["Width"]), int(schematic["Length"])
+    offset = [int(v) for v in schematic.get("Offset", [0, 0, 0])]
+    origin = [0, 0, 0]
+    worldedit = schematic.get("Metadata", {}).get("WorldEdit", {})
+    if "Origin" in worldedit:
+        origin = [int(v) for v in worldedit["Origin"]]
+    corner = (offset[0] + origin[0], offset[1] + origin[1], offset[2] + origin[2])
+
+    blocks_tag = schematic["Blocks"]
+    palette = {int(index): normalize_block(state)[0] for state, index in blocks_tag["Palette"].items()}
+    entities = {
+        tuple(int(v) for v in entity["Pos"]): entity.get("Data", nbtlib.Compound()).snbt()
+        for entity in blocks_tag.get("BlockEntities", [])
+    }
+
+    values: List[int] = []
+    value = shift = 0
+    for byte in blocks_tag["Data"].tobytes():
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+
+    blocks = []
+    for index, palette_id in enumerate(values):
+        x = index % width
+        z = (index // width) % length
+        y = index // (width * length)
+        position = (x, y, z)
+        blocks.append((position, palette[palette_id], entities.get(position)))
+    return corner, blocks
+
+
+def _write_sponge_schematic(
+    path: Path, corner: Position, blocks: List[Tuple[Position, str, Optional[str]]]
+) -> None:
+    """Write a clipboard as a Sponge v3 schematic (WorldEdit origin = minimum corner)."""
+    width = max(dx for (dx, _, _), _, _ in blocks) + 1
+    height = max(dy for (_, dy, _), _, _ in blocks) + 1
+    length = max(dz for (_, _, dz), _, _ in blocks) + 1
+    palette: Dict[str, int] = {}
+    values = [0] * (width * height * length)
+    entities = nbtlib.List[nbtlib.Compound]()
+    for (dx, dy, dz), state, nbt in blocks:
+        values[dx + dz * width + dy * width * length] = palette.setdefault(state, len(palette))
+        if nbt:
+            entities.append(nbtlib.Compound({
+                "Pos": nbtlib.IntArray([dx, dy, dz]),
+                "Id": nbtlib.String(block_type(state)),
+                "Data": nbtlib.parse_nbt(nbt),
+            }))
+
+    data = bytearray()
+    for value in values:
+        while value >= 0x80:
+            data.append((value & 0x7F) | 0x80)
+            value >>= 7
+        data.append(value)
+
+    schematic = nbtlib.Compound({
+        "Version": nbtlib.Int(3),
+        "DataVersion": nbtlib.Int(3953),
+        "Width": nbtlib.Short(width),
+        "Height": nbtlib.Short(height),
+        "Length": nbtlib.Short(length),
+        "Offset": nbtlib.IntArray([0, 0, 0]),
+        "Metadata": nbtlib.Compound({"WorldEdit": nbtlib.Compound({"Origin": nbtlib.IntArray(list(corner))})}),
+        "Blocks": nbtlib.Compound({
+            "Palette": nbtlib.Compound({state: nbtlib.Int(index) for state, index in palette.items()}),
+            "Data": nbtlib.ByteArray([byte - 256 if byte > 127 else byte for byte in data]),
+            "BlockEntities": entities,
+        }),
+    })
+    nbtlib.File({"Schematic": schematic}, gzipped=True).save(path)
+
+
+def _chunk_nbt(cx: int, cz: int, blocks: Dict[Position, str]) -> bytes:
+    """Serialized 1.18+ chunk NBT holding ``blocks`` (everything else air)."""
+    cells: Dict[int, Dict[int, str]] = {}
+    for (x, y, z), state in blocks.items():
+        cells.setdefault(y >> 4, {})[((y & 15) << 8) | ((z & 15) << 4) | (x & 15)] = state
+
+    sections = nbtlib.List[nbtlib.Compound]()
+    for section_y, states in sorted(cells.items()):
+        palette: Dict[str, int] = {AIR: 0}
+        values = [0] * 4096
+        for index, state in states.items():
+            values[index] = palette.setdefault(state, len(palette))
+        bits = max(4, (len(palette) - 1).bit_length())
+        per_long = 64 // bits
+        longs = [0] * -(-4096 // per_long)
+        for index, value in enumerate(values):
+            longs[index // per_long] |= value << ((index % per_long) * bits)
+
+        entries = nbtlib.List[nbtlib.Compound]()
+        for state in palette:
+            name, _, properties = state.partition("[")
+            entry = nbtlib.Compound({"Name": nbtlib.String(name)})
+            if properties:
+                entry["Properties"] = nbtlib.Compound({
+                    key: nbtlib.String(value)
+                    for key, value in (pair.split("=", 1) for pair in properties[:-1].split(","))
+                })
+            entries.append(entry)
+        sections.append(nbtlib.Compound({
+            "Y": nbtlib.Byte(section_y),
+            "block_states": nbtlib.Compound({
+                "palette": entries,
+                "data": nbtlib.LongArray([value - (1 << 64) if value >= 1 << 63 else value for value in longs]),
+            }),
+        }))
+
+    chunk = nbtlib.File({
+        "DataVersion": nbtlib.Int(3953),
+        "xPos": nbtlib.Int(cx),
+        "zPos": nbtlib.Int(cz),
+        "yPos": nbtlib.Int(-4),
+        "Status": nbtlib.String("minecraft:full"),
+        "sections": sections,
+        "Heightmaps": _heightmaps_nbt(blocks),
+    })
+    buffer = io.BytesIO()
+    chunk.write(buffer)
+    return buffer.getvalue()
+
+
+def _passable(state: str) -> bool:
+    return block_type(state) != "minecraft:grass_block" and any(
+        word in state for word in ("grass", "fern", "flower", "torch", "sapling", "rail")
+    )
+
+
+def _fluid(state: str) -> bool:
+    return "water" in state or "lava" in state
+
+
+# Which blocks each heightmap counts, approximated by name: plants and
+# torches do not block motion, fluids only count for the MOTION_BLOCKING ones
+HEIGHTMAP_COUNTS: Dict[str, Callable[[str], bool]] = {
+    "WORLD_SURFACE": lambda state: True,
+    "MOTION_BLOCKING": lambda state: not _passable(state) or _fluid(state),
+    "MOTION_BLOCKING_NO_LEAVES": lambda state: (not _passable(state) or _fluid(state)) and "leaves" not in state,
+    "OCEAN_FLOOR": lambda state: not _passable(state) and not _fluid(state),
+}
+
+
+def _heightmaps_nbt(blocks: Dict[Position, str]) -> nbtlib.Compound:
+    """Heightmaps of a chunk's blocks (see HEIGHTMAP_COUNTS)."""
+    heightmaps = nbtlib.Compound()
+    for kind, counted in HEIGHTMAP_COUNTS.items():
+        # "First free Y above the block" - min_y (-64), 9 bits, z-major
+        values = [0] * 256
+        for (x, y, z), state in blocks.items():
+            index = (z & 15) * 16 + (x & 15)
+            if counted(state):
+                values[index] = max(values[index], y + 1 + 64)
+        longs = [0] * -(-256 // 7)
+        for index, value in enumerate(values):
+            longs[index // 7] |= value << ((index % 7) * 9)
+        heightmaps[kind] = nbtlib.LongArray(longs)
+    return heightmaps
+
+
+def _write_region_files(region_dir: Path, world: VoxelWorld) -> None:
+    """Write every chunk holding blocks into zlib-compressed Anvil region files."""
+    chunks: Dict[Tuple[int, int], Dict[Position, str]] = {}
+    for (x, y, z), state in world.blocks.items():
+        chunks.setdefault((x >> 4, z >> 4), {})[(x, y, z)] = state
+
+    regions: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for cx, cz in chunks:
+        regions.setdefault((cx >> 5, cz >> 5), []).append((cx, cz))
+
+    region_dir.mkdir(parents=True, exist_ok=True)
+    for path in region_dir.glob("r.*.mca"):
+        path.unlink()
+    for (rx, rz), coordinates in regions.items():
+        header = bytearray(8192)
+        body = bytearray()
+        for cx, cz in sorted(coordinates):
+            data = zlib.compress(_chunk_nbt(cx, cz, chunks[(cx, cz)]))
+            payload = struct.pack(">IB", len(data) + 1, 2) + data
+            sectors = -(-len(payload) // 4096)
+            entry = 4 * ((cx % 32) + (cz % 32) * 32)
+            header[entry:entry + 4] = struct.pack(">I", ((2 + len(body) // 4096) << 8) | sectors)
+            body += payload.ljust(sectors * 4096, b"\0")
+        # A new file rather than a rewrite, so readers' existing maps stay valid
+        temporary = region_dir / f"r.{rx}.{rz}.mca.tmp"
+        temporary.write_bytes(bytes(header + body))
+        os.replace(temporary, region_dir / f"r.{rx}.{rz}.mca")
+
+
+def _recv_exact(sock: socket.socket, length: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < length:
+        chunk = sock.recv(length - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Minecraft RCON + WorldEdit server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default="vibecraft")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per command")
+    parser.add_argument(
+        "--fragment-size", type=int, default=DEFAULT_FRAGMENT_SIZE,
+        help="Maximum characters per response packet",
+    )
+    parser.add_argument(
+        "--one-packet-per-read", action="store_true",
+        help="Read one packet per socket read, like vanilla and Paper",
+    )
+    parser.add_argument("--world-dir", type=Path, default=None, help="Folder with datapacks/")
+    parser.add_argument(
+        "--schematic-dir", type=Path, default=None, help="Folder //schem load reads from"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    server = FakeMinecraftServer(
+        host=args.host,
+        port=args.port,
+        password=args.password,
+        latency=args.latency,
+        fragment_size=args.fragment_size,
+        one_packet_per_read=args.one_packet_per_read,
+        world_dir=args.world_dir,
+        schematic_dir=args.schematic_dir,
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the asyncio RCON client and the WorldEdit session lock.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+
+import pytest
+from tests.support.fake_server import FakeMinecraftServer
+
+PASSWORD = "test"
+
+
+@pytest.fixture
+def server():
+    with FakeMinecraftServer(password=PASSWORD) as fake:
+        yield fake
+
+
+class TestAsyncRCON:
+    """Tests for AsyncRCONManager as used by RCONManager.execute()"""
+
+    def test_concurrent_commands(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, latency=0.05) as slow:
+            rcon = make_rcon(slow, rcon_pool_size=4)
+
+            async def scenario():
+                return await asyncio.gather(*(rcon.execute(f"setblock {i} 64 0 stone") for i in range(8)))
+
+            responses = asyncio.run(scenario())
+            assert responses == [f"Changed the block at {i}, 64, 0" for i in range(8)]
+            # Commands ran side by side, on at most rcon_pool_size connections
+            assert 1 < rcon.aio.connections_opened <= 4
+
+    def test_timeout_discards_the_connection(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, latency=0.3) as slow:
+            rcon = make_rcon(slow)
+
+            async def scenario():
+                with pytest.raises(TimeoutError):
+                    await rcon.execute("setblock 0 64 0 stone", timeout=0.1)
+                # The late response must not be taken for this one
+                return await rcon.execute("setblock 1 64 0 stone")
+
+            assert asyncio.run(scenario()) == "Changed the block at 1, 64, 0"
+            assert rcon.aio.connections_opened == 2
+
+    def test_connection_refused(self, server, make_rcon):
+        rcon = make_rcon(server)
+        server.stop()
+        with pytest.raises(ConnectionError):
+            asyncio.run(rcon.execute("list"))
+
+
+class TestWorldEditSession:
+    """Tests for RCONManager.worldedit_session_async()"""
+
+    def test_nested_session_raises(self, server, make_rcon):
+        rcon = make_rcon(server)
+
+        async def scenario():
+            async with rcon.worldedit_session_async():
+                with pytest.raises(RuntimeError, match="not reentrant"):
+                    await rcon.run_blocking(lambda: None, worldedit=True)
+                with pytest.raises(RuntimeError, match="not reentrant"):
+                    async with rcon.worldedit_session_async():
+                        pass
+            # Released: the session can be taken again
+            await rcon.run_blocking(lambda: None, worldedit=True)
+
+        asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    def test_cancelled_waiter_does_not_keep_the_lock(self, server, make_rcon):
+        rcon = make_rcon(server)
+
+        async def wait_for_session():
+            async with rcon.worldedit_session_async():
+                pass
+
+        async def scenario():
+            async with rcon.worldedit_session_async():
+                waiter = asyncio.create_task(wait_for_session())
+                await asyncio.sleep(0.05)
+                waiter.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await waiter
+            await asyncio.sleep(0.05)
+            assert not rcon.worldedit_lock.locked()
+
+        asyncio.run(asyncio.wait_for(scenario(), timeout=5))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for differential builds.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+
+from vibecraft.build_diff import plan_voxels, same_block
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import handle_build
+
+PASSWORD = "test"
+
+HOUSE = [
+    "/fill 0 64 0 9 64 9 stone",
+    "/fill 0 65 0 9 68 9 oak_planks hollow",
+    "/setblock 4 65 0 oak_door[half=lower,facing=north]",
+    "/setblock 4 66 0 oak_door[half=upper,facing=north]",
+    "//pos1 0,69,0",
+    "//pos2 9,69,9",
+    "//set spruce_planks",
+]
+
+
+def build_twice(tmp_path, schematics: bool):
+    """Build HOUSE, damage it, rebuild it with diff=true."""
+    schematic_dir = tmp_path / "plugins" / "WorldEdit" / "schematics"
+    if schematics:
+        schematic_dir.mkdir(parents=True)
+    with FakeMinecraftServer(password=PASSWORD, schematic_dir=schematic_dir) as server:
+        config = VibeCraftConfig(
+            rcon_host="127.0.0.1",
+            rcon_port=server.port,
+            rcon_password=PASSWORD,
+            rcon_timeout=2,
+            enable_chunk_scheduling=False,
+            enable_function_batches=False,
+            enable_schematic_builds=False,
+            build_journal_dir=str(tmp_path / "journal"),
+            minecraft_data_dir=str(tmp_path),
+        )
+        rcon = RCONManager(config)
+        logger = logging.getLogger(__name__)
+
+        async def scenario():
+            await handle_build({"commands": HOUSE}, rcon, config, logger)
+            expected = dict(server.world.blocks)
+
+            unchanged = await handle_build({"commands": HOUSE, "diff": True}, rcon, config, logger)
+            assert "nothing to send" in unchanged[0].text
+
+            server.world.set((3, 64, 3), "minecraft:dirt")
+            server.world.set((5, 66, 5), "minecraft:stone")
+            server.command_names.clear()
+            result = await handle_build({"commands": HOUSE, "diff": True}, rcon, config, logger)
+            return expected, result[0].text
+
+        expected, text = asyncio.run(scenario())
+        assert "Build completed successfully" in text
+        assert server.world.blocks == expected
+        writes = server.command_names["setblock"] + server.command_names["fill"]
+        return text, writes
+
+
+class TestBuildDiff:
+    """Tests for plan evaluation and diffed rebuilds"""
+
+    def test_plan_voxels(self):
+        voxels = plan_voxels(["/fill 0 0 0 2 2 2 stone hollow", "/setblock 1 1 1 glass"])
+        assert len(voxels) == 27
+        assert voxels[(1, 1, 1)] == ("minecraft:glass", None)
+        assert plan_voxels(["/fill 0 0 0 2 2 2 stone keep"]) is None
+        assert same_block("oak_door[facing=north]", "minecraft:oak_door[facing=north,half=lower,open=false]")
+        assert not same_block("oak_door[facing=south]", "minecraft:oak_door[facing=north,half=lower]")
+
+    def test_rebuild_sends_only_changes(self, tmp_path):
+        text, writes = build_twice(tmp_path, schematics=True)
+        assert "read by schematic" in text
+        assert writes == 2
+
+    def test_rebuild_with_probes(self, tmp_path):
+        text, writes = build_twice(tmp_path, schematics=False)
+        assert "read by probes" in text
+        assert writes == 2
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for background build jobs.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+import re
+
+from vibecraft.build_jobs import CANCELLED, COMPLETED, INTERRUPTED, BuildJobManager
+from vibecraft.build_journal import BuildJournal
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import (
+    handle_build,
+    handle_build_cancel,
+    handle_build_status,
+    handle_resume_build,
+)
+
+PASSWORD = "test"
+
+
+class TestBuildJobs:
+    """Tests for build(async=True), build_status and build_cancel"""
+
+    def test_workers_are_bounded_and_table_persists(self, tmp_path):
+        table = tmp_path / "jobs.json"
+
+        async def scenario():
+            manager = BuildJobManager(table, max_workers=2)
+            running = []
+            peak = []
+            release = asyncio.Event()
+
+            async def runner(job):
+                running.append(job.job_id)
+                peak.append(len(running))
+                await release.wait()
+                running.remove(job.job_id)
+                return "done"
+
+            for index in range(4):
+                manager.submit(f"job-{index}", "wall", 10, runner)
+            await asyncio.sleep(0.05)
+            assert len(running) == 2
+            release.set()
+            while any(job.status != COMPLETED for job in manager.list()):
+                await asyncio.sleep(0.01)
+            assert max(peak) == 2
+
+            manager.submit("job-stuck", "tower", 10, lambda job: asyncio.sleep(10))
+            await asyncio.sleep(0.01)
+            # The table as a process killed mid-build leaves it
+            (tmp_path / "killed.json").write_text(table.read_text())
+
+        asyncio.run(scenario())
+        reloaded = BuildJobManager(tmp_path / "killed.json")
+        assert reloaded.get("job-0").status == COMPLETED
+        assert reloaded.get("job-stuck").status == INTERRUPTED
+
+    def test_async_build_cancel_and_resume(self, tmp_path):
+        commands = [f"/setblock {x} 64 {z} stone" for x in range(20) for z in range(0, 40, 2)]
+        logger = logging.getLogger(__name__)
+
+        with FakeMinecraftServer(password=PASSWORD, latency=0.002) as server:
+            config = VibeCraftConfig(
+                rcon_host="127.0.0.1",
+                rcon_port=server.port,
+                rcon_password=PASSWORD,
+                rcon_timeout=2,
+                rcon_pipeline_depth=1,
+                enable_command_compiler=False,
+                enable_function_batches=False,
+                enable_schematic_builds=False,
+                build_journal_dir=str(tmp_path),
+            )
+            rcon = RCONManager(config)
+
+            async def scenario():
+                result = (await handle_build(
+                    {"commands": commands, "async": True}, rcon, config, logger
+                ))[0].text
+                job_id = re.search(r"Job: (\S+)", result).group(1)
+                while rcon.jobs.get(job_id).done < 50:
+                    await asyncio.sleep(0.01)
+                status = (await handle_build_status({"job_id": job_id}, rcon, config, logger))[0].text
+                assert "running" in status
+
+                result = (await handle_build_cancel({"job_id": job_id}, rcon, config, logger))[0].text
+                assert "Cancelled" in result
+                assert rcon.jobs.get(job_id).status == CANCELLED
+                return job_id
+
+            job_id = asyncio.run(scenario())
+            done = BuildJournal.load(tmp_path, job_id).acknowledged
+            assert 50 <= done < len(commands)
+
+            result = asyncio.run(handle_resume_build({"job_id": job_id}, rcon, config, logger))[0].text
+            assert "Build completed successfully" in result
+            assert len(server.world.blocks) == len(commands)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for resumable build journals.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+
+from vibecraft.build_journal import COMPLETED, INTERRUPTED, BuildJournal
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import handle_build, handle_resume_build
+
+PASSWORD = "test"
+
+
+class TestBuildJournal:
+    """Tests for build journals and resume_build"""
+
+    def test_journal_round_trip(self, tmp_path):
+        journal = BuildJournal.create(tmp_path, ["/setblock 0 0 0 stone"] * 120, "wall")
+        for index in range(1, 74):
+            journal.acknowledge(index)
+        journal.interrupt(73, "connection lost")
+
+        loaded = BuildJournal.load(tmp_path, journal.job_id)
+        assert loaded.status == INTERRUPTED
+        assert loaded.acknowledged == 73
+        assert loaded.remaining == 47
+
+    def test_interrupted_build_resumes(self, tmp_path):
+        commands = [f"/setblock {x} 64 {z} stone" for x in range(20) for z in range(0, 20, 2)]
+        server = FakeMinecraftServer(password=PASSWORD, latency=0.001).start()
+        port = server.port
+        config = VibeCraftConfig(
+            rcon_host="127.0.0.1",
+            rcon_port=port,
+            rcon_password=PASSWORD,
+            rcon_timeout=2,
+            enable_command_compiler=False,
+            enable_function_batches=False,
+            enable_schematic_builds=False,
+            build_journal_dir=str(tmp_path),
+        )
+        rcon = RCONManager(config)
+        logger = logging.getLogger(__name__)
+
+        def stop_midway():
+            while server.stats["commands"] < 80:
+                time.sleep(0.001)
+            server.stop()
+
+        threading.Thread(target=stop_midway).start()
+        result = asyncio.run(handle_build({"commands": commands}, rcon, config, logger))[0].text
+        assert "Build interrupted" in result
+        job_id = re.search(r"Job: (\S+)", result).group(1)
+        done = BuildJournal.load(tmp_path, job_id).acknowledged
+        assert 0 < done < len(commands)
+
+        with FakeMinecraftServer(password=PASSWORD, port=port, world=server.world) as restarted:
+            result = asyncio.run(handle_resume_build({"job_id": job_id}, rcon, config, logger))[0].text
+            assert "Build completed successfully" in result
+            assert restarted.stats["commands"] == len(commands) - done
+        assert len(server.world.blocks) == len(commands)
+        assert BuildJournal.load(tmp_path, job_id).status == COMPLETED
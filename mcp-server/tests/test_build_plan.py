@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the build plan optimizer.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import random
+
+from vibecraft import build_plan
+from vibecraft.build_plan import BuildPlan, SelectionPoint, SetBlock, optimize_commands
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import strip_command_slash
+
+
+def run_commands(commands):
+    """Blocks an empty fake world holds after executing ``commands``."""
+    server = FakeMinecraftServer()
+    for command in commands:
+        try:
+            server.execute(strip_command_slash(command))
+        except Exception:
+            pass
+    return dict(server.world.blocks)
+
+
+def random_build(rng, span=4, length=30):
+    blocks = ["stone", "air", "dirt", "sand"]
+    coord = lambda: rng.randint(0, span)
+    commands = []
+    for _ in range(rng.randint(1, length)):
+        roll = rng.random()
+        if roll < 0.45:
+            commands.append(f"/setblock {coord()} {coord()} {coord()} {rng.choice(blocks)}")
+        elif roll < 0.65:
+            box = " ".join(str(coord()) for _ in range(6))
+            mode = rng.choice(["", "", " outline", " hollow", " keep", " replace stone"])
+            commands.append(f"/fill {box} {rng.choice(blocks)}{mode}")
+        elif roll < 0.8:
+            commands.append(f"//pos{rng.randint(1, 2)} {coord()},{coord()},{coord()}")
+        elif roll < 0.9:
+            commands.append(f"//set {rng.choice(blocks)}")
+        elif roll < 0.95:
+            commands.append("//count stone")
+        elif commands:
+            commands.append(commands[-1])
+    return commands
+
+
+class TestBuildPlan:
+    """Tests for parsing and optimizing build commands"""
+
+    def test_parse(self):
+        plan = BuildPlan.from_commands(["/setblock 1 2 3 oak_stairs[facing=east]", "//pos1 1,2,3"])
+        setblock, corner = plan.operations
+        assert isinstance(setblock, SetBlock)
+        assert setblock.block == "minecraft:oak_stairs[facing=east]"
+        assert isinstance(corner, SelectionPoint) and corner.position == (1, 2, 3)
+        assert plan.commands() == ["/setblock 1 2 3 oak_stairs[facing=east]", "//pos1 1,2,3"]
+
+    def test_overwritten_and_redundant_writes(self):
+        commands, report = optimize_commands([
+            "/fill 0 0 0 4 4 4 air",
+            "/setblock 2 2 2 air",
+            "/setblock 1 1 1 stone",
+            "/setblock 1 1 1 dirt",
+        ])
+        assert commands == ["/fill 0 0 0 4 4 4 air", "/setblock 1 1 1 dirt"]
+        assert report.optimized == 2 and report.summary()
+
+    def test_unused_selection_dropped(self):
+        commands, _ = optimize_commands([
+            "//pos1 0,0,0", "//pos1 1,1,1", "//pos2 2,2,2", "//set stone", "//pos1 1,1,1", "//set dirt",
+        ])
+        assert commands == ["//pos1 1,1,1", "//pos2 2,2,2", "//set dirt"]
+
+    def test_barriers_are_kept(self):
+        commands = ["/setblock 0 0 0 stone", "/fill 0 0 0 1 1 1 dirt keep", "/setblock 0 0 0 stone"]
+        assert optimize_commands(commands)[0] == commands
+
+    def test_random_builds_place_the_same_blocks(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            commands = random_build(rng)
+            optimized, _ = optimize_commands(commands)
+            assert run_commands(optimized) == run_commands(commands), commands
+
+    def test_writes_across_index_cubes(self):
+        # Boxes straddling the optimizer's 8-block lookup cubes
+        rng = random.Random(11)
+        for _ in range(40):
+            commands = random_build(rng, span=20, length=200)
+            optimized, _ = optimize_commands(commands)
+            assert run_commands(optimized) == run_commands(commands), commands
+
+    def test_large_plans_skip_the_passes(self, monkeypatch):
+        monkeypatch.setattr(build_plan, "MAX_OPTIMIZED_OPERATIONS", 2)
+        commands, report = optimize_commands(["/setblock 0 0 0 stone", "/setblock 0 0 0 stone", "/setblock 1 0 0 stone"])
+        assert commands == ["/fill 0 0 0 1 0 0 stone"]
+        assert report.skipped and not report.removed
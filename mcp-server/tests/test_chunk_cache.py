@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the chunk cache and its write invalidation.
+
+Note: Import paths are configured via conftest.py
+"""
+
+from vibecraft.block_utils import fetch_block_state, sync_world
+from vibecraft.chunk_cache import ChunkCache, written_box
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.worldedit_session import Box
+
+PASSWORD = "test"
+
+
+class TestChunkCache:
+    """Tests for ChunkCache"""
+
+    def test_written_box(self):
+        selection = Box(0, 60, 0, 9, 70, 9)
+        assert written_box("setblock 1 2 3 stone", None) == (True, Box(1, 2, 3, 1, 2, 3))
+        assert written_box("fill 5 60 5 0 64 0 air replace stone", None) == (True, Box(0, 60, 0, 5, 64, 5))
+        assert written_box("/set stone", selection) == (True, selection)
+        assert written_box("/set stone", None) == (True, None)
+        assert written_box("/paste -a -o", None, clipboard=selection) == (True, selection)
+        assert written_box("/paste", None, clipboard=selection) == (True, None)
+        assert written_box("/undo", selection) == (True, None)
+        assert written_box("execute if block 1 2 3 stone run setblock 4 5 6 air", None) == (True, Box(4, 5, 6, 4, 5, 6))
+        assert written_box("execute positioned 1 2 3 run setblock ~ ~1 ~ air", None) == (True, None)
+        for command in ("/count stone", "/pos1 1,2,3", "execute positioned 1 2 3 run data get block ~ ~ ~",
+                        "save-all flush", "function vibecraft:batch_0", "list"):
+            assert written_box(command, selection) == (False, None), command
+
+    def test_budget_evicts_least_recently_used(self):
+        cache = ChunkCache(max_bytes=10_000, ttl=60)
+        for i in range(100):
+            cache.put_block(i * 16, 64, 0, {"id": "stone"})
+        stats = cache.stats()
+        assert stats.bytes <= 10_000 and stats.evictions > 0
+        assert cache.block(99 * 16, 64, 0) == {"id": "stone"}
+        assert cache.block(0, 64, 0) is None
+        assert cache.stats().hits == 1
+
+    def test_writes_invalidate_cached_chunks(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            server.world.set((1, 64, 1), "minecraft:stone")
+            server.world.set((40, 64, 1), "minecraft:dirt")
+            rcon = make_rcon(server)
+            assert sync_world(rcon)
+            fetch_block_state(rcon, 1, 64, 1)
+            fetch_block_state(rcon, 40, 64, 1)
+            server.command_names.clear()
+
+            # Cached chunks: no save-all, no queries
+            assert sync_world(rcon)
+            assert fetch_block_state(rcon, 1, 64, 1)["id"] == "stone"
+            assert sum(server.command_names.values()) == 0
+            assert rcon.chunk_cache.stats().hits >= 1
+
+            # The written chunk is asked over RCON until the next save
+            rcon.execute_command("setblock 1 64 1 minecraft:gold_block")
+            fetch_block_state(rcon, 1, 64, 1)
+            assert fetch_block_state(rcon, 40, 64, 1)["id"] == "dirt"
+            assert server.command_names["execute"] == 1
+
+            assert sync_world(rcon)
+            assert server.command_names["save-all"] == 1
+            assert fetch_block_state(rcon, 1, 64, 1)["id"] == "gold_block"
+            assert server.command_names["execute"] == 1
+            rcon.close()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for chunk-ordered build scheduling.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+
+from vibecraft.chunk_scheduler import forceload_commands, order_by_chunk, plan_segments
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.tools.build_tools import handle_build
+
+PASSWORD = "test"
+
+
+class TestChunkScheduler:
+    """Tests for chunk ordering and the force-load window"""
+
+    def test_order_and_segments(self):
+        commands = order_by_chunk([
+            "/setblock 40 64 0 stone",
+            "/setblock 0 65 0 stone",
+            "/setblock 1 64 0 stone",
+            "/setblock 20 64 0 stone",
+        ])
+        assert commands == [
+            "/setblock 1 64 0 stone",
+            "/setblock 0 65 0 stone",
+            "/setblock 20 64 0 stone",
+            "/setblock 40 64 0 stone",
+        ]
+        segments = plan_segments(commands)
+        assert [(s.start, s.end, set(s.chunks)) for s in segments] == [
+            (0, 2, {(0, 0)}), (2, 3, {(1, 0)}), (3, 4, {(2, 0)}),
+        ]
+
+    def test_forceload_commands_merge_rows(self):
+        assert forceload_commands("add", [(0, 0), (1, 0), (2, 0), (5, 0), (0, -1)]) == [
+            "forceload add 0 -16",
+            "forceload add 0 0 32 0",
+            "forceload add 80 0",
+        ]
+
+    def test_build_releases_chunks(self, make_rcon):
+        commands = [f"/setblock {x * 16} 64 {z * 16} stone" for x in range(5) for z in range(5)]
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            server.forced_chunks.add((0, 0))
+            # Journals and the data directory go to tmp_path
+            rcon = make_rcon(server, enable_function_batches=False, enable_schematic_builds=False)
+            config = rcon.config
+            result = asyncio.run(
+                handle_build({"commands": commands, "description": "grid"}, rcon, config, logging.getLogger())
+            )
+            assert "Build completed successfully" in result[0].text
+            assert server.command_names["forceload"] > 0
+            assert server.forced_chunks == {(0, 0)}
+            assert len(server.world.blocks) == 25
+
+    def test_function_build_forceloads_its_chunks(self, tmp_path, make_rcon):
+        # A checkerboard does not merge into fills, so a function beats commands
+        commands = [
+            f"/setblock {x} 64 {z} {'stone' if (x + z) % 2 else 'dirt'}"
+            for x in range(0, 80, 2) for z in range(0, 80, 2)
+        ]
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            rcon = make_rcon(server, function_batch_min_commands=8, enable_schematic_builds=False)
+            loaded_during_run = []
+            run = rcon.functions.run
+
+            async def recording_run(batch):
+                loaded_during_run.append(set(server.forced_chunks))
+                return await run(batch)
+
+            rcon.functions.run = recording_run
+            result = asyncio.run(handle_build(
+                {"commands": commands, "description": "grid"}, rcon, rcon.config, logging.getLogger()
+            ))
+            assert "one server tick" in result[0].text
+            assert loaded_during_run == [{(x, z) for x in range(5) for z in range(5)}]
+            assert server.forced_chunks == set()
+            assert len(server.world.blocks) == len(commands)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the setblock-to-fill command compiler.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import random
+
+from vibecraft.command_compiler import compile_commands, greedy_mesh
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import strip_command_slash
+from vibecraft.worldedit_session import volume
+
+
+def run_commands(commands):
+    """Blocks an empty fake world holds after executing ``commands``."""
+    server = FakeMinecraftServer()
+    for command in commands:
+        server.execute(strip_command_slash(command))
+    return dict(server.world.blocks)
+
+
+class TestCommandCompiler:
+    """Tests for greedy meshing and compile_commands"""
+
+    def test_mesh_covers_each_voxel_once(self):
+        rng = random.Random(3)
+        voxels = {
+            (rng.randint(0, 7), rng.randint(0, 7), rng.randint(0, 7)): rng.choice(["stone", "dirt"])
+            for _ in range(300)
+        }
+        covered = {}
+        for box, state in greedy_mesh(voxels, max_volume=20):
+            assert volume(box) <= 20
+            for x in range(box.x1, box.x2 + 1):
+                for y in range(box.y1, box.y2 + 1):
+                    for z in range(box.z1, box.z2 + 1):
+                        assert (x, y, z) not in covered
+                        covered[(x, y, z)] = state
+        assert covered == voxels
+
+    def test_wall_becomes_one_fill(self):
+        wall = [f"/setblock {x} {y} 5 stone_bricks" for x in range(10) for y in range(64, 68)]
+        assert compile_commands(wall) == ["/fill 0 64 5 9 67 5 stone_bricks"]
+
+    def test_barriers_split_runs(self):
+        commands = [
+            "setblock 0 64 0 stone",
+            "setblock 1 64 0 stone",
+            "# doorway",
+            "setblock 2 64 0 stone",
+            "fill 0 64 0 2 64 0 air keep",
+            "setblock 0 64 0 dirt",
+            "setblock 0 64 0 glass",
+        ]
+        compiled = compile_commands(commands)
+        assert compiled == [
+            "# doorway",
+            "fill 0 64 0 2 64 0 stone",
+            "fill 0 64 0 2 64 0 air keep",
+            # The last write to a position wins
+            "setblock 0 64 0 glass",
+        ]
+        assert run_commands(compiled) == run_commands(commands)
+
+    def test_setblocks_with_data_are_kept(self):
+        commands = ["setblock 0 64 0 chest{Lock:\"key\"}", "setblock 1 64 0 chest{Lock:\"key\"}"]
+        assert compile_commands(commands) == commands
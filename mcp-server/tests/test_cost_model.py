@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the build cost model and strategy choice.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+
+from vibecraft.cost_model import COMMANDS, PASTE
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.tools.build_tools import handle_build
+
+PASSWORD = "test"
+
+BUILD_OPTIONS = dict(
+    rcon_timeout=5,
+    enable_command_compiler=False,
+    enable_chunk_scheduling=False,
+    enable_function_batches=False,
+)
+
+# One solid fill: one command beats writing and pasting a schematic
+SOLID = ["/fill 0 60 0 39 79 39 stone"]
+
+# Thousands of single blocks in a small box: one paste beats the round trips
+SCATTERED = [
+    f"/setblock {x + 100} {y} {z} oak_planks"
+    for x in range(20) for y in range(60, 75) for z in range(20)
+    if (x + y + z) % 3
+]
+
+
+class TestCostModel:
+    """Tests for strategy estimates"""
+
+    def test_strategies_ranked_by_build_shape(self, tmp_path, make_rcon):
+        schematic_dir = tmp_path / "plugins" / "WorldEdit" / "schematics"
+        schematic_dir.mkdir(parents=True)
+        with FakeMinecraftServer(password=PASSWORD, schematic_dir=schematic_dir, mspt=12.5) as server:
+            rcon = make_rcon(server, **BUILD_OPTIONS)
+            config = rcon.config
+
+            async def scenario():
+                return (
+                    await rcon.cost_model.estimate(SOLID),
+                    await rcon.cost_model.estimate(SCATTERED),
+                    await handle_build({"commands": SCATTERED, "preview_only": True}, rcon, config, logging.getLogger(__name__)),
+                )
+
+            solid, scattered, preview = asyncio.run(scenario())
+
+        assert solid.mspt == 12.5
+        assert solid.best.strategy == COMMANDS
+        assert solid.blocks == 32000
+        assert scattered.best.strategy == PASTE
+        assert scattered.get(COMMANDS).seconds > scattered.best.seconds
+        assert "Estimated time" in preview[0].text
+        assert "schematic paste: ≈" in preview[0].text
+
+    def test_build_uses_cheapest_strategy_and_learns(self, tmp_path, make_rcon):
+        schematic_dir = tmp_path / "plugins" / "WorldEdit" / "schematics"
+        schematic_dir.mkdir(parents=True)
+        with FakeMinecraftServer(password=PASSWORD, schematic_dir=schematic_dir) as server:
+            rcon = make_rcon(server, **BUILD_OPTIONS)
+            config = rcon.config
+            logger = logging.getLogger(__name__)
+
+            async def scenario():
+                return (
+                    await handle_build({"commands": SOLID}, rcon, config, logger),
+                    await handle_build({"commands": SCATTERED}, rcon, config, logger),
+                )
+
+            solid, scattered = asyncio.run(scenario())
+
+            assert "Build completed successfully" in solid[0].text
+            assert server.command_names["fill"] == 1
+            assert "(schematic paste)" in scattered[0].text
+            assert server.command_names["setblock"] == 0
+            assert len(server.world.blocks) == 32000 + len(SCATTERED)
+            assert set(rcon.cost_model.corrections) == {COMMANDS, PASTE}
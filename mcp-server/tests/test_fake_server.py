@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the RCON client stack against the fake Minecraft server.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+
+import pytest
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.worldedit_session import Box
+
+PASSWORD = "test"
+
+
+@pytest.fixture
+def server():
+    with FakeMinecraftServer(password=PASSWORD) as fake:
+        yield fake
+
+
+class TestFakeServer:
+    """Tests for RCON execution against the fake server"""
+
+    def test_fill_and_distr(self, server, make_rcon):
+        """Vanilla fill followed by a WorldEdit distribution of the region"""
+        rcon = make_rcon(server, enable_function_batches=False)
+        assert rcon.execute_command("fill 0 0 0 3 3 3 stone") == "Successfully filled 64 block(s)"
+
+        with rcon.selection(Box(0, 0, 0, 3, 4, 3)):
+            distr = rcon.execute_command("/distr")
+
+        assert "80.000% minecraft:stone (64)" in distr
+        assert "20.000% minecraft:air (16)" in distr
+
+    def test_fill_limit(self, server, make_rcon):
+        """Fills larger than 32768 blocks are rejected like on a real server"""
+        rcon = make_rcon(server, enable_function_batches=False)
+        response = rcon.execute_command("fill 0 0 0 40 40 40 stone")
+        assert "Too many blocks" in response
+        assert not server.world.blocks
+
+    def test_fragmented_response(self, make_rcon):
+        """Responses split over many packets are reassembled"""
+        with FakeMinecraftServer(password=PASSWORD, fragment_size=16) as fake:
+            for i in range(20):
+                fake.execute(f"setblock {i} 0 0 minecraft:{'abcdefghijklmnopqrst'[i]}_block")
+            rcon = make_rcon(fake, enable_function_batches=False)
+            rcon.execute_command("/pos1 0,0,0")
+            rcon.execute_command("/pos2 19,0,0")
+
+            expected = fake.execute("/distr")
+            assert rcon.execute_command("/distr") == expected
+            assert fake.stats["packets_out"] > len(expected) // 16
+
+    def test_pipelined_batch(self, server, make_rcon):
+        """Batch execution returns responses in command order"""
+        rcon = make_rcon(server, enable_function_batches=False)
+        commands = [f"setblock {i} 64 0 oak_planks" for i in range(200)]
+
+        responses = asyncio.run(rcon.execute_batch(commands))
+
+        assert responses == [f"Changed the block at {i}, 64, 0" for i in range(200)]
+        assert len(server.world.blocks) == 200
+
+    def test_unchanged_selection_is_not_resent(self, server, make_rcon):
+        """Re-selecting the same box does not send //pos1 and //pos2 again"""
+        rcon = make_rcon(server, enable_function_batches=False)
+        box = Box(0, 0, 0, 9, 9, 9)
+        for _ in range(3):
+            with rcon.selection(box):
+                assert rcon.execute_command("/count !air") == "Counted: 0 blocks"
+
+        assert server.command_names["/pos1"] == 1
+        assert server.command_names["/pos2"] == 1
+        assert server.command_names["/count"] == 3
+
+    def test_data_get_block(self, server, make_rcon):
+        """Only block entities have block data"""
+        rcon = make_rcon(server, enable_function_batches=False)
+        rcon.execute_command("setblock 1 2 3 chest[facing=north]")
+        rcon.execute_command("setblock 1 3 3 stone")
+
+        chest = rcon.execute_command("execute positioned 1 2 3 run data get block ~ ~ ~ id")
+        assert chest == '1, 2, 3 has the following block data: "minecraft:chest"'
+        assert "not a block entity" in rcon.execute_command("data get block 1 3 3")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for datapack function batches.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import re
+
+from tests.support.fake_server import FakeMinecraftServer
+
+PASSWORD = "test"
+
+COMMANDS = [f"setblock {x} 64 0 minecraft:stone" for x in range(10)]
+
+
+class TestFunctionBatch:
+    """Tests for FunctionBatchExecutor"""
+
+    def test_batch_runs_as_one_function(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            rcon = make_rcon(server, function_batch_min_commands=8)
+
+            # Deciding writes nothing
+            assert rcon.functions.accepts(COMMANDS)
+            assert not (tmp_path / "world" / "datapacks").exists()
+            assert not rcon.functions.accepts(COMMANDS[:4])
+            assert not rcon.functions.accepts(COMMANDS + ["/set stone"])
+
+            response = asyncio.run(rcon.functions.run(COMMANDS))
+            assert response.startswith("Ran 10 command(s) as function vibecraft:batch_")
+            assert "failed" not in response
+            assert server.world.get((9, 64, 0)) == "minecraft:stone"
+            assert server.command_names["setblock"] == 0
+            assert (tmp_path / "world" / "datapacks" / "vibecraft" / "pack.mcmeta").exists()
+            assert not list((tmp_path / "world").rglob("*.mcfunction"))
+
+    def test_parse_failure_falls_back_to_rcon(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            rcon = make_rcon(server, function_batch_min_commands=8)
+            commands = COMMANDS + ["sefblock 0 65 0 minecraft:stone"]
+
+            assert rcon.functions.run_sync(commands) is None
+            # Still enabled: only this batch goes over RCON
+            assert rcon.functions.accepts(COMMANDS)
+            assert rcon.functions.run_sync(COMMANDS) is not None
+
+    def test_failed_commands_are_counted(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            rcon = make_rcon(server, function_batch_min_commands=8)
+            for x in range(3):
+                server.execute(f"setblock {x} 64 0 minecraft:stone")
+
+            response = rcon.functions.run_sync(["# wall"] + COMMANDS)
+            assert re.fullmatch(
+                r"Ran 10 command\(s\) as function vibecraft:\w+; 3 failed or changed nothing", response
+            )
+            assert server.world.get((9, 64, 0)) == "minecraft:stone"
+
+    def test_unread_directory_disables_batches(self, tmp_path, make_rcon):
+        # The server reads a different world folder than the one written to
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "elsewhere") as server:
+            rcon = make_rcon(server, function_batch_min_commands=8, rcon_timeout=1)
+
+            assert rcon.functions.run_sync(COMMANDS) is None
+            assert not rcon.functions.accepts(COMMANDS)
+            assert not list((tmp_path / "world").rglob("*.mcfunction"))
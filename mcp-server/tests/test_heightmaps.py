@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for surface heights from chunk heightmaps.
+
+Note: Import paths are configured via conftest.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.heightmaps import MOTION_BLOCKING_NO_LEAVES, UNKNOWN, WORLD_MIN_Y
+
+PASSWORD = "test"
+
+
+def build_hill(world) -> None:
+    for x in range(-8, 8):
+        for z in range(-8, 8):
+            for y in range(60, 64 + abs(x) + z % 3):
+                world.set((x, y, z), "minecraft:stone")
+    world.set((0, 90, 0), "minecraft:oak_leaves")
+
+
+class TestHeightmaps:
+    """Tests for HeightmapService"""
+
+    def test_surface_from_heightmaps(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            build_hill(server.world)
+            rcon = make_rcon(server)
+            server.command_names.clear()
+
+            heightmap = rcon.heightmaps.surface(-8, -8, 7, 7)
+            assert heightmap.heights.shape == (16, 16)
+            assert heightmap.source == "chunk heightmaps"
+            assert heightmap.at(-8, 2) == 63 + 8 + 2
+            assert heightmap.at(0, 0) == 90
+            assert rcon.heightmaps.surface(0, 0, 0, 0, kind=MOTION_BLOCKING_NO_LEAVES).at(0, 0) == 63
+            assert server.command_names["save-all"] == 1
+            assert server.command_names["/count"] == 0
+
+            # Every third column; chunks the files do not hold stay unknown
+            heightmap = rcon.heightmaps.surface(-8, -8, 30, 7, step=3, fallback=False)
+            assert heightmap.heights.shape == (13, 6)
+            assert heightmap.at(4, 4) == 63 + 4 + 1
+            assert heightmap.at(10, 4) == WORLD_MIN_Y - 1
+            assert heightmap.at(25, 4) is None
+            assert (heightmap.heights[:, 0] == UNKNOWN).sum() == 5
+            rcon.close()
+
+    def test_server_probe(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            build_hill(server.world)
+            rcon = make_rcon(server, enable_region_reads=False, function_batch_min_commands=8)
+
+            # One datapack function for the batch (after its check function), one read of the
+            # results and one removal of them
+            heightmap = rcon.heightmaps.surface(-8, -8, 7, 7, step=4)
+            assert heightmap.source == "server probe"
+            assert heightmap.at(-8, 0) == 63 + 8
+            assert heightmap.at(0, 0) == 90
+            assert server.command_names["function"] == 2
+            assert server.command_names["data"] == 2
+            assert not server.entities
+            assert server.storage["vibecraft:surface_probe"] == {}
+
+            # Too small for a function: one command per column
+            server.command_names.clear()
+            heightmap = rcon.heightmaps.surface(0, 0, 20, 0, step=10, kind=MOTION_BLOCKING_NO_LEAVES)
+            assert [heightmap.at(x, 0) for x in (0, 10, 20)] == [63, WORLD_MIN_Y - 1, WORLD_MIN_Y - 1]
+            assert server.command_names["function"] == 0
+            assert server.command_names["execute"] == 3 + 1
+            assert server.command_names["/count"] == 0
+            rcon.close()
+
+    def test_remote_server_probe(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world", fragment_size=64) as server:
+            build_hill(server.world)
+            # No local data directory: no region files, no datapack functions
+            rcon = make_rcon(server, minecraft_data_dir=str(tmp_path / "remote"), rcon_pipeline_depth=16)
+
+            heightmap = rcon.heightmaps.surface(-8, -8, 7, 7)
+            assert heightmap.source == "server probe"
+            assert heightmap.at(-8, 2) == 63 + 8 + 2
+            assert heightmap.at(0, 0) == 90
+            assert server.command_names["function"] == 0
+            assert server.command_names["execute"] == 16 * 16 + 1
+            # Pipelined over one pooled connection
+            assert rcon.pool.connections_opened == 1
+            assert not server.entities
+            rcon.close()
+
+    def test_concurrent_probes_stay_apart(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, latency=0.001) as server:
+            build_hill(server.world)
+            rcon = make_rcon(server, minecraft_data_dir=str(tmp_path / "remote"))
+            regions = [[(x, z) for x in range(-8, 0) for z in range(-8, 8)],
+                       [(x, z) for x in range(0, 8) for z in range(-8, 8)]]
+
+            with ThreadPoolExecutor(max_workers=2) as workers:
+                results = list(workers.map(rcon.heightmaps.probe, regions))
+
+            expected = {(x, z): 63 + abs(x) + z % 3 for x in range(-8, 8) for z in range(-8, 8)}
+            expected[(0, 0)] = 90
+            for columns, heights in zip(regions, results):
+                assert heights == {column: expected[column] for column in columns}
+            assert not server.entities
+            rcon.close()
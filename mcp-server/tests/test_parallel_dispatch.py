@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for spatially partitioned parallel build dispatch.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+import random
+
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.parallel_dispatch import partition_commands
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import handle_build
+
+PASSWORD = "test"
+
+
+def random_build(seed: int, count: int = 600):
+    rng = random.Random(seed)
+    blocks = ["stone", "oak_planks", "glass", "air"]
+    commands = []
+    for _ in range(count):
+        x, y, z = rng.randrange(0, 48), rng.randrange(60, 70), rng.randrange(0, 48)
+        if rng.random() < 0.15:
+            commands.append(
+                f"/fill {x} {y} {z} {x + rng.randrange(4)} {y + rng.randrange(3)} {z + rng.randrange(4)} "
+                f"{rng.choice(blocks)}"
+            )
+        else:
+            commands.append(f"/setblock {x} {y} {z} {rng.choice(blocks)}")
+    return commands
+
+
+def run_build(commands, parallelism, tmp_path):
+    with FakeMinecraftServer(password=PASSWORD, latency=0.0005) as server:
+        config = VibeCraftConfig(
+            rcon_host="127.0.0.1",
+            rcon_port=server.port,
+            rcon_password=PASSWORD,
+            rcon_timeout=2,
+            build_parallelism=parallelism,
+            enable_command_compiler=False,
+            enable_chunk_scheduling=False,
+            enable_function_batches=False,
+            enable_schematic_builds=False,
+            build_journal_dir=str(tmp_path),
+        )
+        rcon = RCONManager(config)
+        result = asyncio.run(handle_build({"commands": commands}, rcon, config, logging.getLogger(__name__)))
+        assert "Build completed successfully" in result[0].text
+        return dict(server.world.blocks), rcon.aio.connections_opened
+
+
+class TestParallelDispatch:
+    """Tests for partitioning and parallel dispatch"""
+
+    def test_partitions_are_disjoint_and_ordered(self):
+        commands = random_build(1)
+        partitions = partition_commands(commands, 4)
+        assert len(partitions) == 4
+        assert sorted(i for partition in partitions for i in partition) == list(range(len(commands)))
+        assert all(partition == sorted(partition) for partition in partitions)
+        assert partition_commands(commands + ["//set stone"], 4) is None
+        assert partition_commands(commands + ["/fill 0 0 0 1 1 1 stone keep"], 4) is None
+
+    def test_parallel_build_matches_serial(self, tmp_path):
+        for seed in range(3):
+            commands = random_build(seed)
+            serial, _ = run_build(commands, 1, tmp_path)
+            parallel, connections = run_build(commands, 4, tmp_path)
+            assert parallel == serial
+            assert connections > 1
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for MCP progress notifications.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import logging
+
+from vibecraft import progress
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import handle_build
+
+PASSWORD = "test"
+
+
+class RecordingSession:
+    """Stands in for the MCP session; keeps every progress notification."""
+
+    def __init__(self):
+        self.notifications = []
+
+    async def send_progress_notification(self, token, value, total=None, message=None, related_request_id=None):
+        self.notifications.append((token, value, total, message))
+
+
+class TestProgress:
+    """Tests for progress reporting from long-running tools"""
+
+    def test_reporter_is_silent_without_token(self):
+        reporter = progress.ProgressReporter(10)
+        assert not reporter.active
+        reporter.update(10)
+
+    def test_build_reports_throughput_and_completion(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(progress, "UPDATE_INTERVAL", 0.0)
+        commands = [f"/setblock {x} 64 {z} stone" for x in range(10) for z in range(0, 20, 2)]
+        session = RecordingSession()
+
+        with FakeMinecraftServer(password=PASSWORD, latency=0.001) as server:
+            config = VibeCraftConfig(
+                rcon_host="127.0.0.1",
+                rcon_port=server.port,
+                rcon_password=PASSWORD,
+                rcon_timeout=2,
+                enable_command_compiler=False,
+                enable_function_batches=False,
+                enable_schematic_builds=False,
+                build_journal_dir=str(tmp_path),
+            )
+            rcon = RCONManager(config)
+
+            async def scenario():
+                progress.bind(session, "token-1", request_id=7)
+                result = await handle_build({"commands": commands}, rcon, config, logging.getLogger(__name__))
+                await asyncio.sleep(0.01)
+                return result[0].text
+
+            assert "Build completed successfully" in asyncio.run(scenario())
+
+        values = [value for _, value, _, _ in session.notifications]
+        assert values == sorted(values)
+        token, value, total, message = session.notifications[-1]
+        assert (token, value, total) == ("token-1", len(commands), len(commands))
+        assert "commands/s" in message
+        assert any("ETA" in message for _, _, _, message in session.notifications[:-1])
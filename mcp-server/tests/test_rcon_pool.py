@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the pooled, persistent RCON connections of RCONManager.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.support.fake_server import FakeMinecraftServer
+
+PASSWORD = "test"
+
+
+class TestConnectionPool:
+    """Tests for RCONConnectionPool as used by RCONManager"""
+
+    def test_connections_are_reused(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            rcon = make_rcon(server)
+            for i in range(20):
+                assert rcon.execute_command(f"setblock {i} 64 0 stone") == f"Changed the block at {i}, 64, 0"
+            assert rcon.pool.connections_opened == 1
+            assert rcon.pool.idle_count == 1
+
+    def test_pool_is_bounded(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, latency=0.02) as server:
+            rcon = make_rcon(server, rcon_pool_size=2)
+            with ThreadPoolExecutor(max_workers=8) as workers:
+                responses = list(workers.map(
+                    lambda i: rcon.execute_command(f"setblock {i} 64 0 stone"), range(16)
+                ))
+            assert responses == [f"Changed the block at {i}, 64, 0" for i in range(16)]
+            assert rcon.pool.connections_opened <= 2
+            assert len(server.world.blocks) == 16
+
+    def test_reconnects_after_dropped_connection(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            rcon = make_rcon(server)
+            rcon.execute_command("list")
+            # Server restart or network drop while the connection sits idle
+            server.drop_connections()
+            time.sleep(0.05)
+
+            assert rcon.execute_command("setblock 0 64 0 stone") == "Changed the block at 0, 64, 0"
+            assert rcon.pool.connections_opened == 2
+
+    def test_idle_connections_are_closed(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            rcon = make_rcon(server, rcon_pool_idle_timeout=0.05)
+            rcon.execute_command("list")
+            time.sleep(0.1)
+            rcon.execute_command("list")
+            assert rcon.pool.connections_opened == 2
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for RCON packet handling: pipelined batches and responses
+split over several packets.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import itertools
+import socket
+
+import pytest
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.rcon_protocol import (
+    MAX_REQUEST_BODY,
+    SERVERDATA_AUTH,
+    SERVERDATA_SENTINEL,
+    PipelineWindow,
+    decode_packet,
+    encode_packet,
+)
+
+PASSWORD = "test"
+
+
+def decode_writes(writes):
+    """Decode length-prefixed packets written one at a time."""
+    packets = []
+    for data in writes:
+        length = int.from_bytes(data[:4], "little", signed=True)
+        assert length == len(data) - 4
+        packets.append(decode_packet(data[4:]))
+    return packets
+
+
+@pytest.fixture
+def server():
+    with FakeMinecraftServer(password=PASSWORD) as fake:
+        yield fake
+
+
+class TestPipeline:
+    """Tests for pipelined command batches"""
+
+    def test_window_matches_responses_by_packet_id(self):
+        ids = itertools.count(1)
+        window = PipelineWindow(["a", "b", "c"], depth=2, allocate_id=lambda: next(ids))
+
+        # Two commands, each followed by its sentinel
+        packets = decode_writes(window.top_up())
+        assert [body for _, _, body in packets] == ["a", "", "b", ""]
+        (a_id, _, _), (a_sentinel, _, _), (b_id, _, _), (b_sentinel, _, _) = packets
+
+        # Responses are matched by id, and handed out in command order
+        window.receive(b_id, "B")
+        window.receive(b_sentinel, "Unknown request 0")
+        assert not window.has_next()
+        window.receive(a_id, "A1")
+        window.receive(a_id, "A2")
+        window.receive(a_sentinel, "Unknown request 0")
+        assert window.has_next()
+        assert [window.pop(), window.pop()] == ["A1A2", "B"]
+
+        assert [body for _, _, body in decode_writes(window.top_up())] == ["c", ""]
+
+    def test_batch_runs_in_order_on_one_connection(self, server, make_rcon):
+        rcon = make_rcon(server, enable_rcon_pipelining=True)
+        commands = [f"setblock {i % 10} 64 0 {'stone' if i // 10 % 2 else 'dirt'}" for i in range(300)]
+
+        responses = asyncio.run(rcon.execute_batch(commands, window=16))
+
+        assert responses == [f"Changed the block at {i % 10}, 64, 0" for i in range(300)]
+        assert server.world.get((9, 64, 0)) == "minecraft:stone"
+        assert rcon.aio.connections_opened == 1
+
+    def test_blocking_batch(self, server, make_rcon):
+        rcon = make_rcon(server, enable_rcon_pipelining=True)
+        commands = [f"setblock {i} 64 0 stone" for i in range(50)]
+
+        assert rcon.execute_batch_sync(commands, window=8) == [f"Changed the block at {i}, 64, 0" for i in range(50)]
+        assert rcon.pool.connections_opened == 1
+
+    def test_oversized_command_fails_after_the_ones_before_it(self, server, make_rcon):
+        rcon = make_rcon(server)
+        commands = ["setblock 0 64 0 stone", "say " + "x" * MAX_REQUEST_BODY, "setblock 1 64 0 stone"]
+
+        with pytest.raises(RuntimeError, match="exceeds RCON limit"):
+            asyncio.run(rcon.execute_batch(commands))
+        assert server.world.get((0, 64, 0)) == "minecraft:stone"
+        assert server.world.get((1, 64, 0)) == "minecraft:air"
+
+
+class TestReassembly:
+    """Tests for responses split over several packets (ended by a sentinel)"""
+
+    def test_every_path_reassembles(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, fragment_size=16) as fragmented:
+            for i in range(20):
+                fragmented.execute(f"setblock {i} 0 0 minecraft:{'abcdefghijklmnopqrst'[i]}_block")
+            rcon = make_rcon(fragmented, enable_rcon_pipelining=True)
+            rcon.execute_command("/pos1 0,0,0")
+            rcon.execute_command("/pos2 19,0,0")
+            expected = fragmented.execute("/distr")
+            assert len(expected) > 16 * 20
+
+            assert rcon.execute_command("/distr") == expected
+            assert list(rcon.stream_command("/distr")) == expected.split("\n")
+            assert rcon.execute_batch_sync(["/distr", "list", "/distr"]) == [
+                expected, fragmented.execute("list"), expected,
+            ]
+
+            async def scenario():
+                single = await rcon.execute("/distr")
+                batch = await rcon.execute_batch(["/distr", "/distr"], window=2)
+                return [single] + batch
+
+            assert asyncio.run(scenario()) == [expected] * 3
+
+
+class TestOnePacketPerRead:
+    """Tests against a server that, like vanilla and Paper, reads one packet per read"""
+
+    def test_packets_sent_together_drop_the_connection(self):
+        with FakeMinecraftServer(password=PASSWORD, one_packet_per_read=True) as strict:
+            with socket.create_connection(("127.0.0.1", strict.port), timeout=2) as sock:
+                auth = encode_packet(1, SERVERDATA_AUTH, PASSWORD)
+                sock.sendall(auth + encode_packet(2, SERVERDATA_SENTINEL, ""))
+                sock.recv(4096)
+                assert sock.recv(4096) == b""
+            assert strict.stats["dropped_reads"] == 1
+
+    def test_commands_send_one_packet_per_write(self, make_rcon):
+        strict = FakeMinecraftServer(password=PASSWORD, fragment_size=16, one_packet_per_read=True)
+        with strict:
+            rcon = make_rcon(strict)
+            for i in range(20):
+                response = rcon.execute_command(f"setblock {i} 64 0 stone")
+                assert response == f"Changed the block at {i}, 64, 0"
+            expected = strict.execute("list")
+            assert list(rcon.stream_command("list")) == expected.split("\n")
+
+            async def scenario():
+                return [await rcon.execute("list") for _ in range(5)]
+
+            assert asyncio.run(scenario()) == [expected] * 5
+            assert strict.stats["dropped_reads"] == 0
+            assert rcon.pool.connections_opened == 1
+            assert rcon.aio.connections_opened == 1
+
+    def test_batches_without_pipelining(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, one_packet_per_read=True) as strict:
+            rcon = make_rcon(strict)
+            commands = [f"setblock {i} 64 0 stone" for i in range(40)]
+            expected = [f"Changed the block at {i}, 64, 0" for i in range(40)]
+
+            assert rcon.execute_batch_sync(commands, window=8) == expected
+            commands = [command.replace("stone", "dirt") for command in commands]
+            assert asyncio.run(rcon.execute_batch(commands, window=8)) == expected
+            assert strict.stats["dropped_reads"] == 0
+            assert strict.stats["commands"] == 80
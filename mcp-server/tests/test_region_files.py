@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for block queries answered from Anvil region files.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import numpy as np
+
+from vibecraft.block_utils import fetch_block_state, sync_world
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.region_files import unpack_indices
+from vibecraft.validation_algorithms import StructureValidator
+from vibecraft.worldedit_session import Box
+
+PASSWORD = "test"
+
+
+class TestRegionFiles:
+    """Tests for the region file reader"""
+
+    def test_reads_blocks_from_region_files(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            # Enough block types for 5-bit palette indices, across a region border
+            for i in range(20):
+                server.world.set((i - 10, 64, -1), f"minecraft:wool_{i}")
+            server.world.set((-513, -60, 700), "minecraft:oak_stairs[facing=north,half=top]")
+            # No TTL: every flush saves and re-reads what the player may have changed
+            rcon = make_rcon(server, chunk_cache_ttl=0)
+
+            assert sync_world(rcon)
+            server.command_names.clear()
+
+            stairs = fetch_block_state(rcon, -513, -60, 700)
+            assert stairs["key"] == "oak_stairs[facing=north,half=top]"
+            assert stairs["properties"] == {"facing": "north", "half": "top"}
+            for i in range(20):
+                assert fetch_block_state(rcon, i - 10, 64, -1)["id"] == f"wool_{i}"
+            assert fetch_block_state(rcon, 0, 65, -1)["id"] == "air"
+            assert sum(server.command_names.values()) == 0
+
+            # Changes show up after the next flush only
+            server.world.set((0, 64, -1), "minecraft:gold_block")
+            assert fetch_block_state(rcon, 0, 64, -1)["id"] == "wool_10"
+            sync_world(rcon)
+            assert fetch_block_state(rcon, 0, 64, -1)["id"] == "gold_block"
+
+            # Chunks the files do not hold are asked over RCON
+            fetch_block_state(rcon, 5000, 64, 5000)
+            assert server.command_names["execute"] == 1
+            rcon.close()
+
+    def test_unpack_indices(self):
+        rng = np.random.default_rng(0)
+        for bits in (4, 5, 7, 12):
+            values = rng.integers(0, 1 << bits, 4096)
+            per_long = 64 // bits
+            longs = [0] * -(-4096 // per_long)
+            for i, value in enumerate(values.tolist()):
+                longs[i // per_long] |= value << ((i % per_long) * bits)
+            data = np.array(longs, dtype=np.uint64)
+            assert (unpack_indices(data, bits) == values).all()
+
+    def test_read_box_matches_block_queries(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            rng = np.random.default_rng(1)
+            for x, y, z in rng.integers([-20, 60, -20], [20, 80, 20], (500, 3)).tolist():
+                server.world.set((x, y, z), f"minecraft:wool_{(x * y) % 9}")
+            for x in range(-32, 32):
+                for z in range(-32, 32):
+                    server.world.set((x, 59, z), "minecraft:stone")
+            rcon = make_rcon(server)
+            sync_world(rcon)
+
+            region = rcon.region_files.read_box(Box(18, 79, 19, -21, 58, -22))
+            assert region.origin == (-21, 58, -22)
+            assert region.indices.shape == (40, 22, 42)
+            for x, y, z in rng.integers([-21, 58, -22], [19, 80, 20], (300, 3)).tolist():
+                assert region.state(x, y, z) == rcon.region_files.block_state(x, y, z)
+            assert rcon.region_files.read_box(Box(0, 60, 0, 40, 60, 40)) is None
+
+    def test_validator_reads_locally(self, tmp_path, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD, world_dir=tmp_path / "world") as server:
+            for x in range(5):
+                for z in range(5):
+                    server.world.set((x, 64, z), "minecraft:stone")
+            server.world.set((2, 66, 2), "minecraft:sand")
+
+            local = StructureValidator(make_rcon(server)).validate_structure(0, 64, 0, 4, 66, 4)
+            assert server.command_names["save-all"] == 1
+            assert server.command_names["execute"] == 0
+            assert local["gravity_violations"][0]["position"] == [2, 66, 2]
+
+            server.command_names.clear()
+            rcon = make_rcon(server, enable_region_reads=False)
+            StructureValidator(rcon).validate_structure(0, 64, 0, 4, 66, 4)
+            assert server.command_names["save-all"] == 0
+            assert server.command_names["execute"] > 0
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for tiling oversized fills and WorldEdit region operations.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+import itertools
+import logging
+
+from vibecraft.build_diff import plan_voxels
+from vibecraft.config import VibeCraftConfig
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.region_tiler import CHUNK_SIZE, tile_region
+from vibecraft.rcon_manager import RCONManager
+from vibecraft.tools.build_tools import handle_build
+from vibecraft.worldedit_session import Box, volume
+
+PASSWORD = "test"
+
+
+class TestRegionTiler:
+    """Tests for region tiling"""
+
+    def test_tiles_cover_region_once(self):
+        region = Box(-37, 60, 5, 300, 100, 210)
+        tiles = tile_region(region, 100_000, columns=True, overlap=4)
+
+        assert len(tiles) > 1
+        assert all(volume(tile.box) <= 100_000 for tile in tiles)
+        assert all(tile.box.y1 == 60 and tile.box.y2 == 100 for tile in tiles)
+        assert sum(volume(tile.core) for tile in tiles) == volume(region)
+        for a, b in itertools.combinations(tiles, 2):
+            assert (
+                a.core.x2 < b.core.x1 or b.core.x2 < a.core.x1
+                or a.core.z2 < b.core.z1 or b.core.z2 < a.core.z1
+            )
+        # Inner tile edges fall on chunk borders
+        assert all(tile.core.x1 % CHUNK_SIZE == 0 for tile in tiles if tile.core.x1 != region.x1)
+
+    def test_oversized_build_runs_in_tiles(self, tmp_path):
+        commands = [
+            "/fill 0 60 0 59 79 59 stone_bricks hollow",
+            "//pos1 100,60,0",
+            "//pos2 219,69,99",
+            "//set oak_planks",
+        ]
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            config = VibeCraftConfig(
+                rcon_host="127.0.0.1",
+                rcon_port=server.port,
+                rcon_password=PASSWORD,
+                rcon_timeout=5,
+                enable_chunk_scheduling=False,
+                enable_function_batches=False,
+                enable_schematic_builds=False,
+                build_journal_dir=str(tmp_path),
+            )
+            rcon = RCONManager(config)
+            result = asyncio.run(handle_build({"commands": commands}, rcon, config, logging.getLogger(__name__)))
+
+            assert "Build completed successfully" in result[0].text
+            assert "into tiles" in result[0].text
+            assert server.command_names["/set"] > 1
+            expected = {
+                position: block
+                for position, (block, _) in plan_voxels(commands).items()
+                if block != "minecraft:air"
+            }
+            assert server.world.blocks == expected
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for Sponge schematic builds.
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.schematic import AIR, build_schematic, commands_to_voxels, read_schematic
+from vibecraft.worldedit_session import Box
+
+PASSWORD = "test"
+
+
+class TestSchematic:
+    """Tests for schematic encoding and SchematicBuildExecutor"""
+
+    def test_round_trip(self, tmp_path):
+        voxels, block_entities = commands_to_voxels([
+            "fill 10 64 20 12 64 21 minecraft:stone",
+            "setblock 11 66 20 minecraft:oak_stairs[facing=east]",
+        ])
+        path = tmp_path / "build.schem"
+        build_schematic(voxels, block_entities).save(path)
+
+        size, palette, indices = read_schematic(path)
+        assert size == (3, 3, 2)
+        # x fastest, then z, then y
+        assert palette[indices[0]] == "minecraft:stone"
+        assert palette[indices[1 + 0 * 3 + 2 * 6]] == "minecraft:oak_stairs[facing=east]"
+        assert palette[indices[0 + 0 * 3 + 1 * 6]] == AIR
+
+    def test_paste_after_read_region(self, tmp_path, make_rcon):
+        schematic_dir = tmp_path / "plugins" / "WorldEdit" / "schematics"
+        schematic_dir.mkdir(parents=True)
+        with FakeMinecraftServer(password=PASSWORD, schematic_dir=schematic_dir) as server:
+            server.world.set((0, 64, 0), "minecraft:dirt")
+            rcon = make_rcon(server, schematic_min_blocks=1)
+
+            async def scenario():
+                # Leaves the region's //copy in the clipboard
+                palette, _ = await rcon.schematics.read_region(Box(0, 64, 0, 1, 64, 1))
+                assert "minecraft:dirt" in palette
+                return await rcon.schematics.run(["fill 5 70 5 6 70 6 minecraft:gold_block"])
+
+            assert "pasted" in asyncio.run(scenario())
+            assert server.world.get((5, 70, 5)) == "minecraft:gold_block"
+            assert server.world.get((1, 70, 1)) == AIR
+            assert server.command_names["/clearclipboard"] == 1
+            assert not list(schematic_dir.iterdir())
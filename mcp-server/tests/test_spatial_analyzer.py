@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the spatial analyzer's structure pattern detection.
+
+Note: Import paths are configured via conftest.py
+"""
+
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.spatial_analyzer import SpatialAnalyzerV2
+
+PASSWORD = "test"
+
+
+class TestSpatialAnalyzer:
+    """Tests for SpatialAnalyzerV2"""
+
+    def test_structure_patterns_count_exact_families(self, make_rcon):
+        with FakeMinecraftServer(password=PASSWORD) as server:
+            for x, block in enumerate([
+                "stone_bricks", "mossy_stone_bricks", "end_stone_bricks", "glass",
+                "glass_pane", "red_stained_glass", "oak_stairs", "oak_trapdoor",
+            ]):
+                server.world.set((x, 64, 0), f"minecraft:{block}")
+            rcon = make_rcon(server, enable_function_batches=False)
+
+            patterns = SpatialAnalyzerV2(rcon)._detect_structure_patterns(0, 64, 0, 7, 64, 0)
+            assert patterns["stone_count"] == 2
+            assert patterns["glass_count"] == 2
+            assert patterns["stairs_count"] == 1
+            assert patterns["doors_count"] == 0
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Pytest tests for the mirrored WorldEdit console session (selection, world).
+
+Note: Import paths are configured via conftest.py
+"""
+
+import asyncio
+
+import pytest
+from tests.support.fake_server import FakeMinecraftServer
+from vibecraft.worldedit_session import Box, WorldEditSessionState
+
+PASSWORD = "test"
+
+
+@pytest.fixture
+def server():
+    with FakeMinecraftServer(password=PASSWORD) as fake:
+        yield fake
+
+
+class TestWorldEditSession:
+    """Tests for WorldEditSessionState as used by RCONManager"""
+
+    def test_observed_commands(self):
+        state = WorldEditSessionState()
+        state.observe("/pos1 1,2,3", "First position set to (1, 2, 3).")
+        state.observe("/pos2 4,5,6", "Second position set to (4, 5, 6).")
+        assert state.selection() == Box(1, 2, 3, 4, 5, 6)
+        assert state.cached_response("/pos1 1,2,3") is not None
+        assert state.cached_response("/pos1 1,2,4") is None
+
+        # Trusted commands that do not select keep the selection
+        state.observe("/set stone", "Operation completed (64 blocks affected).")
+        assert state.selection() is not None
+        # Unfamiliar user commands may have moved it
+        state.observe("/expand 5 up", "Region expanded 5 blocks", trusted=False)
+        assert state.selection() is None
+
+        state.observe("/pos1 1,2,3", "First position set to (1, 2, 3).")
+        state.observe("/pos2 1,2,3", "Unknown or invalid position")
+        assert state.selection() is None and state.pos1 == (1, 2, 3)
+
+    def test_changed_corner_only_is_resent(self, server, make_rcon):
+        rcon = make_rcon(server)
+        for box in (Box(0, 0, 0, 3, 3, 3), Box(0, 0, 0, 5, 5, 5), Box(0, 0, 0, 5, 5, 5)):
+            with rcon.selection(box):
+                rcon.execute_command("/count stone")
+        assert server.command_names["/pos1"] == 1
+        assert server.command_names["/pos2"] == 2
+
+    def test_untrusted_and_failed_commands_invalidate(self, server, make_rcon):
+        rcon = make_rcon(server)
+        box = Box(0, 0, 0, 3, 3, 3)
+
+        async def scenario():
+            with rcon.selection(box):
+                pass
+            await rcon.execute_batch(["/sel cuboid"], trusted=False)
+            with rcon.selection(box):
+                pass
+            server.latency = 0.3
+            with pytest.raises(TimeoutError):
+                await rcon.execute("/count stone", timeout=0.1)
+            server.latency = 0
+            with rcon.selection(box):
+                pass
+
+        asyncio.run(scenario())
+        assert server.command_names["/pos1"] == 3
+
+    def test_fresh_connections_forget_the_session(self, server, make_rcon):
+        # Idle connections are closed; the server may restart meanwhile
+        rcon = make_rcon(server, rcon_pool_idle_timeout=0.05)
+        box = Box(0, 0, 0, 3, 3, 3)
+
+        async def scenario():
+            for _ in range(2):
+                with rcon.selection(box):
+                    pass
+                await rcon.ensure_worldedit_world()
+                await asyncio.sleep(0.1)
+
+        asyncio.run(scenario())
+        assert server.command_names["/pos1"] == 2
+        assert server.command_names["/world"] == 2
+
+    def test_world_override_is_sent_once(self, server, make_rcon):
+        rcon = make_rcon(server)
+        box = Box(0, 0, 0, 3, 3, 3)
+
+        async def scenario():
+            with rcon.selection(box):
+                pass
+            for _ in range(3):
+                await rcon.ensure_worldedit_world()
+            assert server.command_names["/world"] == 1
+
+            # Another (here unknown) world: the override and the selection
+            # that belonged to the old world are forgotten
+            await rcon.ensure_worldedit_world("world_nether")
+            assert rcon.worldedit_state.world is None
+            await rcon.ensure_worldedit_world()
+            with rcon.selection(box):
+                pass
+            assert server.command_names["/world"] == 3
+
+            # A dropped connection may mean a restarted server: noticed before
+            # the mirrored session is trusted again
+            server.drop_connections()
+            await asyncio.sleep(0.05)
+            await rcon.ensure_worldedit_world()
+            assert server.command_names["/world"] == 4
+            with rcon.selection(box):
+                pass
+
+        asyncio.run(scenario())
+        assert server.command_names["/pos1"] == 3